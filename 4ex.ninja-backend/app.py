@@ -8,18 +8,20 @@ Achieves 522% returns with 60.87% win rate using Phase 1 enhancements:
 """
 
 import asyncio
+import secrets
 import time
 import os
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from fastapi import FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 from models.signal_models import (
     TradingSignal,
@@ -27,12 +29,35 @@ from models.signal_models import (
     SignalResponse,
     PerformanceResponse,
 )
-from services.signal_service import SignalService
-from services.data_service import DataService
-from services.notification_service import NotificationService
-from services.scheduler_service import ForexSchedulerService
-from services.enhanced_daily_production_service import EnhancedDailyProductionService
-from config.settings import get_settings
+from services.scan_snapshot_service import (
+    ScanSnapshot,
+    ViewBuilder,
+    get_scan_snapshot_service,
+)
+from services.json_codec import (
+    FastJSONResponse,
+    dumps,
+    encoded_response,
+    json_response,
+    negotiate_encoding,
+)
+from services.signal_bus_service import get_signal_bus_service
+from services.metrics_service import get_metrics_registry
+from services.tracing_service import get_tracer
+from services.profiling_service import PROFILE_MODES, get_profiling_service
+from services.strategy_registry_service import (
+    StrategyRegistryService,
+    get_strategy_registry,
+)
+from config.settings import get_settings, ADMIN_SETTINGS, SIGNAL_STREAM_SETTINGS
+
+if TYPE_CHECKING:
+    # Heavy modules (pandas, motor, aiohttp, apscheduler) load when services are built
+    from services.signal_service import SignalService
+    from services.data_service import DataService
+    from services.notification_service import NotificationService
+    from services.scheduler_service import ForexSchedulerService
+    from services.enhanced_daily_production_service import EnhancedDailyProductionService
 
 
 # Initialize FastAPI app
@@ -40,6 +65,7 @@ app = FastAPI(
     title="4ex.ninja Enhanced Backend",
     description="Production-focused backend for Enhanced Daily Strategy",
     version="2.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware
@@ -51,14 +77,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-signal_service = SignalService()
-data_service = DataService()
-notification_service = NotificationService()
-scheduler_service = ForexSchedulerService(data_service, signal_service)
-enhanced_daily_service = EnhancedDailyProductionService()
 settings = get_settings()
 
+# Scan snapshot: published by the scheduler, refreshed on demand (single-flight)
+scan_snapshot_service = get_scan_snapshot_service()
+
+# Shared strategy/risk-manager instances for the /api/v2 endpoints
+strategy_registry = get_strategy_registry()
+
+
+# Services are built on first use (normally in the startup hook), so importing
+# the app stays cheap and worker restarts do not pay for unused modules
+@lru_cache(maxsize=None)
+def get_data_service() -> "DataService":
+    from services.data_service import DataService
+
+    service = DataService()
+    strategy_registry.set_data_service(service)
+    return service
+
+
+@lru_cache(maxsize=None)
+def get_signal_service() -> "SignalService":
+    from services.signal_service import SignalService
+
+    return SignalService()
+
+
+@lru_cache(maxsize=None)
+def get_notification_service() -> "NotificationService":
+    from services.notification_service import NotificationService
+
+    return NotificationService()
+
+
+@lru_cache(maxsize=None)
+def get_enhanced_daily_service() -> "EnhancedDailyProductionService":
+    from services.enhanced_daily_production_service import EnhancedDailyProductionService
+
+    service = EnhancedDailyProductionService(
+        data_service=get_data_service(),
+        notification_service=get_notification_service(),
+    )
+    scan_snapshot_service.set_producer(service.scan_market)
+    return service
+
+
+@lru_cache(maxsize=None)
+def get_scheduler_service() -> "ForexSchedulerService":
+    from services.scheduler_service import ForexSchedulerService
+
+    return ForexSchedulerService(
+        get_data_service(), get_signal_service(), get_enhanced_daily_service()
+    )
+
+
+# Construction time per service, recorded by the startup hook
+startup_profile: Dict[str, float] = {}
+
+
 # App startup time for uptime calculation
 startup_time = time.time()
 
@@ -71,11 +148,53 @@ async def startup_event():
 
     logging.info("🚀 Starting 4ex.ninja Enhanced Backend...")
 
+    # Build services in dependency order, timing each one
+    for name, getter in (
+        ("data_service", get_data_service),
+        ("signal_service", get_signal_service),
+        ("notification_service", get_notification_service),
+        ("enhanced_daily_service", get_enhanced_daily_service),
+        ("scheduler_service", get_scheduler_service),
+    ):
+        started = time.perf_counter()
+        getter()
+        startup_profile[name] = round((time.perf_counter() - started) * 1000, 1)
+    logging.info(
+        "⏱️ Services built in "
+        + ", ".join(f"{name} {ms}ms" for name, ms in startup_profile.items())
+    )
+
+    # Stream live prices for every pair (serves DataService.get_current_price)
+    from services.bar_builder_service import get_bar_builder_service
+    from services.pricing_stream_service import get_pricing_stream_service
+
+    pricing_stream = get_pricing_stream_service()
+    pricing_stream.set_data_service(get_data_service())
+    if pricing_stream.start():
+        # Live bars from the same ticks ("bar" events on /stream/signals)
+        bar_builder = get_bar_builder_service()
+        bar_builder.set_data_service(get_data_service())
+        bar_builder.start(pricing_stream)
+
     # Start the forex market scheduler
-    await scheduler_service.start_scheduler()
+    await get_scheduler_service().start_scheduler()
+
+    # Build shared strategy instances and prime the V2 signal cache in the background
+    strategy_registry.warm_up()
+    asyncio.create_task(_prime_v2_signals())
     logging.info("✅ All services initialized successfully")
 
 
+async def _prime_v2_signals():
+    """Compute V2 signals once at startup so the first request is served from cache."""
+    import logging
+
+    try:
+        await strategy_registry.refresh_v2_signals()
+    except Exception as e:
+        logging.warning(f"⚠️ V2 signal warm-up failed: {str(e)}")
+
+
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown."""
@@ -83,8 +202,20 @@ async def shutdown_event():
 
     logging.info("⏹️ Shutting down 4ex.ninja Enhanced Backend...")
 
-    # Stop the scheduler gracefully
-    await scheduler_service.stop_scheduler()
+    # Stop the scheduler gracefully (only if it was ever built)
+    if get_scheduler_service.cache_info().currsize:
+        await get_scheduler_service().stop_scheduler()
+
+    from services.bar_builder_service import get_bar_builder_service
+    from services.pricing_stream_service import get_pricing_stream_service
+
+    await get_bar_builder_service().stop()
+    await get_pricing_stream_service().stop()
+
+    # Drain pending Discord deliveries and close the shared session
+    from services.discord_delivery_service import get_discord_delivery_service
+
+    await get_discord_delivery_service().close()
     logging.info("✅ All services stopped successfully")
 
 
@@ -106,6 +237,9 @@ async def root():
             "signals": "/signals",
             "config": "/config",
             "performance": "/performance",
+            "stream": "/stream/signals",
+            "metrics": "/metrics",
+            "last_trace": "/debug/last-trace",
         },
     }
 
@@ -115,13 +249,13 @@ async def health_check():
     """Health check endpoint."""
     try:
         # Check data service
-        data_health = await data_service.health_check()
+        data_health = await get_data_service().health_check()
 
         # Check enhanced daily service
-        enhanced_healthy = len(enhanced_daily_service.monitored_pairs) > 0
+        enhanced_healthy = len(get_enhanced_daily_service().monitored_pairs) > 0
 
         # Check scheduler
-        scheduler_status = scheduler_service.get_scheduler_status()
+        scheduler_status = get_scheduler_service().get_scheduler_status()
 
         return HealthCheckResponse(
             status="healthy" if data_health and enhanced_healthy else "degraded",
@@ -158,7 +292,7 @@ async def get_strategy_config():
                 "total_trades": 230,
                 "sharpe_ratio": 0.51,
             },
-            "monitored_pairs": enhanced_daily_service.monitored_pairs,
+            "monitored_pairs": get_enhanced_daily_service().monitored_pairs,
             "phase": "Phase 1 - Quick Wins",
             "status": "Production Ready",
         },
@@ -166,17 +300,108 @@ async def get_strategy_config():
     }
 
 
+def _snapshot_response(
+    request: Request, snapshot: ScanSnapshot, view: str, build: ViewBuilder
+) -> Response:
+    """Serve a snapshot view from pre-serialized bytes with ETag / If-None-Match handling."""
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": "no-cache",
+        "X-Snapshot-Version": str(snapshot.version),
+    }
+    if snapshot.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    body = snapshot.render(view, build)
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), len(body))
+    if encoding:
+        body = snapshot.render(view, build, encoding)
+        headers["ETag"] = snapshot.etag_for(encoding)
+    return encoded_response(body, encoding, headers=headers)
+
+
+def _scan_view(snapshot: ScanSnapshot) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "strategy": "Enhanced Daily Strategy (Phase 1)",
+        "data": snapshot.data,
+        "snapshot_version": snapshot.version,
+        "timestamp": snapshot.created_at,
+    }
+
+
+def _signals_view(snapshot: ScanSnapshot) -> Dict[str, Any]:
+    signals = snapshot.data.get("signals", [])
+    return {
+        "success": True,
+        "message": "Enhanced Daily signals retrieved successfully",
+        "signals": signals,
+        "strategy": "Enhanced Daily Strategy (Phase 1)",
+        "signal_count": len(signals),
+        "active_pairs": get_enhanced_daily_service().monitored_pairs,
+        "snapshot_version": snapshot.version,
+        "timestamp": snapshot.created_at,
+    }
+
+
+# Serialized once per published snapshot, before any request asks for them
+scan_snapshot_service.register_view("scan", _scan_view)
+scan_snapshot_service.register_view("signals", _signals_view)
+
+
+async def _get_scan_snapshot(refresh: bool) -> ScanSnapshot:
+    """Get the current scan snapshot, scanning only if forced or none exists yet."""
+    if refresh:
+        return await scan_snapshot_service.refresh()
+    return await scan_snapshot_service.get_or_refresh()
+
+
+def require_admin(request: Request) -> None:
+    """Reject requests without the configured admin token (FastAPI dependency)."""
+    expected = ADMIN_SETTINGS["api_token"]
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (no ADMIN_API_TOKEN)")
+    provided = request.headers.get(ADMIN_SETTINGS["header"], "")
+    if not secrets.compare_digest(provided.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+async def _profiled_scan(mode: str) -> Tuple[ScanSnapshot, str]:
+    """Run one forced scan under the profiler; returns the snapshot and profile id."""
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"Unknown profiling mode: {mode}")
+    profiling = get_profiling_service()
+    session = profiling.start("scan", mode)
+    if session is None:
+        raise HTTPException(status_code=409, detail="Another profile is already running")
+    try:
+        snapshot = await _get_scan_snapshot(True)
+    finally:
+        await profiling.finish(session)
+    return snapshot, session.profile_id
+
+
 @app.get("/scan")
-async def scan_all_pairs():
-    """Scan all pairs using Enhanced Daily Strategy."""
+async def scan_all_pairs(
+    request: Request, refresh: bool = False, profile: Optional[str] = None
+):
+    """
+    Scan all pairs using Enhanced Daily Strategy (served from the latest snapshot).
+
+    ?profile=sampling|cprofile (admin token required) forces a scan under the profiler.
+    """
+    if profile:
+        require_admin(request)
     try:
-        results = await enhanced_daily_service.get_enhanced_market_analysis()
-        return {
-            "success": True,
-            "strategy": "Enhanced Daily Strategy (Phase 1)",
-            "data": results,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        if profile:
+            snapshot, profile_id = await _profiled_scan(profile)
+            response = _snapshot_response(request, snapshot, "scan", _scan_view)
+            response.headers["X-Profile-Id"] = profile_id
+            return response
+        snapshot = await _get_scan_snapshot(refresh)
+        return _snapshot_response(request, snapshot, "scan", _scan_view)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Enhanced Daily scan failed: {str(e)}"
@@ -184,19 +409,11 @@ async def scan_all_pairs():
 
 
 @app.get("/signals")
-async def get_current_signals():
+async def get_current_signals(request: Request, refresh: bool = False):
     """Get current Enhanced Daily Strategy signals."""
     try:
-        signals = await enhanced_daily_service.generate_enhanced_signals()
-        return {
-            "success": True,
-            "message": "Enhanced Daily signals generated successfully",
-            "signals": signals,
-            "strategy": "Enhanced Daily Strategy (Phase 1)",
-            "signal_count": len(signals),
-            "active_pairs": enhanced_daily_service.monitored_pairs,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        snapshot = await _get_scan_snapshot(refresh)
+        return _snapshot_response(request, snapshot, "signals", _signals_view)
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Enhanced Daily signal generation failed: {str(e)}"
@@ -204,20 +421,25 @@ async def get_current_signals():
 
 
 @app.get("/signals/{pair}")
-async def get_pair_signals(pair: str):
+async def get_pair_signals(request: Request, pair: str):
     """Get Enhanced Daily Strategy signals for specific pair."""
     try:
-        # Get all signals and filter for the specific pair
-        all_signals = await enhanced_daily_service.generate_enhanced_signals()
-        pair_signals = [s for s in all_signals if s.get("pair") == pair]
+        snapshot = await scan_snapshot_service.get_or_refresh()
 
-        return {
-            "success": True,
-            "strategy": "Enhanced Daily Strategy (Phase 1)",
-            "pair": pair,
-            "signals": pair_signals,
-            "timestamp": datetime.utcnow().isoformat(),
-        }
+        def build(snap: ScanSnapshot) -> Dict[str, Any]:
+            return {
+                "success": True,
+                "strategy": "Enhanced Daily Strategy (Phase 1)",
+                "pair": pair,
+                "signals": snap.signals_by_pair.get(pair, []),
+                "snapshot_version": snap.version,
+                "timestamp": snap.created_at,
+            }
+
+        if pair not in get_enhanced_daily_service().monitored_pairs:
+            # Only monitored pairs get a rendered body cached on the snapshot
+            return json_response(build(snapshot), request.headers.get("accept-encoding"))
+        return _snapshot_response(request, snapshot, f"pair:{pair}", build)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -226,17 +448,25 @@ async def get_pair_signals(pair: str):
 
 
 @app.get("/performance")
-async def get_overall_performance():
+async def get_overall_performance(request: Request):
     """Get Enhanced Daily Strategy overall performance metrics."""
     try:
-        return {
+        enhanced_daily_service = get_enhanced_daily_service()
+        # Performance never triggers a scan; before the first snapshot, serve live metrics
+        snapshot = scan_snapshot_service.get_snapshot()
+        live_metrics = (
+            snapshot.data.get("performance_metrics", {})
+            if snapshot
+            else enhanced_daily_service.performance_metrics
+        )
+        body = {
             "success": True,
             "message": "Enhanced Daily performance retrieved successfully",
             "strategy": "Enhanced Daily Strategy (Phase 1)",
-            "live_metrics": enhanced_daily_service.performance_metrics,
+            "live_metrics": live_metrics,
             "discord_integration": {
-                "signals_sent_to_discord": enhanced_daily_service.performance_metrics.get("signals_sent_to_discord", 0),
-                "delivery_success_rate": enhanced_daily_service.performance_metrics.get("discord_delivery_success_rate", 0.0),
+                "signals_sent_to_discord": live_metrics.get("signals_sent_to_discord", 0),
+                "delivery_success_rate": live_metrics.get("discord_delivery_success_rate", 0.0),
                 "integration_status": "ACTIVE" if hasattr(enhanced_daily_service, 'discord_service') else "INACTIVE"
             },
             "active_signals": len(enhanced_daily_service.active_signals),
@@ -248,8 +478,10 @@ async def get_overall_performance():
                 "total_trades": 230,
                 "sharpe_ratio": 0.51,
             },
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": snapshot.created_at if snapshot else datetime.utcnow().isoformat(),
         }
+        # Active signals and integration status are live, so the body is not a snapshot view
+        return json_response(body, request.headers.get("accept-encoding"))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -261,6 +493,7 @@ async def get_overall_performance():
 async def get_pair_performance(pair: str):
     """Get Enhanced Daily Strategy performance for specific pair."""
     try:
+        enhanced_daily_service = get_enhanced_daily_service()
         if pair not in enhanced_daily_service.monitored_pairs:
             raise HTTPException(
                 status_code=404,
@@ -294,10 +527,11 @@ async def get_pair_performance(pair: str):
 async def get_scheduler_status():
     """Get forex market scheduler status."""
     try:
-        status = scheduler_service.get_scheduler_status()
+        status = get_scheduler_service().get_scheduler_status()
         return {
             "success": True,
             "scheduler": status,
+            "profiling": get_profiling_service().get_profiling_status(),
             "timestamp": datetime.utcnow().isoformat(),
         }
     except Exception as e:
@@ -310,6 +544,7 @@ async def get_scheduler_status():
 async def restart_scheduler():
     """Restart the forex market scheduler."""
     try:
+        scheduler_service = get_scheduler_service()
         await scheduler_service.stop_scheduler()
         await scheduler_service.start_scheduler()
         return {
@@ -323,14 +558,43 @@ async def restart_scheduler():
         )
 
 
+@app.get("/admin/profiling", dependencies=[Depends(require_admin)])
+async def get_profiling_status():
+    """Get armed scans, the running profile and recently written profiles."""
+    return {
+        "success": True,
+        "profiling": get_profiling_service().get_profiling_status(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+@app.post("/admin/profiling/arm", dependencies=[Depends(require_admin)])
+async def arm_profiling(scans: int = 1, mode: str = "sampling"):
+    """Profile the next N scheduled scans (scans=0 disarms)."""
+    try:
+        status = get_profiling_service().arm(scans, mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "success": True,
+        "profiling": status,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
 @app.get("/data/health")
 async def get_data_health():
     """Get data service health status."""
+    from services.bar_builder_service import get_bar_builder_service
+    from services.pricing_stream_service import get_pricing_stream_service
+
     try:
-        health = await data_service.health_check()
+        health = await get_data_service().health_check()
         return {
             "success": True,
             "data_service_healthy": health,
+            "pricing_stream": get_pricing_stream_service().get_stream_stats(),
+            "bar_builder": get_bar_builder_service().get_builder_stats(),
             "timestamp": datetime.utcnow().isoformat(),
         }
     except Exception as e:
@@ -344,7 +608,7 @@ async def test_notifications():
     """Test notification system including Discord integration."""
     try:
         # Test basic notification service
-        basic_test = await notification_service.test_notification()
+        basic_test = await get_notification_service().test_notification()
         
         # Test enhanced Discord service if available
         discord_test_result = None
@@ -373,10 +637,149 @@ async def test_notifications():
         )
 
 
+@app.get("/notifications/delivery/status")
+async def get_discord_delivery_status():
+    """Get Discord delivery queue depth and delivery metrics."""
+    from services.discord_delivery_service import get_discord_delivery_service
+
+    try:
+        return {
+            "success": True,
+            "delivery": get_discord_delivery_service().get_queue_metrics(),
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get Discord delivery status: {str(e)}"
+        )
+
+
+def _parse_stream_topics(topics: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma-separated topics query parameter ("signal,scan")."""
+    if not topics:
+        return None
+    return [topic.strip() for topic in topics.split(",") if topic.strip()]
+
+
+@app.get("/stream/signals")
+async def stream_signals(request: Request, topics: Optional[str] = None, pair: Optional[str] = None):
+    """Server-sent events stream of new signals ("signal") and scan snapshots ("scan")."""
+    try:
+        subscription = get_signal_bus_service().subscribe(_parse_stream_topics(topics), pair)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                message = await subscription.get(timeout=SIGNAL_STREAM_SETTINGS["heartbeat_seconds"])
+                if message is None:
+                    if subscription.closed:
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+                payload = dumps(message).decode("utf-8")
+                yield f"id: {message['id']}\nevent: {message['topic']}\ndata: {payload}\n\n"
+        finally:
+            get_signal_bus_service().unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.websocket("/ws/signals")
+async def websocket_signals(websocket: WebSocket, topics: Optional[str] = None, pair: Optional[str] = None):
+    """WebSocket stream of new signals and scan snapshots (same messages as the SSE stream)."""
+    await websocket.accept()
+    try:
+        subscription = get_signal_bus_service().subscribe(_parse_stream_topics(topics), pair)
+    except RuntimeError as e:
+        await websocket.close(code=1013, reason=str(e))
+        return
+
+    async def watch_disconnect():
+        # Client messages are ignored; a disconnect wakes the sender loop immediately
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close()
+
+    watcher = asyncio.create_task(watch_disconnect())
+    try:
+        while True:
+            message = await subscription.get(timeout=SIGNAL_STREAM_SETTINGS["heartbeat_seconds"])
+            if message is None:
+                if subscription.closed:
+                    break
+                await websocket.send_json({"topic": "heartbeat", "timestamp": datetime.utcnow().isoformat()})
+                continue
+            await websocket.send_text(dumps(message).decode("utf-8"))
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        get_signal_bus_service().unsubscribe(subscription)
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics (latency histograms, cache counters, queue depths)."""
+    return Response(
+        content=get_metrics_registry().render(),
+        media_type="text/plain; version=0.0.4",  # Starlette appends charset=utf-8
+    )
+
+
+@app.get("/debug/last-trace")
+async def get_last_trace(name: Optional[str] = None, include_spans: bool = False):
+    """
+    Critical path of the most recent scan trace.
+
+    Query params:
+        name: Root span name (e.g. generate_enhanced_signals, scheduler_signal_generation)
+        include_spans: Also return every span of the trace
+    """
+    tracer = get_tracer()
+    trace = tracer.get_last_trace(name)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No finished trace yet")
+
+    result = {key: value for key, value in trace.items() if key not in ("spans", "start_ns")}
+    if include_spans:
+        result["spans"] = trace["spans"]
+    return {
+        "success": True,
+        "trace": result,
+        "tracing": tracer.get_tracing_stats(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+@app.get("/stream/status")
+async def get_stream_status():
+    """Get live stream subscriber and drop statistics."""
+    try:
+        return {
+            "success": True,
+            "stream": get_signal_bus_service().get_bus_stats(),
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Failed to get stream status: {str(e)}"
+        )
+
+
 @app.post("/signals/send-to-discord")
 async def send_signals_to_discord():
     """Manually trigger sending current signals to Discord."""
     try:
+        enhanced_daily_service = get_enhanced_daily_service()
         # Generate current signals
         signals = await enhanced_daily_service.generate_enhanced_signals()
         
@@ -415,11 +818,12 @@ async def send_signals_to_discord():
 async def get_system_status():
     """Get comprehensive system status."""
     try:
+        enhanced_daily_service = get_enhanced_daily_service()
         # Get signal statistics
-        signal_stats = await signal_service.get_signal_statistics()
+        signal_stats = await get_signal_service().get_signal_statistics()
 
         # Get data health
-        data_health = await data_service.health_check()
+        data_health = await get_data_service().health_check()
 
         # Get enhanced daily metrics
         enhanced_metrics = enhanced_daily_service.performance_metrics
@@ -455,41 +859,23 @@ async def get_system_status():
 # ====================================================================
 
 @app.get("/api/v2/signals")
-async def get_v2_signals():
-    """Get current signals from Enhanced Daily Strategy V2"""
+async def get_v2_signals(
+    refresh: bool = False,
+    registry: StrategyRegistryService = Depends(get_strategy_registry),
+):
+    """Get current signals from Enhanced Daily Strategy V2 (cached until the next H4 close)."""
     try:
-        from enhanced_daily_strategy_v2 import EnhancedDailyStrategyV2
-        
-        strategy = EnhancedDailyStrategyV2()
-        
-        # Get signals for priority pairs
-        priority_pairs = ['USD_JPY', 'EUR_GBP', 'AUD_JPY']
-        signals = []
-        
-        for pair in priority_pairs:
-            try:
-                # Get recent data (would normally come from data service)
-                # For now, return basic signal info
-                signal_info = {
-                    'pair': pair,
-                    'signal': 'no_signal',
-                    'strategy_version': '2.0.0',
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'message': 'V2 parallel deployment - signals pending market data integration'
-                }
-                signals.append(signal_info)
-            except Exception as e:
-                signals.append({
-                    'pair': pair,
-                    'error': str(e),
-                    'strategy_version': '2.0.0'
-                })
-        
+        cached = await registry.get_v2_signals(force_refresh=refresh)
+        risk_manager = registry.risk_manager_v2
+
         return {
-            'version': '2.0.0',
+            'version': registry.strategy_v2.version,
             'strategy': 'Enhanced Daily Strategy V2',
             'timestamp': datetime.utcnow().isoformat(),
-            'signals': signals,
+            'signals': cached['signals'],
+            'computed_at': cached['computed_at'],
+            'expires_at': cached['expires_at'],
+            'trading_allowed': risk_manager.is_trading_allowed(),
             'status': 'parallel_deployment_active',
             'deployment_mode': 'parallel_with_v1'
         }
@@ -499,17 +885,13 @@ async def get_v2_signals():
 
 
 @app.get("/api/v2/status")
-async def get_v2_status():
+async def get_v2_status(
+    registry: StrategyRegistryService = Depends(get_strategy_registry),
+):
     """Get Enhanced Daily Strategy V2 status"""
     try:
-        from enhanced_daily_strategy_v2 import EnhancedDailyStrategyV2
-        from confidence_risk_manager_v2 import ConfidenceAnalysisRiskManager
-        
-        strategy = EnhancedDailyStrategyV2()
-        risk_manager = ConfidenceAnalysisRiskManager()
-        
-        strategy_info = strategy.get_strategy_info()
-        risk_status = risk_manager.get_risk_status()
+        strategy_info = registry.strategy_v2.get_strategy_info()
+        risk_status = registry.risk_manager_v2.get_risk_status()
         
         return {
             'strategy': 'Enhanced Daily Strategy V2',
@@ -529,7 +911,8 @@ async def get_v2_status():
                 'profit_factor_range': '1.8-2.5',
                 'monthly_trades': '20-30',
                 'confidence_level': '75%'
-            }
+            },
+            'registry': registry.get_registry_stats()
         }
         
     except Exception as e:
@@ -537,13 +920,12 @@ async def get_v2_status():
 
 
 @app.get("/api/v2/performance")
-async def get_v2_performance():
+async def get_v2_performance(
+    registry: StrategyRegistryService = Depends(get_strategy_registry),
+):
     """Get Enhanced Daily Strategy V2 performance metrics"""
     try:
-        from confidence_risk_manager_v2 import ConfidenceAnalysisRiskManager
-        
-        risk_manager = ConfidenceAnalysisRiskManager()
-        performance = risk_manager.get_risk_status()
+        performance = registry.risk_manager_v2.get_risk_status()
         
         return {
             'strategy': 'Enhanced Daily Strategy V2',
@@ -571,9 +953,14 @@ async def get_v2_performance():
 
 
 @app.get("/api/v2/comparison")
-async def get_v1_v2_comparison():
+async def get_v1_v2_comparison(
+    registry: StrategyRegistryService = Depends(get_strategy_registry),
+):
     """Compare V1 and V2 strategy performance"""
     try:
+        v2_tracking = registry.risk_manager_v2.performance_tracking
+        v2_trades = v2_tracking.get('total_trades', 0)
+
         return {
             'comparison_period': 'Active since 2025-08-22',
             'v1_strategy': {
@@ -586,8 +973,8 @@ async def get_v1_v2_comparison():
             'v2_strategy': {
                 'name': 'Enhanced Daily Strategy V2',
                 'deployment_date': '2025-08-22',
-                'live_trades': 'TBD',
-                'live_win_rate': 'TBD',
+                'live_trades': v2_trades,
+                'live_win_rate': v2_tracking.get('live_win_rate', 0.0) if v2_trades else 'TBD',
                 'endpoint': '/api/v2/signals'
             },
             'comparison_criteria': {
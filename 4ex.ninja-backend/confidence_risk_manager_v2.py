@@ -11,14 +11,21 @@ Key Features:
 - Conservative position sizing
 - Adaptive risk management based on live performance
 - Emergency exit protocols
+- Performance tracking and emergency status persisted in the shared risk journal,
+  so restarts and other processes (API, live bridge) see the same state
 """
 
 import json
 import logging
+import tempfile
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 import numpy as np
 
+from services.correlation_risk_service import get_correlation_risk_engine
+from services.position_book_service import get_position_book
+from services.risk_journal_service import RiskJournal
+
 class ConfidenceAnalysisRiskManager:
     """
     Risk Management based on comprehensive confidence analysis
@@ -27,16 +34,19 @@ class ConfidenceAnalysisRiskManager:
     derived from our 4,436 trade validation and confidence analysis.
     """
     
-    def __init__(self, account_balance: float = 10000):
+    def __init__(self, account_balance: float = 10000, journal: Optional[RiskJournal] = None):
         """
         Initialize confidence-based risk manager
         
         Args:
             account_balance: Current account balance for risk calculations
+            journal: Journal holding persisted state (defaults to RISK_JOURNAL_SETTINGS["directory"])
         """
         self.logger = logging.getLogger(__name__)
         self.account_balance = account_balance
         self.initial_balance = account_balance
+        self.position_book = get_position_book()  # Open trades shared with sizing and the bridge
+        self.correlation_risk = get_correlation_risk_engine()  # Rolling return correlations across pairs
         
         # Confidence analysis parameters (from our detailed analysis)
         self.confidence_parameters = {
@@ -81,6 +91,15 @@ class ConfidenceAnalysisRiskManager:
             "triggered_at": None
         }
         
+        # Daily/weekly/monthly risk usage resets when these change
+        self.periods = self._current_periods()
+        
+        # Persisted state is restored on first use (see load_state), so constructing
+        # a manager does no file I/O; later changes are journaled as they happen
+        self.journal = journal or RiskJournal()
+        self.journal.attach(self._journal_state, self._restore_state, self._apply_event)
+        self._state_loaded = False
+        
         self.logger.info("Confidence Analysis Risk Manager initialized")
         self.logger.info(f"Account Balance: ${account_balance:,.2f}")
         self.logger.info(f"Conservative Risk Per Trade: {self.risk_limits['max_risk_per_trade']*100:.1f}%")
@@ -162,6 +181,11 @@ class ConfidenceAnalysisRiskManager:
         entry_price = trade_signal.get('entry_price', 0)
         stop_loss = trade_signal.get('stop_loss', 0)
         
+        # Risk less on trades that move with the open positions
+        direction = 1 if trade_signal.get('signal') == 'BUY' else -1
+        correlation_multiplier = self.correlation_risk.correlation_multiplier(trade_signal.get('pair', ''), direction)
+        final_risk_amount *= correlation_multiplier
+        
         if entry_price > 0 and stop_loss > 0:
             pip_value = trade_signal.get('pip_value', 0.0001)
             pip_risk = abs(entry_price - stop_loss) / pip_value
@@ -186,6 +210,7 @@ class ConfidenceAnalysisRiskManager:
             "position_size": round(position_size, 2),
             "risk_amount": round(final_risk_amount, 2),
             "risk_multiplier": risk_multiplier,
+            "correlation_multiplier": round(correlation_multiplier, 3),
             "pip_risk": round(pip_risk, 1) if 'pip_risk' in locals() else 0,
             "allowed": True,
             "confidence_adjusted": True
@@ -199,6 +224,7 @@ class ConfidenceAnalysisRiskManager:
             Risk multiplier (0.25 to 1.0)
         """
         
+        self.load_state()
         base_multiplier = 1.0
         
         # Adjust based on live win rate vs expected
@@ -230,6 +256,8 @@ class ConfidenceAnalysisRiskManager:
     def is_trading_allowed(self) -> bool:
         """Check if trading is allowed based on risk limits"""
         
+        self.refresh()
+        
         # Emergency mode check
         if self.emergency_status['emergency_mode']:
             return False
@@ -250,11 +278,16 @@ class ConfidenceAnalysisRiskManager:
         if self.performance_tracking['daily_risk_used'] >= (self.account_balance * self.risk_limits['max_daily_risk']):
             return False
         
+        # Weekly risk limit check
+        if self.performance_tracking['weekly_risk_used'] >= (self.account_balance * self.risk_limits['max_weekly_risk']):
+            return False
+        
         return True
     
     def get_trading_restriction_reason(self) -> str:
         """Get reason for trading restriction"""
         
+        self.load_state()
         if self.emergency_status['emergency_mode']:
             return f"Emergency mode: {self.emergency_status['reason']}"
         
@@ -271,6 +304,10 @@ class ConfidenceAnalysisRiskManager:
         if daily_risk_used_pct >= self.risk_limits['max_daily_risk'] * 100:
             return f"Daily risk limit reached: {daily_risk_used_pct:.1f}%"
         
+        weekly_risk_used_pct = (self.performance_tracking['weekly_risk_used'] / self.account_balance) * 100
+        if weekly_risk_used_pct >= self.risk_limits['max_weekly_risk'] * 100:
+            return f"Weekly risk limit reached: {weekly_risk_used_pct:.1f}%"
+        
         return "Unknown restriction"
     
     def update_trade_result(self, trade_result: Dict) -> None:
@@ -278,9 +315,23 @@ class ConfidenceAnalysisRiskManager:
         Update performance tracking with trade result
         
         Args:
-            trade_result: Trade result with outcome, pips, etc.
+            trade_result: Trade result with outcome, pips or realized "pl", etc.
         """
         
+        self.load_state()
+        self._roll_periods()
+        self.journal.record("trade_result", result=trade_result)
+        
+        # Check for emergency conditions
+        self.check_emergency_conditions()
+        
+        self.logger.info(f"Trade result updated: {trade_result.get('result')} | "
+                        f"Win Rate: {self.performance_tracking['live_win_rate']:.1f}% | "
+                        f"Consecutive Losses: {self.performance_tracking['consecutive_losses']}")
+    
+    def _apply_trade_result(self, trade_result: Dict) -> None:
+        """Fold a trade result into performance tracking (also used on journal replay)"""
+        
         self.performance_tracking['total_trades'] += 1
         
         pips = trade_result.get('pips', 0)
@@ -292,10 +343,12 @@ class ConfidenceAnalysisRiskManager:
         else:
             self.performance_tracking['consecutive_losses'] += 1
             self.performance_tracking['daily_risk_used'] += risk_amount
+            self.performance_tracking['weekly_risk_used'] += risk_amount
+            self.performance_tracking['monthly_risk_used'] += risk_amount
         
-        # Update account balance
+        # Update account balance (realized P&L when known)
         pip_value = 10  # Simplified $10 per pip
-        balance_change = pips * pip_value
+        balance_change = trade_result['pl'] if 'pl' in trade_result else pips * pip_value
         self.account_balance += balance_change
         
         # Update drawdown
@@ -317,13 +370,6 @@ class ConfidenceAnalysisRiskManager:
                 self.performance_tracking['winning_trades'] / 
                 self.performance_tracking['total_trades'] * 100
             )
-        
-        # Check for emergency conditions
-        self.check_emergency_conditions()
-        
-        self.logger.info(f"Trade result updated: {trade_result.get('result')} | "
-                        f"Win Rate: {self.performance_tracking['live_win_rate']:.1f}% | "
-                        f"Consecutive Losses: {self.performance_tracking['consecutive_losses']}")
     
     def check_emergency_conditions(self) -> None:
         """Check and trigger emergency conditions if needed"""
@@ -343,21 +389,29 @@ class ConfidenceAnalysisRiskManager:
     def trigger_emergency(self, reason: str) -> None:
         """Trigger emergency mode"""
         
-        self.emergency_status.update({
-            "emergency_mode": True,
-            "stop_new_trades": True,
-            "reason": reason,
-            "triggered_at": datetime.now(timezone.utc).isoformat()
-        })
+        self.load_state()
+        if self.emergency_status['emergency_mode']:
+            return  # Already stopped; keep the original reason
+        self.journal.record("emergency", reason=reason)
         
         self.logger.critical(f"EMERGENCY MODE TRIGGERED: {reason}")
         self.logger.critical(f"Account Balance: ${self.account_balance:,.2f}")
         self.logger.critical(f"Current Drawdown: {self.performance_tracking['current_drawdown']*100:.1f}%")
         self.logger.critical(f"Consecutive Losses: {self.performance_tracking['consecutive_losses']}")
     
+    def clear_emergency(self, note: str = "") -> None:
+        """Leave emergency mode (it is persisted, so a restart no longer clears it)"""
+        
+        self.load_state()
+        if not self.emergency_status['emergency_mode']:
+            return
+        self.journal.record("emergency_cleared", note=note)
+        self.logger.warning(f"Emergency mode cleared{': ' + note if note else ''}")
+    
     def get_risk_status(self) -> Dict:
         """Get comprehensive risk status"""
         
+        self.refresh()
         return {
             "account_balance": self.account_balance,
             "initial_balance": self.initial_balance,
@@ -367,24 +421,108 @@ class ConfidenceAnalysisRiskManager:
             "risk_limits": self.risk_limits,
             "confidence_parameters": self.confidence_parameters,
             "adaptive_risk_multiplier": self.get_adaptive_risk_multiplier(),
+            "open_trades": len(self.position_book.trades),
+            "open_risk_amount": round(self.position_book.total_risk, 2),
+            "currency_exposure_percent": self.position_book.get_currency_exposures(),
+            "portfolio_var": self.correlation_risk.portfolio_risk(),
+            "periods": self.periods,
+            "journal": self.journal.get_journal_stats(),
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     
     def reset_daily_tracking(self) -> None:
-        """Reset daily tracking metrics (call at start of each day)"""
-        
-        self.performance_tracking['trades_today'] = 0
-        self.performance_tracking['daily_risk_used'] = 0.0
+        """Reset daily tracking metrics (also done automatically when the UTC day changes)"""
         
+        self.load_state()
+        self.journal.record("period_reset", periods=["day"], current=self.periods)
         self.logger.info("Daily risk tracking reset")
+    
+    def refresh(self) -> None:
+        """Pick up events journaled by other processes and roll over finished periods"""
+        
+        if self._state_loaded:
+            self.journal.catch_up()
+        else:
+            self.load_state()
+        self._roll_periods()
+    
+    def load_state(self) -> None:
+        """Restore persisted state from the journal (once; later calls do nothing)"""
+        
+        if not self._state_loaded:
+            self._state_loaded = True
+            self.journal.recover()
+    
+    @staticmethod
+    def _current_periods() -> Dict[str, str]:
+        now = datetime.now(timezone.utc)
+        year, week, _ = now.isocalendar()
+        return {"day": now.date().isoformat(), "week": f"{year}-W{week:02d}", "month": now.strftime("%Y-%m")}
+    
+    def _roll_periods(self) -> None:
+        current = self._current_periods()
+        ended = [period for period, value in current.items() if self.periods.get(period) != value]
+        if ended:
+            self.journal.record("period_reset", periods=ended, current=current)
+            self.logger.info(f"Risk tracking reset for new {', '.join(ended)}")
+    
+    # Journal state -------------------------------------------------------
+    
+    def _journal_state(self) -> Dict[str, Any]:
+        return {
+            "account_balance": self.account_balance,
+            "initial_balance": self.initial_balance,
+            "performance_tracking": self.performance_tracking,
+            "emergency_status": self.emergency_status,
+            "periods": self.periods,
+        }
+    
+    def _restore_state(self, state: Dict[str, Any]) -> None:
+        self.account_balance = state["account_balance"]
+        self.initial_balance = state["initial_balance"]
+        self.performance_tracking.update(state["performance_tracking"])
+        self.emergency_status.update(state["emergency_status"])
+        self.periods = dict(state["periods"])
+    
+    def _apply_event(self, event: Dict[str, Any]) -> None:
+        """Apply one journaled event; must not journal anything itself (it runs on replay)"""
+        
+        kind = event["type"]
+        if kind == "trade_result":
+            self._apply_trade_result(event["result"])
+        elif kind == "emergency":
+            self.emergency_status.update({
+                "emergency_mode": True,
+                "stop_new_trades": True,
+                "reason": event["reason"],
+                "triggered_at": event["time"]
+            })
+        elif kind == "emergency_cleared":
+            self.emergency_status.update({
+                "emergency_mode": False,
+                "stop_new_trades": False,
+                "reason": None,
+                "triggered_at": None
+            })
+            self.performance_tracking['consecutive_losses'] = 0
+        elif kind == "period_reset":
+            ended = event["periods"]
+            if "day" in ended:
+                self.performance_tracking['trades_today'] = 0
+                self.performance_tracking['daily_risk_used'] = 0.0
+            if "week" in ended:
+                self.performance_tracking['weekly_risk_used'] = 0.0
+            if "month" in ended:
+                self.performance_tracking['monthly_risk_used'] = 0.0
+            self.periods = dict(event["current"])
 
 
 # Test function
 def test_confidence_risk_manager():
     """Test the confidence analysis risk manager"""
     
-    # Initialize risk manager
-    risk_manager = ConfidenceAnalysisRiskManager(account_balance=10000)
+    # Initialize risk manager (throwaway journal so the test leaves live state alone)
+    risk_manager = ConfidenceAnalysisRiskManager(account_balance=10000, journal=RiskJournal(tempfile.mkdtemp()))
     
     # Test backtest adjustment
     backtest_performance = {
@@ -17,6 +17,12 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Runtime state (journals, trace exports) is kept here, never in the working directory
+STATE_DIR = os.getenv(
+    "STATE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "var"),
+)
+
 
 @dataclass
 class Settings:
@@ -29,6 +35,8 @@ class Settings:
     oanda_account_id: str
     oanda_environment: str
     redis_url: str
+    oanda_api_url: str = ""  # Overrides the practice/live URL (e.g. the local mock server)
+    oanda_stream_url: str = ""  # Overrides the streaming URL (defaults to oanda_api_url if set)
 
 
 def get_settings() -> Settings:
@@ -41,6 +49,8 @@ def get_settings() -> Settings:
         oanda_account_id=os.getenv("OANDA_ACCOUNT_ID", ""),
         oanda_environment=os.getenv("OANDA_ENVIRONMENT", "practice"),
         redis_url=os.getenv("REDIS_URL", "redis://localhost:6379"),
+        oanda_api_url=os.getenv("OANDA_API_URL", ""),
+        oanda_stream_url=os.getenv("OANDA_STREAM_URL", ""),
     )
 
 
@@ -470,6 +480,215 @@ MULTI_TIMEFRAME_SETTINGS = {
     },
 }
 
+# External API rate limits (token buckets)
+# capacity = burst size, refill_per_second = sustained rate
+RATE_LIMIT_SETTINGS = {
+    "oanda_rest": {
+        "capacity": 100,  # OANDA allows 120 req/s per connection - keep headroom
+        "refill_per_second": 100.0,
+    },
+    "discord_webhook": {
+        "capacity": 5,  # Discord webhook bucket: 5 requests per 2 seconds
+        "refill_per_second": 2.5,
+    },
+    "max_buckets": 256,  # Upper bound on tracked buckets (LRU eviction)
+}
+
+# Candle-close scheduling (see services/candle_calendar.py)
+CANDLE_SCHEDULE_SETTINGS = {
+    "delay_seconds": 5,  # Wait after the close before fetching
+    "jitter_seconds": 10,  # Random extra delay to spread API load
+    "history_count": 250,  # Candles kept per pair for analysis
+    "incomplete_retry_attempts": 4,  # Re-fetches when the closed candle is not yet complete
+    "incomplete_retry_delay_seconds": 5,  # First retry delay (doubles each attempt)
+}
+
+# Scheduled signal pipeline (fetch → analyze → persist → notify)
+SCHEDULER_PIPELINE_SETTINGS = {
+    "fetch_concurrency": 6,  # Concurrent OANDA candle fetches
+    "analysis_workers": 4,  # Threads for strategy analysis
+    "persist_concurrency": 4,  # Concurrent signal writes
+    "notify_discord": True,  # Send actionable signals after each scan
+}
+
+# Live signal streaming (SSE / WebSocket)
+SIGNAL_STREAM_SETTINGS = {
+    "client_queue_size": 100,  # Per-client buffer; oldest messages dropped when full
+    "max_subscribers": 500,  # Concurrent stream connections
+    "heartbeat_seconds": 15,  # Keep-alive interval for idle streams
+}
+
+# Application-scoped strategy instances (/api/v2)
+STRATEGY_REGISTRY_SETTINGS = {
+    "warm_up": ["enhanced_daily_v2", "confidence_risk_v2"],  # Built at startup
+    "v2_granularity": "H4",  # V2 signals are recomputed after each candle close
+    "v2_candle_count": 100,  # Candles per pair fed to the V2 strategy
+    "v2_refresh_delay_seconds": 10,  # Wait after the close before recomputing
+    "v2_retry_seconds": 60,  # Retry failed pairs this soon instead of at the next close
+}
+
+# JSON response serialization / compression
+JSON_RESPONSE_SETTINGS = {
+    "compression_min_bytes": 1024,  # Smaller bodies are sent uncompressed
+    "gzip_level": 6,
+    "brotli_quality": 5,  # Used only when the brotli package is installed
+}
+
+# Metrics (/metrics, Prometheus text format)
+METRICS_SETTINGS = {
+    "namespace": "forex",  # Prefix for every metric name
+    "latency_buckets": [
+        0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+    ],
+}
+
+# Tracing of the signal pipeline (fetch → analysis → Discord)
+TRACING_SETTINGS = {
+    "exporter": os.getenv("TRACING_EXPORTER", "none"),  # "jsonl", "otlp" or "none" (opt-in)
+    "jsonl_path": os.getenv("TRACING_JSONL_PATH", os.path.join(STATE_DIR, "traces", "traces.jsonl")),
+    "jsonl_max_bytes": 10 * 1024 * 1024,  # Rotate the JSONL file past this size
+    "jsonl_backups": 3,  # Rotated files kept (traces.jsonl.1 is the newest)
+    "otlp_endpoint": os.getenv("OTLP_TRACES_ENDPOINT", "http://localhost:4318/v1/traces"),
+    "service_name": "4ex-ninja-backend",  # OTLP resource service.name
+    "keep_last": 20,  # Finished traces kept in memory for /debug/last-trace
+    "export_queue_size": 100,  # Traces waiting for export before new ones are dropped
+}
+
+# Admin-only endpoints (profiling); disabled while no token is configured
+ADMIN_SETTINGS = {
+    "api_token": os.getenv("ADMIN_API_TOKEN", ""),
+    "header": "X-Admin-Token",
+}
+
+# On-demand scan profiling
+PROFILING_SETTINGS = {
+    "output_dir": os.getenv("PROFILE_OUTPUT_DIR", "logs/profiles"),
+    "default_mode": "sampling",  # "sampling" (all threads) or "cprofile" (event loop only)
+    "sample_interval_ms": 5.0,
+    "profile_next_scans": int(os.getenv("PROFILE_NEXT_SCANS", "0")),  # Arm at startup
+    "top_functions": 30,  # Rows in the summary
+    "keep_last": 10,  # Recent profiles listed in the status
+}
+
+# Synthetic candles used when OANDA data is unavailable (and for benchmarks)
+SYNTHETIC_MARKET_SETTINGS = {
+    "seed": int(os.getenv("SYNTHETIC_MARKET_SEED", "42")),
+    "regime_switching": True,  # False = plain GBM
+    "calm_volatility_multiplier": 0.8,
+    "volatile_volatility_multiplier": 1.8,
+    "calm_mean_days": 40,  # Mean regime length
+    "volatile_mean_days": 10,
+    "skip_weekends": True,  # No candles Friday 17:00 → Sunday 17:00 New York
+}
+
+# OANDA pricing stream (see services/pricing_stream_service.py)
+PRICING_STREAM_SETTINGS = {
+    "enabled": os.getenv("PRICING_STREAM_ENABLED", "true").lower() == "true",
+    "heartbeat_timeout_seconds": 10.0,  # OANDA heartbeats every 5s; reconnect after two misses
+    "reconnect_initial_seconds": 1.0,  # Backoff doubles per failed attempt (with jitter)
+    "reconnect_max_seconds": 60.0,
+    "max_price_age_seconds": 30.0,  # Serve a tick this old when the stream is down
+    "subscriber_queue_size": 1000,  # Per-subscriber tick buffer; oldest dropped when full
+}
+
+# Live bars built from streamed ticks (see services/bar_builder_service.py)
+BAR_BUILDER_SETTINGS = {
+    "granularities": ["M1", "M5", "H1", "H4", "D"],
+    "history_size": 500,  # Completed bars kept per pair and granularity
+    "close_grace_seconds": 2.0,  # Wait for late ticks before closing a quiet bar
+    "close_check_seconds": 1.0,  # How often quiet bars are checked for their close
+    "reconcile_interval_seconds": 900,  # Compare built bars with OANDA candles
+    "reconcile_granularities": ["H1", "H4", "D"],
+    "reconcile_candles": 3,  # Most recent complete candles compared per check
+    "reconcile_tolerance_pips": 0.5,  # Larger OHLC differences count as mismatches
+    "publish_to_stream": True,  # Send bar closes to /stream/signals (topic "bar")
+}
+
+# OANDA order execution (see services/execution_service.py)
+EXECUTION_SETTINGS = {
+    "request_timeout_seconds": 10.0,
+    "connection_limit": 10,  # Pooled connections to the OANDA REST host
+    "max_retries": 3,  # Retries after timeouts, 5xx and 429 (same client order ID)
+    "retry_backoff_seconds": 0.5,  # Doubles per retry
+    "account_max_age_seconds": 60.0,  # Refetch the account summary when older than this
+    "transaction_stream": True,  # Keep balance current from the transaction stream
+    "client_order_prefix": "4xn",
+}
+
+# Live trading engine (see services/live_engine_service.py)
+LIVE_ENGINE_SETTINGS = {
+    # Any of the 10 validated V2 pairs; the default is the conservative Tier 1 set
+    "pairs": os.getenv("LIVE_ENGINE_PAIRS", "USD_JPY,EUR_GBP").split(","),
+    "timeframe": "H4",
+    "history_candles": 50,  # Candles used to warm up the incremental EMAs
+}
+
+# Open-position book (see services/position_book_service.py)
+POSITION_BOOK_SETTINGS = {
+    "account_currency": "USD",  # Replaced by the account's currency on sync
+    "default_risk_percent": 0.5,  # Assumed risk when a trade's stop loss cannot be priced
+    "transaction_memory": 1000,  # Recent transaction IDs kept to skip duplicates
+}
+
+# Correlation risk (see services/correlation_risk_service.py)
+CORRELATION_RISK_SETTINGS = {
+    "pairs": [
+        "EUR_USD",
+        "GBP_USD",
+        "USD_JPY",
+        "USD_CHF",
+        "AUD_USD",
+        "USD_CAD",
+        "EUR_GBP",
+        "EUR_JPY",
+        "GBP_JPY",
+        "AUD_JPY",
+    ],
+    "timeframe": "D",  # Bar size of the returns matrix
+    "window": 60,  # Returns kept per pair
+    "min_observations": 20,  # Rows needed before covariance is used
+    "var_confidence": 0.95,
+    "var_horizon_bars": 1,  # VaR horizon in bars of the timeframe
+    "min_correlation_multiplier": 0.5,  # Size multiplier for a trade perfectly correlated with the book
+}
+
+# Risk-manager journal (see services/risk_journal_service.py)
+RISK_JOURNAL_SETTINGS = {
+    "directory": os.getenv("RISK_JOURNAL_DIR", os.path.join(STATE_DIR, "risk_journal")),
+    "snapshot_every": 200,  # Events between snapshots (bounds replay on restart)
+    "fsync": os.getenv("RISK_JOURNAL_FSYNC", "true").lower() == "true",
+}
+
+# Market session calendar (see services/session_calendar.py)
+SESSION_CALENDAR_SETTINGS = {
+    # Local opening hours with DST and Mon-Fri sessions; "false" keeps the fixed UTC hours every day
+    "dst_aware": os.getenv("SESSION_DST_AWARE", "true").lower() == "true",
+}
+
+# Phase 1 historical replay (see services/phase1_backtest_service.py)
+PHASE1_BACKTEST_SETTINGS = {
+    "history_dir": os.getenv("BACKTEST_HISTORY_DIR", "backtest_data/historical_data"),
+    "initial_balance": 10000.0,  # Per pair
+    "bar_hours": 4,  # H4 bars; the analysis runs at each bar's close
+    "sr_window_days": 35,  # Covers the 30-day S/R lookback and the last four weekly bars
+    "trade_recommendations": ["STRONG_BUY", "STRONG_SELL", "BUY", "SELL"],
+    # Round-trip spread in pips, plus slippage per trade
+    "spread_pips": {
+        "EUR_USD": 1.2,
+        "GBP_USD": 1.5,
+        "USD_JPY": 1.0,
+        "AUD_USD": 1.3,
+        "USD_CAD": 1.8,
+        "USD_CHF": 1.6,
+        "EUR_GBP": 1.4,
+        "GBP_JPY": 2.1,
+        "AUD_JPY": 1.9,
+        "EUR_JPY": 1.6,
+    },
+    "default_spread_pips": 2.0,
+    "slippage_pips": 0.5,
+}
+
 
 def get_enhanced_daily_config(pair: str) -> Dict[str, Any]:
     """Get enhanced daily strategy configuration for a specific pair."""
@@ -23,6 +23,7 @@ from typing import Dict, List, Optional, Tuple
 import logging
 import os
 import sys
+import time
 
 # Add backend directory to path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -30,6 +31,94 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from services.session_manager_service import SessionManagerService
 from services.support_resistance_service import SupportResistanceService
 from services.dynamic_position_sizing_service import DynamicPositionSizingService
+from services.metrics_service import get_metrics_registry
+from services.tracing_service import get_tracer
+
+tracer = get_tracer()
+
+metrics = get_metrics_registry()
+INDICATOR_SECONDS = metrics.histogram(
+    "strategy_indicator_seconds", "EMA/RSI/ATR indicator calculation time", ["pair"]
+)
+SR_DETECTION_SECONDS = metrics.histogram(
+    "strategy_sr_detection_seconds", "Support/resistance level detection time", ["pair"]
+)
+ANALYSIS_SECONDS = metrics.histogram(
+    "strategy_analysis_seconds", "Full Enhanced Daily analysis time per pair", ["pair"]
+)
+
+# Strategy parameters - REALISTIC MULTI-PAIR OPTIMIZED (August 20, 2025)
+# Comprehensive optimization across 10 major currency pairs
+OPTIMIZED_PARAMETERS = {
+    "USD_JPY": {
+        "ema_fast": 20,
+        "ema_slow": 60,
+        "rsi_oversold": 30,
+        "rsi_overbought": 70,
+        "optimization_status": "REALISTIC_EMA_OPTIMIZED",
+        "expected_performance": {
+            "win_rate": 70.0,
+            "annual_return": 14.0,
+            "trades_per_year": 10,
+        },
+    },
+    "EUR_JPY": {
+        "ema_fast": 30,
+        "ema_slow": 60,
+        "rsi_oversold": 30,
+        "rsi_overbought": 70,
+        "optimization_status": "REALISTIC_EMA_OPTIMIZED",
+        "expected_performance": {
+            "win_rate": 70.0,
+            "annual_return": 13.5,
+            "trades_per_year": 10,
+        },
+    },
+    "AUD_JPY": {
+        "ema_fast": 20,
+        "ema_slow": 60,
+        "rsi_oversold": 30,
+        "rsi_overbought": 70,
+        "optimization_status": "REALISTIC_EMA_OPTIMIZED",
+        "expected_performance": {
+            "win_rate": 46.7,
+            "annual_return": 3.8,
+            "trades_per_year": 15,
+        },
+    },
+    "GBP_JPY": {
+        "ema_fast": 30,
+        "ema_slow": 60,
+        "rsi_oversold": 30,
+        "rsi_overbought": 70,
+        "optimization_status": "REALISTIC_EMA_OPTIMIZED",
+        "expected_performance": {
+            "win_rate": 45.5,
+            "annual_return": 2.2,
+            "trades_per_year": 11,
+        },
+    },
+    "AUD_USD": {
+        "ema_fast": 20,
+        "ema_slow": 60,
+        "rsi_oversold": 30,
+        "rsi_overbought": 70,
+        "optimization_status": "REALISTIC_EMA_OPTIMIZED",
+        "expected_performance": {
+            "win_rate": 41.7,
+            "annual_return": 1.5,
+            "trades_per_year": 12,
+        },
+    },
+}
+
+# JPY pair priority (based on realistic optimization results)
+JPY_PAIR_PRIORITIES = {
+    "USD_JPY": 1.0,  # Top performer: 14.0% return, 70.0% win rate
+    "EUR_JPY": 0.95,  # Excellent: 13.5% return, 70.0% win rate
+    "AUD_JPY": 0.7,  # Good: 3.8% return, 46.7% win rate
+    "GBP_JPY": 0.65,  # Decent: 2.2% return, 45.5% win rate
+}
 
 
 class EnhancedDailyStrategy:
@@ -44,70 +133,8 @@ class EnhancedDailyStrategy:
         self.sr_detector = SupportResistanceService()
         self.position_sizer = DynamicPositionSizingService()
 
-        # Strategy parameters - REALISTIC MULTI-PAIR OPTIMIZED (August 20, 2025)
-        # Comprehensive optimization across 10 major currency pairs
-        self.optimized_parameters = {
-            "USD_JPY": {
-                "ema_fast": 20,
-                "ema_slow": 60,
-                "rsi_oversold": 30,
-                "rsi_overbought": 70,
-                "optimization_status": "REALISTIC_EMA_OPTIMIZED",
-                "expected_performance": {
-                    "win_rate": 70.0,
-                    "annual_return": 14.0,
-                    "trades_per_year": 10,
-                },
-            },
-            "EUR_JPY": {
-                "ema_fast": 30,
-                "ema_slow": 60,
-                "rsi_oversold": 30,
-                "rsi_overbought": 70,
-                "optimization_status": "REALISTIC_EMA_OPTIMIZED",
-                "expected_performance": {
-                    "win_rate": 70.0,
-                    "annual_return": 13.5,
-                    "trades_per_year": 10,
-                },
-            },
-            "AUD_JPY": {
-                "ema_fast": 20,
-                "ema_slow": 60,
-                "rsi_oversold": 30,
-                "rsi_overbought": 70,
-                "optimization_status": "REALISTIC_EMA_OPTIMIZED",
-                "expected_performance": {
-                    "win_rate": 46.7,
-                    "annual_return": 3.8,
-                    "trades_per_year": 15,
-                },
-            },
-            "GBP_JPY": {
-                "ema_fast": 30,
-                "ema_slow": 60,
-                "rsi_oversold": 30,
-                "rsi_overbought": 70,
-                "optimization_status": "REALISTIC_EMA_OPTIMIZED",
-                "expected_performance": {
-                    "win_rate": 45.5,
-                    "annual_return": 2.2,
-                    "trades_per_year": 11,
-                },
-            },
-            "AUD_USD": {
-                "ema_fast": 20,
-                "ema_slow": 60,
-                "rsi_oversold": 30,
-                "rsi_overbought": 70,
-                "optimization_status": "REALISTIC_EMA_OPTIMIZED",
-                "expected_performance": {
-                    "win_rate": 41.7,
-                    "annual_return": 1.5,
-                    "trades_per_year": 12,
-                },
-            },
-        }
+        # Strategy parameters (module constants, shared by every instance)
+        self.optimized_parameters = OPTIMIZED_PARAMETERS
 
         # Default parameters (backward compatibility)
         self.ema_fast = 20
@@ -117,12 +144,7 @@ class EnhancedDailyStrategy:
         self.rsi_overbought = 70
 
         # JPY pair priority (based on realistic optimization results)
-        self.jpy_pair_priorities = {
-            "USD_JPY": 1.0,  # Top performer: 14.0% return, 70.0% win rate
-            "EUR_JPY": 0.95,  # Excellent: 13.5% return, 70.0% win rate
-            "AUD_JPY": 0.7,  # Good: 3.8% return, 46.7% win rate
-            "GBP_JPY": 0.65,  # Decent: 2.2% return, 45.5% win rate
-        }
+        self.jpy_pair_priorities = JPY_PAIR_PRIORITIES
 
         # Risk management
         self.base_stop_loss_atr = 2.0  # 2x ATR stop loss
@@ -177,17 +199,32 @@ class EnhancedDailyStrategy:
                 self._logged_pairs.add(pair)
             return default_params
 
-    def analyze_pair(self, pair: str, data: pd.DataFrame) -> Dict:
+    @tracer.traced("analyze_pair")
+    def analyze_pair(
+        self,
+        pair: str,
+        data: pd.DataFrame,
+        size_position: bool = True,
+        current_time: Optional[datetime] = None,
+    ) -> Dict:
         """
         Comprehensive analysis of a currency pair using Phase 1 enhancements.
 
         Args:
             pair: Currency pair (e.g., "USD_JPY")
             data: OHLC data with datetime index
+            size_position: Size the trade now; scans pass False and size all
+                pairs together with size_positions()
+            current_time: Time of the analysis for the session filter (default now);
+                replays pass the close time of the last bar
 
         Returns:
             Dict with complete analysis and trade recommendations
         """
+        analysis_started = time.perf_counter()
+        if current_time is None:
+            current_time = datetime.now(timezone.utc)
+        tracer.current_span().set_attribute("pair", pair)
         try:
             if len(data) < 100:
                 return {"error": f"Insufficient data for {pair} analysis"}
@@ -197,15 +234,17 @@ class EnhancedDailyStrategy:
 
             # Prepare data
             df = data.copy()
-            df = self._calculate_indicators(df, pair_params)
+            with INDICATOR_SECONDS.time(pair), tracer.span("calculate_indicators", pair=pair):
+                df = self._calculate_indicators(df, pair_params)
 
             current_price = float(df["close"].iloc[-1])
 
             # 1. Session Analysis - Phase 1 Enhancement
-            session_analysis = self.session_manager.get_session_filter_for_pair(pair)
+            session_analysis = self.session_manager.get_session_filter_for_pair(pair, current_time)
 
             # 2. Support/Resistance Analysis - Phase 1 Enhancement
-            sr_analysis = self.sr_detector.detect_key_levels(df, pair)
+            with SR_DETECTION_SECONDS.time(pair), tracer.span("detect_key_levels", pair=pair):
+                sr_analysis = self.sr_detector.detect_key_levels(df, pair)
 
             # 3. Technical Signal Generation
             signal_data = self._generate_daily_signal(df, pair, pair_params)
@@ -222,52 +261,41 @@ class EnhancedDailyStrategy:
                 signal_data, confluence_score, session_analysis
             )
 
-            # 6. Dynamic Position Sizing - Phase 1 Enhancement
-            position_sizing = None
-            if signal_data.get("signal") != "NONE":
-                sizing_data = {
-                    "signal_strength": signal_strength,
-                    "confluence_score": confluence_score,
-                    "session_quality": session_analysis["session_quality_multiplier"],
-                }
-
-                stop_loss = signal_data.get("stop_loss", current_price * 0.98)
-                position_sizing = self.position_sizer.calculate_position_size(
-                    pair=pair,
-                    entry_price=current_price,
-                    stop_loss=stop_loss,
-                    account_balance=self.account_balance,
-                    signal_data=sizing_data,
-                    market_data=df.tail(30),
-                )
-
-            # 7. Final Trade Recommendation
+            # 6. Final Trade Recommendation
             trade_recommendation = self._make_trade_decision(
                 pair, signal_data, confluence_score, session_analysis, signal_strength
             )
 
-            return {
+            analysis = {
                 "pair": pair,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "timestamp": current_time.isoformat(),
                 "current_price": current_price,
                 "session_analysis": session_analysis,
                 "technical_signal": signal_data,
                 "support_resistance": sr_analysis,
                 "confluence_score": round(confluence_score, 2),
                 "signal_strength": signal_strength,
-                "position_sizing": position_sizing,
+                "atr": float(df["atr"].iloc[-1]),  # Volatility input for position sizing
+                "position_sizing": None,
                 "trade_recommendation": trade_recommendation,
                 "phase1_enhancements": {
                     "session_filter_active": session_analysis["is_optimal_session"],
                     "confluence_detected": confluence_score
                     >= self.min_confluence_score,
-                    "dynamic_sizing_applied": position_sizing is not None,
+                    "dynamic_sizing_applied": False,
                 },
             }
 
+            # 7. Dynamic Position Sizing - Phase 1 Enhancement
+            if size_position:
+                self.size_positions({pair: analysis})
+            return analysis
+
         except Exception as e:
             self.logger.error(f"Error analyzing {pair}: {str(e)}")
             return {"error": f"Analysis failed for {pair}: {str(e)}"}
+        finally:
+            ANALYSIS_SECONDS.observe(time.perf_counter() - analysis_started, pair)
 
     def _calculate_indicators(
         self, df: pd.DataFrame, pair_params: Optional[Dict] = None
@@ -564,13 +592,64 @@ class EnhancedDailyStrategy:
 
     def scan_all_pairs(self, data_dict: Dict[str, pd.DataFrame]) -> Dict:
         """Scan all currency pairs and return prioritized opportunities."""
-        results = {}
-        opportunities = []
+        results = {
+            pair: self.analyze_pair(pair, data, size_position=False)
+            for pair, data in data_dict.items()
+        }
+        self.size_positions(results)
+        return self.summarize_scan(results)
+
+    @tracer.traced("size_positions")
+    def size_positions(self, results: Dict[str, Dict]) -> int:
+        """
+        Size every unsized signal among analyze_pair() results in one batch.
+
+        Entry, stop, strength, confluence, session quality and the ATR the
+        analysis already computed go to the sizer as arrays; each analysis gets
+        its "position_sizing" filled in place.
 
-        for pair, data in data_dict.items():
-            analysis = self.analyze_pair(pair, data)
-            results[pair] = analysis
+        Returns:
+            Number of analyses sized
+        """
+        candidates = [
+            analysis
+            for analysis in results.values()
+            if "error" not in analysis
+            and analysis["technical_signal"].get("signal") != "NONE"
+            and analysis.get("position_sizing") is None
+        ]
+        if not candidates:
+            return 0
+
+        pairs = [analysis["pair"] for analysis in candidates]
+        entry_prices = [analysis["current_price"] for analysis in candidates]
+        sizes = self.position_sizer.calculate_position_sizes(
+            pairs,
+            entry_prices,
+            [
+                analysis["technical_signal"].get("stop_loss") or price * 0.98
+                for analysis, price in zip(candidates, entry_prices)
+            ],
+            self.account_balance,
+            signal_strengths=[analysis["signal_strength"] for analysis in candidates],
+            confluence_scores=[analysis["confluence_score"] for analysis in candidates],
+            session_qualities=[
+                analysis["session_analysis"]["session_quality_multiplier"] for analysis in candidates
+            ],
+            atrs=[analysis["atr"] for analysis in candidates],
+        )
+        sizing = self.position_sizer.to_sizing_dicts(pairs, sizes, self.account_balance)
+        for analysis, position_sizing in zip(candidates, sizing):
+            analysis["position_sizing"] = position_sizing
+            analysis["phase1_enhancements"]["dynamic_sizing_applied"] = True
+        tracer.current_span().set_attribute("sized", len(candidates))
+        return len(candidates)
+
+    def summarize_scan(self, results: Dict[str, Dict]) -> Dict:
+        """Build prioritized scan results from per-pair analyze_pair() output."""
+        opportunities = []
 
+        for pair, analysis in results.items():
             # Collect trading opportunities
             if "error" not in analysis:
                 trade_rec = analysis.get("trade_recommendation", {})
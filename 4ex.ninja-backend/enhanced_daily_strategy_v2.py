@@ -23,9 +23,27 @@ import json
 import pandas as pd
 import numpy as np
 from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any
 import logging
 
+
+class IncrementalEMA:
+    """EMA updated one price at a time (same values as pandas ewm(span, adjust=False))"""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, period: int):
+        self.alpha = 2 / (period + 1)
+        self.value: Optional[float] = None
+
+    def update(self, price: float) -> float:
+        if self.value is None:
+            self.value = price
+        else:
+            self.value += self.alpha * (price - self.value)
+        return self.value
+
+
 class EnhancedDailyStrategyV2:
     """
     Enhanced Daily Strategy V2 - Validated Implementation
@@ -52,6 +70,9 @@ class EnhancedDailyStrategyV2:
         self.validation_date = "2025-08-21"
         self.validation_trades = 4436
         
+        # Incremental EMA state per pair for bar-close driven trading
+        self.live_indicators: Dict[str, Dict[str, Any]] = {}
+        
         # Validated configuration from comprehensive testing
         self.validated_config = {
             "USD_JPY": {
@@ -104,6 +125,126 @@ class EnhancedDailyStrategyV2:
                     "monthly_trades": 6,
                     "confidence_level": 70
                 }
+            },
+            # Remaining pairs from the 10-pair validation (SL/TP as tested there)
+            "EUR_USD": {
+                "ema_fast": 10,
+                "ema_slow": 20,
+                "timeframe": "H4",
+                "priority": 4,
+                "sl_pips": 30,
+                "tp_pips": 60,
+                "pip_value": 0.0001,
+                "expected_performance": {
+                    "backtest_win_rate": 62.7,
+                    "realistic_win_rate": 49.7,
+                    "backtest_profit_factor": 3.53,
+                    "realistic_profit_factor": 2.1,
+                    "monthly_trades": 8,
+                    "confidence_level": 65
+                }
+            },
+            "GBP_USD": {
+                "ema_fast": 10,
+                "ema_slow": 20,
+                "timeframe": "H4",
+                "priority": 5,
+                "sl_pips": 35,
+                "tp_pips": 70,
+                "pip_value": 0.0001,
+                "expected_performance": {
+                    "backtest_win_rate": 59.7,
+                    "realistic_win_rate": 46.7,
+                    "backtest_profit_factor": 3.10,
+                    "realistic_profit_factor": 1.9,
+                    "monthly_trades": 8,
+                    "confidence_level": 65
+                }
+            },
+            "GBP_JPY": {
+                "ema_fast": 10,
+                "ema_slow": 20,
+                "timeframe": "H4",
+                "priority": 6,
+                "sl_pips": 40,
+                "tp_pips": 80,
+                "pip_value": 0.01,
+                "expected_performance": {
+                    "backtest_win_rate": 61.8,
+                    "realistic_win_rate": 48.8,
+                    "backtest_profit_factor": 3.18,
+                    "realistic_profit_factor": 1.9,
+                    "monthly_trades": 8,
+                    "confidence_level": 65
+                }
+            },
+            "EUR_JPY": {
+                "ema_fast": 10,
+                "ema_slow": 20,
+                "timeframe": "H4",
+                "priority": 7,
+                "sl_pips": 35,
+                "tp_pips": 70,
+                "pip_value": 0.01,
+                "expected_performance": {
+                    "backtest_win_rate": 64.5,
+                    "realistic_win_rate": 51.5,
+                    "backtest_profit_factor": 3.42,
+                    "realistic_profit_factor": 2.1,
+                    "monthly_trades": 6,
+                    "confidence_level": 65
+                }
+            },
+            "AUD_USD": {
+                "ema_fast": 10,
+                "ema_slow": 20,
+                "timeframe": "H4",
+                "priority": 8,
+                "sl_pips": 30,
+                "tp_pips": 60,
+                "pip_value": 0.0001,
+                "expected_performance": {
+                    "backtest_win_rate": 60.5,
+                    "realistic_win_rate": 47.5,
+                    "backtest_profit_factor": 3.28,
+                    "realistic_profit_factor": 2.0,
+                    "monthly_trades": 9,
+                    "confidence_level": 65
+                }
+            },
+            "USD_CAD": {
+                "ema_fast": 10,
+                "ema_slow": 20,
+                "timeframe": "H4",
+                "priority": 9,
+                "sl_pips": 30,
+                "tp_pips": 60,
+                "pip_value": 0.0001,
+                "expected_performance": {
+                    "backtest_win_rate": 61.2,
+                    "realistic_win_rate": 48.2,
+                    "backtest_profit_factor": 3.22,
+                    "realistic_profit_factor": 1.9,
+                    "monthly_trades": 9,
+                    "confidence_level": 65
+                }
+            },
+            "USD_CHF": {
+                "ema_fast": 10,
+                "ema_slow": 20,
+                "timeframe": "H4",
+                "priority": 10,
+                "sl_pips": 30,
+                "tp_pips": 60,
+                "pip_value": 0.0001,
+                "expected_performance": {
+                    "backtest_win_rate": 59.8,
+                    "realistic_win_rate": 46.8,
+                    "backtest_profit_factor": 3.35,
+                    "realistic_profit_factor": 2.0,
+                    "monthly_trades": 6,
+                    "confidence_level": 65
+                }
             }
         }
         
@@ -146,6 +287,66 @@ class EnhancedDailyStrategyV2:
         """Calculate Exponential Moving Average"""
         return prices.ewm(span=period, adjust=False).mean()
     
+    def warm_up_indicators(self, pair: str, closes: Iterable[float]) -> None:
+        """
+        Seed the incremental EMAs used by on_bar_close from historical closes
+        
+        Args:
+            pair: Currency pair
+            closes: H4 closes, oldest first
+        """
+        config = self.get_pair_config(pair)
+        if config is None:
+            raise ValueError(f"Pair {pair} not supported by Enhanced Daily Strategy V2")
+        
+        state = {
+            "ema_fast": IncrementalEMA(config['ema_fast']),
+            "ema_slow": IncrementalEMA(config['ema_slow']),
+            "previous": None,
+        }
+        for close in closes:
+            self._update_live_state(state, close)
+        self.live_indicators[pair] = state
+    
+    @staticmethod
+    def _update_live_state(state: Dict[str, Any], close: float) -> Dict[str, float]:
+        row = {
+            "close": close,
+            "ema_fast": state["ema_fast"].update(close),
+            "ema_slow": state["ema_slow"].update(close),
+        }
+        state["previous"], state["current"] = state.get("current"), row
+        return row
+    
+    def on_bar_close(self, bar) -> Optional[Dict[str, Any]]:
+        """
+        Update the EMAs with a closed bar and check for a crossover
+        
+        Constant time per bar, so live trading needs no candle downloads.
+        
+        Args:
+            bar: Closed bar with pair, close and granularity (Bar) or timeframe (PriceData)
+            
+        Returns:
+            Signal dictionary, or None for other timeframes and unsupported pairs
+        """
+        config = self.get_pair_config(bar.pair)
+        if config is None:
+            return None
+        timeframe = getattr(bar, "granularity", None) or getattr(bar, "timeframe", None)
+        if timeframe != config['timeframe']:
+            return None
+        
+        state = self.live_indicators.get(bar.pair)
+        if state is None:
+            self.warm_up_indicators(bar.pair, [])
+            state = self.live_indicators[bar.pair]
+        self._update_live_state(state, float(bar.close))
+        if state["previous"] is None:
+            return self._no_signal_response(bar.pair, "Insufficient data")
+        
+        return self._crossover_signal(bar.pair, state["current"], state["previous"])
+    
     def calculate_indicators(self, df: pd.DataFrame, pair: str) -> pd.DataFrame:
         """
         Calculate technical indicators for V2 strategy
@@ -191,9 +392,18 @@ class EnhancedDailyStrategyV2:
         if not self.is_supported_pair(pair):
             return self._no_signal_response(pair, f"Unsupported pair: {pair}")
         
+        return self._crossover_signal(pair, df.iloc[-1], df.iloc[-2])
+    
+    def _crossover_signal(self, pair: str, current, previous) -> Dict[str, Any]:
+        """
+        Signal from the last two rows (DataFrame rows or the live indicator dicts)
+        
+        Args:
+            pair: Supported currency pair
+            current: Latest row with close, ema_fast and ema_slow
+            previous: Row before it
+        """
         config = self.get_pair_config(pair)
-        current = df.iloc[-1]
-        previous = df.iloc[-2]
         
         # EMA crossover detection (core V2 strategy)
         ema_fast_current = current['ema_fast']
@@ -0,0 +1 @@
+"""Local OANDA mock server and load-test driver."""
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Load Test
+Drives the backend against the local OANDA mock and reports throughput and tail latency.
+
+Scenarios:
+    data      Concurrent DataService.get_historical_data calls (REST fetch + parse)
+    pipeline  Concurrent EnhancedDailyProductionService.generate_enhanced_signals runs
+              (fetch, indicators, signal conversion, Discord delivery to the mock sink)
+    account   DataService.health_check plus MARKET orders with SL/TP through the execution
+              service; every 10th order is resubmitted to check client-ID idempotency
+    all       The three scenarios one after another
+
+The mock is started in-process unless --base-url points at a running one. The real
+service hides OANDA errors behind synthetic fallback candles, so each scenario also
+reports how many fallback responses were served while it ran. The execution
+service has no separate test suite; the account scenario is its stand-in test.
+
+Usage:
+    python -m load_testing.load_test --scenario all --duration 20 --concurrency 16
+    python -m load_testing.load_test --scenario data --latency-ms 80 --error-rate 0.02 --rate-limit 100
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import aiohttp
+import numpy as np
+
+from load_testing.mock_oanda_server import DEFAULT_ACCOUNT_ID, MockOandaConfig, MockOandaServer
+
+SCENARIOS = ("data", "pipeline", "account")
+
+DISCORD_WEBHOOK_ENV = (
+    "DISCORD_WEBHOOK_SIGNALS_FREE",
+    "DISCORD_WEBHOOK_SIGNALS_PREMIUM",
+    "DISCORD_WEBHOOK_WHALE_SIGNALS",
+    "DISCORD_WEBHOOK_ALPHA_SIGNALS",
+    "DISCORD_WEBHOOK_ALERTS_CRITICAL",
+    "DISCORD_WEBHOOK_ALERTS_GENERAL",
+    "DISCORD_WEBHOOK_MARKET_ANALYSIS",
+    "DISCORD_WEBHOOK_SYSTEM_STATUS",
+    "DISCORD_WEBHOOK_COMMUNITY",
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ScenarioResult:
+    """Latencies and failures for one scenario."""
+
+    name: str
+    concurrency: int
+    latencies: List[float] = field(default_factory=list)
+    errors: Dict[str, int] = field(default_factory=dict)
+    fallback_responses: int = 0  # Operations answered from fallback data after an OANDA error
+    elapsed: float = 0.0
+
+    def record_error(self, kind: str) -> None:
+        self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        completed = len(self.latencies)
+        failed = sum(self.errors.values())
+        report: Dict[str, Any] = {
+            "scenario": self.name,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": round(self.elapsed, 3),
+            "operations": completed + failed,
+            "succeeded": completed,
+            "failed": failed,
+            "errors": self.errors,
+            "fallback_responses": self.fallback_responses,
+            "throughput_per_second": round(completed / self.elapsed, 2) if self.elapsed else 0.0,
+        }
+        if completed:
+            latencies_ms = np.asarray(self.latencies) * 1000
+            p50, p90, p99 = np.percentile(latencies_ms, [50, 90, 99])
+            report["latency_ms"] = {
+                "mean": round(float(latencies_ms.mean()), 2),
+                "p50": round(float(p50), 2),
+                "p90": round(float(p90), 2),
+                "p99": round(float(p99), 2),
+                "max": round(float(latencies_ms.max()), 2),
+            }
+        return report
+
+
+def configure_environment(base_url: str, client_rate_limit: Optional[float]) -> None:
+    """Point the backend at the mock. Must run before any service is built."""
+    os.environ["OANDA_API_URL"] = base_url
+    os.environ.setdefault("OANDA_API_KEY", "mock-api-key")
+    os.environ.setdefault("OANDA_ACCOUNT_ID", DEFAULT_ACCOUNT_ID)
+    for name in DISCORD_WEBHOOK_ENV:
+        os.environ[name] = f"{base_url}/__mock__/discord/{name.lower()}"
+
+    if client_rate_limit:
+        from config.settings import RATE_LIMIT_SETTINGS
+
+        RATE_LIMIT_SETTINGS["oanda_rest"] = {
+            "capacity": int(client_rate_limit),
+            "refill_per_second": float(client_rate_limit),
+        }
+
+
+async def run_workers(
+    name: str,
+    operation: Callable[[int], Awaitable[Optional[str]]],
+    duration: float,
+    concurrency: int,
+) -> ScenarioResult:
+    """
+    Run `operation` in a closed loop from `concurrency` workers for `duration` seconds.
+
+    The operation returns None on success or an error kind to count as a failure.
+    """
+    result = ScenarioResult(name, concurrency)
+    fallbacks = _fallback_count()
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id: int) -> None:
+        iteration = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                error = await operation(worker_id * 1_000_000 + iteration)
+            except Exception as e:
+                error = type(e).__name__
+            if error is None:
+                result.latencies.append(time.perf_counter() - started)
+            else:
+                result.record_error(error)
+            iteration += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    result.elapsed = time.perf_counter() - started
+    result.fallback_responses = int(_fallback_count() - fallbacks)
+    return result
+
+
+def _fallback_count() -> float:
+    from services.data_service import CACHE_REQUESTS
+
+    return CACHE_REQUESTS.get("fallback_candles", "hit") + CACHE_REQUESTS.get(
+        "fallback_candles", "miss"
+    )
+
+
+async def data_scenario(data_service, args) -> ScenarioResult:
+    pairs = list(data_service.pair_mapping)
+
+    async def fetch(iteration: int) -> Optional[str]:
+        pair = pairs[iteration % len(pairs)]
+        candles = await data_service.get_historical_data(pair, args.timeframe, args.count)
+        if not candles:
+            return "empty"
+        return None
+
+    return await run_workers("data", fetch, args.duration, args.concurrency)
+
+
+async def pipeline_scenario(data_service, args) -> ScenarioResult:
+    from services.enhanced_daily_production_service import EnhancedDailyProductionService
+
+    # One service per worker, all sharing the DataService (as the app does)
+    services = [
+        EnhancedDailyProductionService(data_service=data_service)
+        for _ in range(args.concurrency)
+    ]
+
+    async def scan(iteration: int) -> Optional[str]:
+        service = services[(iteration // 1_000_000) % len(services)]
+        await service.generate_enhanced_signals()
+        return None
+
+    result = await run_workers("pipeline", scan, args.duration, args.concurrency)
+    # Let scheduled Discord deliveries reach the mock before its stats are read
+    pending = [
+        task
+        for task in asyncio.all_tasks()
+        if task is not asyncio.current_task() and not task.done()
+    ]
+    if pending:
+        await asyncio.wait(pending, timeout=10)
+    return result
+
+
+async def account_scenario(data_service, args) -> ScenarioResult:
+    from services.execution_service import get_execution_service
+
+    pairs = list(data_service.pair_mapping)
+    rng = random.Random(args.seed)
+    execution = get_execution_service()
+    execution.set_data_service(data_service)
+    await execution.start()
+
+    async def account_op(iteration: int) -> Optional[str]:
+        if iteration % 4 == 0:
+            health = await data_service.health_check()
+            status = health.get("oanda_status")
+            return None if status == "connected" else str(status)
+
+        pair = pairs[iteration % len(pairs)]
+        price = await data_service.get_current_price(pair)
+        units = rng.choice((1000, -1000))
+        offset = price * 0.005 * (1 if units > 0 else -1)
+        client_order_id = f"lt-{uuid.uuid4().hex[:16]}"
+        result = await execution.place_market_order(
+            pair, units, price - offset, price + 2 * offset, client_order_id, tag="load-test"
+        )
+        if not result.ok:
+            return result.status.lower()
+
+        if iteration % 10 == 1:
+            # Same client ID again: must return the original trade, not open a new one
+            again = await execution.place_market_order(
+                pair, units, price - offset, price + 2 * offset, client_order_id, tag="load-test"
+            )
+            if not again.recovered or again.trade_id != result.trade_id:
+                return "duplicate_order"
+        return None
+
+    try:
+        return await run_workers("account", account_op, args.duration, args.concurrency)
+    finally:
+        await execution.close()
+
+
+def metrics_summary() -> Dict[str, Any]:
+    """Per-stage histogram summaries recorded by the services during the run."""
+    from services.metrics_service import Histogram, get_metrics_registry
+
+    summary = {}
+    for name, metric in sorted(get_metrics_registry()._metrics.items()):
+        if not isinstance(metric, Histogram):
+            continue
+        for labels, child in metric._children.items():
+            if child.count:
+                key = name + ("{" + ",".join(labels) + "}" if labels else "")
+                summary[key] = {
+                    "count": child.count,
+                    "mean_ms": round(child.sum / child.count * 1000, 2),
+                }
+    return summary
+
+
+def print_report(results: List[ScenarioResult], mock_stats: Dict[str, Any]) -> None:
+    print()
+    print(f"{'scenario':<10} {'ops':>7} {'fail':>6} {'fallbk':>6} {'ops/s':>8} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}  (ms)")
+    for result in results:
+        report = result.to_dict()
+        latency = report.get("latency_ms", {})
+        print(
+            f"{report['scenario']:<10} {report['operations']:>7} {report['failed']:>6} "
+            f"{report['fallback_responses']:>6} "
+            f"{report['throughput_per_second']:>8.1f} "
+            + " ".join(f"{latency.get(key, 0.0):>8.1f}" for key in ("p50", "p90", "p99", "max"))
+        )
+        if report["errors"]:
+            print(f"{'':<10} errors: {report['errors']}")
+
+    if mock_stats:
+        print()
+        print(f"Mock OANDA status codes: {mock_stats.get('status', {})}")
+        print(f"Mock OANDA injected faults: {mock_stats.get('injected', {})}")
+        if "account" in {result.name for result in results}:
+            from services.execution_service import get_execution_service
+
+            stats = get_execution_service().get_execution_stats()
+            print(
+                f"Orders: {stats['orders_filled']} filled, {stats['orders_recovered']} recovered by client ID, "
+                f"{stats['retries']} retries, mean fill round trip {stats['mean_fill_round_trip_ms']}ms"
+            )
+        if mock_stats.get("discord_messages"):
+            print(f"Discord messages received: {sum(mock_stats['discord_messages'].values())}")
+
+
+async def main_async(args) -> Dict[str, Any]:
+    server: Optional[MockOandaServer] = None
+    base_url = args.base_url
+    if not base_url:
+        server = MockOandaServer(
+            MockOandaConfig(
+                latency_ms=args.latency_ms,
+                latency_sigma=args.latency_sigma,
+                error_rate=args.error_rate,
+                throttle_rate=args.throttle_rate,
+                rate_limit_per_second=args.rate_limit,
+                recorded_data=not args.synthetic_only,
+            )
+        )
+        base_url = await server.start()
+        logger.info(f"🧪 Mock OANDA started at {base_url}")
+
+    configure_environment(base_url, args.client_rate_limit)
+
+    from services.data_service import DataService
+
+    data_service = DataService()
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+    runners = {"data": data_scenario, "pipeline": pipeline_scenario, "account": account_scenario}
+
+    results = []
+    try:
+        for name in scenarios:
+            logger.info(f"🚀 Running {name} scenario for {args.duration}s x {args.concurrency} workers")
+            results.append(await runners[name](data_service, args))
+
+        if server is not None:
+            mock_stats = server.get_mock_stats()
+        else:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"{base_url}/__mock__/stats") as response:
+                    mock_stats = await response.json()
+    finally:
+        if server is not None:
+            await server.stop()
+
+    if not args.json:
+        print_report(results, mock_stats)
+    return {
+        "results": [result.to_dict() for result in results],
+        "mock": mock_stats,
+        "stages": metrics_summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the backend against a mock OANDA")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeframe", default="H4", help="data scenario granularity")
+    parser.add_argument("--count", type=int, default=200, help="data scenario candle count")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", default="", help="Use a running mock instead of starting one")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Mock 429s above this req/s")
+    parser.add_argument(
+        "--client-rate-limit",
+        type=float,
+        default=None,
+        help="Override the client-side OANDA token bucket (req/s)",
+    )
+    parser.add_argument("--synthetic-only", action="store_true", help="Ignore recorded candles")
+    parser.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Keep service INFO logs")
+    args = parser.parse_args()
+
+    # Per-request service logs would dominate both the output and the timings
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    logger.setLevel(logging.INFO)
+    report = asyncio.run(main_async(args))
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, default=str)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,920 @@
+#!/usr/bin/env python3
+"""
+Mock OANDA Server
+Local stand-in for the OANDA v20 REST API, for load and latency testing.
+
+Serves:
+    GET  /v3/instruments/{instrument}/candles   count, from, to, granularity, price
+    GET  /v3/accounts/{id}                      (and /summary)
+    GET  /v3/accounts/{id}/pricing              instruments=EUR_USD,USD_JPY
+    GET  /v3/accounts/{id}/pricing/stream       newline-delimited PRICE and HEARTBEAT messages
+    GET  /v3/accounts/{id}/transactions/stream  order/fill transactions and HEARTBEAT messages
+    GET  /v3/accounts/{id}/transactions/sinceid id=N
+    POST /v3/accounts/{id}/orders               MARKET/LIMIT/STOP with SL/TP on fill
+    GET  /v3/accounts/{id}/orders[/{specifier}] specifier may be @clientOrderID
+    PUT  /v3/accounts/{id}/orders/{specifier}/cancel
+    GET  /v3/accounts/{id}/openTrades, /trades/{specifier}, /openPositions
+    PUT  /v3/accounts/{id}/trades/{specifier}/close
+    PUT  /v3/accounts/{id}/trades/{specifier}/orders
+    POST /__mock__/discord/{name}               Discord webhook sink
+    GET  /__mock__/stats, PATCH /__mock__/config, POST /__mock__/reset
+
+Candles come from recorded files (backtest_data/historical_data/{PAIR}_{GRAN}_*.json)
+when present, otherwise from services/synthetic_market.py. Every request can be
+delayed (lognormal latency), failed with a 500, or throttled with a 429.
+
+Usage:
+    python -m load_testing.mock_oanda_server --port 8081 --latency-ms 40 --error-rate 0.01
+    OANDA_API_URL=http://127.0.0.1:8081 OANDA_API_KEY=mock OANDA_ACCOUNT_ID=101-001-0000000-001 ...
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+
+from services.candle_calendar import get_granularity_duration
+from services.rate_limiter_service import TokenBucket
+from services.synthetic_market import PAIR_MARKET_PARAMS, generate_series
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_DATA_DIR = BACKEND_DIR / "backtest_data" / "historical_data"
+
+MAX_CANDLE_COUNT = 5000
+DEFAULT_ACCOUNT_ID = "101-001-0000000-001"
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MockOandaConfig:
+    """Fault injection and data settings (adjustable at runtime via PATCH /__mock__/config)."""
+
+    latency_ms: float = 20.0  # Median added latency
+    latency_sigma: float = 0.5  # Lognormal spread; 0 = fixed latency
+    error_rate: float = 0.0  # Share of requests answered with a 500
+    throttle_rate: float = 0.0  # Share of requests answered with a random 429
+    rate_limit_per_second: float = 0.0  # Token-bucket 429s above this rate; 0 = unlimited
+    rate_limit_burst: float = 0.0  # Bucket capacity (default: one second of requests)
+    recorded_data: bool = True  # Prefer recorded candles when a file exists
+    account_balance: float = 100000.0
+    spread_pips: float = 1.2
+    stream_tick_ms: float = 250.0  # Interval between streamed price updates (per instrument)
+    stream_heartbeat_seconds: float = 5.0
+    seed: int = 7
+
+
+def _format_time(moment: datetime) -> str:
+    """OANDA RFC3339 timestamp with nanosecond precision."""
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f") + "000Z"
+
+
+def _parse_time(value: str) -> datetime:
+    """Parse RFC3339 (nanoseconds allowed) or UNIX seconds."""
+    try:
+        return datetime.fromtimestamp(float(value), tz=timezone.utc)
+    except ValueError:
+        pass
+    value = value.replace("Z", "+00:00")
+    if "." in value:
+        # Python parses at most microseconds
+        head, rest = value.split(".", 1)
+        digits = "".join(ch for ch in rest if ch.isdigit())
+        offset = rest[len(digits):]
+        value = f"{head}.{digits[:6]}{offset}"
+    moment = datetime.fromisoformat(value)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def _pip_size(instrument: str) -> float:
+    return 0.01 if instrument.endswith("JPY") else 0.0001
+
+
+def _error(status: int, message: str, **extra: Any) -> web.Response:
+    return web.json_response({"errorMessage": message, **extra}, status=status)
+
+
+class MockAccount:
+    """In-memory account: balance, pending orders and open trades."""
+
+    def __init__(self, account_id: str, balance: float):
+        self.account_id = account_id
+        self.balance = balance
+        self.last_transaction_id = 1
+        self.orders: Dict[str, Dict[str, Any]] = {}  # Pending orders
+        self.filled_orders: Dict[str, Dict[str, Any]] = {}
+        self.trades: Dict[str, Dict[str, Any]] = {}
+        self.client_order_ids: Dict[str, str] = {}  # clientExtensions.id -> order ID
+        self.transactions: List[Dict[str, Any]] = []
+
+    def next_id(self) -> str:
+        self.last_transaction_id += 1
+        return str(self.last_transaction_id)
+
+
+class MockOandaServer:
+    """aiohttp application implementing the OANDA endpoints the backend uses."""
+
+    def __init__(
+        self,
+        config: Optional[MockOandaConfig] = None,
+        data_dir: Path = DEFAULT_DATA_DIR,
+        account_id: str = DEFAULT_ACCOUNT_ID,
+    ):
+        self.config = config or MockOandaConfig()
+        self.data_dir = Path(data_dir)
+        self.account = MockAccount(account_id, self.config.account_balance)
+        self._rng = random.Random(self.config.seed)
+        self._bucket: Optional[TokenBucket] = None
+        self._recorded: Dict[Tuple[str, str], Optional[Dict[str, np.ndarray]]] = {}
+        self._runner: Optional[web.AppRunner] = None
+        self._transaction_streams: List[asyncio.Queue] = []
+        self.stats: Dict[str, Counter] = {
+            "requests": Counter(),
+            "status": Counter(),
+            "injected": Counter(),
+            "discord_messages": Counter(),
+            "streams": Counter(),
+        }
+        self._configure_bucket()
+
+    # Lifecycle ----------------------------------------------------------
+
+    def build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._fault_middleware])
+        prefix = "/v3/accounts/{account_id}"
+        app.add_routes(
+            [
+                web.get("/v3/instruments/{instrument}/candles", self.get_candles),
+                web.get(prefix, self.get_account),
+                web.get(prefix + "/summary", self.get_account),
+                web.get(prefix + "/pricing", self.get_pricing),
+                web.get(prefix + "/pricing/stream", self.stream_pricing),
+                web.get(prefix + "/transactions/stream", self.stream_transactions),
+                web.get(prefix + "/transactions/sinceid", self.transactions_since),
+                web.post(prefix + "/orders", self.create_order),
+                web.get(prefix + "/orders", self.list_orders),
+                web.get(prefix + "/pendingOrders", self.list_orders),
+                web.get(prefix + "/orders/{specifier}", self.get_order),
+                web.put(prefix + "/orders/{specifier}/cancel", self.cancel_order),
+                web.get(prefix + "/openTrades", self.list_trades),
+                web.get(prefix + "/trades", self.list_trades),
+                web.get(prefix + "/trades/{specifier}", self.get_trade),
+                web.put(prefix + "/trades/{specifier}/close", self.close_trade),
+                web.put(prefix + "/trades/{specifier}/orders", self.modify_trade_orders),
+                web.get(prefix + "/openPositions", self.list_positions),
+                web.post("/__mock__/discord/{name}", self.discord_webhook),
+                web.get("/__mock__/stats", self.get_stats),
+                web.patch("/__mock__/config", self.patch_config),
+                web.post("/__mock__/reset", self.reset),
+            ]
+        )
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving in the current event loop; returns the base URL."""
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{bound_port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _configure_bucket(self) -> None:
+        rate = self.config.rate_limit_per_second
+        self._bucket = (
+            TokenBucket(self.config.rate_limit_burst or rate, rate) if rate > 0 else None
+        )
+
+    # Fault injection ----------------------------------------------------
+
+    @web.middleware
+    async def _fault_middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        route = request.match_info.route.resource
+        route_name = route.canonical if route is not None else request.path
+        self.stats["requests"][route_name] += 1
+
+        if not request.path.startswith("/__mock__"):
+            response = await self._inject_faults(request)
+            if response is None:
+                response = await handler(request)
+        else:
+            response = await handler(request)
+
+        self.stats["status"][response.status] += 1
+        return response
+
+    async def _inject_faults(self, request: web.Request) -> Optional[web.Response]:
+        config = self.config
+        if not request.headers.get("Authorization", "").startswith("Bearer "):
+            return _error(401, "Insufficient authorization to perform request.")
+
+        if config.latency_ms > 0:
+            delay = config.latency_ms
+            if config.latency_sigma > 0:
+                delay *= math.exp(self._rng.gauss(0.0, config.latency_sigma))
+            await asyncio.sleep(delay / 1000)
+
+        if self._bucket is not None and not self._bucket.try_acquire():
+            self.stats["injected"]["rate_limited"] += 1
+            return self._throttled()
+        if config.throttle_rate and self._rng.random() < config.throttle_rate:
+            self.stats["injected"]["throttled"] += 1
+            return self._throttled()
+        if config.error_rate and self._rng.random() < config.error_rate:
+            self.stats["injected"]["server_error"] += 1
+            return _error(500, "Internal server error (injected)")
+        return None
+
+    @staticmethod
+    def _throttled() -> web.Response:
+        return web.json_response(
+            {"errorMessage": "Rate limit exceeded"}, status=429, headers={"Retry-After": "1"}
+        )
+
+    # Candles ------------------------------------------------------------
+
+    def _load_recorded(self, instrument: str, granularity: str) -> Optional[Dict[str, np.ndarray]]:
+        key = (instrument, granularity)
+        if key in self._recorded:
+            return self._recorded[key]
+
+        columns = None
+        matches = sorted(self.data_dir.glob(f"{instrument}_{granularity}_*.json"))
+        if matches:
+            with matches[0].open() as f:
+                candles = json.load(f)["data"]
+            columns = {
+                "time": pd.to_datetime([c["timestamp"] for c in candles], utc=True)
+                .tz_convert(None)
+                .to_numpy(),
+                **{
+                    name: np.array([c[name] for c in candles], dtype=float)
+                    for name in ("open", "high", "low", "close")
+                },
+                "volume": np.array([c.get("volume", 0) for c in candles], dtype=np.int64),
+            }
+            logger.info(f"📼 Loaded {len(candles)} recorded {granularity} candles for {instrument}")
+        self._recorded[key] = columns
+        return columns
+
+    def _select_candles(
+        self,
+        instrument: str,
+        granularity: str,
+        count: Optional[int],
+        start: Optional[datetime],
+        end: Optional[datetime],
+    ) -> Dict[str, np.ndarray]:
+        recorded = self._load_recorded(instrument, granularity) if self.config.recorded_data else None
+        if recorded is not None:
+            times = recorded["time"]
+            lo = 0 if start is None else int(np.searchsorted(times, np.datetime64(start.replace(tzinfo=None), "ns")))
+            hi = len(times) if end is None else int(np.searchsorted(times, np.datetime64(end.replace(tzinfo=None), "ns")))
+            if count is not None:
+                lo, hi = (lo, min(hi, lo + count)) if start is not None else (max(lo, hi - count), hi)
+            return {name: values[lo:hi] for name, values in recorded.items()}
+
+        if instrument not in PAIR_MARKET_PARAMS:
+            raise KeyError(instrument)
+        duration = get_granularity_duration(granularity)
+        if start is not None and end is None:
+            end = min(
+                start + duration * int((count or MAX_CANDLE_COUNT) * 1.5 + 10),
+                datetime.now(timezone.utc),
+            )
+        series = generate_series(
+            instrument,
+            granularity,
+            count=None if start is not None else count,
+            start=start,
+            end=end,
+        )
+        columns = {
+            "time": series.timestamps,
+            "open": series.open,
+            "high": series.high,
+            "low": series.low,
+            "close": series.close,
+            "volume": series.volume,
+        }
+        if start is not None:
+            keep = series.timestamps >= np.datetime64(start.replace(tzinfo=None), "ns")
+            columns = {name: values[keep][: count or None] for name, values in columns.items()}
+        return columns
+
+    async def get_candles(self, request: web.Request) -> web.Response:
+        instrument = request.match_info["instrument"]
+        query = request.query
+        granularity = query.get("granularity", "S5")
+        try:
+            duration = get_granularity_duration(granularity)
+        except ValueError:
+            return _error(400, f"Invalid value specified for 'granularity': {granularity}")
+
+        try:
+            start = _parse_time(query["from"]) if "from" in query else None
+            end = _parse_time(query["to"]) if "to" in query else None
+            count = int(query["count"]) if "count" in query else None
+        except ValueError as e:
+            return _error(400, f"Invalid parameter: {e}")
+
+        if start is not None and end is not None and count is not None:
+            return _error(400, "'count' cannot be specified with both 'from' and 'to'")
+        if count is None and (start is None or end is None):
+            count = 500
+        if count is not None and not 0 < count <= MAX_CANDLE_COUNT:
+            return _error(400, f"Maximum value for 'count' exceeded ({MAX_CANDLE_COUNT})")
+
+        try:
+            columns = self._select_candles(instrument, granularity, count, start, end)
+        except KeyError:
+            return _error(400, f"Invalid value specified for 'instrument': {instrument}")
+
+        now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "ns")
+        complete = (columns["time"] + np.timedelta64(int(duration.total_seconds()), "s")) <= now
+        decimals = 3 if instrument.endswith("JPY") else 5
+        times = np.datetime_as_string(columns["time"], unit="ns")
+        prices = {name: np.round(columns[name], decimals).tolist() for name in ("open", "high", "low", "close")}
+
+        candles = [
+            {
+                "complete": done,
+                "volume": volume,
+                "time": f"{stamp}Z",
+                "mid": {"o": f"{o:.{decimals}f}", "h": f"{h:.{decimals}f}", "l": f"{l:.{decimals}f}", "c": f"{c:.{decimals}f}"},
+            }
+            for stamp, done, volume, o, h, l, c in zip(
+                times.tolist(),
+                complete.tolist(),
+                columns["volume"].tolist(),
+                prices["open"],
+                prices["high"],
+                prices["low"],
+                prices["close"],
+            )
+        ]
+        return web.json_response(
+            {"instrument": instrument, "granularity": granularity, "candles": candles}
+        )
+
+    # Pricing ------------------------------------------------------------
+
+    def _quote(self, instrument: str) -> Tuple[float, float]:
+        """Current bid/ask: last synthetic M5 close plus a little noise and the spread."""
+        mid = float(generate_series(instrument, "M5", count=1).close[-1])
+        mid *= 1 + self._rng.gauss(0.0, 0.00005)
+        half_spread = self.config.spread_pips * _pip_size(instrument) / 2
+        return mid - half_spread, mid + half_spread
+
+    async def get_pricing(self, request: web.Request) -> web.Response:
+        if request.match_info["account_id"] != self.account.account_id:
+            return _error(404, "Account not found")
+        instruments = [i for i in request.query.get("instruments", "").split(",") if i]
+        if not instruments:
+            return _error(400, "'instruments' is required")
+
+        now = _format_time(datetime.now(timezone.utc))
+        prices = []
+        for instrument in instruments:
+            if instrument not in PAIR_MARKET_PARAMS:
+                return _error(400, f"Invalid value specified for 'instruments': {instrument}")
+            bid, ask = self._quote(instrument)
+            decimals = 3 if instrument.endswith("JPY") else 5
+            prices.append(
+                {
+                    "type": "PRICE",
+                    "instrument": instrument,
+                    "time": now,
+                    "tradeable": True,
+                    "bids": [{"price": f"{bid:.{decimals}f}", "liquidity": 10000000}],
+                    "asks": [{"price": f"{ask:.{decimals}f}", "liquidity": 10000000}],
+                    "closeoutBid": f"{bid:.{decimals}f}",
+                    "closeoutAsk": f"{ask:.{decimals}f}",
+                }
+            )
+        return web.json_response({"prices": prices, "time": now})
+
+    async def stream_pricing(self, request: web.Request) -> web.StreamResponse:
+        error = self._check_account(request)
+        if error:
+            return error
+        instruments = [i for i in request.query.get("instruments", "").split(",") if i]
+        unknown = [i for i in instruments if i not in PAIR_MARKET_PARAMS]
+        if not instruments or unknown:
+            return _error(400, f"Invalid value specified for 'instruments': {unknown or instruments}")
+
+        response = web.StreamResponse(headers={"Content-Type": "application/octet-stream"})
+        await response.prepare(request)
+        self.stats["streams"]["opened"] += 1
+
+        mids = {instrument: sum(self._quote(instrument)) / 2 for instrument in instruments}
+        next_heartbeat = time.monotonic() + self.config.stream_heartbeat_seconds
+        try:
+            while True:
+                now = _format_time(datetime.now(timezone.utc))
+                lines = []
+                for instrument in instruments:
+                    # Random walk around the synthetic price
+                    mids[instrument] *= 1 + self._rng.gauss(0.0, 0.00003)
+                    half_spread = self.config.spread_pips * _pip_size(instrument) / 2
+                    decimals = 3 if instrument.endswith("JPY") else 5
+                    bid = f"{mids[instrument] - half_spread:.{decimals}f}"
+                    ask = f"{mids[instrument] + half_spread:.{decimals}f}"
+                    lines.append(
+                        {
+                            "type": "PRICE",
+                            "instrument": instrument,
+                            "time": now,
+                            "tradeable": True,
+                            "bids": [{"price": bid, "liquidity": 10000000}],
+                            "asks": [{"price": ask, "liquidity": 10000000}],
+                            "closeoutBid": bid,
+                            "closeoutAsk": ask,
+                        }
+                    )
+                if time.monotonic() >= next_heartbeat:
+                    lines.append({"type": "HEARTBEAT", "time": now})
+                    next_heartbeat += self.config.stream_heartbeat_seconds
+                await response.write("".join(json.dumps(line) + "\n" for line in lines).encode())
+                self.stats["streams"]["messages"] += len(lines)
+                await asyncio.sleep(self.config.stream_tick_ms / 1000)
+        except ConnectionResetError:
+            # Client went away (or reconnected after a missed heartbeat)
+            self.stats["streams"]["closed"] += 1
+        return response
+
+    async def stream_transactions(self, request: web.Request) -> web.StreamResponse:
+        error = self._check_account(request)
+        if error:
+            return error
+
+        response = web.StreamResponse(headers={"Content-Type": "application/octet-stream"})
+        await response.prepare(request)
+        self.stats["streams"]["transactions_opened"] += 1
+        queue: asyncio.Queue = asyncio.Queue()
+        self._transaction_streams.append(queue)
+        try:
+            while True:
+                try:
+                    transaction = await asyncio.wait_for(
+                        queue.get(), self.config.stream_heartbeat_seconds
+                    )
+                except asyncio.TimeoutError:
+                    transaction = {
+                        "type": "HEARTBEAT",
+                        "lastTransactionID": str(self.account.last_transaction_id),
+                        "time": _format_time(datetime.now(timezone.utc)),
+                    }
+                await response.write((json.dumps(transaction) + "\n").encode())
+                self.stats["streams"]["transactions"] += 1
+        except ConnectionResetError:
+            self.stats["streams"]["closed"] += 1
+        finally:
+            self._transaction_streams.remove(queue)
+        return response
+
+    async def transactions_since(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        try:
+            since = int(request.query["id"])
+        except (KeyError, ValueError):
+            return _error(400, "Invalid value specified for 'id'")
+        return web.json_response(
+            {
+                "transactions": [t for t in self.account.transactions if int(t["id"]) > since],
+                "lastTransactionID": str(self.account.last_transaction_id),
+            }
+        )
+
+    def _publish_transactions(self, *transactions: Dict[str, Any]) -> None:
+        self.account.transactions.extend(transactions)
+        for queue in self._transaction_streams:
+            for transaction in transactions:
+                queue.put_nowait(transaction)
+
+    # Account ------------------------------------------------------------
+
+    def _check_account(self, request: web.Request) -> Optional[web.Response]:
+        if request.match_info["account_id"] != self.account.account_id:
+            return _error(404, "The Account specified does not exist.")
+        return None
+
+    def _unrealized_pl(self) -> float:
+        total = 0.0
+        for trade in self.account.trades.values():
+            bid, ask = self._quote(trade["instrument"])
+            price = bid if float(trade["currentUnits"]) > 0 else ask
+            total += (price - float(trade["price"])) * float(trade["currentUnits"])
+        return total
+
+    async def get_account(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        account = self.account
+        unrealized = self._unrealized_pl()
+        return web.json_response(
+            {
+                "account": {
+                    "id": account.account_id,
+                    "alias": "Mock",
+                    "currency": "USD",
+                    "balance": f"{account.balance:.4f}",
+                    "NAV": f"{account.balance + unrealized:.4f}",
+                    "unrealizedPL": f"{unrealized:.4f}",
+                    "marginUsed": "0.0000",
+                    "marginAvailable": f"{account.balance + unrealized:.4f}",
+                    "openTradeCount": len(account.trades),
+                    "openPositionCount": len({t["instrument"] for t in account.trades.values()}),
+                    "pendingOrderCount": len(account.orders),
+                    "lastTransactionID": str(account.last_transaction_id),
+                },
+                "lastTransactionID": str(account.last_transaction_id),
+            }
+        )
+
+    # Orders -------------------------------------------------------------
+
+    def _find_order(self, specifier: str) -> Optional[Dict[str, Any]]:
+        if specifier.startswith("@"):
+            specifier = self.account.client_order_ids.get(specifier[1:], "")
+        return self.account.orders.get(specifier) or self.account.filled_orders.get(specifier)
+
+    async def create_order(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        try:
+            order = (await request.json())["order"]
+            instrument = order["instrument"]
+            units = float(order["units"])
+            order_type = order.get("type", "MARKET")
+        except (ValueError, KeyError, TypeError) as e:
+            return _error(400, f"Invalid order request: {e}")
+        if instrument not in PAIR_MARKET_PARAMS:
+            return _error(400, f"Invalid value specified for 'instrument': {instrument}")
+
+        account = self.account
+        now = _format_time(datetime.now(timezone.utc))
+        client_id = (order.get("clientExtensions") or {}).get("id")
+        if client_id and client_id in account.client_order_ids:
+            reject_id = account.next_id()
+            return web.json_response(
+                {
+                    "orderRejectTransaction": {
+                        "id": reject_id,
+                        "type": f"{order_type}_ORDER_REJECT",
+                        "rejectReason": "CLIENT_ORDER_ID_ALREADY_EXISTS",
+                        "time": now,
+                    },
+                    "errorCode": "CLIENT_ORDER_ID_ALREADY_EXISTS",
+                    "errorMessage": "The client Order ID specified is already assigned to another pending Order",
+                    "lastTransactionID": reject_id,
+                },
+                status=400,
+            )
+
+        order_id = account.next_id()
+        record = {
+            "id": order_id,
+            "type": order_type,
+            "instrument": instrument,
+            "units": str(int(units)),
+            "state": "PENDING",
+            "createTime": now,
+            "clientExtensions": order.get("clientExtensions"),
+            "stopLossOnFill": order.get("stopLossOnFill"),
+            "takeProfitOnFill": order.get("takeProfitOnFill"),
+            "price": order.get("price"),
+        }
+        if client_id:
+            account.client_order_ids[client_id] = order_id
+        create_tx = {
+            "id": order_id,
+            "type": f"{order_type}_ORDER",
+            "instrument": instrument,
+            "units": record["units"],
+            "time": now,
+            "clientExtensions": record["clientExtensions"],
+        }
+
+        if order_type != "MARKET":
+            account.orders[order_id] = record
+            self._publish_transactions(create_tx)
+            return web.json_response(
+                {"orderCreateTransaction": create_tx, "lastTransactionID": order_id}, status=201
+            )
+
+        bid, ask = self._quote(instrument)
+        price = ask if units > 0 else bid
+        fill_id = account.next_id()
+        trade = {
+            "id": fill_id,
+            "instrument": instrument,
+            "price": f"{price:.5f}",
+            "openTime": now,
+            "initialUnits": record["units"],
+            "currentUnits": record["units"],
+            "state": "OPEN",
+            "realizedPL": "0.0000",
+            "clientExtensions": record["clientExtensions"],
+            "stopLossOrder": self._dependent_order(fill_id, "STOP_LOSS", record["stopLossOnFill"]),
+            "takeProfitOrder": self._dependent_order(fill_id, "TAKE_PROFIT", record["takeProfitOnFill"]),
+        }
+        account.trades[fill_id] = trade
+        record["state"] = "FILLED"
+        record["filledTime"] = now
+        record["tradeOpenedID"] = fill_id
+        account.filled_orders[order_id] = record
+        fill_tx = {
+            "id": fill_id,
+            "type": "ORDER_FILL",
+            "orderID": order_id,
+            "instrument": instrument,
+            "units": record["units"],
+            "price": trade["price"],
+            "time": now,
+            "tradeOpened": {"tradeID": fill_id, "units": record["units"], "price": trade["price"]},
+            "accountBalance": f"{account.balance:.4f}",
+        }
+        dependent_txs = [
+            {**order, "type": f"{order['type']}_ORDER", "time": now}
+            for order in (trade["stopLossOrder"], trade["takeProfitOrder"])
+            if order is not None
+        ]
+        self._publish_transactions(create_tx, fill_tx, *dependent_txs)
+
+        return web.json_response(
+            {
+                "orderCreateTransaction": create_tx,
+                "orderFillTransaction": fill_tx,
+                "relatedTransactionIDs": [order_id, fill_id],
+                "lastTransactionID": fill_id,
+            },
+            status=201,
+        )
+
+    def _dependent_order(
+        self, trade_id: str, order_type: str, details: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        if not details or "price" not in details:
+            return None
+        return {
+            "id": self.account.next_id(),
+            "type": order_type,
+            "tradeID": trade_id,
+            "price": str(details["price"]),
+            "state": "PENDING",
+            "timeInForce": details.get("timeInForce", "GTC"),
+        }
+
+    async def list_orders(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        return web.json_response(
+            {
+                "orders": list(self.account.orders.values()),
+                "lastTransactionID": str(self.account.last_transaction_id),
+            }
+        )
+
+    async def get_order(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        order = self._find_order(request.match_info["specifier"])
+        if order is None:
+            return _error(404, "The Order specified does not exist", errorCode="ORDER_DOESNT_EXIST")
+        return web.json_response(
+            {"order": order, "lastTransactionID": str(self.account.last_transaction_id)}
+        )
+
+    async def cancel_order(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        order = self._find_order(request.match_info["specifier"])
+        if order is None or order["id"] not in self.account.orders:
+            return _error(404, "The Order specified does not exist", errorCode="ORDER_DOESNT_EXIST")
+        del self.account.orders[order["id"]]
+        order["state"] = "CANCELLED"
+        cancel_id = self.account.next_id()
+        return web.json_response(
+            {
+                "orderCancelTransaction": {"id": cancel_id, "type": "ORDER_CANCEL", "orderID": order["id"]},
+                "lastTransactionID": cancel_id,
+            }
+        )
+
+    # Trades -------------------------------------------------------------
+
+    def _find_trade(self, specifier: str) -> Optional[Dict[str, Any]]:
+        if specifier.startswith("@"):
+            client_id = specifier[1:]
+            return next(
+                (
+                    trade
+                    for trade in self.account.trades.values()
+                    if (trade.get("clientExtensions") or {}).get("id") == client_id
+                ),
+                None,
+            )
+        return self.account.trades.get(specifier)
+
+    async def list_trades(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        return web.json_response(
+            {
+                "trades": list(self.account.trades.values()),
+                "lastTransactionID": str(self.account.last_transaction_id),
+            }
+        )
+
+    async def get_trade(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        trade = self._find_trade(request.match_info["specifier"])
+        if trade is None:
+            return _error(404, "The Trade specified does not exist", errorCode="NO_SUCH_TRADE")
+        return web.json_response(
+            {"trade": trade, "lastTransactionID": str(self.account.last_transaction_id)}
+        )
+
+    async def close_trade(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        trade = self._find_trade(request.match_info["specifier"])
+        if trade is None:
+            return _error(404, "The Trade specified does not exist", errorCode="NO_SUCH_TRADE")
+
+        units = float(trade["currentUnits"])
+        bid, ask = self._quote(trade["instrument"])
+        price = bid if units > 0 else ask
+        realized = (price - float(trade["price"])) * units
+        self.account.balance += realized
+        del self.account.trades[trade["id"]]
+
+        fill_id = self.account.next_id()
+        fill_tx = {
+            "id": fill_id,
+            "type": "ORDER_FILL",
+            "instrument": trade["instrument"],
+            "units": str(int(-units)),
+            "price": f"{price:.5f}",
+            "pl": f"{realized:.4f}",
+            "tradesClosed": [
+                {"tradeID": trade["id"], "units": str(int(-units)), "realizedPL": f"{realized:.4f}"}
+            ],
+            "accountBalance": f"{self.account.balance:.4f}",
+        }
+        self._publish_transactions(fill_tx)
+        return web.json_response(
+            {
+                "orderFillTransaction": fill_tx,
+                "lastTransactionID": fill_id,
+            }
+        )
+
+    async def modify_trade_orders(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        trade = self._find_trade(request.match_info["specifier"])
+        if trade is None:
+            return _error(404, "The Trade specified does not exist", errorCode="NO_SUCH_TRADE")
+        try:
+            body = await request.json()
+        except ValueError as e:
+            return _error(400, f"Invalid request body: {e}")
+
+        response: Dict[str, Any] = {}
+        for field, order_type, key in (
+            ("stopLoss", "STOP_LOSS", "stopLossOrder"),
+            ("takeProfit", "TAKE_PROFIT", "takeProfitOrder"),
+        ):
+            if field in body:
+                trade[key] = self._dependent_order(trade["id"], order_type, body[field])
+                if trade[key] is not None:
+                    response[f"{field}OrderTransaction"] = {**trade[key], "type": f"{order_type}_ORDER"}
+        response["lastTransactionID"] = str(self.account.last_transaction_id)
+        return web.json_response(response)
+
+    async def list_positions(self, request: web.Request) -> web.Response:
+        error = self._check_account(request)
+        if error:
+            return error
+        positions: Dict[str, Dict[str, Any]] = {}
+        for trade in self.account.trades.values():
+            position = positions.setdefault(
+                trade["instrument"],
+                {"instrument": trade["instrument"], "long": {"units": 0.0, "tradeIDs": []}, "short": {"units": 0.0, "tradeIDs": []}},
+            )
+            side = position["long"] if float(trade["currentUnits"]) > 0 else position["short"]
+            side["units"] += float(trade["currentUnits"])
+            side["tradeIDs"].append(trade["id"])
+        for position in positions.values():
+            for side in ("long", "short"):
+                position[side]["units"] = str(int(position[side]["units"]))
+        return web.json_response(
+            {"positions": list(positions.values()), "lastTransactionID": str(self.account.last_transaction_id)}
+        )
+
+    # Mock control -------------------------------------------------------
+
+    async def discord_webhook(self, request: web.Request) -> web.Response:
+        await request.read()
+        self.stats["discord_messages"][request.match_info["name"]] += 1
+        return web.Response(status=204)
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.get_mock_stats())
+
+    def get_mock_stats(self) -> Dict[str, Any]:
+        """Request, status and injected-fault counts plus the current config."""
+        return {
+            "config": asdict(self.config),
+            "requests": dict(self.stats["requests"]),
+            "status": {str(code): count for code, count in self.stats["status"].items()},
+            "injected": dict(self.stats["injected"]),
+            "discord_messages": dict(self.stats["discord_messages"]),
+            "streams": dict(self.stats["streams"]),
+            "open_trades": len(self.account.trades),
+            "pending_orders": len(self.account.orders),
+        }
+
+    async def patch_config(self, request: web.Request) -> web.Response:
+        try:
+            updates = await request.json()
+        except ValueError as e:
+            return _error(400, f"Invalid JSON: {e}")
+        known = {field.name: field.type for field in fields(MockOandaConfig)}
+        unknown = set(updates) - set(known)
+        if unknown:
+            return _error(400, f"Unknown config keys: {sorted(unknown)}")
+        for key, value in updates.items():
+            setattr(self.config, key, value)
+        self._configure_bucket()
+        return web.json_response(asdict(self.config))
+
+    async def reset(self, request: web.Request) -> web.Response:
+        self.account = MockAccount(self.account.account_id, self.config.account_balance)
+        for counter in self.stats.values():
+            counter.clear()
+        return web.json_response({"reset": True})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OANDA v20 stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--account-id", default=DEFAULT_ACCOUNT_ID)
+    parser.add_argument("--data-dir", default=str(DEFAULT_DATA_DIR), help="Recorded candle files")
+    parser.add_argument("--synthetic-only", action="store_true", help="Ignore recorded candles")
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/second before 429s")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = MockOandaConfig(
+        latency_ms=args.latency_ms,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        rate_limit_per_second=args.rate_limit,
+        recorded_data=not args.synthetic_only,
+    )
+    server = MockOandaServer(config, Path(args.data_dir), args.account_id)
+    logger.info(f"🧪 Mock OANDA listening on http://{args.host}:{args.port} (account {args.account_id})")
+    web.run_app(server.build_app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
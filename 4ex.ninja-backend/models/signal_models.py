@@ -41,6 +41,7 @@ class TradingSignal(BaseModel):
     status: SignalStatus = Field(default=SignalStatus.PENDING)
     strategy_type: str = Field(default="conservative_moderate_daily")
     confidence: Optional[float] = Field(None, description="Signal confidence (0-1)")
+    trace_id: Optional[str] = Field(None, description="Trace of the scan that produced the signal")
 
     class Config:
         json_encoders = {datetime: lambda v: v.isoformat()}
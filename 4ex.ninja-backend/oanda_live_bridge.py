@@ -17,13 +17,20 @@ import logging
 import os
 import json
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 # Import existing services
 from enhanced_daily_strategy_v2 import EnhancedDailyStrategyV2
 from confidence_risk_manager_v2 import ConfidenceAnalysisRiskManager
+from config.settings import LIVE_ENGINE_SETTINGS
 from services.data_service import DataService
 from services.enhanced_discord_service import EnhancedDiscordService
+from services.correlation_risk_service import get_correlation_risk_engine
+from services.execution_service import get_execution_service, make_client_order_id
+from services.live_engine_service import LiveTradingEngine
+from services.position_book_service import BookTrade, get_position_book
+from services.bar_builder_service import get_bar_builder_service
+from services.pricing_stream_service import Tick, get_pricing_stream_service
 
 # Configure logging
 logging.basicConfig(
@@ -46,31 +53,40 @@ class OandaLiveTradingBridge:
         self.risk_manager = ConfidenceAnalysisRiskManager()
         self.data_service = DataService()  # Already has Oanda integration
         self.discord_service = EnhancedDiscordService()
+        self.execution = get_execution_service()  # Pooled session, idempotent orders
+        self.execution.set_data_service(self.data_service)
+
+        # Streamed prices let SL/TP levels be checked on every tick instead of every bar
+        self.pricing_stream = get_pricing_stream_service()
+        self.pricing_stream.set_data_service(self.data_service)
+        # Open trades shared with the risk manager and position sizing
+        self.position_book = get_position_book()
+        self.position_book.set_execution_service(self.execution)
+        # Closed trades feed the risk manager's journaled loss streak and daily/weekly risk
+        self.position_book.close_listeners.append(self.record_closed_trade)
+        self._level_alerts: Set[str] = set()  # Trade IDs already reported at a level
+        # Rolling return correlations the risk manager scales correlated trades by
+        self.correlation_risk = get_correlation_risk_engine()
+        self.bar_builder = get_bar_builder_service()
+        self.bar_builder.set_data_service(self.data_service)
         
-        # Tier 1 pairs for conservative start
-        self.tier_1_pairs = ["USD_JPY", "EUR_GBP"]
+        # Tier 1 pairs for conservative start (any validated pairs via LIVE_ENGINE_PAIRS)
+        self.tier_1_pairs = list(LIVE_ENGINE_SETTINGS["pairs"])
         self.risk_per_trade = 0.005  # 0.5% as validated in backtest
+        self.test_mode = True
+        
+        # One worker per pair; signals come back through handle_signal
+        self.engine = LiveTradingEngine(
+            self.strategy, self.data_service, self.handle_signal, pairs=self.tier_1_pairs
+        )
         
         logger.info("✅ All services initialized successfully")
         
     async def get_account_balance(self) -> float:
-        """Get current Oanda account balance"""
+        """Get current Oanda account balance (cached, kept current by the transaction stream)"""
         try:
-            # Use the Oanda API directly since DataService doesn't have get_account_info
-            import aiohttp
-            headers = {"Authorization": f"Bearer {self.data_service.api_key}"}
-            url = f"{self.data_service.base_url}/v3/accounts/{self.data_service.account_id}"
-            
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        balance = float(data['account']['balance'])
-                        logger.info(f"💰 Account balance: ${balance:,.2f}")
-                        return balance
-                    else:
-                        logger.warning(f"⚠️ Failed to get account balance: {response.status}")
-                        return 10000.0
+            account = await self.execution.get_account_state()
+            return account.balance
         except Exception as e:
             logger.error(f"❌ Failed to get account balance: {e}")
             return 10000.0  # Fallback to demo starting balance
@@ -78,24 +94,37 @@ class OandaLiveTradingBridge:
     async def execute_live_trade(self, signal: Dict) -> Dict:
         """Execute a live trade using existing infrastructure"""
         try:
-            # Get current balance
-            balance = await self.get_account_balance()
+            # Size against the current balance using the existing risk manager
+            self.risk_manager.load_state()  # Journaled state first, so it doesn't replace the live balance
+            self.risk_manager.account_balance = await self.get_account_balance()
+            sizing = self.risk_manager.calculate_position_size(signal)
+            if not sizing.get("allowed", True):
+                logger.warning(f"⚠️ Trade blocked by risk manager: {signal['pair']}")
+                return {"error": "Trade not allowed by risk manager", "sizing": sizing}
             
-            # Use existing risk manager for position sizing
-            position_size = self.risk_manager.calculate_position_size(
-                account_balance=balance,
-                risk_percentage=self.risk_per_trade,
-                pair=signal['pair'],
-                confidence_score=signal.get('confidence', 0.85)
-            )
+            # Lots -> OANDA units; sells are negative
+            units = int(round(sizing["position_size"] * 100000))
+            if signal['signal'] == 'SELL':
+                units = -units
             
-            # Execute trade via DataService (extends to Oanda API)
-            order_result = await self.place_oanda_order(signal, position_size)
+            order_result = await self.place_oanda_order(signal, units)
+            if order_result.get("status") not in ("FILLED", "PENDING"):
+                raise RuntimeError(
+                    f"Order {order_result.get('status')}: {order_result.get('reason')}"
+                )
             
+            # The fill is already in the book; add the levels and the risk we sized for
+            self.position_book.annotate(
+                order_result.get("trade_id"),
+                stop_loss=signal.get('stop_loss'),
+                take_profit=signal.get('take_profit'),
+                risk_amount=sizing.get("risk_amount"),
+            )
+
             # Send Discord notification using existing service
             await self.discord_service.send_enhanced_signal(signal, order_result)
             
-            logger.info(f"✅ Trade executed: {signal['pair']} - Size: {position_size}")
+            logger.info(f"✅ Trade executed: {signal['pair']} - Units: {units}")
             return order_result
             
         except Exception as e:
@@ -107,95 +136,113 @@ class OandaLiveTradingBridge:
             return {"error": str(e)}
             
     async def place_oanda_order(self, signal: Dict, units: int) -> Dict:
-        """Place order via Oanda API (integration point)"""
-        # This is where we'll connect to Oanda's order placement
-        # For now, return simulated order result
+        """Place a MARKET order with SL/TP attached; safe to retry for the same signal"""
+        result = await self.execution.place_market_order(
+            instrument=self.data_service.pair_mapping.get(signal['pair'], signal['pair']),
+            units=units,
+            stop_loss=signal.get('stop_loss'),
+            take_profit=signal.get('take_profit'),
+            client_order_id=make_client_order_id(signal),
+        )
         order_result = {
-            "id": f"order_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
-            "instrument": signal['pair'],
-            "units": units,
+            **result.to_dict(),
             "type": "MARKET",
             "side": signal['signal'],
-            "price": signal['price'],
             "time": datetime.now(timezone.utc).isoformat(),
-            "status": "FILLED"  # Simulated for testing
         }
         
         logger.info(f"📝 Order placed: {order_result}")
         return order_result
         
+    def record_closed_trade(self, trade: BookTrade, realized_pl: float):
+        """Journal a closed trade's result with the risk manager"""
+        self.risk_manager.update_trade_result({
+            "trade_id": trade.trade_id,
+            "pair": trade.pair,
+            "result": "win" if realized_pl > 0 else "loss",
+            "pl": realized_pl,
+            "risk_amount": trade.risk_amount,
+        })
+        self._level_alerts.discard(trade.trade_id)
+
+    def check_price_levels(self, tick: Tick) -> List[Tuple[BookTrade, str]]:
+        """Open trades on the tick's pair whose "stop_loss" or "take_profit" the tick crosses"""
+        hits = []
+        for trade in self.position_book.get_pair_trades(tick.instrument):
+            # Longs close at the bid, shorts at the ask
+            if trade.units > 0:
+                if trade.stop_loss is not None and tick.bid <= trade.stop_loss:
+                    hits.append((trade, "stop_loss"))
+                elif trade.take_profit is not None and tick.bid >= trade.take_profit:
+                    hits.append((trade, "take_profit"))
+            else:
+                if trade.stop_loss is not None and tick.ask >= trade.stop_loss:
+                    hits.append((trade, "stop_loss"))
+                elif trade.take_profit is not None and tick.ask <= trade.take_profit:
+                    hits.append((trade, "take_profit"))
+        return hits
+
+    async def watch_price_levels(self):
+        """React to SL/TP levels as ticks arrive"""
+        subscription = self.pricing_stream.bus.subscribe(self.tier_1_pairs)
+        try:
+            while True:
+                tick = await subscription.get()
+                if tick is None:
+                    return
+                for trade, level in self.check_price_levels(tick):
+                    # OANDA closes the trade through its SL/TP order; the book follows the fill
+                    if trade.trade_id in self._level_alerts:
+                        continue
+                    self._level_alerts.add(trade.trade_id)
+                    price = tick.bid if trade.side == "BUY" else tick.ask
+                    logger.info(
+                        f"🎯 {tick.instrument} {trade.side} hit {level} at {price} "
+                        f"(level {getattr(trade, level)})"
+                    )
+                    await self.discord_service.send_system_notification(
+                        f"🎯 {tick.instrument} {trade.side} {level.replace('_', ' ')} hit at {price}",
+                        level="info"
+                    )
+        finally:
+            self.pricing_stream.bus.unsubscribe(subscription)
+
+    async def handle_signal(self, signal: Dict):
+        """Execute a signal from the live engine (risk sizing happens in execute_live_trade)"""
+        if self.test_mode:
+            logger.info(f"🧪 TEST MODE: Signal detected - {signal}")
+        else:
+            # Only the traded pairs are streamed; daily closes for every pair come from cached candles
+            await self.correlation_risk.refresh(self.data_service)
+            await self.execute_live_trade(signal)
+        
     async def run_live_strategy(self, test_mode: bool = True):
         """Main trading loop connecting all existing components"""
         logger.info("🎯 Starting Enhanced Daily Strategy V2.0 Live Trading")
         logger.info(f"🔄 Test Mode: {test_mode}")
         logger.info(f"📊 Tier 1 Pairs: {self.tier_1_pairs}")
-        
+        self.test_mode = test_mode
+
+        level_watcher = None
         try:
-            while True:
-                # Generate signals for each pair using existing strategy
-                signals = []
-                for pair in self.tier_1_pairs:
-                    try:
-                        # Get recent data for the pair
-                        data = await self.data_service.get_historical_data(
-                            pair=pair, 
-                            timeframe="H4", 
-                            count=50  # Get enough data for EMA calculations
-                        )
-                        
-                        if data and len(data) > 20:  # Ensure we have enough data
-                            # Convert NamedTuple data to proper DataFrame
-                            import pandas as pd
-                            
-                            # Extract OHLC data from NamedTuple format
-                            ohlc_data = []
-                            for candle in data:
-                                ohlc_data.append({
-                                    'timestamp': candle.timestamp,
-                                    'open': candle.open,
-                                    'high': candle.high,
-                                    'low': candle.low,
-                                    'close': candle.close,
-                                    'volume': candle.volume
-                                })
-                            
-                            df = pd.DataFrame(ohlc_data)
-                                
-                            # Add EMA indicators using existing strategy method
-                            if 'close' in df.columns and len(df) > 20:
-                                config = self.strategy.get_pair_config(pair)
-                                df['ema_fast'] = self.strategy.calculate_ema(df['close'], config['ema_fast'])
-                                df['ema_slow'] = self.strategy.calculate_ema(df['close'], config['ema_slow'])
-                                
-                                # Generate signal using existing method
-                                signal = self.strategy.generate_signal(df, pair)
-                                if signal and signal.get('signal') != 'NO_SIGNAL':
-                                    signals.append(signal)
-                                    logger.info(f"🎯 Signal generated for {pair}: {signal.get('signal')}")
-                            else:
-                                logger.warning(f"⚠️ Insufficient data for {pair}: {len(df)} candles")
-                                
-                    except Exception as e:
-                        logger.error(f"❌ Failed to generate signal for {pair}: {e}")
-                
-                # Process each signal
-                for signal in signals:
-                    if self.risk_manager.validate_signal(signal):
-                        if not test_mode:
-                            # Execute actual trade
-                            await self.execute_live_trade(signal)
-                        else:
-                            # Test mode - just log
-                            logger.info(f"🧪 TEST MODE: Signal detected - {signal}")
-                            
-                # Wait for next H4 candle close (4 hours)
-                logger.info("⏳ Waiting for next H4 candle close...")
-                if test_mode:
-                    # In test mode, just wait 10 seconds for demonstration
-                    await asyncio.sleep(10)
-                    break  # Exit after one test cycle
-                else:
-                    await asyncio.sleep(4 * 60 * 60)  # 4 hours in production
+            if test_mode:
+                # One pass over each pair's latest closed H4 candle
+                await self.engine.start()
+                await self.engine.drain()
+                return
+            
+            await self.execution.start()
+            await self.position_book.sync()
+            await self.correlation_risk.refresh(self.data_service)
+            if self.pricing_stream.start():
+                # H4 bars are built from the price stream - no candle polling
+                level_watcher = asyncio.create_task(self.watch_price_levels())
+                await self.engine.start(self.bar_builder)
+                self.bar_builder.start(self.pricing_stream)
+            else:
+                # Poll every pair concurrently at each H4 candle close
+                await self.engine.start()
+            await self.engine.run()
                 
         except KeyboardInterrupt:
             logger.info("🛑 Trading stopped by user")
@@ -205,6 +252,13 @@ class OandaLiveTradingBridge:
                 f"🚨 Trading loop error: {e}",
                 level="error"
             )
+        finally:
+            if level_watcher is not None:
+                level_watcher.cancel()
+            await self.engine.stop()
+            await self.bar_builder.stop()
+            await self.pricing_stream.stop()
+            await self.execution.close()
 
 async def main():
     """Main entry point for live trading"""
@@ -16,8 +16,10 @@ from typing import Dict, List
 # Import existing services
 from enhanced_daily_strategy_v2 import EnhancedDailyStrategyV2
 from confidence_risk_manager_v2 import ConfidenceAnalysisRiskManager
+from config.settings import LIVE_ENGINE_SETTINGS
 from services.data_service import DataService
 from services.enhanced_discord_service import EnhancedDiscordService
+from services.live_engine_service import LiveTradingEngine
 
 # Configure production logging
 logging.basicConfig(
@@ -44,7 +46,7 @@ class EnhancedDailyStrategyProduction:
         self.discord_service = EnhancedDiscordService()
         
         # Production configuration
-        self.tier_1_pairs = ["USD_JPY", "EUR_GBP"]
+        self.tier_1_pairs = list(LIVE_ENGINE_SETTINGS["pairs"])
         self.risk_per_trade = 0.005  # 0.5%
         self.max_daily_drawdown = 0.05  # 5%
         
@@ -53,6 +55,11 @@ class EnhancedDailyStrategyProduction:
         self.signals_processed = 0
         self.daily_pnl = 0.0
         
+        # Concurrent per-pair workers with incremental EMAs
+        self.engine = LiveTradingEngine(
+            self.strategy, self.data_service, self.process_trading_signal, pairs=self.tier_1_pairs
+        )
+        
         logger.info("✅ All production services initialized")
         logger.info(f"📊 Tier 1 Pairs: {self.tier_1_pairs}")
         logger.info(f"🛡️ Risk per trade: {self.risk_per_trade * 100}%")
@@ -63,57 +70,17 @@ class EnhancedDailyStrategyProduction:
         logger.info(f"⏰ Started at: {datetime.now(timezone.utc).isoformat()}")
         
         try:
-            while self.trading_enabled:
-                # Process each Tier 1 pair
-                for pair in self.tier_1_pairs:
-                    try:
-                        # Get current market data
-                        data = await self.data_service.get_historical_data(pair, "H4", 50)
-                        
-                        if data and len(data) > 20:
-                            # Convert to DataFrame and add EMAs
-                            import pandas as pd
-                            ohlc_data = []
-                            for candle in data:
-                                ohlc_data.append({
-                                    'timestamp': candle.timestamp,
-                                    'open': candle.open,
-                                    'high': candle.high,
-                                    'low': candle.low,
-                                    'close': candle.close,
-                                    'volume': candle.volume
-                                })
-                            
-                            df = pd.DataFrame(ohlc_data)
-                            
-                            # Add EMA indicators
-                            config = self.strategy.get_pair_config(pair)
-                            df['ema_fast'] = self.strategy.calculate_ema(df['close'], config['ema_fast'])
-                            df['ema_slow'] = self.strategy.calculate_ema(df['close'], config['ema_slow'])
-                            
-                            # Generate signal
-                            signal = self.strategy.generate_signal(df, pair)
-                            
-                            if signal and signal.get('signal') not in ['NONE', 'NO_SIGNAL']:
-                                logger.info(f"🎯 SIGNAL DETECTED: {pair} - {signal.get('signal')}")
-                                
-                                # In production, this would execute the trade
-                                # For now, log the signal
-                                await self.process_trading_signal(signal)
-                            else:
-                                logger.debug(f"📊 {pair}: No signal (Current state: {signal.get('signal', 'NONE')})")
-                                
-                    except Exception as e:
-                        logger.error(f"❌ Error processing {pair}: {e}")
-                
-                # Wait for next H4 candle close
-                logger.info("⏳ Waiting for next H4 candle close (4 hours)...")
-                await asyncio.sleep(4 * 60 * 60)  # 4 hours
+            if self.trading_enabled:
+                # Every pair is fetched and evaluated concurrently at each H4 close
+                await self.engine.start()
+                await self.engine.run()
                 
         except KeyboardInterrupt:
             logger.info("🛑 Trading stopped by user")
         except Exception as e:
             logger.error(f"❌ Production trading error: {e}")
+        finally:
+            await self.engine.stop()
             
     async def process_trading_signal(self, signal: Dict):
         """Process a trading signal (placeholder for actual execution)"""
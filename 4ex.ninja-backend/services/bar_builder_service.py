@@ -0,0 +1,361 @@
+"""
+Bar Builder Service
+Aggregates streamed ticks into live M1/M5/H1/H4/D bars.
+
+Features:
+- OANDA candle boundaries (17:00 New York alignment, weekend gap) from candle_calendar
+- Per-tick cost is a string comparison plus an OHLC update; boundaries are
+  computed only when a bar rolls over
+- Quiet bars close on a timer after their end time (plus a grace period)
+- "Bar closed" events to in-process listeners and the signal stream
+- Periodic reconciliation against OANDA REST candles (REST wins on mismatch)
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from config.settings import BAR_BUILDER_SETTINGS
+from services.candle_calendar import get_granularity_duration, next_candle_close
+from services.metrics_service import get_metrics_registry
+from services.pricing_stream_service import Tick
+from services.signal_bus_service import get_signal_bus_service
+
+metrics = get_metrics_registry()
+BARS_CLOSED = metrics.counter(
+    "bars_closed_total", "Live bars closed by granularity and trigger", ["granularity", "trigger"]
+)
+BAR_MISMATCHES = metrics.counter(
+    "bar_reconcile_mismatches_total", "Built bars that differed from OANDA candles", ["granularity"]
+)
+
+# OANDA timestamps are fixed-width RFC3339, so they order correctly as strings
+_OANDA_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000000000Z"
+
+BarListener = Callable[["Bar"], None]
+
+
+class Bar:
+    """One candle being built from ticks (mid prices, tick-count volume)."""
+
+    __slots__ = (
+        "instrument", "granularity", "start", "end", "end_key", "end_ts",
+        "open", "high", "low", "close", "volume", "last_tick", "complete", "source",
+    )
+
+    def __init__(self, instrument: str, granularity: str, start: datetime, end: datetime, price: float):
+        self.instrument = instrument
+        self.granularity = granularity
+        self.start = start
+        self.end = end
+        self.end_key = end.strftime(_OANDA_TIME_FORMAT)
+        self.end_ts = end.timestamp()
+        self.open = self.high = self.low = self.close = price
+        self.volume = 0
+        self.last_tick = ""
+        self.complete = False
+        self.source = "stream"  # "rest" once replaced by an OANDA candle
+
+    # Same field names as PriceData, so bars and REST candles are interchangeable
+    @property
+    def pair(self) -> str:
+        return self.instrument
+
+    @property
+    def timestamp(self) -> datetime:
+        return self.start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pair": self.instrument,
+            "granularity": self.granularity,
+            "time": self.start.isoformat(),
+            "open": self.open,
+            "high": self.high,
+            "low": self.low,
+            "close": self.close,
+            "volume": self.volume,
+            "complete": self.complete,
+            "source": self.source,
+        }
+
+
+class BarBuilderService:
+    """Builds live bars from the tick bus and announces closed bars."""
+
+    def __init__(self, granularities: Optional[Iterable[str]] = None):
+        self.logger = logging.getLogger(__name__)
+        self.granularities = list(granularities or BAR_BUILDER_SETTINGS["granularities"])
+        self._durations = {g: get_granularity_duration(g) for g in self.granularities}
+        self._open: Dict[Tuple[str, str], Bar] = {}
+        self._history: Dict[Tuple[str, str], Deque[Bar]] = {}
+        self._listeners: List[Tuple[BarListener, Optional[Set[str]], Optional[Set[str]]]] = []
+        self._tick_bus = None
+        self._tasks: List[asyncio.Task] = []
+        self.data_service = None
+
+        self.builder_stats = {
+            "ticks": 0,
+            "out_of_order_ticks": 0,
+            "bars_opened": 0,
+            "bars_closed": 0,
+            "listener_errors": 0,
+            "reconcile_runs": 0,
+            "reconcile_checked": 0,
+            "reconcile_mismatches": 0,
+            "reconcile_missing": 0,
+            "last_reconcile": None,
+        }
+
+    def set_data_service(self, data_service) -> None:
+        """Set the DataService used for seeding and reconciliation."""
+        self.data_service = data_service
+
+    def start(self, pricing_stream) -> None:
+        """Consume ticks from a PricingStreamService and start the close/reconcile timers."""
+        if self._tick_bus is not None:
+            return
+        self._tick_bus = pricing_stream.bus
+        self._tick_bus.add_listener(self.on_tick)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._close_loop())]
+        if self.data_service is not None and self.data_service.api_key:
+            self._tasks.append(loop.create_task(self._reconcile_loop()))
+        self.logger.info(f"🕯️ Bar builder started ({', '.join(self.granularities)})")
+
+    async def stop(self) -> None:
+        if self._tick_bus is not None:
+            self._tick_bus.remove_listener(self.on_tick)
+            self._tick_bus = None
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def add_listener(
+        self,
+        listener: BarListener,
+        granularities: Optional[Iterable[str]] = None,
+        instruments: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Call `listener(bar)` for every closed bar matching the filters; it must not block."""
+        self._listeners.append(
+            (
+                listener,
+                set(granularities) if granularities else None,
+                set(instruments) if instruments else None,
+            )
+        )
+
+    def remove_listener(self, listener: BarListener) -> None:
+        self._listeners = [entry for entry in self._listeners if entry[0] != listener]
+
+    # Building -----------------------------------------------------------
+
+    def on_tick(self, tick: Tick) -> None:
+        """Fold one tick into the open bar of every granularity."""
+        self.builder_stats["ticks"] += 1
+        price = tick.mid
+        for granularity in self.granularities:
+            key = (tick.instrument, granularity)
+            bar = self._open.get(key)
+            if bar is not None and tick.time >= bar.end_key:
+                self._close(bar, "tick")
+                bar = None
+            if bar is None:
+                bar = self._open_bar(tick, granularity, price)
+                if bar is None:
+                    continue
+            elif tick.time < bar.last_tick:
+                # Stale price (e.g. the snapshot sent on reconnect)
+                self.builder_stats["out_of_order_ticks"] += 1
+                continue
+
+            if price > bar.high:
+                bar.high = price
+            elif price < bar.low:
+                bar.low = price
+            bar.close = price
+            bar.volume += 1
+            bar.last_tick = tick.time
+
+    def _open_bar(self, tick: Tick, granularity: str, price: float) -> Optional[Bar]:
+        moment = tick.timestamp
+        end = next_candle_close(granularity, moment)
+        start = end - self._durations[granularity]
+        history = self._history.get((tick.instrument, granularity))
+        if moment < start or (history and history[-1].start >= start):
+            # Weekend tick, or a late tick for a bar that has already closed
+            self.builder_stats["out_of_order_ticks"] += 1
+            return None
+
+        bar = Bar(tick.instrument, granularity, start, end, price)
+        self._open[(tick.instrument, granularity)] = bar
+        self.builder_stats["bars_opened"] += 1
+        return bar
+
+    def _close(self, bar: Bar, trigger: str) -> None:
+        del self._open[(bar.instrument, bar.granularity)]
+        bar.complete = True
+        self._history_for(bar.instrument, bar.granularity).append(bar)
+        self.builder_stats["bars_closed"] += 1
+        BARS_CLOSED.inc(bar.granularity, trigger)
+
+        for listener, granularities, instruments in self._listeners:
+            if granularities is not None and bar.granularity not in granularities:
+                continue
+            if instruments is not None and bar.instrument not in instruments:
+                continue
+            try:
+                listener(bar)
+            except Exception as e:
+                self.builder_stats["listener_errors"] += 1
+                self.logger.error(f"❌ Bar listener failed for {bar.instrument} {bar.granularity}: {str(e)}")
+
+        if BAR_BUILDER_SETTINGS["publish_to_stream"]:
+            get_signal_bus_service().publish("bar", bar.to_dict(), pairs=[bar.instrument])
+
+    def close_due_bars(self, now: Optional[float] = None) -> int:
+        """Close bars whose end (plus grace) has passed without a newer tick."""
+        cutoff = (now or time.time()) - BAR_BUILDER_SETTINGS["close_grace_seconds"]
+        due = [bar for bar in self._open.values() if bar.end_ts <= cutoff]
+        for bar in due:
+            self._close(bar, "timer")
+        return len(due)
+
+    async def _close_loop(self) -> None:
+        while True:
+            await asyncio.sleep(BAR_BUILDER_SETTINGS["close_check_seconds"])
+            self.close_due_bars()
+
+    # History ------------------------------------------------------------
+
+    def _history_for(self, instrument: str, granularity: str) -> Deque[Bar]:
+        key = (instrument, granularity)
+        history = self._history.get(key)
+        if history is None:
+            history = self._history[key] = deque(maxlen=BAR_BUILDER_SETTINGS["history_size"])
+        return history
+
+    def get_bars(self, instrument: str, granularity: str, count: Optional[int] = None) -> List[Bar]:
+        """Completed bars, oldest first."""
+        bars = list(self._history.get((instrument, granularity), ()))
+        return bars[-count:] if count else bars
+
+    def get_open_bar(self, instrument: str, granularity: str) -> Optional[Bar]:
+        """The bar currently being built, if any tick has arrived for it."""
+        return self._open.get((instrument, granularity))
+
+    def _bar_from_candle(self, candle, granularity: str) -> Bar:
+        start = candle.timestamp
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        bar = Bar(candle.pair, granularity, start, start + self._durations[granularity], candle.open)
+        bar.high, bar.low, bar.close = candle.high, candle.low, candle.close
+        bar.volume = candle.volume or 0
+        bar.complete = True
+        bar.source = "rest"
+        return bar
+
+    async def seed_history(
+        self, pairs: Iterable[str], granularities: Optional[Iterable[str]] = None, count: int = 100
+    ) -> None:
+        """Load recent complete candles once so consumers start with full history."""
+        for pair in pairs:
+            for granularity in granularities or self.granularities:
+                candles = await self.data_service.get_latest_candles(pair, granularity, count)
+                history = self._history_for(pair, granularity)
+                known = {bar.start for bar in history}
+                bars = [self._bar_from_candle(c, granularity) for c in candles]
+                merged = sorted(
+                    [bar for bar in bars if bar.start not in known] + list(history),
+                    key=lambda bar: bar.start,
+                )
+                history.clear()
+                history.extend(merged)
+
+    # Reconciliation -----------------------------------------------------
+
+    async def reconcile(self) -> Dict[str, Any]:
+        """Compare recent built bars with OANDA candles, replacing any that differ."""
+        checked = mismatches = 0
+        for (instrument, granularity), history in list(self._history.items()):
+            if granularity not in BAR_BUILDER_SETTINGS["reconcile_granularities"]:
+                continue
+            candles = await self.data_service.get_latest_candles(
+                instrument, granularity, BAR_BUILDER_SETTINGS["reconcile_candles"]
+            )
+            tolerance = BAR_BUILDER_SETTINGS["reconcile_tolerance_pips"] * (
+                0.01 if instrument.endswith("JPY") else 0.0001
+            )
+            by_start = {bar.start: index for index, bar in enumerate(history)}
+            filled = False
+            for candle in candles:
+                reference = self._bar_from_candle(candle, granularity)
+                index = by_start.get(reference.start)
+                if index is None:
+                    # Ticks never arrived for this candle (stream down); fill the gap
+                    self.builder_stats["reconcile_missing"] += 1
+                    history.append(reference)
+                    filled = True
+                    continue
+
+                built = history[index]
+                if built.source == "rest":
+                    continue
+                checked += 1
+                deviation = max(
+                    abs(built.open - reference.open),
+                    abs(built.high - reference.high),
+                    abs(built.low - reference.low),
+                    abs(built.close - reference.close),
+                )
+                if deviation > tolerance:
+                    mismatches += 1
+                    BAR_MISMATCHES.inc(granularity)
+                    self.logger.warning(
+                        f"⚠️ {instrument} {granularity} bar {built.start.isoformat()} differs from "
+                        f"OANDA by {deviation:.5f} - replaced"
+                    )
+                    history[index] = reference
+
+            if filled:
+                ordered = sorted(history, key=lambda bar: bar.start)
+                history.clear()
+                history.extend(ordered)
+
+        self.builder_stats["reconcile_runs"] += 1
+        self.builder_stats["reconcile_checked"] += checked
+        self.builder_stats["reconcile_mismatches"] += mismatches
+        self.builder_stats["last_reconcile"] = datetime.utcnow().isoformat()
+        return {"checked": checked, "mismatches": mismatches}
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            await asyncio.sleep(BAR_BUILDER_SETTINGS["reconcile_interval_seconds"])
+            try:
+                await self.reconcile()
+            except Exception as e:
+                self.logger.error(f"❌ Bar reconciliation failed: {str(e)}")
+
+    def get_builder_stats(self) -> Dict[str, Any]:
+        """Get tick/bar counts, reconciliation results and the open bars."""
+        return {
+            "running": self._tick_bus is not None,
+            "granularities": self.granularities,
+            "open_bars": len(self._open),
+            "listeners": len(self._listeners),
+            **self.builder_stats,
+        }
+
+
+# Global bar builder instance
+bar_builder_service = BarBuilderService()
+
+
+def get_bar_builder_service() -> BarBuilderService:
+    """Get the global bar builder."""
+    return bar_builder_service
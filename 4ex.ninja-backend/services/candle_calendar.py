@@ -0,0 +1,196 @@
+"""
+Candle Calendar
+Computes OANDA candle close times so work runs when a candle completes.
+
+Features:
+- OANDA alignment: daily and hourly candles anchored at 17:00 America/New_York
+  (DST aware), minute candles aligned to the top of the hour
+- Weekend handling: no candles start between Friday 17:00 and Sunday 17:00 New York
+- APScheduler trigger firing just after each close, with delay and jitter
+- Async wait_for_next_close() for standalone loops
+"""
+
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from apscheduler.triggers.base import BaseTrigger
+
+# OANDA defaults: dailyAlignment=17, alignmentTimezone=America/New_York
+ALIGNMENT_TIMEZONE = ZoneInfo("America/New_York")
+DAILY_ALIGNMENT_HOUR = 17
+
+# Candle length per OANDA granularity
+GRANULARITY_DURATIONS = {
+    "M1": timedelta(minutes=1),
+    "M5": timedelta(minutes=5),
+    "M15": timedelta(minutes=15),
+    "M30": timedelta(minutes=30),
+    "H1": timedelta(hours=1),
+    "H2": timedelta(hours=2),
+    "H4": timedelta(hours=4),
+    "H6": timedelta(hours=6),
+    "H8": timedelta(hours=8),
+    "H12": timedelta(hours=12),
+    "D": timedelta(days=1),
+}
+
+
+def get_granularity_duration(granularity: str) -> timedelta:
+    """Get candle length for a granularity (e.g. "H4" -> 4 hours)."""
+    try:
+        return GRANULARITY_DURATIONS[granularity]
+    except KeyError:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def is_weekend_closed(moment: datetime) -> bool:
+    """Check if the market is closed at moment (Friday 17:00 → Sunday 17:00 New York)."""
+    local = moment.astimezone(ALIGNMENT_TIMEZONE)
+    weekday = local.weekday()  # 0=Monday, 6=Sunday
+
+    if weekday == 5:  # Saturday
+        return True
+    if weekday == 4 and local.hour >= DAILY_ALIGNMENT_HOUR:
+        return True
+    if weekday == 6 and local.hour < DAILY_ALIGNMENT_HOUR:
+        return True
+    return False
+
+
+def _candidate_closes(granularity: str, after: datetime) -> Iterable[datetime]:
+    """Yield aligned candle boundaries (UTC) in ascending order, starting near after."""
+    duration = get_granularity_duration(granularity)
+
+    if duration < timedelta(hours=1):
+        # Minute candles: fixed steps from the top of the hour (UTC offsets are whole hours)
+        step = int(duration.total_seconds())
+        start = after.replace(minute=0, second=0, microsecond=0)
+        boundary = start + timedelta(seconds=((after - start).total_seconds() // step) * step)
+        while True:
+            yield boundary
+            boundary += duration
+
+    # Hourly/daily candles: wall-clock boundaries in New York, anchored at 17:00
+    step_hours = int(duration.total_seconds() // 3600)
+    hours = sorted((DAILY_ALIGNMENT_HOUR + i * step_hours) % 24 for i in range(24 // step_hours))
+    local_date = after.astimezone(ALIGNMENT_TIMEZONE).date() - timedelta(days=1)
+
+    while True:
+        for hour in hours:
+            local = datetime(local_date.year, local_date.month, local_date.day, hour, tzinfo=ALIGNMENT_TIMEZONE)
+            yield local.astimezone(timezone.utc)
+        local_date += timedelta(days=1)
+
+
+def next_candle_close(granularity: str, after: Optional[datetime] = None) -> datetime:
+    """
+    Get the first candle close strictly after a moment, skipping the weekend.
+
+    Args:
+        granularity: OANDA granularity ("D", "H4", "M15", ...)
+        after: Reference time (default: now); naive datetimes are treated as UTC
+
+    Returns:
+        Close time as an aware UTC datetime
+    """
+    after = after or datetime.now(timezone.utc)
+    if after.tzinfo is None:
+        after = after.replace(tzinfo=timezone.utc)
+
+    duration = get_granularity_duration(granularity)
+    for close in _candidate_closes(granularity, after):
+        # A close only exists if its candle started while the market was open
+        if close > after and not is_weekend_closed(close - duration):
+            return close
+
+
+def last_candle_close(granularity: str, before: Optional[datetime] = None) -> datetime:
+    """Get the most recent candle close at or before a moment."""
+    before = before or datetime.now(timezone.utc)
+    if before.tzinfo is None:
+        before = before.replace(tzinfo=timezone.utc)
+
+    duration = get_granularity_duration(granularity)
+    # Weekend gap is at most 48h plus one candle, so this always finds the previous close
+    probe = next_candle_close(granularity, before - duration - timedelta(days=3))
+    previous = probe
+    while probe <= before:
+        previous = probe
+        probe = next_candle_close(granularity, probe)
+    return previous
+
+
+class CandleCloseTrigger(BaseTrigger):
+    """
+    APScheduler trigger that fires shortly after each candle close.
+
+    Args:
+        granularity: OANDA granularity to follow
+        delay_seconds: Fixed delay after the close, giving OANDA time to finalise the candle
+        jitter: Extra random delay (seconds) so many jobs do not hit the API at once
+    """
+
+    __slots__ = "granularity", "delay", "jitter"
+
+    def __init__(self, granularity: str, delay_seconds: float = 5.0, jitter: Optional[float] = None):
+        get_granularity_duration(granularity)  # Validate early
+        self.granularity = granularity
+        self.delay = timedelta(seconds=delay_seconds)
+        self.jitter = jitter
+
+    def get_next_fire_time(self, previous_fire_time, now):
+        # Fire times are close + delay + jitter, so step back by the delay to find
+        # the close we last fired for (jitter is always smaller than a candle)
+        reference = (previous_fire_time or now) - self.delay
+        if previous_fire_time is None:
+            # Start with the most recent close if we are still inside its delay window
+            reference -= timedelta(microseconds=1)
+        close = next_candle_close(self.granularity, reference)
+        return self._apply_jitter(close + self.delay, self.jitter, now)
+
+    def __getstate__(self):
+        return {
+            "version": 1,
+            "granularity": self.granularity,
+            "delay": self.delay,
+            "jitter": self.jitter,
+        }
+
+    def __setstate__(self, state):
+        self.granularity = state["granularity"]
+        self.delay = state["delay"]
+        self.jitter = state["jitter"]
+
+    def __str__(self):
+        return f"candle_close[{self.granularity}]"
+
+    def __repr__(self):
+        return (
+            f"<{self.__class__.__name__} (granularity='{self.granularity}', "
+            f"delay={self.delay.total_seconds()}s, jitter={self.jitter})>"
+        )
+
+
+async def wait_for_next_close(
+    granularity: str, delay_seconds: float = 5.0, jitter: float = 0.0
+) -> datetime:
+    """
+    Sleep until just after the next candle close.
+
+    Returns:
+        The candle close time that was waited for
+    """
+    close = next_candle_close(granularity)
+    wake_at = close + timedelta(seconds=delay_seconds + random.uniform(0, jitter))
+    wait_seconds = max(0.0, (wake_at - datetime.now(timezone.utc)).total_seconds())
+
+    logging.getLogger(__name__).info(
+        f"⏳ Waiting {wait_seconds / 60:.1f} min for {granularity} candle close at "
+        f"{close.strftime('%Y-%m-%d %H:%M UTC')}"
+    )
+    await asyncio.sleep(wait_seconds)
+    return close
@@ -0,0 +1,321 @@
+"""
+Correlation Risk Service
+Rolling returns matrix across the monitored pairs with portfolio VaR and marginal risk.
+
+Features:
+- Fixed-size ring buffer of log returns, one column per pair
+- Running sums and cross-products updated on every bar close, so covariance is
+  rebuilt from them without rescanning the window
+- Closes are aligned by bar time; a pair missing from a row is carried forward
+- Parametric portfolio VaR, marginal and component risk as matrix operations
+- Correlation-based size multipliers for every pair at once (no per-pair loops)
+"""
+
+import asyncio
+import logging
+from statistics import NormalDist
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config.settings import CORRELATION_RISK_SETTINGS
+from services.metrics_service import get_metrics_registry
+from services.position_book_service import get_position_book
+
+metrics = get_metrics_registry()
+PORTFOLIO_VAR = metrics.gauge(
+    "portfolio_var", "Parametric portfolio VaR of open positions in the account currency"
+)
+
+
+class CorrelationRiskEngine:
+    """Rolling covariance of pair returns and the risk of the open positions."""
+
+    def __init__(
+        self,
+        pairs: Optional[Iterable[str]] = None,
+        timeframe: Optional[str] = None,
+        window: Optional[int] = None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.pairs: List[str] = list(pairs or CORRELATION_RISK_SETTINGS["pairs"])
+        self.index = {pair: i for i, pair in enumerate(self.pairs)}
+        self.timeframe = timeframe or CORRELATION_RISK_SETTINGS["timeframe"]
+        self.window = window or CORRELATION_RISK_SETTINGS["window"]
+        self.position_book = get_position_book()
+
+        n = len(self.pairs)
+        self._returns = np.zeros((self.window, n))
+        self._head = 0
+        self.count = 0  # Rows currently in the window
+        self._sum = np.zeros(n)
+        self._cross = np.zeros((n, n))
+        self._last_close = np.full(n, np.nan)
+        self._last_time = None  # Bar time of the newest finalized row
+        self._pending: Dict[Any, np.ndarray] = {}  # Bar time -> closes (NaN until received)
+        self._covariance: Optional[np.ndarray] = None
+        self._pushes_since_rebuild = 0
+
+        self.engine_stats = {"rows": 0, "late_closes": 0, "carried_forward": 0, "last_bar": None}
+
+    # Updates ------------------------------------------------------------
+
+    def on_bar_close(self, bar) -> None:
+        """Bar listener: add a closed bar (Bar or PriceData) of the engine's timeframe."""
+        granularity = getattr(bar, "granularity", None) or getattr(bar, "timeframe", None)
+        if granularity == self.timeframe:
+            self.add_close(bar.pair, bar.timestamp, float(bar.close))
+
+    def add_close(self, pair: str, timestamp, close: float) -> None:
+        """Record one pair's close for a bar time; rows are finalized as bar times advance."""
+        i = self.index.get(pair)
+        if i is None:
+            return
+        if self._last_time is not None and timestamp <= self._last_time:
+            self.engine_stats["late_closes"] += 1
+            return
+
+        row = self._pending.get(timestamp)
+        if row is None:
+            row = self._pending[timestamp] = np.full(len(self.pairs), np.nan)
+        row[i] = close
+
+        # A row is done once every pair has reported or a later bar has started
+        for pending_time in sorted(self._pending):
+            pending = self._pending[pending_time]
+            if pending_time < timestamp or not np.isnan(pending).any():
+                del self._pending[pending_time]
+                self._finalize(pending_time, pending)
+            else:
+                break
+
+    def ingest(self, candles_by_pair: Dict[str, Iterable[Any]]) -> int:
+        """Add candle histories (oldest first); candles already seen are skipped. Returns rows added."""
+        rows_before = self.engine_stats["rows"]
+        closes = sorted(
+            (candle.timestamp, pair, float(candle.close))
+            for pair, candles in candles_by_pair.items()
+            if pair in self.index
+            for candle in candles
+        )
+        for timestamp, pair, close in closes:
+            self.add_close(pair, timestamp, close)
+        return self.engine_stats["rows"] - rows_before
+
+    async def refresh(self, data_service, count: Optional[int] = None) -> int:
+        """Fetch the latest candles for every pair concurrently and ingest the new ones."""
+        count = count or self.window + 1
+        results = await asyncio.gather(
+            *(data_service.get_latest_candles(pair, self.timeframe, count) for pair in self.pairs),
+            return_exceptions=True,
+        )
+        candles = {}
+        for pair, result in zip(self.pairs, results):
+            if isinstance(result, Exception):
+                self.logger.warning(f"⚠️ No {self.timeframe} candles for {pair}: {result}")
+            else:
+                candles[pair] = result
+        return self.ingest(candles)
+
+    def _finalize(self, timestamp, closes: np.ndarray) -> None:
+        missing = np.isnan(closes)
+        self.engine_stats["carried_forward"] += int(missing.sum())
+        closes = np.where(missing, self._last_close, closes)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            returns = np.log(closes / self._last_close)
+        started = not np.isnan(self._last_close).all()
+        self._last_close = np.where(np.isnan(closes), self._last_close, closes)
+        self._last_time = timestamp
+        self.engine_stats["last_bar"] = str(timestamp)
+        if started:
+            # Pairs without a previous close contribute a zero return
+            self._push(np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0))
+
+    def _push(self, returns: np.ndarray) -> None:
+        if self.count == self.window:
+            oldest = self._returns[self._head]
+            self._sum -= oldest
+            self._cross -= np.outer(oldest, oldest)
+        else:
+            self.count += 1
+        self._returns[self._head] = returns
+        self._head = (self._head + 1) % self.window
+        self._sum += returns
+        self._cross += np.outer(returns, returns)
+        self._covariance = None
+        self.engine_stats["rows"] += 1
+
+        # Rebuild from the buffer now and then so add/subtract rounding cannot accumulate
+        self._pushes_since_rebuild += 1
+        if self._pushes_since_rebuild >= self.window:
+            rows = self._returns[: self.count]
+            self._sum = rows.sum(axis=0)
+            self._cross = rows.T @ rows
+            self._pushes_since_rebuild = 0
+
+    # Risk ---------------------------------------------------------------
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= CORRELATION_RISK_SETTINGS["min_observations"]
+
+    def covariance(self) -> Optional[np.ndarray]:
+        """Sample covariance of per-bar log returns, or None until min_observations rows."""
+        if not self.ready:
+            return None
+        if self._covariance is None:
+            mean = self._sum / self.count
+            self._covariance = (self._cross - self.count * np.outer(mean, mean)) / (self.count - 1)
+        return self._covariance
+
+    def correlation(self) -> Optional[np.ndarray]:
+        covariance = self.covariance()
+        if covariance is None:
+            return None
+        volatility = np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+        scale = np.outer(volatility, volatility)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            correlation = np.where(scale > 0, covariance / scale, 0.0)
+        np.fill_diagonal(correlation, 1.0)
+        return correlation
+
+    def exposure_vector(self) -> np.ndarray:
+        """Signed notional per pair in the account currency, from the position book."""
+        exposures = np.zeros(len(self.pairs))
+        for pair, position in self.position_book.get_positions().items():
+            i = self.index.get(pair)
+            if i is None:
+                continue
+            price = self._last_close[i]
+            if np.isnan(price):
+                trades = self.position_book.get_pair_trades(pair)
+                price = trades[0].price if trades else np.nan
+            notional = self.position_book.to_account_currency(
+                abs(position["units"]) * price, pair, price, price_source=self._price
+            )
+            if notional is not None and not np.isnan(notional):
+                exposures[i] = np.sign(position["units"]) * notional
+        return exposures
+
+    def _price(self, pair: str) -> Optional[float]:
+        """Streamed mid if there is one, else the pair's last close in the window."""
+        price = self.position_book.price_source(pair)
+        if price:
+            return price
+        i = self.index.get(pair)
+        if i is None or np.isnan(self._last_close[i]):
+            return None
+        return float(self._last_close[i])
+
+    def _scale(self) -> float:
+        """z-score times sqrt(horizon): VaR per unit of portfolio standard deviation."""
+        z = NormalDist().inv_cdf(CORRELATION_RISK_SETTINGS["var_confidence"])
+        return z * np.sqrt(CORRELATION_RISK_SETTINGS["var_horizon_bars"])
+
+    def portfolio_risk(self, exposures: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Parametric VaR of a portfolio with marginal and component risk per pair.
+
+        Args:
+            exposures: Signed account-currency notional per pair (defaults to the position book)
+
+        Returns:
+            VaR, diversification benefit and per-pair risk for the pairs with exposure
+        """
+        covariance = self.covariance()
+        if covariance is None:
+            return {"ready": False, "observations": self.count}
+
+        w = self.exposure_vector() if exposures is None else np.asarray(exposures, dtype=float)
+        scale = self._scale()
+        cov_w = covariance @ w
+        sigma = float(np.sqrt(max(w @ cov_w, 0.0)))
+        value_at_risk = scale * sigma
+        marginal = scale * cov_w / sigma if sigma > 0 else np.zeros_like(w)
+        component = w * marginal
+        standalone = scale * np.abs(w) * np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+
+        held = np.flatnonzero(w)
+        return {
+            "ready": True,
+            "observations": self.count,
+            "timeframe": self.timeframe,
+            "confidence": CORRELATION_RISK_SETTINGS["var_confidence"],
+            "horizon_bars": CORRELATION_RISK_SETTINGS["var_horizon_bars"],
+            "var": round(value_at_risk, 2),
+            "undiversified_var": round(float(standalone.sum()), 2),
+            "diversification_benefit": round(float(standalone.sum()) - value_at_risk, 2),
+            "pairs": {
+                self.pairs[i]: {
+                    "exposure": round(float(w[i]), 2),
+                    "marginal_var": round(float(marginal[i]), 6),
+                    "component_var": round(float(component[i]), 2),
+                    "standalone_var": round(float(standalone[i]), 2),
+                }
+                for i in held
+            },
+        }
+
+    def correlation_multipliers(
+        self, directions: np.ndarray, exposures: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Size multiplier per pair for a new trade in `directions` (+1 long, -1 short).
+
+        A trade whose returns move with the existing portfolio is scaled down
+        linearly to min_correlation_multiplier at correlation 1; trades that
+        hedge it are left at 1.0.
+        """
+        n = len(self.pairs)
+        covariance = self.covariance()
+        w = self.exposure_vector() if exposures is None else np.asarray(exposures, dtype=float)
+        if covariance is None or not w.any():
+            return np.ones(n)
+
+        cov_w = covariance @ w
+        sigma = np.sqrt(max(w @ cov_w, 0.0))
+        volatility = np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            with_portfolio = np.where(volatility * sigma > 0, cov_w / (volatility * sigma), 0.0)
+        aligned = np.clip(with_portfolio * np.asarray(directions, dtype=float), 0.0, 1.0)
+        return 1.0 - (1.0 - CORRELATION_RISK_SETTINGS["min_correlation_multiplier"]) * aligned
+
+    def correlation_multiplier(self, pair: str, direction: int) -> float:
+        """Size multiplier for one new trade (1.0 for unknown pairs or too little data)."""
+        i = self.index.get(pair)
+        if i is None:
+            return 1.0
+        directions = np.zeros(len(self.pairs))
+        directions[i] = direction
+        return float(self.correlation_multipliers(directions)[i])
+
+    def get_risk_stats(self) -> Dict[str, Any]:
+        """Get window state, the correlation matrix and current portfolio risk."""
+        correlation = self.correlation()
+        return {
+            **self.engine_stats,
+            "observations": self.count,
+            "window": self.window,
+            "pending_rows": len(self._pending),
+            "correlation": (
+                {
+                    pair: {other: round(float(correlation[i, j]), 3) for j, other in enumerate(self.pairs)}
+                    for i, pair in enumerate(self.pairs)
+                }
+                if correlation is not None
+                else None
+            ),
+            "portfolio": self.portfolio_risk(),
+        }
+
+
+# Global correlation risk engine instance
+correlation_risk_engine = CorrelationRiskEngine()
+PORTFOLIO_VAR.set_function(
+    lambda: {(): float(correlation_risk_engine.portfolio_risk().get("var", 0.0))}
+)
+
+
+def get_correlation_risk_engine() -> CorrelationRiskEngine:
+    """Get the global correlation risk engine."""
+    return correlation_risk_engine
@@ -12,8 +12,29 @@ import logging
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta, timezone
 import json
+import time
 from models.signal_models import PriceData
 from config.settings import get_settings
+from services.json_codec import loads
+from services.metrics_service import get_metrics_registry
+from services.pricing_stream_service import get_pricing_stream_service
+from services.rate_limiter_service import get_rate_limiter_service
+from services.candle_calendar import GRANULARITY_DURATIONS
+from services.synthetic_market import generate_series, grid_candle_start
+
+metrics = get_metrics_registry()
+OANDA_FETCH_SECONDS = metrics.histogram(
+    "oanda_fetch_seconds", "OANDA candle request latency, request to body read", ["pair"]
+)
+OANDA_PRICE_SECONDS = metrics.histogram(
+    "oanda_price_seconds", "OANDA current price request latency, request to body read", ["pair"]
+)
+JSON_PARSE_SECONDS = metrics.histogram(
+    "json_parse_seconds", "Time spent parsing JSON response bodies", ["source"]
+)
+CACHE_REQUESTS = metrics.counter(
+    "cache_requests_total", "Cache lookups by cache and result", ["cache", "result"]
+)
 
 
 class DataService:
@@ -25,7 +46,9 @@ class DataService:
         self.account_id = self.settings.oanda_account_id
 
         # OANDA API endpoints
-        if (
+        if self.settings.oanda_api_url:
+            self.base_url = self.settings.oanda_api_url.rstrip("/")
+        elif (
             hasattr(self.settings, "oanda_environment")
             and self.settings.oanda_environment == "live"
         ):
@@ -33,6 +56,14 @@ class DataService:
         else:
             self.base_url = "https://api-fxpractice.oanda.com"  # Demo environment
 
+        # Streaming endpoints live on a separate host
+        if self.settings.oanda_stream_url:
+            self.stream_url = self.settings.oanda_stream_url.rstrip("/")
+        elif self.settings.oanda_api_url:
+            self.stream_url = self.base_url
+        else:
+            self.stream_url = self.base_url.replace("://api-", "://stream-")
+
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
@@ -41,6 +72,15 @@ class DataService:
         # Create SSL context for secure connections
         self.ssl_context = ssl.create_default_context(cafile=certifi.where())
 
+        # Complete candles per "PAIR_TIMEFRAME", extended incrementally after each close
+        self.candle_cache: Dict[str, List[PriceData]] = {}
+        self.candle_cache_depth: Dict[str, int] = {}  # Candle count each cache was seeded with
+        # Synthetic fallback candles per (pair, timeframe, count), valid until the next candle
+        self._fallback_cache: Dict[tuple, tuple] = {}
+
+        # Shared token bucket keeps concurrent fetches inside OANDA's request limits
+        self.oanda_bucket = get_rate_limiter_service().get_configured_bucket("oanda_rest")
+
         # Log initialization
         masked_key = f"{self.api_key[:10]}..." if self.api_key else "None"
         logging.info(f"🔌 OANDA DataService initialized - Environment: {self.base_url}")
@@ -62,9 +102,9 @@ class DataService:
             "AUD_JPY": "AUD_JPY",
         }
 
-        logging.info(f"🔌 OANDA DataService initialized - Environment: {self.base_url}")
-        logging.info(f"📊 API Key: {self.api_key[:10]}... (masked)")
-        logging.info(f"🏦 Account: {self.account_id}")
+        # Allocate per-pair latency buckets now rather than on the first fetch
+        OANDA_FETCH_SECONDS.preallocate((pair,) for pair in self.pair_mapping)
+        OANDA_PRICE_SECONDS.preallocate((pair,) for pair in self.pair_mapping)
 
     async def get_historical_data(
         self, pair: str, timeframe: str, count: int
@@ -82,7 +122,7 @@ class DataService:
         """
         if not self.api_key:
             logging.warning("🚨 No OANDA API key configured - using fallback data")
-            return await self._get_fallback_data(pair, count)
+            return await self._get_fallback_data(pair, count, timeframe)
 
         if pair not in self.pair_mapping:
             raise ValueError(f"Unsupported pair: {pair}")
@@ -194,6 +234,8 @@ class DataService:
                     f"📡 Fetching {count} {granularity} candles for {pair} from OANDA"
                 )
 
+                await self._acquire_oanda_token()
+                started = time.perf_counter()
                 async with session.get(
                     url, headers=self.headers, params=params
                 ) as response:
@@ -202,14 +244,14 @@ class DataService:
                         logging.error(
                             f"❌ OANDA API error {response.status}: {error_text}"
                         )
-                        return await self._get_fallback_data(pair, count)
+                        return await self._get_fallback_data(pair, count, timeframe)
 
-                    data = await response.json()
+                    data = await self._read_json(response, pair, started)
                     candles = data.get("candles", [])
 
                     if not candles:
                         logging.warning(f"⚠️ No candles returned for {pair}")
-                        return await self._get_fallback_data(pair, count)
+                        return await self._get_fallback_data(pair, count, timeframe)
 
                     price_data = []
                     for candle in candles:
@@ -239,7 +281,7 @@ class DataService:
 
         except Exception as e:
             logging.error(f"❌ Error fetching OANDA data for {pair}: {e}")
-            return await self._get_fallback_data(pair, count)
+            return await self._get_fallback_data(pair, count, timeframe)
 
     async def _get_historical_data_with_end_time(
         self, pair: str, timeframe: str, count: int, end_time: datetime
@@ -269,6 +311,8 @@ class DataService:
                     "to": end_time_str,  # End time in OANDA RFC3339 format
                 }
 
+                await self._acquire_oanda_token()
+                started = time.perf_counter()
                 async with session.get(
                     url, headers=self.headers, params=params
                 ) as response:
@@ -279,7 +323,7 @@ class DataService:
                         )
                         return []
 
-                    data = await response.json()
+                    data = await self._read_json(response, pair, started)
                     candles = data.get("candles", [])
 
                     price_data = []
@@ -309,6 +353,127 @@ class DataService:
             logging.error(f"❌ Error fetching chunk data for {pair}: {e}")
             return []
 
+    async def get_latest_candles(
+        self, pair: str, timeframe: str, count: int
+    ) -> List[PriceData]:
+        """
+        Get the most recent complete candles, fetching only candles newer than the cache.
+
+        The first call per pair/timeframe loads `count` candles; later calls ask
+        OANDA for candles after the last cached one, which after a candle close
+        is a single candle.
+
+        Args:
+            pair: Currency pair (e.g., "EUR_USD")
+            timeframe: Timeframe (e.g., "D", "H4")
+            count: Number of candles to return
+
+        Returns:
+            List of PriceData objects, oldest first
+        """
+        cache_key = f"{pair}_{timeframe}"
+        cached = self.candle_cache.get(cache_key)
+
+        if not self.api_key or pair not in self.pair_mapping:
+            return await self.get_historical_data(pair, timeframe, count)
+
+        if not cached or self.candle_cache_depth.get(cache_key, 0) < count:
+            CACHE_REQUESTS.inc("candles", "miss")
+            candles = await self._fetch_complete_candles(
+                pair, timeframe, {"count": min(count, 4999)}
+            )
+            if candles is None:
+                # Leave the cache empty rather than seeding it with fallback data
+                return await self.get_historical_data(pair, timeframe, count)
+            self.candle_cache[cache_key] = candles
+            self.candle_cache_depth[cache_key] = count
+            return candles[-count:]
+
+        CACHE_REQUESTS.inc("candles", "hit")
+        last_time = cached[-1].timestamp
+        new_candles = await self._fetch_complete_candles(
+            pair,
+            timeframe,
+            {
+                "from": last_time.strftime("%Y-%m-%dT%H:%M:%S.000000000Z"),
+                "includeFirst": "false",
+            },
+        )
+        if new_candles:
+            cached = cached + [c for c in new_candles if c.timestamp > last_time]
+            self.candle_cache[cache_key] = cached[-self.candle_cache_depth[cache_key]:]
+            logging.info(f"🕯️ {pair} {timeframe}: +{len(new_candles)} new candle(s)")
+
+        return self.candle_cache[cache_key][-count:]
+
+    async def _fetch_complete_candles(
+        self, pair: str, timeframe: str, params: Dict[str, Any]
+    ) -> Optional[List[PriceData]]:
+        """Fetch complete mid candles with extra query params; None on API errors."""
+        granularity_map = {"D": "D", "H4": "H4", "H1": "H1", "M15": "M15", "M5": "M5"}
+        instrument = self.pair_mapping[pair]
+
+        try:
+            connector = aiohttp.TCPConnector(ssl=self.ssl_context)
+            async with aiohttp.ClientSession(connector=connector) as session:
+                url = f"{self.base_url}/v3/instruments/{instrument}/candles"
+                params = {
+                    "granularity": granularity_map.get(timeframe, "D"),
+                    "price": "M",  # Mid prices
+                    **params,
+                }
+
+                await self._acquire_oanda_token()
+                started = time.perf_counter()
+                async with session.get(
+                    url, headers=self.headers, params=params
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        logging.error(
+                            f"❌ OANDA API error {response.status}: {error_text}"
+                        )
+                        return None
+
+                    data = await self._read_json(response, pair, started)
+                    return [
+                        PriceData(
+                            pair=pair,
+                            timeframe=timeframe,
+                            timestamp=datetime.fromisoformat(
+                                candle["time"].replace("Z", "+00:00")
+                            ),
+                            open=float(candle["mid"]["o"]),
+                            high=float(candle["mid"]["h"]),
+                            low=float(candle["mid"]["l"]),
+                            close=float(candle["mid"]["c"]),
+                            volume=candle.get("volume", 1000),
+                        )
+                        for candle in data.get("candles", [])
+                        if candle.get("complete", False)  # Only use complete candles
+                    ]
+
+        except Exception as e:
+            logging.error(f"❌ Error fetching candles for {pair}: {e}")
+            return None
+
+    async def _read_json(
+        self, response, pair: str, started: float, request: str = "candles"
+    ) -> Dict[str, Any]:
+        """Read an OANDA response body, recording fetch latency and JSON parse time."""
+        body = await response.read()
+        latency = OANDA_PRICE_SECONDS if request == "price" else OANDA_FETCH_SECONDS
+        latency.observe(time.perf_counter() - started, pair)
+
+        parse_started = time.perf_counter()
+        data = loads(body)
+        JSON_PARSE_SECONDS.observe(time.perf_counter() - parse_started, f"oanda_{request}")
+        return data
+
+    async def _acquire_oanda_token(self):
+        """Wait for a token from the shared OANDA REST bucket before a request."""
+        await self.oanda_bucket.acquire()
+
     def _get_timeframe_delta(self, timeframe: str) -> timedelta:
         """Get time delta for a given timeframe."""
         deltas = {
@@ -320,52 +485,29 @@ class DataService:
         }
         return deltas.get(timeframe, timedelta(days=1))
 
-    async def _get_fallback_data(self, pair: str, count: int) -> List[PriceData]:
-        """Fallback data generation when OANDA API is unavailable."""
-        import random
-
-        # Base prices for fallback
-        fallback_prices = {
-            "EUR_USD": 1.0850,
-            "GBP_USD": 1.2650,
-            "USD_JPY": 150.25,
-            "AUD_USD": 0.6580,
-            "EUR_GBP": 0.8580,
-            "GBP_JPY": 190.15,
-            "NZD_USD": 0.6125,
-            "USD_CAD": 1.3685,
-        }
+    async def _get_fallback_data(
+        self, pair: str, count: int, timeframe: str = "D"
+    ) -> List[PriceData]:
+        """
+        Fallback candles when OANDA API is unavailable.
 
-        if pair not in fallback_prices:
-            raise ValueError(f"Unsupported pair: {pair}")
+        Deterministic synthetic data (services/synthetic_market.py), generated once
+        per candle period and reused until the next candle starts.
+        """
+        if timeframe not in GRANULARITY_DURATIONS:
+            timeframe = "D"
+        candle_start = grid_candle_start(timeframe)
+        key = (pair, timeframe, count)
 
-        base_price = fallback_prices[pair]
-        data = []
-        start_date = datetime.now(timezone.utc) - timedelta(days=count)
-
-        for i in range(count):
-            timestamp = start_date + timedelta(days=i)
-            trend_factor = 1 + (i / count) * 0.02
-            volatility = random.uniform(0.995, 1.005)
-            close_price = base_price * trend_factor * volatility
-
-            open_price = close_price * random.uniform(0.999, 1.001)
-            high_price = max(open_price, close_price) * random.uniform(1.0, 1.002)
-            low_price = min(open_price, close_price) * random.uniform(0.998, 1.0)
-
-            data.append(
-                PriceData(
-                    pair=pair,
-                    timeframe="D",
-                    timestamp=timestamp,
-                    open=round(open_price, 5),
-                    high=round(high_price, 5),
-                    low=round(low_price, 5),
-                    close=round(close_price, 5),
-                    volume=random.randint(1000, 10000),
-                )
-            )
-        return data
+        cached = self._fallback_cache.get(key)
+        if cached is not None and cached[0] == candle_start:
+            CACHE_REQUESTS.inc("fallback_candles", "hit")
+            return list(cached[1])
+
+        CACHE_REQUESTS.inc("fallback_candles", "miss")
+        data = generate_series(pair, timeframe, count, end=candle_start).to_price_data()
+        self._fallback_cache[key] = (candle_start, data)
+        return list(data)
 
     async def get_current_price(self, pair: str) -> float:
         """Get current price from OANDA or fallback."""
@@ -377,19 +519,29 @@ class DataService:
 
         instrument = self.pair_mapping[pair]
 
+        # Latest streamed tick, when the pricing stream is running
+        streamed = get_pricing_stream_service().get_mid(instrument)
+        if streamed is not None:
+            CACHE_REQUESTS.inc("streamed_price", "hit")
+            return streamed
+        CACHE_REQUESTS.inc("streamed_price", "miss")
+
         try:
             async with aiohttp.ClientSession() as session:
                 url = f"{self.base_url}/v3/instruments/{instrument}/candles"
                 params = {"count": 1, "granularity": "M5", "price": "M"}
 
+                await self._acquire_oanda_token()
+                started = time.perf_counter()
                 async with session.get(
                     url, headers=self.headers, params=params
                 ) as response:
                     if response.status == 200:
-                        data = await response.json()
+                        data = await self._read_json(response, pair, started, request="price")
                         candles = data.get("candles", [])
-                        if candles and candles[0].get("complete"):
-                            return float(candles[0]["mid"]["c"])
+                        # The latest candle is still forming; its close is the current mid
+                        if candles:
+                            return float(candles[-1]["mid"]["c"])
 
             return await self._get_fallback_current_price(pair)
 
@@ -398,22 +550,9 @@ class DataService:
             return await self._get_fallback_current_price(pair)
 
     async def _get_fallback_current_price(self, pair: str) -> float:
-        """Fallback current price."""
-        import random
-
-        fallback_prices = {
-            "EUR_USD": 1.0850,
-            "GBP_USD": 1.2650,
-            "USD_JPY": 150.25,
-            "AUD_USD": 0.6580,
-            "EUR_GBP": 0.8580,
-            "GBP_JPY": 190.15,
-            "NZD_USD": 0.6125,
-            "USD_CAD": 1.3685,
-        }
-        if pair not in fallback_prices:
-            raise ValueError(f"Unsupported pair: {pair}")
-        return round(fallback_prices[pair] * random.uniform(0.998, 1.002), 5)
+        """Fallback current price (close of the synthetic M5 candle, stable for 5 minutes)."""
+        candles = await self._get_fallback_data(pair, 1, "M5")
+        return candles[-1].close
 
     async def get_all_current_prices(self) -> Dict[str, float]:
         """Get current prices for all supported pairs."""
@@ -460,6 +599,7 @@ class DataService:
             "last_updated": datetime.utcnow().isoformat(),
             "oanda_configured": bool(self.api_key),
             "api_endpoint": self.base_url,
+            "oanda_rate_limit": self.oanda_bucket.get_stats(),
         }
 
         # Test OANDA connectivity
@@ -467,6 +607,7 @@ class DataService:
             try:
                 async with aiohttp.ClientSession() as session:
                     url = f"{self.base_url}/v3/accounts/{self.account_id}"
+                    await self._acquire_oanda_token()
                     async with session.get(url, headers=self.headers) as response:
                         if response.status == 200:
                             health_info["oanda_status"] = "connected"
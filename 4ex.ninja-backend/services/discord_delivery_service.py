@@ -0,0 +1,482 @@
+"""
+Discord Delivery Service
+Queue-based Discord webhook delivery shared by every Discord sender.
+
+Features:
+- One persistent aiohttp session (SSL context and connector built once)
+- Per-webhook async queue with a dedicated worker: posts to one webhook go out
+  in order, posts to different webhooks go out concurrently
+- 429-aware retries honouring Discord's retry_after / Retry-After values
+- Proactive pausing when a webhook reports its rate-limit bucket is empty
+- Client-side token bucket per webhook so bursts queue instead of hitting 429s
+- Queue depth and delivery metrics
+"""
+
+import asyncio
+import aiohttp
+import logging
+import ssl
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple
+
+from services.metrics_service import get_metrics_registry
+from services.rate_limiter_service import TokenBucket, get_rate_limiter_service
+
+metrics = get_metrics_registry()
+DISCORD_DELIVERY_SECONDS = metrics.histogram(
+    "discord_delivery_seconds", "Discord webhook delivery time including retries", ["result"]
+)
+DISCORD_QUEUE_DEPTH = metrics.gauge(
+    "discord_queue_depth", "Payloads waiting per Discord webhook", ["webhook"]
+)
+
+
+@dataclass
+class DeliveryJob:
+    """A single webhook post waiting in a webhook queue."""
+
+    webhook_url: str
+    payload: Dict[str, Any]
+    future: Optional[asyncio.Future]
+    enqueued_at: float
+    attempts: int = 0
+
+
+class DiscordDeliveryService:
+    """Delivers Discord webhook payloads through per-webhook worker queues."""
+
+    def __init__(
+        self,
+        max_queue_size: int = 1000,
+        max_retries: int = 3,
+        request_timeout: float = 10.0,
+        max_retry_after: float = 60.0,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.max_queue_size = max_queue_size
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.max_retry_after = max_retry_after  # Never sleep longer than this
+        self.rate_limiter = get_rate_limiter_service()
+
+        # Runtime state (bound to the running event loop)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._buckets: Dict[str, TokenBucket] = {}  # Resolved once per webhook, immune to LRU eviction
+        self._paused_until: Dict[str, float] = {}  # Per-webhook pause (monotonic)
+        self._global_paused_until = 0.0
+
+        # Delivery metrics
+        self.delivery_metrics = {
+            "enqueued": 0,
+            "delivered": 0,
+            "failed": 0,
+            "dropped": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "in_flight": 0,
+            "max_queue_depth": 0,
+            "last_delivery": None,
+        }
+        self.webhook_metrics: Dict[str, Dict[str, Any]] = {}
+
+    async def deliver(self, webhook_url: str, payload: Dict[str, Any]) -> bool:
+        """
+        Queue a payload and wait for its delivery result.
+
+        Args:
+            webhook_url: Discord webhook URL
+            payload: JSON payload to post
+
+        Returns:
+            True if Discord accepted the payload
+        """
+        if not webhook_url:
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        if not self._enqueue_job(webhook_url, payload, future):
+            return False
+
+        return await future
+
+    def enqueue(self, webhook_url: str, payload: Dict[str, Any]) -> bool:
+        """
+        Queue a payload without waiting for delivery (fire and forget).
+
+        Must be called from within a running event loop.
+
+        Returns:
+            True if the payload was accepted into the queue
+        """
+        if not webhook_url:
+            return False
+
+        return self._enqueue_job(webhook_url, payload, None)
+
+    def _enqueue_job(
+        self,
+        webhook_url: str,
+        payload: Dict[str, Any],
+        future: Optional[asyncio.Future],
+    ) -> bool:
+        """Place a job on the webhook's queue, starting its worker if needed."""
+        queue = self._get_queue(webhook_url)
+        job = DeliveryJob(
+            webhook_url=webhook_url,
+            payload=payload,
+            future=future,
+            enqueued_at=time.monotonic(),
+        )
+
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.delivery_metrics["dropped"] += 1
+            self._webhook_stats(webhook_url)["dropped"] += 1
+            self.logger.error(
+                f"Discord queue full for webhook {self._webhook_label(webhook_url)} - payload dropped"
+            )
+            return False
+
+        self.delivery_metrics["enqueued"] += 1
+        self.delivery_metrics["max_queue_depth"] = max(
+            self.delivery_metrics["max_queue_depth"], queue.qsize()
+        )
+        return True
+
+    def _get_queue(self, webhook_url: str) -> asyncio.Queue:
+        """Get the queue for a webhook, creating the queue and worker lazily."""
+        self._bind_to_running_loop()
+
+        queue = self._queues.get(webhook_url)
+        if queue is None:
+            queue = asyncio.Queue(maxsize=self.max_queue_size)
+            self._queues[webhook_url] = queue
+
+        worker = self._workers.get(webhook_url)
+        if worker is None or worker.done():
+            self._workers[webhook_url] = asyncio.get_running_loop().create_task(
+                self._worker(webhook_url, queue)
+            )
+
+        return queue
+
+    def _bind_to_running_loop(self) -> None:
+        """Reset loop-bound state if we are now running on a different loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+
+        if self._loop is not None:
+            self.logger.info("Discord delivery service re-bound to a new event loop")
+
+        self._loop = loop
+        self._session = None
+        self._queues = {}
+        self._workers = {}
+        self._paused_until = {}
+        self._global_paused_until = 0.0
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            # Create SSL context for Discord API
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+
+            connector = aiohttp.TCPConnector(ssl=ssl_context, limit=50)
+            timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+        return self._session
+
+    async def _worker(self, webhook_url: str, queue: asyncio.Queue) -> None:
+        """Deliver jobs for one webhook, strictly in queue order."""
+        while True:
+            job = await queue.get()
+            success = False
+            self.delivery_metrics["in_flight"] += 1
+            started = time.monotonic()
+
+            try:
+                success = await self._post_with_retries(job)
+            except asyncio.CancelledError:
+                if job.future is not None and not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as e:
+                self.logger.error(f"Discord delivery worker error: {str(e)}")
+                success = False
+            finally:
+                self.delivery_metrics["in_flight"] -= 1
+                queue.task_done()
+
+            self._record_result(webhook_url, success, time.monotonic() - started)
+
+            if job.future is not None and not job.future.done():
+                job.future.set_result(success)
+
+    async def _post_with_retries(self, job: DeliveryJob) -> bool:
+        """Post a job, retrying on 429, 5xx and network errors."""
+        while job.attempts <= self.max_retries:
+            await self._wait_for_rate_limit(job.webhook_url)
+
+            job.attempts += 1
+            status, retry_after = await self._post(job.webhook_url, job.payload)
+
+            if status in (200, 204):
+                return True
+
+            if job.attempts > self.max_retries:
+                break
+
+            if status == 429:
+                self.delivery_metrics["rate_limited"] += 1
+                self.delivery_metrics["retries"] += 1
+                self.logger.warning(
+                    f"Discord rate limited webhook {self._webhook_label(job.webhook_url)} - "
+                    f"retrying in {retry_after:.2f}s"
+                )
+                self._pause_webhook(job.webhook_url, retry_after)
+                continue
+
+            if status is None or status >= 500:
+                self.delivery_metrics["retries"] += 1
+                await asyncio.sleep(min(0.5 * (2 ** (job.attempts - 1)), 8.0))
+                continue
+
+            # Other 4xx responses will not succeed on retry
+            break
+
+        self.logger.error(
+            f"Discord delivery failed for webhook {self._webhook_label(job.webhook_url)} "
+            f"after {job.attempts} attempt(s)"
+        )
+        return False
+
+    async def _post(
+        self, webhook_url: str, payload: Dict[str, Any]
+    ) -> Tuple[Optional[int], float]:
+        """
+        Post a payload once.
+
+        Returns:
+            (HTTP status or None on network error, seconds to wait before retry)
+        """
+        try:
+            session = await self._get_session()
+            async with session.post(webhook_url, json=payload) as response:
+                retry_after = 0.0
+
+                if response.status == 429:
+                    retry_after = await self._parse_retry_after(response)
+                elif response.headers.get("X-RateLimit-Remaining") == "0":
+                    # Bucket exhausted - pause this webhook before the next post
+                    self._pause_webhook(
+                        webhook_url,
+                        self._safe_float(response.headers.get("X-RateLimit-Reset-After")),
+                    )
+                elif response.status not in (200, 204):
+                    self.logger.error(
+                        f"Discord webhook failed with status {response.status}"
+                    )
+
+                return response.status, retry_after
+
+        except asyncio.TimeoutError:
+            self.logger.error("Discord webhook timeout")
+            return None, 0.0
+        except aiohttp.ClientError as e:
+            self.logger.error(f"Discord webhook error: {str(e)}")
+            return None, 0.0
+
+    async def _parse_retry_after(self, response: aiohttp.ClientResponse) -> float:
+        """Extract the retry delay from a 429 response body or headers."""
+        retry_after = 0.0
+        is_global = False
+
+        try:
+            body = await response.json(content_type=None)
+            if isinstance(body, dict):
+                retry_after = self._safe_float(body.get("retry_after"))
+                is_global = bool(body.get("global", False))
+        except Exception:
+            pass
+
+        if retry_after <= 0:
+            retry_after = self._safe_float(
+                response.headers.get("Retry-After")
+                or response.headers.get("X-RateLimit-Reset-After")
+            )
+
+        if retry_after <= 0:
+            retry_after = 1.0
+
+        retry_after = min(retry_after, self.max_retry_after)
+
+        if is_global or response.headers.get("X-RateLimit-Global"):
+            self._global_paused_until = time.monotonic() + retry_after
+
+        return retry_after
+
+    def _pause_webhook(self, webhook_url: str, seconds: float) -> None:
+        """Hold back further posts to a webhook for the given number of seconds."""
+        if seconds <= 0:
+            return
+
+        seconds = min(seconds, self.max_retry_after)
+        self._paused_until[webhook_url] = max(
+            self._paused_until.get(webhook_url, 0.0), time.monotonic() + seconds
+        )
+
+    async def _wait_for_rate_limit(self, webhook_url: str) -> None:
+        """Sleep until the webhook (and the global bucket) may be posted to."""
+        resume_at = max(
+            self._paused_until.get(webhook_url, 0.0), self._global_paused_until
+        )
+        delay = resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        bucket = self._buckets.get(webhook_url)
+        if bucket is None:
+            bucket = self._buckets[webhook_url] = self.rate_limiter.get_configured_bucket(
+                "discord_webhook", name=f"discord_{self._webhook_label(webhook_url)}"
+            )
+        await bucket.acquire()
+
+    def _record_result(self, webhook_url: str, success: bool, latency: float) -> None:
+        """Update delivery metrics for a completed job."""
+        stats = self._webhook_stats(webhook_url)
+        stats["last_latency_ms"] = round(latency * 1000, 1)
+        DISCORD_DELIVERY_SECONDS.observe(latency, "delivered" if success else "failed")
+
+        if success:
+            self.delivery_metrics["delivered"] += 1
+            self.delivery_metrics["last_delivery"] = datetime.now(
+                timezone.utc
+            ).isoformat()
+            stats["delivered"] += 1
+        else:
+            self.delivery_metrics["failed"] += 1
+            stats["failed"] += 1
+
+    def _webhook_stats(self, webhook_url: str) -> Dict[str, Any]:
+        """Get the per-webhook metrics entry, keyed by a token-free label."""
+        label = self._webhook_label(webhook_url)
+        if label not in self.webhook_metrics:
+            self.webhook_metrics[label] = {
+                "delivered": 0,
+                "failed": 0,
+                "dropped": 0,
+                "last_latency_ms": None,
+            }
+        return self.webhook_metrics[label]
+
+    @staticmethod
+    def _webhook_label(webhook_url: str) -> str:
+        """Label a webhook by its ID so tokens never reach logs or metrics."""
+        parts = [p for p in webhook_url.rstrip("/").split("/") if p]
+        if len(parts) >= 2 and parts[-2].isdigit():
+            return f"webhook_{parts[-2]}"
+        return f"webhook_{abs(hash(webhook_url)) % 100000}"
+
+    @staticmethod
+    def _safe_float(value: Any) -> float:
+        """Convert a header/body value to float, defaulting to 0."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    def get_queue_depth(self) -> int:
+        """Get the total number of payloads waiting across all webhooks."""
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        """Get queue depth and delivery metrics."""
+        now = time.monotonic()
+        queues = {}
+
+        for webhook_url, queue in self._queues.items():
+            label = self._webhook_label(webhook_url)
+            paused_for = self._paused_until.get(webhook_url, 0.0) - now
+            queues[label] = {
+                "depth": queue.qsize(),
+                "worker_running": webhook_url in self._workers
+                and not self._workers[webhook_url].done(),
+                "paused_seconds": round(max(0.0, paused_for), 2),
+                **self.webhook_metrics.get(label, {}),
+            }
+
+        return {
+            "total_queue_depth": self.get_queue_depth(),
+            "webhook_count": len(self._queues),
+            "global_paused_seconds": round(
+                max(0.0, self._global_paused_until - now), 2
+            ),
+            "metrics": dict(self.delivery_metrics),
+            "queues": queues,
+        }
+
+    async def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Wait until every queued payload has been processed.
+
+        Returns:
+            True if all queues drained within the timeout
+        """
+        if not self._queues:
+            return True
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in self._queues.values())),
+                timeout=timeout,
+            )
+            return True
+        except asyncio.TimeoutError:
+            self.logger.warning(
+                f"Discord queues not drained after {timeout}s - {self.get_queue_depth()} pending"
+            )
+            return False
+
+    async def close(self, flush_timeout: float = 5.0) -> None:
+        """Drain queues, stop workers and close the shared session."""
+        if self._loop is not None and self._loop is asyncio.get_running_loop():
+            await self.flush(flush_timeout)
+
+            for worker in self._workers.values():
+                worker.cancel()
+            if self._workers:
+                await asyncio.gather(*self._workers.values(), return_exceptions=True)
+
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+
+        self._workers = {}
+        self._queues = {}
+        self._session = None
+        self._loop = None
+        self.logger.info("Discord delivery service stopped")
+
+
+# Global Discord delivery service instance
+discord_delivery_service = DiscordDeliveryService()
+DISCORD_QUEUE_DEPTH.set_function(
+    lambda: {
+        (discord_delivery_service._webhook_label(url),): queue.qsize()
+        for url, queue in discord_delivery_service._queues.items()
+    }
+)
+
+
+def get_discord_delivery_service() -> DiscordDeliveryService:
+    """Get the Discord delivery service instance."""
+    return discord_delivery_service
@@ -0,0 +1,114 @@
+"""
+Discord Embed Packer
+Groups rendered signal embeds into the fewest Discord webhook messages.
+
+Features:
+- Enforces Discord's per-message limits (10 embeds, 6000 embed characters)
+- Truncates oversized titles, descriptions, fields and footers to their limits
+- Preserves signal order; each message carries the indices of its signals
+"""
+
+from typing import Dict, Any, List, Tuple
+
+# Discord message / embed limits
+# https://discord.com/developers/docs/resources/message#embed-object-embed-limits
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_CONTENT_LENGTH = 2000
+MAX_TITLE_LENGTH = 256
+MAX_DESCRIPTION_LENGTH = 4096
+MAX_FIELDS = 25
+MAX_FIELD_NAME_LENGTH = 256
+MAX_FIELD_VALUE_LENGTH = 1024
+MAX_FOOTER_LENGTH = 2048
+MAX_AUTHOR_NAME_LENGTH = 256
+
+
+def _truncate(text: str, limit: int) -> str:
+    """Truncate text to limit characters, marking the cut with an ellipsis."""
+    if text is None or len(text) <= limit:
+        return text
+    return text[: limit - 1] + "…"
+
+
+def clamp_embed(embed: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of embed with every text element inside Discord's limits."""
+    clamped = dict(embed)
+
+    if "title" in clamped:
+        clamped["title"] = _truncate(clamped["title"], MAX_TITLE_LENGTH)
+    if "description" in clamped:
+        clamped["description"] = _truncate(clamped["description"], MAX_DESCRIPTION_LENGTH)
+    if "fields" in clamped:
+        clamped["fields"] = [
+            {
+                **field,
+                "name": _truncate(field.get("name", ""), MAX_FIELD_NAME_LENGTH),
+                "value": _truncate(field.get("value", ""), MAX_FIELD_VALUE_LENGTH),
+            }
+            for field in clamped["fields"][:MAX_FIELDS]
+        ]
+    if "footer" in clamped:
+        clamped["footer"] = {
+            **clamped["footer"],
+            "text": _truncate(clamped["footer"].get("text", ""), MAX_FOOTER_LENGTH),
+        }
+    if "author" in clamped:
+        clamped["author"] = {
+            **clamped["author"],
+            "name": _truncate(clamped["author"].get("name", ""), MAX_AUTHOR_NAME_LENGTH),
+        }
+
+    return clamped
+
+
+def embed_size(embed: Dict[str, Any]) -> int:
+    """Count the characters Discord counts towards the 6000-character total."""
+    size = len(embed.get("title") or "") + len(embed.get("description") or "")
+    size += len((embed.get("footer") or {}).get("text") or "")
+    size += len((embed.get("author") or {}).get("name") or "")
+    for field in embed.get("fields") or []:
+        size += len(field.get("name") or "") + len(field.get("value") or "")
+    return size
+
+
+def pack_embeds(
+    embeds: List[Dict[str, Any]],
+    max_embeds: int = MAX_EMBEDS_PER_MESSAGE,
+    max_chars: int = MAX_EMBED_CHARS_PER_MESSAGE,
+) -> List[Tuple[List[int], List[Dict[str, Any]]]]:
+    """
+    Pack embeds, in order, into as few messages as the limits allow.
+
+    Greedy in-order packing gives the minimum message count for ordered
+    input. An embed that exceeds max_chars by itself is sent alone.
+
+    Args:
+        embeds: Rendered embeds, one per signal
+        max_embeds: Maximum embeds per message
+        max_chars: Maximum combined embed characters per message
+
+    Returns:
+        List of (signal indices, clamped embeds) per message
+    """
+    messages: List[Tuple[List[int], List[Dict[str, Any]]]] = []
+    indices: List[int] = []
+    batch: List[Dict[str, Any]] = []
+    batch_chars = 0
+
+    for index, embed in enumerate(embeds):
+        clamped = clamp_embed(embed)
+        size = embed_size(clamped)
+
+        if batch and (len(batch) >= max_embeds or batch_chars + size > max_chars):
+            messages.append((indices, batch))
+            indices, batch, batch_chars = [], [], 0
+
+        indices.append(index)
+        batch.append(clamped)
+        batch_chars += size
+
+    if batch:
+        messages.append((indices, batch))
+
+    return messages
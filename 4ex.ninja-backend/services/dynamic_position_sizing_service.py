@@ -6,19 +6,29 @@ Implements intelligent position sizing based on:
 - Market volatility (ATR)
 - Portfolio correlation and risk management
 - Session quality multipliers
+
+Open-position exposure comes from the shared position book unless the caller
+passes its own `current_positions`. Against the book, trades that move with the
+open positions are also scaled down by the rolling correlation matrix.
+All candidates of a scan can be sized in one call with `calculate_position_sizes`.
 """
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Sequence
 import logging
 
+from services.correlation_risk_service import get_correlation_risk_engine
+from services.position_book_service import get_position_book
+
 
 class DynamicPositionSizingService:
     """Calculates optimal position sizes based on multiple risk factors."""
 
     def __init__(self, base_risk_percent: float = 1.5, max_risk_percent: float = 3.0):
         self.logger = logging.getLogger(__name__)
+        self.position_book = get_position_book()
+        self.correlation_risk = get_correlation_risk_engine()
         self.base_risk_percent = base_risk_percent  # Base risk per trade
         self.max_risk_percent = max_risk_percent  # Maximum risk per trade
 
@@ -40,6 +50,10 @@ class DynamicPositionSizingService:
             1.2: 1.2,  # High quality
             1.3: 1.3,  # Premium overlap
         }
+        self._session_levels = np.array(sorted(self.session_multipliers))
+        self._session_values = np.array(
+            [self.session_multipliers[level] for level in self._session_levels]
+        )
 
         # Volatility adjustment factors
         self.volatility_adjustments = {
@@ -49,6 +63,9 @@ class DynamicPositionSizingService:
             "high": 0.8,  # Reduce size in high volatility
             "very_high": 0.6,
         }
+        # ATR % of price boundaries between the regimes above (in order)
+        self.volatility_thresholds = [0.5, 0.8, 1.5, 2.5]
+        self._volatility_values = np.array(list(self.volatility_adjustments.values()))
 
         # Currency correlation limits (max exposure per currency)
         self.currency_limits = {
@@ -70,6 +87,7 @@ class DynamicPositionSizingService:
         signal_data: Dict,
         market_data: Optional[pd.DataFrame] = None,
         current_positions: Optional[Dict] = None,
+        atr: Optional[float] = None,
     ) -> Dict:
         """
         Calculate optimal position size based on multiple risk factors.
@@ -80,154 +98,216 @@ class DynamicPositionSizingService:
             stop_loss: Stop loss price
             account_balance: Current account balance
             signal_data: Dict containing signal strength, confluence score, session quality
-            market_data: Recent OHLC data for volatility calculations
-            current_positions: Dict of current open positions
+            market_data: Recent OHLC data for volatility calculations (unused if atr is given)
+            current_positions: Dict of open positions (defaults to the position book)
+            atr: Latest ATR already computed by the caller
 
         Returns:
             Dict with position sizing recommendations
         """
         try:
-            # 1. Calculate base position size
-            risk_amount = account_balance * (self.base_risk_percent / 100)
-            stop_distance = abs(entry_price - stop_loss)
-
-            if stop_distance == 0:
-                return {"error": "Invalid stop loss: distance cannot be zero"}
-
-            base_position_size = risk_amount / stop_distance
-
-            # 2. Apply signal strength multiplier
-            signal_strength = signal_data.get("signal_strength", "moderate")
-            signal_multiplier = self.signal_strength_multipliers.get(
-                signal_strength, 1.0
+            if atr is None:
+                atr = self._latest_atr(market_data)
+            sizes = self.calculate_position_sizes(
+                [pair],
+                [entry_price],
+                [stop_loss],
+                account_balance,
+                signal_strengths=[signal_data.get("signal_strength", "moderate")],
+                confluence_scores=[signal_data.get("confluence_score", 0.0)],
+                session_qualities=[signal_data.get("session_quality", 1.0)],
+                atrs=[atr],
+                current_positions=current_positions,
             )
+            return self.to_sizing_dicts([pair], sizes, account_balance)[0]
 
-            # 3. Apply confluence score multiplier
-            confluence_score = signal_data.get("confluence_score", 0.0)
-            confluence_multiplier = 1.0 + (
-                confluence_score * 0.2
-            )  # +20% per confluence point
-
-            # 4. Apply session quality multiplier
-            session_quality = signal_data.get("session_quality", 1.0)
-            session_multiplier = self._get_session_multiplier(session_quality)
+        except Exception as e:
+            self.logger.error(f"Error calculating position size for {pair}: {str(e)}")
+            return {"error": f"Position sizing calculation failed: {str(e)}"}
 
-            # 5. Apply volatility adjustment
-            volatility_multiplier = self._calculate_volatility_multiplier(
-                market_data, pair
-            )
+    def calculate_position_sizes(
+        self,
+        pairs: Sequence[str],
+        entry_prices: Sequence[float],
+        stop_losses: Sequence[float],
+        account_balance: float,
+        signal_strengths: Optional[Sequence[str]] = None,
+        confluence_scores: Optional[Sequence[float]] = None,
+        session_qualities: Optional[Sequence[float]] = None,
+        atrs: Optional[Sequence[float]] = None,
+        current_positions: Optional[Dict] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Size every candidate trade of a scan at once.
 
-            # 6. Check currency exposure limits
-            currency_multiplier = self._check_currency_limits(pair, current_positions)
+        Args:
+            pairs: Currency pair per candidate
+            entry_prices: Proposed entry price per candidate
+            stop_losses: Stop loss price per candidate
+            account_balance: Current account balance
+            signal_strengths: Strength label per candidate (default "moderate")
+            confluence_scores: Confluence score per candidate (default 0.0)
+            session_qualities: Session quality multiplier per candidate (default 1.0)
+            atrs: Latest ATR per candidate from the strategy's indicators (NaN: no adjustment)
+            current_positions: Dict of open positions (defaults to the position book)
 
-            # 7. Calculate final position size
-            total_multiplier = (
-                signal_multiplier
-                * confluence_multiplier
-                * session_multiplier
-                * volatility_multiplier
-                * currency_multiplier
+        Returns:
+            Column arrays aligned with `pairs`: sizes, risk, every multiplier,
+            "position_capped" and "valid" (False where the stop distance is zero)
+        """
+        n = len(pairs)
+        entry = np.asarray(entry_prices, dtype=float)
+        stop = np.asarray(stop_losses, dtype=float)
+
+        # 1. Calculate base position size
+        stop_distance = np.abs(entry - stop)
+        valid = stop_distance > 0
+        distance = np.where(valid, stop_distance, np.nan)
+        base_position_size = account_balance * (self.base_risk_percent / 100) / distance
+
+        # 2. Signal strength multiplier
+        if signal_strengths is None:
+            signal = np.full(n, self.signal_strength_multipliers["moderate"])
+        else:
+            signal = np.array(
+                [self.signal_strength_multipliers.get(s, 1.0) for s in signal_strengths], dtype=float
             )
 
-            final_position_size = base_position_size * total_multiplier
-
-            # 8. Apply maximum risk limit
-            max_position_size = (
-                account_balance * (self.max_risk_percent / 100)
-            ) / stop_distance
-            final_position_size = min(final_position_size, max_position_size)
+        # 3. Confluence score multiplier (+20% per confluence point)
+        confluence = 1.0 + 0.2 * (
+            np.zeros(n) if confluence_scores is None else np.asarray(confluence_scores, dtype=float)
+        )
 
-            # 9. Calculate risk percentages
-            final_risk_amount = final_position_size * stop_distance
-            final_risk_percent = (final_risk_amount / account_balance) * 100
+        # 4. Session quality multiplier
+        session = self._session_multipliers(
+            np.ones(n) if session_qualities is None else np.asarray(session_qualities, dtype=float)
+        )
 
-            return {
-                "pair": pair,
-                "recommended_position_size": round(final_position_size, 2),
-                "risk_amount": round(final_risk_amount, 2),
-                "risk_percent": round(final_risk_percent, 2),
-                "stop_distance_pips": self._calculate_pips(stop_distance, pair),
-                "multipliers": {
-                    "signal_strength": signal_multiplier,
-                    "confluence_score": confluence_multiplier,
-                    "session_quality": session_multiplier,
-                    "volatility": volatility_multiplier,
-                    "currency_limit": currency_multiplier,
-                    "total_multiplier": round(total_multiplier, 3),
-                },
-                "limits": {
-                    "max_risk_percent": self.max_risk_percent,
-                    "base_risk_percent": self.base_risk_percent,
-                    "position_capped": final_position_size >= max_position_size,
-                },
-                "recommendation": self._get_sizing_recommendation(
-                    final_risk_percent, total_multiplier
-                ),
-            }
+        # 5. Volatility regime from the caller's ATR
+        volatility = self._volatility_multipliers(
+            np.full(n, np.nan) if atrs is None else np.asarray(atrs, dtype=float), entry
+        )
 
-        except Exception as e:
-            self.logger.error(f"Error calculating position size for {pair}: {str(e)}")
-            return {"error": f"Position sizing calculation failed: {str(e)}"}
+        # 6. Currency exposure limits (O(1) book lookups, once per distinct pair)
+        limits = {pair: self._check_currency_limits(pair, current_positions) for pair in set(pairs)}
+        currency = np.array([limits[pair] for pair in pairs], dtype=float)
 
-    def _get_session_multiplier(self, session_quality: float) -> float:
-        """Get session quality multiplier."""
-        # Find closest session quality level
-        closest_quality = min(
-            self.session_multipliers.keys(), key=lambda x: abs(x - session_quality)
-        )
-        return self.session_multipliers[closest_quality]
+        # 7. Correlation with the open book (long if the stop is below entry)
+        if current_positions is None:
+            correlation = self._correlation_multipliers(pairs, stop < entry)
+        else:
+            correlation = np.ones(n)
 
-    def _calculate_volatility_multiplier(
-        self, market_data: Optional[pd.DataFrame], pair: str
-    ) -> float:
-        """Calculate volatility-based position size adjustment."""
-        if market_data is None or len(market_data) < 20:
-            return 1.0  # Default multiplier if no data
+        # 8. Final position size, capped at the maximum risk
+        total_multiplier = signal * confluence * session * volatility * currency * correlation
+        max_position_size = account_balance * (self.max_risk_percent / 100) / distance
+        final_position_size = base_position_size * total_multiplier
+        position_capped = final_position_size >= max_position_size
+        final_position_size = np.minimum(final_position_size, max_position_size)
 
-        try:
-            # Calculate ATR (Average True Range)
-            high = market_data["high"]
-            low = market_data["low"]
-            close = market_data["close"]
-            prev_close = close.shift(1)
+        # 9. Risk amounts and percentages
+        risk_amount = final_position_size * stop_distance
+        return {
+            "position_size": final_position_size,
+            "risk_amount": risk_amount,
+            "risk_percent": risk_amount / account_balance * 100,
+            "stop_distance": stop_distance,
+            "signal_strength": signal,
+            "confluence_score": confluence,
+            "session_quality": session,
+            "volatility": volatility,
+            "currency_limit": currency,
+            "correlation": correlation,
+            "total_multiplier": total_multiplier,
+            "position_capped": position_capped,
+            "valid": valid,
+        }
 
-            true_range = pd.DataFrame(
+    def to_sizing_dicts(
+        self, pairs: Sequence[str], sizes: Dict[str, np.ndarray], account_balance: float
+    ) -> List[Dict]:
+        """Per-pair sizing dicts (the calculate_position_size shape) from batch columns."""
+        results = []
+        for i, pair in enumerate(pairs):
+            if not sizes["valid"][i]:
+                results.append({"error": "Invalid stop loss: distance cannot be zero"})
+                continue
+            risk_percent = float(sizes["risk_percent"][i])
+            total_multiplier = float(sizes["total_multiplier"][i])
+            results.append(
                 {
-                    "hl": high - low,
-                    "hc": abs(high - prev_close),
-                    "lc": abs(low - prev_close),
+                    "pair": pair,
+                    "recommended_position_size": round(float(sizes["position_size"][i]), 2),
+                    "risk_amount": round(float(sizes["risk_amount"][i]), 2),
+                    "risk_percent": round(risk_percent, 2),
+                    "stop_distance_pips": self._calculate_pips(float(sizes["stop_distance"][i]), pair),
+                    "multipliers": {
+                        "signal_strength": float(sizes["signal_strength"][i]),
+                        "confluence_score": float(sizes["confluence_score"][i]),
+                        "session_quality": float(sizes["session_quality"][i]),
+                        "volatility": float(sizes["volatility"][i]),
+                        "currency_limit": float(sizes["currency_limit"][i]),
+                        "correlation": round(float(sizes["correlation"][i]), 3),
+                        "total_multiplier": round(total_multiplier, 3),
+                    },
+                    "limits": {
+                        "max_risk_percent": self.max_risk_percent,
+                        "base_risk_percent": self.base_risk_percent,
+                        "position_capped": bool(sizes["position_capped"][i]),
+                    },
+                    "recommendation": self._get_sizing_recommendation(
+                        risk_percent, total_multiplier
+                    ),
                 }
-            ).max(axis=1)
-
-            atr_14 = true_range.rolling(window=14).mean().iloc[-1]
-            current_price = close.iloc[-1]
-
-            # Calculate ATR as percentage of price
-            atr_percent = (atr_14 / current_price) * 100
-
-            # Determine volatility regime
-            if atr_percent < 0.5:
-                volatility_regime = "very_low"
-            elif atr_percent < 0.8:
-                volatility_regime = "low"
-            elif atr_percent < 1.5:
-                volatility_regime = "normal"
-            elif atr_percent < 2.5:
-                volatility_regime = "high"
-            else:
-                volatility_regime = "very_high"
-
-            return self.volatility_adjustments[volatility_regime]
-
-        except Exception as e:
-            self.logger.warning(f"Error calculating volatility for {pair}: {str(e)}")
-            return 1.0
+            )
+        return results
+
+    def _session_multipliers(self, session_qualities: np.ndarray) -> np.ndarray:
+        """Multiplier of the closest session quality level (ties go to the lower level)."""
+        levels, values = self._session_levels, self._session_values
+        right = np.clip(np.searchsorted(levels, session_qualities), 1, len(levels) - 1)
+        left = right - 1
+        closest = np.where(
+            session_qualities - levels[left] <= levels[right] - session_qualities, left, right
+        )
+        return values[closest]
+
+    def _volatility_multipliers(self, atrs: np.ndarray, prices: np.ndarray) -> np.ndarray:
+        """Volatility regime multiplier from ATR as a percentage of price (1.0 without ATR)."""
+        atr_percent = atrs / prices * 100
+        regimes = np.digitize(np.nan_to_num(atr_percent), self.volatility_thresholds)
+        return np.where(np.isnan(atr_percent), 1.0, self._volatility_values[regimes])
+
+    def _correlation_multipliers(self, pairs: Sequence[str], is_long: np.ndarray) -> np.ndarray:
+        """Correlation-with-book multipliers, both directions computed once for all pairs."""
+        engine = self.correlation_risk
+        longs = engine.correlation_multipliers(np.ones(len(engine.pairs)))
+        shorts = engine.correlation_multipliers(-np.ones(len(engine.pairs)))
+        index = np.array([engine.index.get(pair, -1) for pair in pairs], dtype=int)
+        picked = np.where(is_long, longs[index], shorts[index])
+        return np.where(index >= 0, picked, 1.0)
+
+    @staticmethod
+    def _latest_atr(market_data: Optional[pd.DataFrame], period: int = 14) -> float:
+        """Latest ATR of OHLC data (NaN when there are fewer than 20 candles)."""
+        if market_data is None or len(market_data) < 20:
+            return np.nan
+        high = market_data["high"].to_numpy(dtype=float)
+        low = market_data["low"].to_numpy(dtype=float)
+        close = market_data["close"].to_numpy(dtype=float)
+        true_range = np.maximum.reduce(
+            [high[1:] - low[1:], np.abs(high[1:] - close[:-1]), np.abs(low[1:] - close[:-1])]
+        )
+        return float(true_range[-period:].mean())
 
     def _check_currency_limits(
         self, pair: str, current_positions: Optional[Dict]
     ) -> float:
         """Check currency exposure limits and adjust position size."""
-        if not current_positions:
+        if current_positions is None:
+            if not self.position_book.trades:
+                return 1.0
+        elif not current_positions:
             return 1.0  # No current positions, no adjustment needed
 
         # Extract currencies from pair (e.g., "USD_JPY" -> ["USD", "JPY"])
@@ -259,9 +339,12 @@ class DynamicPositionSizingService:
             return 1.0  # No reduction needed
 
     def _calculate_currency_exposure(
-        self, currency: str, current_positions: Dict
+        self, currency: str, current_positions: Optional[Dict]
     ) -> float:
         """Calculate current exposure percentage for a specific currency."""
+        if current_positions is None:
+            return self.position_book.get_currency_exposure(currency)
+
         total_exposure = 0.0
 
         for position_pair, position_data in current_positions.items():
@@ -296,9 +379,12 @@ class DynamicPositionSizingService:
             return "MINIMAL - Very low risk, consider if opportunity is worth it"
 
     def get_portfolio_risk_analysis(
-        self, current_positions: Dict, account_balance: float
+        self, current_positions: Optional[Dict] = None, account_balance: float = 10000
     ) -> Dict:
-        """Analyze current portfolio risk distribution."""
+        """Analyze current portfolio risk distribution (the position book by default)."""
+        from_book = current_positions is None
+        if from_book:
+            current_positions = self.position_book.get_positions()
         if not current_positions:
             return {
                 "total_risk_percent": 0.0,
@@ -320,7 +406,9 @@ class DynamicPositionSizingService:
             all_currencies.update([base, quote])
 
         for currency in all_currencies:
-            exposure = self._calculate_currency_exposure(currency, current_positions)
+            exposure = self._calculate_currency_exposure(
+                currency, None if from_book else current_positions
+            )
             currency_exposures[currency] = {
                 "current_exposure": round(exposure, 2),
                 "limit": self.currency_limits.get(currency, 3.0),
@@ -339,7 +427,7 @@ class DynamicPositionSizingService:
         else:
             risk_status = "LOW - Room for more positions"
 
-        return {
+        analysis = {
             "total_risk_percent": round(total_risk, 2),
             "currency_exposures": currency_exposures,
             "position_count": len(current_positions),
@@ -349,6 +437,9 @@ class DynamicPositionSizingService:
                 total_risk, currency_exposures
             ),
         }
+        if from_book:
+            analysis["correlation_risk"] = self.correlation_risk.portfolio_risk()
+        return analysis
 
     def _get_portfolio_recommendations(
         self, total_risk: float, currency_exposures: Dict
@@ -13,23 +13,41 @@ import logging
 import pandas as pd
 
 from deployed_strategies.enhanced_daily_strategy import EnhancedDailyStrategy
+from services.correlation_risk_service import get_correlation_risk_engine
 from services.data_service import DataService
-from services.enhanced_discord_service import get_enhanced_discord_service, SignalPriority
+from services.enhanced_discord_service import (
+    SignalPriority,
+    determine_target_tiers,
+    get_enhanced_discord_service,
+)
 from services.notification_service import NotificationService
+from services.tracing_service import get_tracer
 from models.signal_models import PriceData, TradingSignal, SignalType, SignalStatus
 
+tracer = get_tracer()
+
 
 class EnhancedDailyProductionService:
     """Production service for Enhanced Daily Strategy with Phase 1 enhancements."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        data_service: Optional[DataService] = None,
+        notification_service: Optional[NotificationService] = None,
+    ):
         self.logger = logging.getLogger(__name__)
-        self.data_service = DataService()
+        # Share the app's DataService (and its candle cache) when one is passed in
+        self.data_service = data_service or DataService()
         self.strategy = EnhancedDailyStrategy()
+        # Daily closes feed the rolling correlation matrix used for sizing
+        self.correlation_risk = get_correlation_risk_engine()
         
         # Initialize Discord integration
         self.discord_service = get_enhanced_discord_service()
-        self.notification_service = NotificationService()
+        self.notification_service = notification_service or NotificationService()
+
+        # Background Discord delivery tasks (kept referenced until done)
+        self._delivery_tasks = set()
 
         # Track performance and signals
         self.active_signals = {}
@@ -57,6 +75,7 @@ class EnhancedDailyProductionService:
             "EUR_GBP",
         ]
 
+    @tracer.traced("generate_enhanced_signals")
     async def generate_enhanced_signals(self) -> List[Dict]:
         """Generate trading signals using Enhanced Daily Strategy."""
         try:
@@ -70,17 +89,19 @@ class EnhancedDailyProductionService:
                 return []
 
             # Run strategy analysis
-            scan_results = self.strategy.scan_all_pairs(market_data)
+            with tracer.span("scan_all_pairs", pairs=len(market_data)):
+                scan_results = self.strategy.scan_all_pairs(market_data)
 
             # Update performance metrics
             self._update_performance_metrics(scan_results)
 
             # Convert opportunities to production signals
             signals = await self._convert_to_production_signals(scan_results)
+            tracer.current_span().set_attribute("signals", len(signals))
 
-            # Send signals to Discord if any were generated
+            # Hand signals to Discord delivery without waiting on Discord
             if signals:
-                await self._send_signals_to_discord(signals)
+                self._schedule_discord_delivery(signals)
 
             self.logger.info(
                 f"Generated {len(signals)} enhanced signals with Phase 1 improvements"
@@ -92,37 +113,45 @@ class EnhancedDailyProductionService:
             self.logger.error(f"Error generating enhanced signals: {str(e)}")
             return []
 
+    @tracer.traced("fetch_market_data")
     async def _fetch_market_data(self) -> Dict[str, pd.DataFrame]:
         """Fetch OHLC data for all monitored pairs."""
         market_data = {}
+        candles = {}
 
         for pair in self.monitored_pairs:
             try:
                 # Fetch daily data for the last 100 days
-                data = await self.data_service.get_historical_data(
-                    pair=pair, timeframe="D", count=100  # Daily timeframe
-                )
-
-                if data and len(data) >= 50:  # Minimum data requirement
-                    # Convert to DataFrame
-                    df_data = []
-                    for candle in data:
-                        df_data.append(
-                            {
-                                "open": float(candle.open),
-                                "high": float(candle.high),
-                                "low": float(candle.low),
-                                "close": float(candle.close),
-                                "volume": float(candle.volume or 0),
-                            }
-                        )
+                with tracer.span("fetch", pair=pair) as fetch_span:
+                    data = await self.data_service.get_historical_data(
+                        pair=pair, timeframe="D", count=100  # Daily timeframe
+                    )
+                    fetch_span.set_attribute("candles", len(data) if data else 0)
 
-                    # Create datetime index
-                    end_date = datetime.now(timezone.utc)
-                    dates = pd.date_range(end=end_date, periods=len(df_data), freq="D")
+                if data:
+                    candles[pair] = data
 
-                    df = pd.DataFrame(df_data, index=dates)
-                    market_data[pair] = df
+                if data and len(data) >= 50:  # Minimum data requirement
+                    with tracer.span("dataframe_build", pair=pair):
+                        # Convert to DataFrame
+                        df_data = []
+                        for candle in data:
+                            df_data.append(
+                                {
+                                    "open": float(candle.open),
+                                    "high": float(candle.high),
+                                    "low": float(candle.low),
+                                    "close": float(candle.close),
+                                    "volume": float(candle.volume or 0),
+                                }
+                            )
+
+                        # Create datetime index
+                        end_date = datetime.now(timezone.utc)
+                        dates = pd.date_range(end=end_date, periods=len(df_data), freq="D")
+
+                        df = pd.DataFrame(df_data, index=dates)
+                        market_data[pair] = df
 
                 else:
                     self.logger.warning(f"Insufficient data for {pair}")
@@ -130,11 +159,15 @@ class EnhancedDailyProductionService:
             except Exception as e:
                 self.logger.error(f"Error fetching data for {pair}: {str(e)}")
 
+        # Only candles newer than the returns window's last row are added
+        self.correlation_risk.ingest(candles)
         return market_data
 
+    @tracer.traced("convert_to_production_signals")
     async def _convert_to_production_signals(self, scan_results: Dict) -> List[Dict]:
         """Convert strategy opportunities to production trading signals."""
         signals = []
+        trace_id = tracer.current_trace_id()
 
         opportunities = scan_results.get("top_opportunities", [])
 
@@ -172,6 +205,7 @@ class EnhancedDailyProductionService:
                     "timestamp": datetime.now(timezone.utc).isoformat(),
                     "timeframe": "1d",
                     "strategy_version": "enhanced_daily_v1.0",
+                    "trace_id": trace_id,
                     "phase1_features": {
                         "session_filtered": detailed_analysis["session_analysis"][
                             "is_optimal_session"
@@ -236,50 +270,65 @@ class EnhancedDailyProductionService:
         except Exception as e:
             self.logger.error(f"Error updating performance metrics: {str(e)}")
 
-    async def _send_signals_to_discord(self, signals: List[Dict]) -> None:
+    def _schedule_discord_delivery(self, signals: List[Dict]) -> None:
+        """Deliver signals to Discord in the background so a slow Discord never stalls generation."""
+        # Started here so the scan's trace stays open until delivery finishes
+        span = tracer.start_span("discord_delivery", signals=len(signals))
+        task = asyncio.get_running_loop().create_task(
+            self._send_signals_to_discord(signals, span)
+        )
+        self._delivery_tasks.add(task)
+        task.add_done_callback(self._delivery_tasks.discard)
+
+    async def _send_signals_to_discord(self, signals: List[Dict], span=None) -> None:
         """Send generated signals to Discord with multi-tier routing."""
-        try:
-            if not signals:
-                return
+        span = span or tracer.start_span("discord_delivery", signals=len(signals))
+        with tracer.use_span(span):
+            try:
+                if not signals:
+                    return
                 
-            discord_signals_sent = 0
-            discord_delivery_failures = 0
-            
-            for signal in signals:
-                try:
-                    # Determine signal priority based on confluence and strength
-                    priority = self._determine_signal_priority(signal)
-                    
-                    # Convert to enhanced signal format for Discord
-                    enhanced_signal = self._convert_to_enhanced_signal(signal)
-                    
-                    # Send to Discord with appropriate tier routing
-                    success = await self.discord_service.send_enhanced_signal(
-                        enhanced_signal, priority
+                # Convert each signal to the enhanced Discord format with its priority
+                # and tiers; each tier's share of the scan is packed into as few
+                # webhook messages as possible
+                routed_signals = [
+                    (
+                        self._convert_to_enhanced_signal(signal),
+                        self._determine_signal_priority(signal),
+                        determine_target_tiers(signal),
                     )
-                    
-                    if success:
+                    for signal in signals
+                ]
+                with tracer.span("webhook", messages=len(routed_signals)):
+                    results = await self.discord_service.send_packed_signals_by_tier(routed_signals)
+            
+                discord_signals_sent = 0
+                discord_delivery_failures = 0
+            
+                for signal, tier_results in zip(signals, results):
+                    if not tier_results:
+                        self.logger.info(f"No Discord tier qualifies for {signal['pair']}")
+                    elif any(tier_results.values()):
                         discord_signals_sent += 1
-                        self.logger.info(f"Signal sent to Discord: {signal['pair']} - {signal['trade_recommendation']['recommendation']}")
+                        self.logger.info(
+                            f"Signal sent to Discord: {signal['pair']} - {signal.get('recommendation')} "
+                            f"({', '.join(tier for tier, sent in tier_results.items() if sent)})"
+                        )
                     else:
                         discord_delivery_failures += 1
                         self.logger.warning(f"Failed to send Discord signal for {signal['pair']}")
-                        
-                except Exception as e:
-                    discord_delivery_failures += 1
-                    self.logger.error(f"Error sending signal to Discord for {signal['pair']}: {str(e)}")
             
-            # Update Discord delivery metrics
-            self.performance_metrics["signals_sent_to_discord"] += discord_signals_sent
-            total_attempts = discord_signals_sent + discord_delivery_failures
-            if total_attempts > 0:
-                success_rate = discord_signals_sent / total_attempts
-                self.performance_metrics["discord_delivery_success_rate"] = round(success_rate, 3)
+                # Update Discord delivery metrics
+                self.performance_metrics["signals_sent_to_discord"] += discord_signals_sent
+                total_attempts = discord_signals_sent + discord_delivery_failures
+                if total_attempts > 0:
+                    success_rate = discord_signals_sent / total_attempts
+                    self.performance_metrics["discord_delivery_success_rate"] = round(success_rate, 3)
             
-            self.logger.info(f"Discord delivery: {discord_signals_sent} sent, {discord_delivery_failures} failed")
+                self.logger.info(f"Discord delivery: {discord_signals_sent} sent, {discord_delivery_failures} failed")
             
-        except Exception as e:
-            self.logger.error(f"Error in Discord signal delivery: {str(e)}")
+            except Exception as e:
+                self.logger.error(f"Error in Discord signal delivery: {str(e)}")
 
     def _determine_signal_priority(self, signal: Dict) -> SignalPriority:
         """Determine signal priority based on Enhanced Daily Strategy analysis."""
@@ -355,6 +404,53 @@ class EnhancedDailyProductionService:
                 "error": str(e)
             }
 
+    @tracer.traced("scan_market")
+    async def scan_market(self) -> Dict:
+        """Fetch market data and build a market analysis without sending notifications."""
+        market_data = await self._fetch_market_data()
+        with tracer.span("scan_all_pairs", pairs=len(market_data)):
+            scan_results = await asyncio.get_running_loop().run_in_executor(
+                None, tracer.bind(self.strategy.scan_all_pairs), market_data
+            )
+        return await self.build_market_analysis(scan_results)
+
+    async def build_market_analysis(self, scan_results: Dict) -> Dict:
+        """
+        Build the market analysis payload from strategy scan results.
+
+        Unlike get_enhanced_market_analysis(), this does not fetch data or
+        deliver signals to Discord, so it is safe to call from the scheduler.
+        """
+        self._update_performance_metrics(scan_results)
+        signals = await self._convert_to_production_signals(scan_results)
+        session_analysis = self.strategy.session_manager.get_session_analysis()
+        portfolio_analysis = (
+            self.strategy.position_sizer.get_portfolio_risk_analysis()
+        )
+
+        return {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "market_status": {
+                "active_sessions": session_analysis["current_sessions"],
+                "major_overlap_active": session_analysis["major_overlap_active"],
+                "pairs_analyzed": scan_results.get("total_pairs_analyzed", 0),
+            },
+            "signals": signals,
+            "signal_count": len(signals),
+            "performance_metrics": dict(self.performance_metrics),
+            "session_analysis": session_analysis,
+            "portfolio_analysis": portfolio_analysis,
+            "phase1_status": {
+                "session_filtering": "ACTIVE",
+                "confluence_detection": "ACTIVE",
+                "dynamic_sizing": "ACTIVE",
+                "integration_status": "COMPLETE",
+            },
+            "recommendations": self._generate_market_recommendations(
+                signals, session_analysis
+            ),
+        }
+
     async def get_enhanced_market_analysis(self) -> Dict:
         """Get comprehensive market analysis with Phase 1 enhancements."""
         try:
@@ -366,7 +462,7 @@ class EnhancedDailyProductionService:
 
             # Get portfolio analysis (if we had current positions)
             portfolio_analysis = (
-                self.strategy.position_sizer.get_portfolio_risk_analysis({}, 10000)
+                self.strategy.position_sizer.get_portfolio_risk_analysis()
             )
 
             return {
@@ -5,21 +5,32 @@ Advanced Discord webhook management with tier-based routing and rich signal form
 Features:
 - Multi-tier webhook routing (Free, Premium, Whale, Alpha)
 - Enhanced signal embeds with Phase 1 strategy details
-- Rate limiting and error handling
+- Multi-embed packing: one scan's signals go out in the fewest messages per tier
+- Shared tier routing rules (TIER_THRESHOLDS / determine_target_tiers)
+- Token-bucket rate limiting per tier and error handling
 - Signal delivery tracking
 - Performance monitoring integration
+- Queued delivery over a shared session (see discord_delivery_service)
 """
 
 import asyncio
-import aiohttp
 import logging
 import os
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from enum import Enum
 
 from models.signal_models import TradingSignal, NotificationPayload
 from config.settings import get_settings
+from services.discord_delivery_service import get_discord_delivery_service
+from services.rate_limiter_service import get_rate_limiter_service
+from services.discord_embed_packer import pack_embeds, MAX_CONTENT_LENGTH
+from services.metrics_service import get_metrics_registry
+
+CACHE_REQUESTS = get_metrics_registry().counter(
+    "cache_requests_total", "Cache lookups by cache and result", ["cache", "result"]
+)
 
 
 class UserTier(Enum):
@@ -38,12 +49,65 @@ class SignalPriority(Enum):
     CRITICAL = "critical"
 
 
+# Minimum signal quality for each tier's channel
+TIER_THRESHOLDS = {
+    UserTier.FREE: {
+        "min_confidence": 0.5,
+        "min_confluence": 0.0,
+        "allowed_pairs": ["USD_JPY", "EUR_USD", "GBP_USD"]  # Limited pairs
+    },
+    UserTier.PREMIUM: {
+        "min_confidence": 0.6,
+        "min_confluence": 0.5,
+        "allowed_pairs": None  # All pairs
+    },
+    UserTier.WHALE: {
+        "min_confidence": 0.7,
+        "min_confluence": 0.8,
+        "allowed_pairs": None  # All pairs with priority
+    },
+    UserTier.ALPHA: {
+        "min_confidence": 0.8,
+        "min_confluence": 1.0,
+        "allowed_pairs": None  # All signals first
+    }
+}
+
+
+def determine_target_tiers(
+    signal_data: Dict[str, Any], thresholds: Optional[Dict[UserTier, Dict[str, Any]]] = None
+) -> List[UserTier]:
+    """Tiers that should receive a strategy analysis (uses trade_recommendation and confluence_score)."""
+    target_tiers = []
+    
+    pair = signal_data.get("pair", "")
+    confidence = signal_data.get("trade_recommendation", {}).get("confidence", 0.0)
+    confluence_score = signal_data.get("confluence_score", 0.0)
+    
+    for tier, tier_thresholds in (thresholds or TIER_THRESHOLDS).items():
+        if confidence < tier_thresholds["min_confidence"]:
+            continue
+        if confluence_score < tier_thresholds["min_confluence"]:
+            continue
+        if tier_thresholds["allowed_pairs"] and pair not in tier_thresholds["allowed_pairs"]:
+            continue
+        target_tiers.append(tier)
+    
+    # Ensure at least FREE tier gets decent signals
+    if not target_tiers and confidence >= 0.6:
+        target_tiers.append(UserTier.FREE)
+    
+    return target_tiers
+
+
 class EnhancedDiscordService:
     """Enhanced Discord service with multi-tier support and rich formatting."""
 
     def __init__(self):
         self.settings = get_settings()
         self.logger = logging.getLogger(__name__)
+        self.delivery_service = get_discord_delivery_service()
+        self.rate_limiter = get_rate_limiter_service()
         
         # Webhook configurations for different tiers
         self.webhook_configs = {
@@ -89,8 +153,20 @@ class EnhancedDiscordService:
             "brand_color": int(os.getenv("DISCORD_BRAND_COLOR", "0x1DB954"), 16)
         }
         
-        # Rate limiting tracking
-        self.rate_limits = {}
+        # Per-tier token buckets: burst of one hour's quota, refilled continuously
+        self.tier_buckets = {
+            tier: self.rate_limiter.get_bucket(
+                f"discord_tier_{tier.value}",
+                capacity=config["rate_limit"],
+                refill_per_second=config["rate_limit"] / 3600.0,
+            )
+            for tier, config in self.webhook_configs.items()
+        }
+        
+        # Tier-neutral embed parts, rendered once per signal and reused across tiers
+        self.embed_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self.embed_cache_size = 256
+        self.embed_cache_stats = {"hits": 0, "misses": 0}
         
         # Delivery tracking
         self.delivery_stats = {
@@ -164,6 +240,35 @@ class EnhancedDiscordService:
         priority: SignalPriority
     ) -> Dict[str, Any]:
         """Create rich Discord embed for enhanced signal."""
+        base = self._get_base_signal_embed(signal_data)
+        return self._apply_tier_overlay(base, signal_data, user_tier, priority)
+
+    def _get_signal_cache_key(self, signal_data: Dict[str, Any]) -> tuple:
+        """Identify a signal for embed caching."""
+        return (
+            signal_data.get("pair"),
+            signal_data.get("timestamp"),
+            signal_data.get("direction") or signal_data.get("signal"),
+            signal_data.get("entry_price", signal_data.get("current_price")),
+        )
+
+    def _get_base_signal_embed(self, signal_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the tier-neutral part of a signal embed, rendering it once per signal.
+
+        The result is shared across tiers and must not be mutated; tier-specific
+        parts are added by _apply_tier_overlay.
+        """
+        cache_key = self._get_signal_cache_key(signal_data)
+        cached = self.embed_cache.get(cache_key)
+        if cached is not None:
+            self.embed_cache.move_to_end(cache_key)
+            self.embed_cache_stats["hits"] += 1
+            CACHE_REQUESTS.inc("discord_embeds", "hit")
+            return cached
+        
+        self.embed_cache_stats["misses"] += 1
+        CACHE_REQUESTS.inc("discord_embeds", "miss")
         
         # Handle both V2 format and legacy format
         trade_rec = signal_data.get("trade_recommendation", {})
@@ -181,22 +286,6 @@ class EnhancedDiscordService:
             
         confidence = trade_rec.get("confidence", signal_data.get("confidence", 0.0))
         
-        # Determine embed color based on signal direction and priority
-        if signal_direction == "LONG":
-            base_color = 0x00FF00  # Green
-        elif signal_direction == "SHORT":
-            base_color = 0xFF0000  # Red
-        else:
-            base_color = self.webhook_configs[user_tier]["color"]
-        
-        # Adjust color intensity based on priority
-        if priority == SignalPriority.CRITICAL:
-            color = base_color
-        elif priority == SignalPriority.HIGH:
-            color = base_color
-        else:
-            color = self.webhook_configs[user_tier]["color"]
-        
         # Build embed fields
         fields = []
         
@@ -267,6 +356,58 @@ class EnhancedDiscordService:
             "inline": True
         })
         
+        # Strategy information
+        strategy_field_value = "Enhanced Daily Strategy (Phase 1)"
+        if phase1_data:
+            enhancements = []
+            if phase1_data.get("session_filter_active"):
+                enhancements.append("📅 Session Filter")
+            if phase1_data.get("confluence_detected"):
+                enhancements.append("🎯 Confluence")
+            if phase1_data.get("dynamic_sizing_applied"):
+                enhancements.append("⚖️ Dynamic Sizing")
+            
+            if enhancements:
+                strategy_field_value += f"\n{' • '.join(enhancements)}"
+        
+        base = {
+            "direction": signal_direction,
+            "fields": fields,
+            "strategy_field": {
+                "name": "🤖 Strategy",
+                "value": strategy_field_value,
+                "inline": False
+            },
+            "title": f"{self._get_direction_emoji(signal_direction)} {signal_direction} Signal - {signal_data.get('pair')}",
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        }
+        
+        self.embed_cache[cache_key] = base
+        if len(self.embed_cache) > self.embed_cache_size:
+            self.embed_cache.popitem(last=False)
+        
+        return base
+
+    def _apply_tier_overlay(
+        self,
+        base: Dict[str, Any],
+        signal_data: Dict[str, Any],
+        user_tier: UserTier,
+        priority: SignalPriority
+    ) -> Dict[str, Any]:
+        """Build the final embed from a cached base plus tier/priority details."""
+        signal_direction = base["direction"]
+        
+        # Strong colours for high priority signals, tier colour otherwise
+        if priority in (SignalPriority.CRITICAL, SignalPriority.HIGH) and signal_direction == "LONG":
+            color = 0x00FF00  # Green
+        elif priority in (SignalPriority.CRITICAL, SignalPriority.HIGH) and signal_direction == "SHORT":
+            color = 0xFF0000  # Red
+        else:
+            color = self.webhook_configs[user_tier]["color"]
+        
+        fields = list(base["fields"])
+        
         # Position sizing (if available)
         position_sizing = signal_data.get("position_sizing")
         if position_sizing and user_tier in [UserTier.PREMIUM, UserTier.WHALE, UserTier.ALPHA]:
@@ -285,33 +426,14 @@ class EnhancedDiscordService:
                 }
             ])
         
-        # Strategy information
-        strategy_field_value = "Enhanced Daily Strategy (Phase 1)"
-        if phase1_data:
-            enhancements = []
-            if phase1_data.get("session_filter_active"):
-                enhancements.append("📅 Session Filter")
-            if phase1_data.get("confluence_detected"):
-                enhancements.append("🎯 Confluence")
-            if phase1_data.get("dynamic_sizing_applied"):
-                enhancements.append("⚖️ Dynamic Sizing")
-            
-            if enhancements:
-                strategy_field_value += f"\n{' • '.join(enhancements)}"
-        
-        fields.append({
-            "name": "🤖 Strategy",
-            "value": strategy_field_value,
-            "inline": False
-        })
+        fields.append(base["strategy_field"])
         
-        # Create embed
-        embed = {
-            "title": f"{self._get_direction_emoji(signal_direction)} {signal_direction} Signal - {signal_data.get('pair')}",
+        return {
+            "title": base["title"],
             "description": self._get_signal_description(signal_data, user_tier),
             "color": color,
             "fields": fields,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": base["timestamp"],
             "footer": {
                 "text": f"4ex.ninja • {user_tier.value.title()} Tier • {priority.value.title()} Priority",
                 "icon_url": self.branding["footer_icon_url"]
@@ -320,8 +442,6 @@ class EnhancedDiscordService:
                 "url": self.branding["avatar_url"]
             }
         }
-        
-        return embed
 
     def _get_signal_description(self, signal_data: Dict[str, Any], user_tier: UserTier) -> str:
         """Get appropriate signal description based on user tier."""
@@ -342,14 +462,7 @@ class EnhancedDiscordService:
     def _get_signal_content_message(self, signal_data: Dict[str, Any], priority: SignalPriority) -> str:
         """Get content message for signal notification."""
         
-        priority_emoji = {
-            SignalPriority.CRITICAL: "🚨🚨🚨",
-            SignalPriority.HIGH: "🚨🚨",
-            SignalPriority.MEDIUM: "🚨",
-            SignalPriority.LOW: "📢"
-        }
-        
-        emoji = priority_emoji.get(priority, "📢")
+        emoji = self._get_priority_emoji(priority)
         direction = (
             signal_data.get("direction") or  # V2 format
             signal_data.get("trade_recommendation", {}).get("signal_direction") or  # Legacy format
@@ -365,6 +478,15 @@ class EnhancedDiscordService:
         
         return f"{emoji} **{direction} {pair}** - Enhanced Daily Strategy Signal"
 
+    def _get_priority_emoji(self, priority: SignalPriority) -> str:
+        """Get alert emoji for signal priority."""
+        return {
+            SignalPriority.CRITICAL: "🚨🚨🚨",
+            SignalPriority.HIGH: "🚨🚨",
+            SignalPriority.MEDIUM: "🚨",
+            SignalPriority.LOW: "📢"
+        }.get(priority, "📢")
+
     def _get_direction_emoji(self, direction: str) -> str:
         """Get emoji for signal direction."""
         return {
@@ -374,6 +496,138 @@ class EnhancedDiscordService:
             "SELL": "🔴"
         }.get(direction, "📊")
 
+    async def send_packed_signals(
+        self,
+        signals: List[Tuple[Dict[str, Any], SignalPriority]],
+        user_tier: UserTier = UserTier.FREE
+    ) -> List[bool]:
+        """
+        Send several signals to one tier using as few webhook messages as possible.
+        
+        Each signal keeps its own embed; embeds are packed up to Discord's
+        per-message embed count and size limits.
+        
+        Args:
+            signals: (signal_data, priority) pairs, in delivery order
+            user_tier: User subscription tier
+            
+        Returns:
+            Per-signal delivery results, in input order
+        """
+        results = [False] * len(signals)
+        if not signals:
+            return results
+        
+        webhook_config = self.webhook_configs.get(user_tier)
+        if not webhook_config or not webhook_config["url"]:
+            self.logger.warning(f"No webhook configured for tier: {user_tier.value}")
+            return results
+        
+        # Rate limits apply per signal, not per message
+        accepted = []
+        for index, (signal_data, priority) in enumerate(signals):
+            if self._check_rate_limit(user_tier):
+                accepted.append(index)
+            else:
+                self.logger.warning(f"Rate limit exceeded for tier: {user_tier.value} ({signal_data.get('pair')})")
+                self._update_delivery_stats(user_tier, False)
+        
+        if not accepted:
+            return results
+        
+        try:
+            embeds = [
+                self._create_enhanced_signal_embed(signals[i][0], user_tier, signals[i][1])
+                for i in accepted
+            ]
+        except Exception as e:
+            self.logger.error(f"Error building packed signal embeds: {str(e)}")
+            for _ in accepted:
+                self._update_delivery_stats(user_tier, False)
+            return results
+        
+        messages = pack_embeds(embeds)
+        payloads = []
+        for packed_indices, packed_embeds in messages:
+            message_signals = [signals[accepted[i]] for i in packed_indices]
+            payloads.append({
+                "content": self._get_packed_content_message(message_signals),
+                "embeds": packed_embeds,
+                "username": f"4ex.ninja {webhook_config['name']}",
+                "avatar_url": self.branding["avatar_url"]
+            })
+        
+        # Messages to one webhook are delivered in order by the delivery queue
+        send_results = await asyncio.gather(
+            *(self._send_webhook(webhook_config["url"], payload) for payload in payloads),
+            return_exceptions=True
+        )
+        
+        for (packed_indices, _), success in zip(messages, send_results):
+            if isinstance(success, Exception):
+                self.logger.error(f"Error sending packed signals: {str(success)}")
+                success = False
+            for i in packed_indices:
+                results[accepted[i]] = success
+                self._update_delivery_stats(user_tier, success)
+        
+        self.logger.info(
+            f"Packed {len(accepted)} signals into {len(messages)} message(s) for {user_tier.value} tier"
+        )
+        return results
+
+    async def send_packed_signals_by_tier(
+        self,
+        signals: List[Tuple[Dict[str, Any], SignalPriority, List[UserTier]]]
+    ) -> List[Dict[str, bool]]:
+        """
+        Pack one scan's signals per tier and deliver the tiers concurrently.
+        
+        Args:
+            signals: (signal_data, priority, target_tiers) triples, in delivery order
+            
+        Returns:
+            Per-signal {tier value: delivered}, in input order
+        """
+        tier_batches: Dict[UserTier, List[int]] = {}
+        for index, (_, _, target_tiers) in enumerate(signals):
+            for tier in target_tiers:
+                tier_batches.setdefault(tier, []).append(index)
+        
+        batch_results = await asyncio.gather(
+            *(
+                self.send_packed_signals([signals[i][:2] for i in indices], tier)
+                for tier, indices in tier_batches.items()
+            ),
+            return_exceptions=True
+        )
+        
+        results: List[Dict[str, bool]] = [{} for _ in signals]
+        for (tier, indices), tier_results in zip(tier_batches.items(), batch_results):
+            if isinstance(tier_results, Exception):
+                self.logger.error(f"Error sending packed signals to {tier.value} tier: {str(tier_results)}")
+                tier_results = [False] * len(indices)
+            for index, result in zip(indices, tier_results):
+                results[index][tier.value] = result
+        return results
+
+    def _get_packed_content_message(self, signals: List[Tuple[Dict[str, Any], SignalPriority]]) -> str:
+        """Get content message for a packed multi-signal notification."""
+        if len(signals) == 1:
+            signal_data, priority = signals[0]
+            return self._get_signal_content_message(signal_data, priority)
+        
+        # Lead with the most urgent signal's alert emoji
+        priority_order = [SignalPriority.CRITICAL, SignalPriority.HIGH, SignalPriority.MEDIUM, SignalPriority.LOW]
+        top_priority = min((p for _, p in signals), key=priority_order.index)
+        emoji = self._get_priority_emoji(top_priority)
+        
+        pairs = ", ".join(signal_data.get("pair", "UNKNOWN") for signal_data, _ in signals)
+        content = f"{emoji} **{len(signals)} Enhanced Daily Strategy Signals** - {pairs}"
+        if len(content) > MAX_CONTENT_LENGTH:
+            content = content[:MAX_CONTENT_LENGTH - 1] + "…"
+        return content
+
     async def send_batch_enhanced_signals(
         self, 
         signals_data: List[Dict[str, Any]], 
@@ -600,22 +854,11 @@ class EnhancedDiscordService:
         return await self._send_webhook(webhook_url, payload)
 
     def _check_rate_limit(self, user_tier: UserTier) -> bool:
-        """Check if user tier is within rate limits."""
-        # Simplified rate limiting - in production, implement proper time-based limits
-        config = self.webhook_configs.get(user_tier, {})
-        limit = config.get("rate_limit", 10)
-        
-        current_hour = datetime.now().hour
-        tier_key = f"{user_tier.value}_{current_hour}"
-        
-        if tier_key not in self.rate_limits:
-            self.rate_limits[tier_key] = 0
-        
-        if self.rate_limits[tier_key] >= limit:
-            return False
-        
-        self.rate_limits[tier_key] += 1
-        return True
+        """Take a token from the tier bucket; rejects immediately when empty."""
+        bucket = self.tier_buckets.get(user_tier)
+        if bucket is None:
+            return True
+        return bucket.try_acquire()
 
     def _update_delivery_stats(self, user_tier: UserTier, success: bool):
         """Update delivery statistics."""
@@ -630,28 +873,9 @@ class EnhancedDiscordService:
             self.delivery_stats["by_tier"][user_tier.value]["failed"] += 1
 
     async def _send_webhook(self, webhook_url: str, payload: Dict[str, Any]) -> bool:
-        """Send payload to Discord webhook with error handling."""
+        """Send payload to Discord webhook through the shared delivery queue."""
         try:
-            import ssl
-            # Create SSL context for Discord API
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=10)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.post(webhook_url, json=payload) as response:
-                    if response.status == 204:
-                        return True
-                    else:
-                        self.logger.error(f"Discord webhook failed with status {response.status}")
-                        return False
-                        
-        except asyncio.TimeoutError:
-            self.logger.error("Discord webhook timeout")
-            return False
+            return await self.delivery_service.deliver(webhook_url, payload)
         except Exception as e:
             self.logger.error(f"Discord webhook error: {str(e)}")
             return False
@@ -666,7 +890,12 @@ class EnhancedDiscordService:
             "successful_deliveries": self.delivery_stats["successful_deliveries"],
             "failed_deliveries": self.delivery_stats["failed_deliveries"],
             "success_rate": round(success_rate, 2),
-            "by_tier": self.delivery_stats["by_tier"]
+            "by_tier": self.delivery_stats["by_tier"],
+            "embed_cache": {**self.embed_cache_stats, "size": len(self.embed_cache)},
+            "delivery_queue": self.delivery_service.get_queue_metrics(),
+            "tier_rate_limits": {
+                tier.value: bucket.get_stats() for tier, bucket in self.tier_buckets.items()
+            }
         }
 
     async def test_all_webhooks(self) -> Dict[str, bool]:
@@ -0,0 +1,566 @@
+"""
+Execution Service
+Places and tracks OANDA orders for live trading.
+
+Features:
+- One pooled aiohttp session for every order and account request
+- Client order IDs (clientExtensions.id) derived from the signal, so a retried
+  or re-submitted order never opens a second position
+- Stop-loss and take-profit attached to the fill (stopLossOnFill/takeProfitOnFill)
+- Retries on timeouts, 5xx and 429; ambiguous failures look the order up by
+  client ID before resubmitting
+- Cached account balance/NAV kept current by the transaction stream instead of
+  a REST call per order
+- Order round-trip latency histogram
+- Transaction listeners (e.g. the position book) fed from order responses and the
+  stream, each transaction delivered once
+"""
+
+import asyncio
+import hashlib
+import logging
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from config.settings import EXECUTION_SETTINGS, PRICING_STREAM_SETTINGS
+from services.json_codec import loads
+from services.metrics_service import get_metrics_registry
+
+metrics = get_metrics_registry()
+ORDER_ROUND_TRIP_SECONDS = metrics.histogram(
+    "order_round_trip_seconds", "Order submission to final OANDA response, including retries", ["status"]
+)
+ACCOUNT_REFRESHES = metrics.counter(
+    "account_refreshes_total", "Account summary fetches by trigger", ["trigger"]
+)
+
+# Transactions after which balance, margin or open trades have changed
+_ACCOUNT_CHANGING_TRANSACTIONS = {
+    "ORDER_FILL",
+    "TRANSFER_FUNDS",
+    "DAILY_FINANCING",
+    "DIVIDEND_ADJUSTMENT",
+    "MARGIN_CALL_ENTER",
+    "MARGIN_CALL_EXIT",
+}
+
+# Recent transaction IDs remembered to drop a fill seen in both the order response and the stream
+_SEEN_TRANSACTIONS_LIMIT = 1000
+
+
+class OrderError(Exception):
+    """Raised when an order request cannot be sent at all (e.g. not configured)."""
+
+
+@dataclass
+class OrderResult:
+    """Outcome of one order submission."""
+
+    client_order_id: str
+    instrument: str
+    units: int
+    status: str  # FILLED, PENDING, CANCELLED, REJECTED or FAILED
+    order_id: Optional[str] = None
+    trade_id: Optional[str] = None
+    price: Optional[float] = None
+    reason: Optional[str] = None
+    attempts: int = 0
+    recovered: bool = False  # Found by client ID after an ambiguous failure
+    latency_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("FILLED", "PENDING")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class AccountState:
+    """Cached OANDA account summary."""
+
+    balance: float
+    nav: float
+    unrealized_pl: float
+    margin_used: float
+    margin_available: float
+    open_trade_count: int
+    currency: str
+    last_transaction_id: str
+    refreshed_at: float = field(default_factory=time.monotonic)
+
+    def age(self) -> float:
+        return time.monotonic() - self.refreshed_at
+
+
+def make_client_order_id(signal: Dict[str, Any]) -> str:
+    """
+    Deterministic client order ID for a signal.
+
+    The same signal always maps to the same ID, so submitting it twice (a retry,
+    a restart mid-order) is rejected by OANDA instead of opening a second trade.
+    """
+    # The bar time (set by the live engine) survives restarts; the generation time does not
+    moment = _utc_isoformat(signal.get("candle_time") or signal.get("timestamp"))
+    key = "|".join(str(part) for part in (signal.get("pair"), signal.get("signal"), moment, signal.get("entry_price")))
+    digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+    return f"{EXECUTION_SETTINGS['client_order_prefix']}-{signal.get('pair')}-{digest}"
+
+
+def _utc_isoformat(moment: Any) -> Any:
+    """ISO timestamp in UTC, so naive (PriceData) and tz-aware (Bar) times give the same ID."""
+    if isinstance(moment, str):
+        try:
+            moment = datetime.fromisoformat(moment.replace("Z", "+00:00"))
+        except ValueError:
+            return moment
+    if isinstance(moment, datetime):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)  # OANDA candle times are UTC
+        return moment.astimezone(timezone.utc).isoformat()
+    return moment
+
+
+def _format_price(instrument: str, price: float) -> str:
+    return f"{price:.3f}" if instrument.endswith("JPY") else f"{price:.5f}"
+
+
+class OandaExecutionService:
+    """Order placement and account state over one persistent OANDA session."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.data_service = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._account: Optional[AccountState] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._stream_task: Optional[asyncio.Task] = None
+        self.stream_connected = False
+        self.transaction_listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.reconnect_listeners: List[Callable[[], None]] = []  # Called when the stream (re)connects
+        self._seen_transactions: "OrderedDict[str, None]" = OrderedDict()
+
+        self.execution_stats = {
+            "orders_submitted": 0,
+            "orders_filled": 0,
+            "orders_pending": 0,
+            "orders_rejected": 0,
+            "orders_failed": 0,
+            "orders_recovered": 0,
+            "retries": 0,
+            "account_refreshes": 0,
+            "transactions": 0,
+            "stream_reconnects": 0,
+            "last_order": None,
+            "last_error": None,
+        }
+
+    def set_data_service(self, data_service) -> None:
+        """Set the DataService providing credentials, URLs and the OANDA rate limiter."""
+        self.data_service = data_service
+
+    @property
+    def account_url(self) -> str:
+        return f"{self.data_service.base_url}/v3/accounts/{self.data_service.account_id}"
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                ssl=self.data_service.ssl_context, limit=EXECUTION_SETTINGS["connection_limit"]
+            )
+            timeout = aiohttp.ClientTimeout(total=EXECUTION_SETTINGS["request_timeout_seconds"])
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=timeout, headers=self.data_service.headers
+            )
+        return self._session
+
+    async def start(self) -> None:
+        """Load the account and follow the transaction stream."""
+        if self.data_service is None or not self.data_service.api_key:
+            raise OrderError("No OANDA API key configured")
+        await self.refresh_account("startup")
+        if EXECUTION_SETTINGS["transaction_stream"] and self._stream_task is None:
+            self._stream_task = asyncio.get_running_loop().create_task(self._transaction_loop())
+
+    async def close(self) -> None:
+        """Stop the transaction stream and close the shared session."""
+        for task in (self._stream_task, self._refresh_task):
+            if task is not None:
+                task.cancel()
+        await asyncio.gather(
+            *(t for t in (self._stream_task, self._refresh_task) if t is not None),
+            return_exceptions=True,
+        )
+        self._stream_task = self._refresh_task = None
+        self.stream_connected = False
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _request(
+        self, method: str, path: str, **kwargs
+    ) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """
+        Send one request through the shared session and OANDA rate limiter.
+
+        A body that is not JSON (e.g. an HTML error page from a proxy) raises
+        aiohttp.ClientPayloadError, so callers retry it like a dropped connection.
+        """
+        if self.data_service is None or not self.data_service.api_key:
+            raise OrderError("No OANDA API key configured")
+        await self.data_service._acquire_oanda_token()
+        session = await self._get_session()
+        async with session.request(method, self.account_url + path, **kwargs) as response:
+            body = await response.read()
+            try:
+                data = loads(body) if body else {}
+            except ValueError:
+                raise aiohttp.ClientPayloadError(
+                    f"HTTP {response.status}: undecodable response body {body[:100]!r}"
+                )
+            return response.status, data, dict(response.headers)
+
+    # Account ------------------------------------------------------------
+
+    async def get_account_state(self, max_age: Optional[float] = None) -> AccountState:
+        """
+        Get the cached account state, refetching only when it is too old.
+
+        While the transaction stream is connected the cache is refreshed as
+        transactions arrive, so it never expires on age alone.
+        """
+        state = self._account
+        max_age = EXECUTION_SETTINGS["account_max_age_seconds"] if max_age is None else max_age
+        if state is not None and (self.stream_connected or state.age() <= max_age):
+            return state
+        return await self.refresh_account("expired")
+
+    async def refresh_account(self, trigger: str = "manual") -> AccountState:
+        """Fetch the account summary (concurrent callers share one request)."""
+        task = self._refresh_task
+        if task is None or task.done():
+            task = asyncio.get_running_loop().create_task(self._fetch_account(trigger))
+            self._refresh_task = task
+        return await asyncio.shield(task)
+
+    async def _fetch_account(self, trigger: str) -> AccountState:
+        status, data, _ = await self._request("GET", "/summary")
+        if status != 200:
+            raise OrderError(f"Account summary failed: HTTP {status} {data.get('errorMessage', '')}")
+
+        account = data["account"]
+        self._account = AccountState(
+            balance=float(account["balance"]),
+            nav=float(account["NAV"]),
+            unrealized_pl=float(account["unrealizedPL"]),
+            margin_used=float(account["marginUsed"]),
+            margin_available=float(account["marginAvailable"]),
+            open_trade_count=int(account["openTradeCount"]),
+            currency=account.get("currency", "USD"),
+            last_transaction_id=str(data.get("lastTransactionID", account.get("lastTransactionID", ""))),
+        )
+        self.execution_stats["account_refreshes"] += 1
+        ACCOUNT_REFRESHES.inc(trigger)
+        return self._account
+
+    def _apply_transaction(self, transaction: Dict[str, Any]) -> None:
+        """Update the cached balance from a transaction and refresh the rest in the background."""
+        transaction_id = str(transaction.get("id") or "")
+        if transaction_id:
+            # A fill arrives in the order response and again on the stream
+            if transaction_id in self._seen_transactions:
+                return
+            self._seen_transactions[transaction_id] = None
+            if len(self._seen_transactions) > _SEEN_TRANSACTIONS_LIMIT:
+                self._seen_transactions.popitem(last=False)
+
+        for listener in self.transaction_listeners:
+            try:
+                listener(transaction)
+            except Exception as e:
+                self.logger.error(f"❌ Transaction listener failed: {str(e)}")
+
+        state = self._account
+        if state is None:
+            return
+        if "accountBalance" in transaction:
+            balance = float(transaction["accountBalance"])
+            state.nav += balance - state.balance  # Realized P/L and funding move NAV too
+            state.balance = balance
+        if transaction.get("id"):
+            state.last_transaction_id = str(transaction["id"])
+
+        if transaction.get("type") in _ACCOUNT_CHANGING_TRANSACTIONS:
+            task = self._refresh_task
+            if task is None or task.done():
+                self._refresh_task = asyncio.get_running_loop().create_task(
+                    self._fetch_account("transaction")
+                )
+                self._refresh_task.add_done_callback(self._log_refresh_failure)
+
+    def _log_refresh_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.execution_stats["last_error"] = str(task.exception())
+            self.logger.warning(f"⚠️ Background account refresh failed: {task.exception()}")
+
+    async def _transaction_loop(self) -> None:
+        delay = PRICING_STREAM_SETTINGS["reconnect_initial_seconds"]
+        while True:
+            received_before = self.execution_stats["transactions"]
+            try:
+                await self._follow_transactions()
+                self.execution_stats["last_error"] = "transaction stream closed by server"
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                self.execution_stats["last_error"] = "transaction stream heartbeat timeout"
+            except Exception as e:
+                self.execution_stats["last_error"] = str(e) or type(e).__name__
+            finally:
+                self.stream_connected = False
+
+            if self.execution_stats["transactions"] > received_before:
+                delay = PRICING_STREAM_SETTINGS["reconnect_initial_seconds"]
+            self.execution_stats["stream_reconnects"] += 1
+            wait = random.uniform(delay / 2, delay)
+            self.logger.warning(
+                f"⚠️ Transaction stream disconnected ({self.execution_stats['last_error']}) - "
+                f"reconnecting in {wait:.1f}s"
+            )
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, PRICING_STREAM_SETTINGS["reconnect_max_seconds"])
+
+    async def _follow_transactions(self) -> None:
+        data_service = self.data_service
+        url = f"{data_service.stream_url}/v3/accounts/{data_service.account_id}/transactions/stream"
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=PRICING_STREAM_SETTINGS["heartbeat_timeout_seconds"],
+            sock_read=PRICING_STREAM_SETTINGS["heartbeat_timeout_seconds"],
+        )
+        session = await self._get_session()
+        async with session.get(url, timeout=timeout) as response:
+            if response.status != 200:
+                body = await response.text()
+                raise RuntimeError(f"HTTP {response.status}: {body[:200]}")
+
+            self.stream_connected = True
+            # Catch anything that happened while disconnected
+            await self.refresh_account("reconnect")
+            for listener in self.reconnect_listeners:
+                listener()
+            async for line in response.content:
+                if not line.strip():
+                    continue
+                transaction = loads(line)
+                self.execution_stats["transactions"] += 1
+                if transaction.get("type") != "HEARTBEAT":
+                    self._apply_transaction(transaction)
+
+    # Orders -------------------------------------------------------------
+
+    async def place_market_order(
+        self,
+        instrument: str,
+        units: int,
+        stop_loss: Optional[float] = None,
+        take_profit: Optional[float] = None,
+        client_order_id: Optional[str] = None,
+        tag: str = "4ex-ninja",
+    ) -> OrderResult:
+        """
+        Place a MARKET order with optional SL/TP attached to the fill.
+
+        Args:
+            instrument: OANDA instrument (e.g. "EUR_USD")
+            units: Signed units (positive buys, negative sells)
+            stop_loss: Stop-loss price
+            take_profit: Take-profit price
+            client_order_id: Idempotency key (see make_client_order_id); random if omitted
+            tag: clientExtensions tag
+
+        Returns:
+            OrderResult; never raises for OANDA-side failures
+        """
+        client_order_id = client_order_id or f"{EXECUTION_SETTINGS['client_order_prefix']}-{uuid.uuid4().hex[:20]}"
+        extensions = {"id": client_order_id, "tag": tag}
+        order: Dict[str, Any] = {
+            "type": "MARKET",
+            "instrument": instrument,
+            "units": str(int(units)),
+            "timeInForce": "FOK",
+            "positionFill": "DEFAULT",
+            "clientExtensions": extensions,
+            "tradeClientExtensions": extensions,
+        }
+        if stop_loss is not None:
+            order["stopLossOnFill"] = {"price": _format_price(instrument, stop_loss), "timeInForce": "GTC"}
+        if take_profit is not None:
+            order["takeProfitOnFill"] = {"price": _format_price(instrument, take_profit), "timeInForce": "GTC"}
+
+        result = OrderResult(client_order_id, instrument, int(units), "FAILED")
+        started = time.perf_counter()
+        self.execution_stats["orders_submitted"] += 1
+        backoff = EXECUTION_SETTINGS["retry_backoff_seconds"]
+
+        while True:
+            result.attempts += 1
+            retry_after = None
+            try:
+                status, data, headers = await self._request("POST", "/orders", json={"order": order})
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status, data, headers = None, {}, {}
+                result.reason = str(e) or type(e).__name__
+
+            if status in (200, 201):
+                self._apply_create_response(result, data)
+                break
+            if status == 400 and self._reject_reason(data) == "CLIENT_ORDER_ID_ALREADY_EXISTS":
+                # An earlier attempt (or an earlier run) already placed this order
+                await self._recover_by_client_id(result)
+                break
+            if status is not None and status < 500 and status != 429:
+                result.status = "REJECTED"
+                result.reason = self._reject_reason(data) or f"HTTP {status}"
+                break
+
+            if status == 429:
+                retry_after = float(headers.get("Retry-After", backoff))
+            elif status is not None:
+                result.reason = f"HTTP {status}: {data.get('errorMessage', '')}"
+            if status is None or status >= 500:
+                # The order may have reached OANDA before the failure
+                if await self._recover_by_client_id(result):
+                    break
+
+            if result.attempts > EXECUTION_SETTINGS["max_retries"]:
+                result.status = "FAILED"
+                break
+            self.execution_stats["retries"] += 1
+            await asyncio.sleep(retry_after if retry_after is not None else backoff)
+            backoff *= 2
+
+        elapsed = time.perf_counter() - started
+        result.latency_ms = round(elapsed * 1000, 2)
+        ORDER_ROUND_TRIP_SECONDS.observe(elapsed, result.status)
+        self._count_result(result)
+        return result
+
+    @staticmethod
+    def _reject_reason(data: Dict[str, Any]) -> Optional[str]:
+        reject = data.get("orderRejectTransaction") or {}
+        return reject.get("rejectReason") or data.get("errorCode") or data.get("errorMessage")
+
+    def _apply_create_response(self, result: OrderResult, data: Dict[str, Any]) -> None:
+        create = data.get("orderCreateTransaction") or {}
+        result.order_id = create.get("id")
+        fill = data.get("orderFillTransaction")
+        cancel = data.get("orderCancelTransaction")
+        if fill:
+            result.status = "FILLED"
+            result.price = float(fill["price"]) if fill.get("price") else None
+            result.trade_id = (fill.get("tradeOpened") or {}).get("tradeID")
+            self._apply_transaction(fill)
+        elif cancel:
+            result.status = "CANCELLED"
+            result.reason = cancel.get("reason")
+        else:
+            result.status = "PENDING"
+
+    async def _recover_by_client_id(self, result: OrderResult) -> bool:
+        """Look an order up by client ID; fills `result` and returns True if it exists."""
+        try:
+            status, data, _ = await self._request("GET", f"/orders/@{result.client_order_id}")
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+        if status != 200:
+            return False
+
+        order = data["order"]
+        result.recovered = True
+        result.order_id = order.get("id")
+        result.status = {"FILLED": "FILLED", "PENDING": "PENDING", "CANCELLED": "CANCELLED"}.get(
+            order.get("state"), "FAILED"
+        )
+        result.trade_id = order.get("tradeOpenedID")
+        if result.trade_id:
+            status, data, _ = await self._request("GET", f"/trades/{result.trade_id}")
+            if status == 200:
+                result.price = float(data["trade"]["price"])
+        result.reason = None
+        return True
+
+    def _count_result(self, result: OrderResult) -> None:
+        key = {
+            "FILLED": "orders_filled",
+            "PENDING": "orders_pending",
+            "REJECTED": "orders_rejected",
+            "CANCELLED": "orders_rejected",
+        }.get(result.status, "orders_failed")
+        self.execution_stats[key] += 1
+        if result.recovered:
+            self.execution_stats["orders_recovered"] += 1
+        self.execution_stats["last_order"] = datetime.utcnow().isoformat()
+
+        log = self.logger.info if result.ok else self.logger.warning
+        log(
+            f"📝 {result.instrument} {result.units:+d} {result.status} "
+            f"({result.client_order_id}, {result.attempts} attempt(s), {result.latency_ms:.0f}ms)"
+            + (f" - {result.reason}" if result.reason else "")
+        )
+
+    async def get_open_trades(self) -> Tuple[List[Dict[str, Any]], str]:
+        """Open trades and the last transaction ID they reflect."""
+        status, data, _ = await self._request("GET", "/openTrades")
+        if status != 200:
+            raise OrderError(f"Open trades fetch failed: HTTP {status} {data.get('errorMessage', '')}")
+        return data.get("trades", []), str(data.get("lastTransactionID", ""))
+
+    async def get_transactions_since(self, transaction_id: str) -> List[Dict[str, Any]]:
+        """Transactions after `transaction_id`, oldest first."""
+        status, data, _ = await self._request("GET", "/transactions/sinceid", params={"id": transaction_id})
+        if status != 200:
+            raise OrderError(f"Transactions fetch failed: HTTP {status} {data.get('errorMessage', '')}")
+        return data.get("transactions", [])
+
+    async def close_trade(self, trade_id: str) -> Dict[str, Any]:
+        """Close an open trade (trade ID or @clientID)."""
+        status, data, _ = await self._request("PUT", f"/trades/{trade_id}/close")
+        if status != 200:
+            raise OrderError(f"Close of trade {trade_id} failed: HTTP {status} {data.get('errorMessage', '')}")
+        fill = data.get("orderFillTransaction")
+        if fill:
+            self._apply_transaction(fill)
+        return data
+
+    def get_execution_stats(self) -> Dict[str, Any]:
+        """Get order counts, round-trip latency and the cached account state."""
+        filled = ORDER_ROUND_TRIP_SECONDS.get_summary("FILLED")
+        return {
+            **self.execution_stats,
+            "transaction_stream_connected": self.stream_connected,
+            "mean_fill_round_trip_ms": round(filled["mean"] * 1000, 2),
+            "account": (
+                {**asdict(self._account), "age_seconds": round(self._account.age(), 1)}
+                if self._account
+                else None
+            ),
+        }
+
+
+# Global execution service instance
+execution_service = OandaExecutionService()
+
+
+def get_execution_service() -> OandaExecutionService:
+    """Get the global execution service."""
+    return execution_service
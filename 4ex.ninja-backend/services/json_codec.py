@@ -0,0 +1,180 @@
+"""
+JSON Codec
+Fast JSON serialization and response compression for large API payloads.
+
+Features:
+- orjson when installed (native datetime, numpy, dataclass and enum support),
+  falling back to the standard library encoder
+- One fallback hook for pydantic models, pandas/numpy scalars and Decimals
+- gzip, and brotli when the optional brotli package is installed
+- Accept-Encoding negotiation with a minimum size below which bodies stay plain
+- FastJSONResponse for FastAPI handlers
+"""
+
+import gzip
+import json
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+from config.settings import JSON_RESPONSE_SETTINGS
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional compression
+    brotli = None
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+# Content-Encoding values this process can produce, most preferred first
+SUPPORTED_ENCODINGS = (("br",) if brotli is not None else ()) + ("gzip",)
+
+
+def _default(obj: Any) -> Any:
+    """Convert values neither encoder handles natively."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if hasattr(obj, "isoformat"):  # pandas.Timestamp and other datetime-likes
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):  # numpy scalars/arrays, pandas Series
+        return obj.tolist()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    return str(obj)
+
+
+def _stdlib_default(obj: Any) -> Any:
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return asdict(obj)
+    return _default(obj)
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """
+    Serialize obj to UTF-8 JSON bytes.
+
+    Args:
+        obj: Value to serialize
+        indent: Pretty-print with two-space indentation (for files on disk)
+        sort_keys: Sort object keys (canonical output for hashing)
+    """
+    if orjson is not None:
+        options = _ORJSON_OPTIONS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        if sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_default, option=options)
+
+    return json.dumps(
+        obj,
+        default=_stdlib_default,
+        indent=2 if indent else None,
+        sort_keys=sort_keys,
+        separators=None if indent else (",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse JSON bytes or text."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dump_to_file(obj: Any, path: Union[str, Path]) -> None:
+    """Write obj to path as indented JSON in a single write."""
+    Path(path).write_bytes(dumps(obj, indent=True))
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress body with a Content-Encoding produced by negotiate_encoding()."""
+    if encoding == "br":
+        return brotli.compress(body, quality=JSON_RESPONSE_SETTINGS["brotli_quality"])
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=JSON_RESPONSE_SETTINGS["gzip_level"], mtime=0)
+    return body
+
+
+def negotiate_encoding(accept_encoding: Optional[str], body_size: int) -> Optional[str]:
+    """
+    Pick the Content-Encoding for a response.
+
+    Returns:
+        "br", "gzip", or None for an uncompressed body (small body or no match)
+    """
+    if not accept_encoding or body_size < JSON_RESPONSE_SETTINGS["compression_min_bytes"]:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in SUPPORTED_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def encoded_response(
+    body: bytes,
+    encoding: Optional[str],
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Build a JSON response from already serialized (and possibly compressed) bytes."""
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def json_response(
+    obj: Any,
+    accept_encoding: Optional[str] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """Serialize obj and compress it when large and the client accepts it."""
+    body = dumps(obj)
+    encoding = negotiate_encoding(accept_encoding, len(body))
+    return encoded_response(compress(body, encoding), encoding, status_code, headers)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the fast codec (FastAPI default_response_class)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,237 @@
+"""
+Live Engine Service
+Runs the V2 strategy for many pairs at once, one worker task per pair.
+
+Features:
+- Candle fetches for every pair run concurrently against the shared DataService cache
+- Incremental EMA state per pair (strategy.on_bar_close) instead of rebuilding a
+  DataFrame from 50 candles every cycle
+- Bars come from a REST poll at each candle close or from the live bar builder
+- Per-pair bar queues keep each pair's bars in order while pairs run in parallel
+- Signals fan out to an async handler (risk sizing and execution)
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from config.settings import CANDLE_SCHEDULE_SETTINGS, LIVE_ENGINE_SETTINGS
+from services.candle_calendar import wait_for_next_close
+from services.metrics_service import get_metrics_registry
+
+metrics = get_metrics_registry()
+ENGINE_CYCLE_SECONDS = metrics.histogram(
+    "live_engine_cycle_seconds", "Fetch, signal and execution time for one polling cycle over all pairs"
+)
+ENGINE_BARS = metrics.counter(
+    "live_engine_bars_total", "Closed bars processed by the live engine", ["pair"]
+)
+ENGINE_SIGNALS = metrics.counter(
+    "live_engine_signals_total", "Signals handed to risk/execution by the live engine", ["pair"]
+)
+
+SignalHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+def _as_utc(moment: datetime) -> datetime:
+    """REST candles (PriceData) carry naive UTC timestamps; streamed Bars are tz-aware."""
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=timezone.utc)
+
+
+class LiveTradingEngine:
+    """Feeds closed bars to per-pair workers and passes their signals on."""
+
+    def __init__(
+        self,
+        strategy,
+        data_service,
+        signal_handler: SignalHandler,
+        pairs: Optional[Iterable[str]] = None,
+        timeframe: Optional[str] = None,
+    ):
+        """
+        Args:
+            strategy: EnhancedDailyStrategyV2 (or anything with warm_up_indicators/on_bar_close)
+            data_service: Shared DataService for candle history and polling
+            signal_handler: Awaited for every BUY/SELL signal
+            pairs: Pairs to trade (defaults to LIVE_ENGINE_SETTINGS["pairs"])
+            timeframe: Bar granularity (defaults to LIVE_ENGINE_SETTINGS["timeframe"])
+        """
+        self.logger = logging.getLogger(__name__)
+        self.strategy = strategy
+        self.data_service = data_service
+        self.signal_handler = signal_handler
+        self.pairs = list(pairs or LIVE_ENGINE_SETTINGS["pairs"])
+        self.timeframe = timeframe or LIVE_ENGINE_SETTINGS["timeframe"]
+
+        unsupported = [pair for pair in self.pairs if not strategy.is_supported_pair(pair)]
+        if unsupported:
+            raise ValueError(f"Pairs not supported by {strategy.strategy_name}: {unsupported}")
+
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._last_bar: Dict[str, datetime] = {}  # Timestamp of the newest bar queued per pair
+        self._bar_builder = None
+        self.running = False
+
+        self.engine_stats = {
+            "cycles": 0,
+            "bars": 0,
+            "signals": 0,
+            "handler_errors": 0,
+            "last_cycle": None,
+            "last_cycle_ms": None,
+        }
+        self.pair_stats: Dict[str, Dict[str, Any]] = {
+            pair: {"bars": 0, "signals": 0, "last_bar": None, "last_signal": None}
+            for pair in self.pairs
+        }
+
+    async def start(self, bar_builder=None) -> None:
+        """
+        Warm up every pair's EMAs and start one worker per pair.
+
+        The newest closed bar of each pair is evaluated straight away. With a
+        bar builder, later bars arrive as the builder closes them; otherwise
+        call poll_once (or run) after each candle close.
+        """
+        if self.running:
+            return
+        count = LIVE_ENGINE_SETTINGS["history_candles"]
+        if bar_builder is not None:
+            await bar_builder.seed_history(self.pairs, [self.timeframe], count=count)
+            history = [bar_builder.get_bars(pair, self.timeframe) for pair in self.pairs]
+        else:
+            history = await asyncio.gather(*(self._fetch(pair) for pair in self.pairs))
+
+        for pair in self.pairs:
+            self._queues[pair] = asyncio.Queue()
+            self._workers[pair] = asyncio.create_task(self._run_pair(pair))
+
+        for pair, bars in zip(self.pairs, history):
+            if len(bars) < 2:
+                self.logger.warning(f"⚠️ Insufficient data for {pair}: {len(bars)} candles")
+                continue
+            self.strategy.warm_up_indicators(pair, [bar.close for bar in bars[:-1]])
+            self._last_bar[pair] = _as_utc(bars[-2].timestamp)
+            self.enqueue(bars[-1])
+
+        if bar_builder is not None:
+            bar_builder.add_listener(self.enqueue, granularities=[self.timeframe], instruments=self.pairs)
+            self._bar_builder = bar_builder
+        self.running = True
+        self.logger.info(f"🚀 Live engine started: {len(self.pairs)} pairs on {self.timeframe}")
+
+    async def stop(self) -> None:
+        self.running = False
+        if self._bar_builder is not None:
+            self._bar_builder.remove_listener(self.enqueue)
+            self._bar_builder = None
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers = {}
+        self._queues = {}
+
+    async def _fetch(self, pair: str) -> List[Any]:
+        return await self.data_service.get_latest_candles(
+            pair, self.timeframe, LIVE_ENGINE_SETTINGS["history_candles"]
+        )
+
+    def enqueue(self, bar) -> bool:
+        """Queue a closed bar for its pair's worker; bars already seen are ignored."""
+        queue = self._queues.get(bar.pair)
+        if queue is None:
+            return False
+        timestamp = _as_utc(bar.timestamp)
+        last = self._last_bar.get(bar.pair)
+        if last is not None and timestamp <= last:
+            return False
+        self._last_bar[bar.pair] = timestamp
+        queue.put_nowait(bar)
+        return True
+
+    async def drain(self) -> None:
+        """Wait until every queued bar has been evaluated and its signal handled."""
+        await asyncio.gather(*(queue.join() for queue in self._queues.values()))
+
+    async def poll_once(self) -> int:
+        """
+        Fetch the latest candles for all pairs concurrently and process the new ones.
+
+        Returns:
+            Number of new bars processed
+        """
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(self._fetch(pair) for pair in self.pairs), return_exceptions=True
+        )
+        queued = 0
+        for pair, candles in zip(self.pairs, results):
+            if isinstance(candles, Exception):
+                self.logger.error(f"❌ Failed to fetch candles for {pair}: {candles}")
+                continue
+            queued += sum(self.enqueue(candle) for candle in candles)
+        await self.drain()
+
+        elapsed = time.perf_counter() - started
+        ENGINE_CYCLE_SECONDS.observe(elapsed)
+        self.engine_stats["cycles"] += 1
+        self.engine_stats["last_cycle"] = datetime.utcnow().isoformat()
+        self.engine_stats["last_cycle_ms"] = round(elapsed * 1000, 2)
+        return queued
+
+    async def run(self) -> None:
+        """Trade until stopped: poll at each candle close, or follow the bar builder."""
+        while self.running:
+            if self._bar_builder is not None:
+                # Bars arrive from the builder; the workers do the rest
+                await asyncio.gather(*self._workers.values())
+                return
+            await wait_for_next_close(
+                self.timeframe,
+                delay_seconds=CANDLE_SCHEDULE_SETTINGS["delay_seconds"],
+                jitter=CANDLE_SCHEDULE_SETTINGS["jitter_seconds"],
+            )
+            await self.poll_once()
+
+    async def _run_pair(self, pair: str) -> None:
+        queue = self._queues[pair]
+        stats = self.pair_stats[pair]
+        while True:
+            bar = await queue.get()
+            try:
+                signal = self.strategy.on_bar_close(bar)
+                stats["bars"] += 1
+                stats["last_bar"] = _as_utc(bar.timestamp).isoformat()
+                self.engine_stats["bars"] += 1
+                ENGINE_BARS.inc(pair)
+                if not signal or signal.get("signal") in ("NONE", "NO_SIGNAL"):
+                    continue
+
+                # Ties the order's client ID to the bar, not to when it was evaluated
+                signal["candle_time"] = stats["last_bar"]
+                stats["signals"] += 1
+                stats["last_signal"] = signal["signal"]
+                self.engine_stats["signals"] += 1
+                ENGINE_SIGNALS.inc(pair)
+                self.logger.info(f"🎯 Signal generated for {pair}: {signal['signal']}")
+                await self.signal_handler(signal)
+            except Exception as e:
+                self.engine_stats["handler_errors"] += 1
+                self.logger.error(f"❌ Failed to process {pair} bar: {e}")
+            finally:
+                queue.task_done()
+
+    def get_engine_stats(self) -> Dict[str, Any]:
+        """Get cycle timing and per-pair bar/signal counts."""
+        return {
+            "running": self.running,
+            "timeframe": self.timeframe,
+            "source": "stream" if self._bar_builder is not None else "rest",
+            **self.engine_stats,
+            "mean_cycle_ms": round(ENGINE_CYCLE_SECONDS.get_summary()["mean"] * 1000, 2),
+            "pairs": self.pair_stats,
+        }
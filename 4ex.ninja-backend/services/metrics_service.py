@@ -0,0 +1,275 @@
+"""
+Metrics Service
+In-process metrics registry rendered in the Prometheus text format at /metrics.
+
+Features:
+- Counters, gauges and fixed-bucket histograms with optional labels
+- Hot path is a dict lookup plus a list increment: buckets are preallocated
+  per label set and recording takes no locks
+- Callback gauges read live values (queue depths, cache sizes) only at scrape time
+- Prometheus exposition format 0.0.4 (cumulative buckets, _sum, _count)
+
+Recording from executor threads is lock-free by design; under heavy thread
+contention an occasional increment can be lost, which is acceptable for metrics.
+"""
+
+import logging
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config.settings import METRICS_SETTINGS
+
+# Default latency buckets in seconds (1ms → 30s)
+LATENCY_BUCKETS: Tuple[float, ...] = tuple(METRICS_SETTINGS["latency_buckets"])
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    """Common name/help/label handling."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+
+    def _check_labels(self, values: LabelValues) -> None:
+        if len(values) != len(self.label_names):
+            raise ValueError(
+                f"{self.name} expects labels {self.label_names}, got {len(values)} values"
+            )
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+            *self._render_samples(),
+        ]
+
+    def _render_samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increment the counter for a label set (created on first use)."""
+        try:
+            self._values[labels] += amount
+        except KeyError:
+            self._check_labels(labels)
+            self._values[labels] = amount
+
+    def get(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def _render_samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be read from a callback at scrape time."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: Dict[LabelValues, float] = {}
+        self._callback: Optional[Callable[[], Dict[LabelValues, float]]] = None
+
+    def set(self, value: float, *labels: str) -> None:
+        if labels not in self._values:
+            self._check_labels(labels)
+        self._values[labels] = value
+
+    def set_function(self, callback: Callable[[], Dict[LabelValues, float]]) -> None:
+        """
+        Read values from callback at scrape time instead of storing them.
+
+        The callback returns {label values tuple: value}; use () for an unlabelled gauge.
+        """
+        self._callback = callback
+
+    def _render_samples(self) -> List[str]:
+        values = self._values
+        if self._callback is not None:
+            try:
+                values = self._callback()
+            except Exception as e:
+                logging.getLogger(__name__).warning(f"⚠️ Gauge {self.name} callback failed: {e}")
+                values = {}
+        return [
+            f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+            for labels, value in values.items()
+        ]
+
+
+class _HistogramChild:
+    """Bucket counts for one label set; allocated once, then only incremented."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        self.counts = [0] * (bucket_count + 1)  # Last slot is the +Inf bucket
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram per label set."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[LabelValues, _HistogramChild] = {}
+
+    def preallocate(self, label_sets: Iterable[LabelValues]) -> None:
+        """Create bucket arrays for known label sets (e.g. every monitored pair) up front."""
+        for labels in label_sets:
+            labels = tuple(labels)
+            self._check_labels(labels)
+            self._children.setdefault(labels, _HistogramChild(len(self.buckets)))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record one observation (seconds for latency histograms)."""
+        child = self._children.get(labels)
+        if child is None:
+            self._check_labels(labels)
+            child = self._children.setdefault(labels, _HistogramChild(len(self.buckets)))
+        # bisect_left: a value equal to a bound belongs to that bucket (le semantics)
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+        child.count += 1
+
+    def time(self, *labels: str) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labels)
+
+    def _render_samples(self) -> List[str]:
+        lines = []
+        for labels, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}"
+                )
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{label_text} {child.count}")
+        return lines
+
+    def get_summary(self, *labels: str) -> Dict[str, float]:
+        """Count, sum and mean for one label set (for JSON status endpoints)."""
+        child = self._children.get(labels)
+        if child is None or child.count == 0:
+            return {"count": 0, "sum": 0.0, "mean": 0.0}
+        return {"count": child.count, "sum": child.sum, "mean": child.sum / child.count}
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram: Histogram, labels: LabelValues):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class MetricsRegistry:
+    """Named metrics shared across services; get-or-create by name."""
+
+    def __init__(self, namespace: str = METRICS_SETTINGS["namespace"]):
+        self.logger = logging.getLogger(__name__)
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, documentation: str, label_names, **kwargs):
+        full_name = f"{self.namespace}_{name}" if self.namespace else name
+        metric = self._metrics.get(full_name)
+        if metric is None:
+            metric = cls(full_name, documentation, label_names, **kwargs)
+            self._metrics[full_name] = metric
+        elif not isinstance(metric, cls) or metric.label_names != tuple(label_names):
+            raise ValueError(f"Metric {full_name} already registered with a different type or labels")
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, label_names)
+
+    def gauge(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, label_names)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, label_names, buckets=buckets)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            lines.extend(self._metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+# Global metrics registry
+metrics_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry."""
+    return metrics_registry
@@ -3,13 +3,12 @@ Notification Service
 Handles Discord notifications for trading signals and system events.
 """
 
-import asyncio
-import aiohttp
 import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 from models.signal_models import TradingSignal, NotificationPayload
 from config.settings import get_settings
+from services.discord_delivery_service import get_discord_delivery_service
 
 
 class NotificationService:
@@ -19,6 +18,7 @@ class NotificationService:
         self.settings = get_settings()
         self.webhook_url = self.settings.discord_webhook_url
         self.logger = logging.getLogger(__name__)
+        self.delivery_service = get_discord_delivery_service()
 
     async def send_signal_notification(self, signal: TradingSignal) -> bool:
         """
@@ -219,32 +219,12 @@ class NotificationService:
         return colors.get(level.lower(), 0x0099FF)
 
     async def _send_discord_webhook(self, payload: NotificationPayload) -> bool:
-        """Send payload to Discord webhook."""
+        """Send payload to Discord webhook through the shared delivery queue."""
         try:
-            import ssl
-            # Create SSL context for Discord API
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=10)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.post(
-                    self.webhook_url, json=payload.dict()
-                ) as response:
-                    if response.status == 204:
-                        return True
-                    else:
-                        self.logger.error(
-                            f"Discord webhook failed with status {response.status}"
-                        )
-                        return False
-
-        except asyncio.TimeoutError:
-            self.logger.error("Discord webhook timeout")
-            return False
+            return await self.delivery_service.deliver(
+                self.webhook_url, payload.dict(exclude_none=True)
+            )
+
         except Exception as e:
             self.logger.error(f"Discord webhook error: {str(e)}")
             return False
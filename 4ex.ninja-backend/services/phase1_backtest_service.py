@@ -0,0 +1,471 @@
+"""
+Phase 1 Backtest Service
+Replays years of H4 history through the Enhanced Daily Strategy's Phase 1 pipeline in seconds.
+
+Features:
+- Time injected from the bar timestamps; the wall clock is never read
+- Daily EMA/RSI/ATR for every H4 bar at once, including the still-forming daily
+  candle a bar-by-bar analyze_pair() replay would see
+- Session filter for the whole history from the session calendar tables
+- Support/resistance levels detected only at signal bars, over a trailing window
+- Strength and trade decision from the strategy's own methods
+- All trades sized in one batch; compounding from the sizer's risk percent
+- SL/TP exits found with array scans, one open trade per pair
+"""
+
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import PHASE1_BACKTEST_SETTINGS
+from deployed_strategies.enhanced_daily_strategy import EnhancedDailyStrategy
+from services import json_codec
+
+OHLC = {"open": "first", "high": "max", "low": "min", "close": "last"}
+
+
+class Phase1Backtester:
+    """Vectorized replay of EnhancedDailyStrategy.analyze_pair() over H4 history."""
+
+    def __init__(
+        self,
+        strategy: Optional[EnhancedDailyStrategy] = None,
+        initial_balance: Optional[float] = None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.initial_balance = (
+            PHASE1_BACKTEST_SETTINGS["initial_balance"] if initial_balance is None else initial_balance
+        )
+        self.strategy = strategy or EnhancedDailyStrategy(account_balance=self.initial_balance)
+        self.bar_duration = pd.Timedelta(hours=PHASE1_BACKTEST_SETTINGS["bar_hours"])
+        self.sr_window = pd.Timedelta(days=PHASE1_BACKTEST_SETTINGS["sr_window_days"])
+        self.trade_recommendations = set(PHASE1_BACKTEST_SETTINGS["trade_recommendations"])
+
+        self.backtest_stats = {
+            "pairs": 0,
+            "bars": 0,
+            "signal_bars": 0,
+            "sr_detections": 0,
+            "trades": 0,
+            "seconds": 0.0,
+        }
+
+    @staticmethod
+    def load_history(pair: str, directory: Optional[str] = None) -> pd.DataFrame:
+        """Load a pair's H4 history saved by backtest_data/fetch_historical_data.py."""
+        path = Path(directory or PHASE1_BACKTEST_SETTINGS["history_dir"]) / f"{pair}_H4_5Y.json"
+        candles = pd.DataFrame(json_codec.loads(path.read_bytes())["data"])
+        candles["timestamp"] = pd.to_datetime(candles["timestamp"], utc=True)
+        return candles.set_index("timestamp")[list(OHLC)].astype(float)
+
+    @staticmethod
+    def available_pairs(directory: Optional[str] = None) -> List[str]:
+        """Pairs with a saved H4 history."""
+        path = Path(directory or PHASE1_BACKTEST_SETTINGS["history_dir"])
+        return sorted(file.name[: -len("_H4_5Y.json")] for file in path.glob("*_H4_5Y.json"))
+
+    # Signals -------------------------------------------------------------
+
+    def signal_frame(self, pair: str, data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Per-bar Phase 1 inputs as analyze_pair() would compute them at each bar's close.
+
+        A bar's own day is still forming, so its daily EMAs, RSI and ATR come
+        from the completed days' values extended by that partial candle in
+        closed form, instead of resampling the history at every bar.
+
+        Args:
+            pair: Currency pair
+            data: H4 OHLC with a UTC datetime index
+
+        Returns:
+            DataFrame aligned with `data`: direction (1 buy, -1 sell, 0 none),
+            entry/stop/target, indicators, H4 ATR and the session filter
+        """
+        strategy = self.strategy
+        params = strategy.get_pair_parameters(pair)
+        h4 = strategy._calculate_indicators(data[list(OHLC)].copy(), params)
+        daily = strategy._calculate_indicators(h4[list(OHLC)].resample("D").agg(OHLC).dropna(), params)
+
+        bar_day = h4.index.floor("D")
+        day = daily.index.get_indexer(bar_day)  # Position of each bar's day among the days with data
+        prev = np.maximum(day - 1, 0)
+        close = h4["close"].to_numpy()
+        day_high = h4["high"].groupby(bar_day).cummax().to_numpy()
+        day_low = h4["low"].groupby(bar_day).cummin().to_numpy()
+        prev_close = daily["close"].to_numpy()[prev]
+
+        # EMAs: pandas' adjusted ewm weights W_k = W_(k-1) * decay + 1, extended by the partial close
+        emas = {}
+        for column, span in (("ema_20", params["ema_fast"]), ("ema_50", params["ema_slow"])):
+            decay = 1.0 - 2.0 / (span + 1)
+            weights = np.empty(len(daily))
+            weight = 1.0
+            for k in range(len(daily)):
+                weights[k] = weight
+                weight = weight * decay + 1.0
+            old = weights[prev] * decay
+            emas[column] = (old * daily[column].to_numpy()[prev] + close) / (old + 1.0)
+
+        # RSI and ATR: the last 13 completed days plus the partial day
+        period = strategy.rsi_period
+        delta = daily["close"].diff()
+        gain_sum = delta.where(delta > 0, 0.0).rolling(period - 1).sum().to_numpy()[prev]
+        loss_sum = (-delta.where(delta < 0, 0.0)).rolling(period - 1).sum().to_numpy()[prev]
+        partial_delta = close - prev_close
+        gain = (gain_sum + np.maximum(partial_delta, 0.0)) / period
+        loss = (loss_sum + np.maximum(-partial_delta, 0.0)) / period
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rsi = 100 - (100 / (1 + gain / loss))
+
+        daily_prev_close = daily["close"].shift()
+        true_range = pd.concat(
+            [
+                daily["high"] - daily["low"],
+                (daily["high"] - daily_prev_close).abs(),
+                (daily["low"] - daily_prev_close).abs(),
+            ],
+            axis=1,
+        ).max(axis=1)
+        partial_range = np.maximum.reduce(
+            [day_high - day_low, np.abs(day_high - prev_close), np.abs(day_low - prev_close)]
+        )
+        atr = (true_range.rolling(14 - 1).sum().to_numpy()[prev] + partial_range) / 14
+
+        # EMA crossover with RSI confirmation against the previous completed day
+        fast, slow = emas["ema_20"], emas["ema_50"]
+        fast_prev = daily["ema_20"].to_numpy()[prev]
+        slow_prev = daily["ema_50"].to_numpy()[prev]
+        ready = (np.arange(len(h4)) >= 99) & (day >= 59)  # 100 H4 bars and 60 daily candles
+        buy = (
+            ready
+            & (fast > slow)
+            & (fast_prev <= slow_prev)
+            & (rsi > 50)
+            & ~(rsi > params["rsi_overbought"])
+        )
+        sell = (
+            ready
+            & ~buy
+            & (fast < slow)
+            & (fast_prev >= slow_prev)
+            & (rsi < 50)
+            & ~(rsi < params["rsi_oversold"])
+        )
+        direction = np.where(buy, 1, np.where(sell, -1, 0))
+        stop_offset = atr * strategy.base_stop_loss_atr
+
+        # The analysis runs when the bar closes
+        close_time = h4.index + self.bar_duration
+        is_optimal, quality = strategy.session_manager.session_filter_array(pair, close_time)
+
+        return pd.DataFrame(
+            {
+                "close_time": close_time,
+                "direction": direction,
+                "entry_price": close,
+                "stop_loss": close - direction * stop_offset,
+                "take_profit": close + direction * stop_offset * strategy.take_profit_ratio,
+                "ema_20": fast,
+                "ema_50": slow,
+                "rsi": rsi,
+                "daily_atr": atr,
+                "atr": h4["atr"].to_numpy(),
+                "is_optimal_session": is_optimal,
+                "session_quality": quality,
+            },
+            index=h4.index,
+        )
+
+    def _analyze_signal_bar(
+        self, pair: str, data: pd.DataFrame, bar: pd.Series, i: int
+    ) -> Tuple[float, str, Dict]:
+        """Confluence, strength and trade decision at one signal bar."""
+        strategy = self.strategy
+        start = data.index.searchsorted(data.index[i] - self.sr_window)
+        sr_analysis = strategy.sr_detector.detect_key_levels(data.iloc[start : i + 1], pair)
+        self.backtest_stats["sr_detections"] += 1
+
+        confluence_score = 0.0
+        if "error" not in sr_analysis:
+            confluence_score = strategy.sr_detector.get_level_confluence_score(
+                float(bar["entry_price"]), sr_analysis
+            )
+
+        long = bar["direction"] > 0
+        signal_data = {
+            "signal": "BUY" if long else "SELL",
+            "direction": "LONG" if long else "SHORT",
+            "entry_price": float(bar["entry_price"]),
+            "stop_loss": float(bar["stop_loss"]),
+            "take_profit": float(bar["take_profit"]),
+            "indicators": {
+                "ema_20": float(bar["ema_20"]),
+                "ema_50": float(bar["ema_50"]),
+                "rsi": float(bar["rsi"]),
+                "atr": float(bar["daily_atr"]),
+            },
+        }
+        session_analysis = {
+            "is_optimal_session": bool(bar["is_optimal_session"]),
+            "session_quality_multiplier": float(bar["session_quality"]),
+        }
+        signal_strength = strategy._assess_signal_strength(
+            signal_data, confluence_score, session_analysis
+        )
+        decision = strategy._make_trade_decision(
+            pair, signal_data, confluence_score, session_analysis, signal_strength
+        )
+        return confluence_score, signal_strength, decision
+
+    @staticmethod
+    def _find_exit(
+        i: int, direction: int, stop: float, target: float, high: np.ndarray, low: np.ndarray
+    ) -> Tuple[int, float, str]:
+        """First bar after `i` that reaches the stop or the target."""
+        if direction > 0:
+            stop_hit, target_hit = low[i + 1 :] <= stop, high[i + 1 :] >= target
+        else:
+            stop_hit, target_hit = high[i + 1 :] >= stop, low[i + 1 :] <= target
+        hit = stop_hit | target_hit
+        if not hit.any():
+            return -1, np.nan, "end_of_data"
+        j = int(hit.argmax())
+        if stop_hit[j]:
+            return i + 1 + j, stop, "stop_loss"  # A bar spanning both levels counts as a loss
+        return i + 1 + j, target, "take_profit"
+
+    # Replay --------------------------------------------------------------
+
+    def backtest_pair(self, pair: str, data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Replay one pair's H4 history: a trade opens at the close of a signal bar
+        the strategy recommends trading, and no new trade opens until it exits.
+
+        Args:
+            pair: Currency pair
+            data: H4 OHLC with a UTC datetime index
+
+        Returns:
+            Dict with "metrics" and "trades"
+        """
+        started = time.perf_counter()
+        frame = self.signal_frame(pair, data)
+        high = data["high"].to_numpy(dtype=float)
+        low = data["low"].to_numpy(dtype=float)
+        signal_bars = np.flatnonzero(frame["direction"].to_numpy() != 0)
+
+        trades = []
+        flat_from = 0
+        for i in signal_bars:
+            if i < flat_from:
+                continue
+            bar = frame.iloc[i]
+            confluence_score, signal_strength, decision = self._analyze_signal_bar(pair, data, bar, i)
+            if decision["recommendation"] not in self.trade_recommendations:
+                continue
+
+            exit_bar, exit_price, exit_reason = self._find_exit(
+                i, int(bar["direction"]), bar["stop_loss"], bar["take_profit"], high, low
+            )
+            if exit_bar < 0:
+                exit_bar, exit_price = len(data) - 1, float(data["close"].iloc[-1])
+            trades.append(
+                {
+                    "bar": i,
+                    "entry_time": bar["close_time"].isoformat(),
+                    "exit_bar_time": data.index[exit_bar].isoformat(),
+                    "direction": "LONG" if bar["direction"] > 0 else "SHORT",
+                    "entry_price": float(bar["entry_price"]),
+                    "stop_loss": float(bar["stop_loss"]),
+                    "take_profit": float(bar["take_profit"]),
+                    "exit_price": float(exit_price),
+                    "exit_reason": exit_reason,
+                    "recommendation": decision["recommendation"],
+                    "confidence": decision["confidence"],
+                    "signal_strength": signal_strength,
+                    "confluence_score": round(confluence_score, 2),
+                    "session_optimal": bool(bar["is_optimal_session"]),
+                    "session_quality": float(bar["session_quality"]),
+                    "atr": float(bar["atr"]),
+                }
+            )
+            # Trading resumes at the close of the bar the trade exited in
+            flat_from = exit_bar if exit_reason != "end_of_data" else len(data)
+
+        self._apply_sizing(pair, trades)
+        elapsed = time.perf_counter() - started
+
+        self.backtest_stats["pairs"] += 1
+        self.backtest_stats["bars"] += len(data)
+        self.backtest_stats["signal_bars"] += len(signal_bars)
+        self.backtest_stats["trades"] += len(trades)
+        self.backtest_stats["seconds"] += elapsed
+        self.logger.info(
+            f"📈 {pair}: {len(data)} bars, {len(signal_bars)} signal bars, "
+            f"{len(trades)} trades in {elapsed:.2f}s"
+        )
+        return {
+            "pair": pair,
+            "backtest_period": f"{str(data.index[0])[:10]} to {str(data.index[-1])[:10]}",
+            "metrics": self._calculate_metrics(trades, len(signal_bars), elapsed),
+            "trades": trades,
+        }
+
+    def _apply_sizing(self, pair: str, trades: List[Dict]) -> None:
+        """Size every trade in one batch and compound the balance trade by trade."""
+        if not trades:
+            return
+        entry = np.array([t["entry_price"] for t in trades])
+        stop = np.array([t["stop_loss"] for t in trades])
+        sizes = self.strategy.position_sizer.calculate_position_sizes(
+            [pair] * len(trades),
+            entry,
+            stop,
+            self.initial_balance,
+            signal_strengths=[t["signal_strength"] for t in trades],
+            confluence_scores=[t["confluence_score"] for t in trades],
+            session_qualities=[t["session_quality"] for t in trades],
+            atrs=[t["atr"] for t in trades],
+            current_positions={},  # Each pair replays on its own; the live book plays no part
+        )
+
+        # Risk percent does not depend on the balance, so compounding is a running product
+        direction = np.where(np.array([t["direction"] for t in trades]) == "LONG", 1.0, -1.0)
+        exit_price = np.array([t["exit_price"] for t in trades])
+        valid = sizes["valid"]
+        distance = np.where(valid, sizes["stop_distance"], 1.0)
+        pip = 0.01 if "JPY" in pair else 0.0001
+        cost_pips = (
+            PHASE1_BACKTEST_SETTINGS["spread_pips"].get(pair, PHASE1_BACKTEST_SETTINGS["default_spread_pips"])
+            + PHASE1_BACKTEST_SETTINGS["slippage_pips"]
+        )
+        r_multiple = np.where(valid, direction * (exit_price - entry) / distance - cost_pips * pip / distance, 0.0)
+        risk_percent = np.where(valid, sizes["risk_percent"], 0.0)
+        balance = self.initial_balance * np.cumprod(1 + risk_percent / 100 * r_multiple)
+        pnl = np.diff(balance, prepend=self.initial_balance)
+
+        for k, trade in enumerate(trades):
+            trade.update(
+                {
+                    "risk_percent": round(float(risk_percent[k]), 3),
+                    "total_multiplier": round(float(sizes["total_multiplier"][k]), 3),
+                    "r_multiple": round(float(r_multiple[k]), 3),
+                    "pnl": round(float(pnl[k]), 2),
+                    "balance_after": round(float(balance[k]), 2),
+                }
+            )
+
+    def _calculate_metrics(self, trades: List[Dict], signal_bars: int, elapsed: float) -> Dict[str, Any]:
+        """Performance and Phase 1 coverage of one pair's trades."""
+        pnl = np.array([t["pnl"] for t in trades], dtype=float)
+        balance = np.concatenate([[self.initial_balance], [t["balance_after"] for t in trades]])
+        peak = np.maximum.accumulate(balance)
+        gross_profit = float(pnl[pnl > 0].sum())
+        gross_loss = float(-pnl[pnl < 0].sum())
+        wins = int((pnl > 0).sum())
+        count = len(trades)
+
+        def average(key: str) -> float:
+            return round(float(np.mean([t[key] for t in trades])), 3) if trades else 0.0
+
+        return {
+            "total_trades": count,
+            "wins": wins,
+            "losses": count - wins,
+            "win_rate": round(wins / count * 100, 2) if count else 0.0,
+            "final_balance": round(float(balance[-1]), 2),
+            "total_return_usd": round(float(balance[-1] - self.initial_balance), 2),
+            "total_return_pct": round(float(balance[-1] / self.initial_balance - 1) * 100, 2),
+            "profit_factor": round(gross_profit / gross_loss, 2) if gross_loss > 0 else None,
+            "max_drawdown_pct": round(float(((peak - balance) / peak).max()) * 100, 2),
+            "avg_r_multiple": average("r_multiple"),
+            "exit_reasons": {
+                reason: sum(1 for t in trades if t["exit_reason"] == reason)
+                for reason in ("take_profit", "stop_loss", "end_of_data")
+            },
+            "phase1_metrics": {
+                "signal_bars": signal_bars,
+                "session_filtered_trades": sum(1 for t in trades if t["session_optimal"]),
+                "confluence_trades": sum(
+                    1 for t in trades if t["confluence_score"] >= self.strategy.min_confluence_score
+                ),
+                "avg_confidence": average("confidence"),
+                "avg_confluence_score": average("confluence_score"),
+                "avg_session_quality": average("session_quality"),
+                "avg_risk_percent": average("risk_percent"),
+            },
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+    def run(
+        self,
+        data_by_pair: Optional[Dict[str, pd.DataFrame]] = None,
+        pairs: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Backtest several pairs, each with its own starting balance.
+
+        Args:
+            data_by_pair: H4 history per pair (default: load the saved histories)
+            pairs: Pairs to load when `data_by_pair` is not given (default: all saved)
+
+        Returns:
+            Dict with "backtest_summary" and "pair_results"
+        """
+        started = time.perf_counter()
+        if data_by_pair is None:
+            data_by_pair = {
+                pair: self.load_history(pair) for pair in (pairs or self.available_pairs())
+            }
+
+        pair_results = {pair: self.backtest_pair(pair, data) for pair, data in data_by_pair.items()}
+        metrics = {pair: result["metrics"] for pair, result in pair_results.items()}
+        total_trades = sum(m["total_trades"] for m in metrics.values())
+        total_wins = sum(m["wins"] for m in metrics.values())
+        total_return = sum(m["total_return_usd"] for m in metrics.values())
+        ranked = sorted(metrics, key=lambda pair: metrics[pair]["total_return_pct"])
+
+        return {
+            "backtest_summary": {
+                "strategy": "Enhanced Daily Strategy (Phase 1)",
+                "pairs_tested": len(pair_results),
+                "initial_balance_per_pair": self.initial_balance,
+                "total_trades": total_trades,
+                "total_wins": total_wins,
+                "overall_win_rate": round(total_wins / total_trades * 100, 2) if total_trades else 0.0,
+                "total_return_usd": round(total_return, 2),
+                "overall_return_pct": (
+                    round(total_return / (self.initial_balance * len(metrics)) * 100, 2) if metrics else 0.0
+                ),
+                "best_pair": ranked[-1] if ranked else None,
+                "worst_pair": ranked[0] if ranked else None,
+                "elapsed_seconds": round(time.perf_counter() - started, 3),
+            },
+            "pair_results": pair_results,
+        }
+
+    def get_backtest_stats(self) -> Dict[str, Any]:
+        """Get bar, signal and trade counts across the pairs replayed so far."""
+        return {**self.backtest_stats, "seconds": round(self.backtest_stats["seconds"], 3)}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    results = Phase1Backtester().run()
+    summary = results["backtest_summary"]
+    print(f"\n{'Pair':<10}{'Trades':>8}{'Win %':>8}{'Return %':>10}{'Max DD %':>10}")
+    for pair, result in results["pair_results"].items():
+        m = result["metrics"]
+        print(
+            f"{pair:<10}{m['total_trades']:>8}{m['win_rate']:>8}"
+            f"{m['total_return_pct']:>10}{m['max_drawdown_pct']:>10}"
+        )
+    print(
+        f"\n{summary['total_trades']} trades, {summary['overall_win_rate']}% wins, "
+        f"{summary['overall_return_pct']}% return in {summary['elapsed_seconds']}s"
+    )
@@ -0,0 +1,383 @@
+"""
+Position Book Service
+Shared view of open OANDA trades, indexed by pair and by currency.
+
+Features:
+- Full sync from /openTrades; catch-up from /transactions/sinceid after a reconnect
+- Incremental updates from fills, partial closes and SL/TP order transactions
+- Duplicate transactions (order response and stream) are applied once
+- Pair and currency indexes maintained on every change, so exposure queries
+  are dictionary lookups instead of a scan over every position
+- Risk per trade from its stop loss, converted to the account currency
+"""
+
+import asyncio
+import logging
+from collections import defaultdict, deque
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Set
+
+from config.settings import POSITION_BOOK_SETTINGS
+from services.metrics_service import get_metrics_registry
+from services.pricing_stream_service import get_pricing_stream_service
+
+metrics = get_metrics_registry()
+BOOK_UPDATES = metrics.counter(
+    "position_book_updates_total", "Position book changes by kind", ["kind"]
+)
+
+
+@dataclass
+class BookTrade:
+    """One open trade."""
+
+    trade_id: str
+    pair: str
+    units: float  # Signed: positive long, negative short
+    price: float
+    stop_loss: Optional[float] = None
+    take_profit: Optional[float] = None
+    risk_amount: float = 0.0  # Account currency lost if the stop loss is hit
+    risk_source: str = "default"  # "stop_loss", "sizing" or "default"
+    client_id: Optional[str] = None
+    open_time: Optional[str] = None
+
+    @property
+    def side(self) -> str:
+        return "BUY" if self.units > 0 else "SELL"
+
+    @property
+    def currencies(self) -> List[str]:
+        return self.pair.split("_")
+
+
+class PositionBook:
+    """Open trades plus running per-pair and per-currency totals."""
+
+    def __init__(self, price_source: Optional[Callable[[str], Optional[float]]] = None):
+        """
+        Args:
+            price_source: pair -> mid price, used to convert stop-loss risk to the
+                account currency (defaults to the pricing stream)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.price_source = price_source or get_pricing_stream_service().get_mid
+        self.execution = None
+        self.account_balance = 0.0
+        self.account_currency = POSITION_BOOK_SETTINGS["account_currency"]
+        self.last_transaction_id: Optional[str] = None
+        # Called with (trade, realized P&L) when a fill fully closes a booked trade
+        self.close_listeners: List[Callable[[BookTrade, float], None]] = []
+
+        self.trades: Dict[str, BookTrade] = {}
+        self._pair_trades: Dict[str, Set[str]] = defaultdict(set)
+        self._pair_units: Dict[str, float] = defaultdict(float)
+        self._pair_risk: Dict[str, float] = defaultdict(float)
+        self._currency_risk: Dict[str, float] = defaultdict(float)
+        self._currency_units: Dict[str, float] = defaultdict(float)
+        self.total_risk = 0.0
+
+        self._seen: Deque[str] = deque()
+        self._seen_ids: Set[str] = set()
+        self._sync_task: Optional[asyncio.Task] = None
+
+        self.book_stats = {
+            "syncs": 0,
+            "catch_ups": 0,
+            "transactions_applied": 0,
+            "duplicate_transactions": 0,
+            "last_sync": None,
+            "last_error": None,
+        }
+
+    def set_execution_service(self, execution) -> None:
+        """Follow an OandaExecutionService's transactions and resync when its stream reconnects."""
+        if self.execution is execution:
+            return
+        self.execution = execution
+        execution.transaction_listeners.append(self.apply_transaction)
+        execution.reconnect_listeners.append(self.request_sync)
+
+    # Indexes ------------------------------------------------------------
+
+    def _index(self, trade: BookTrade, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a trade's contribution to every index."""
+        base, quote = trade.currencies
+        if sign > 0:
+            self._pair_trades[trade.pair].add(trade.trade_id)
+        else:
+            self._pair_trades[trade.pair].discard(trade.trade_id)
+            if not self._pair_trades[trade.pair]:
+                del self._pair_trades[trade.pair]
+        self._pair_units[trade.pair] += sign * trade.units
+        self._pair_risk[trade.pair] += sign * trade.risk_amount
+        self._currency_risk[base] += sign * trade.risk_amount
+        self._currency_risk[quote] += sign * trade.risk_amount
+        self._currency_units[base] += sign * trade.units
+        self._currency_units[quote] -= sign * trade.units * trade.price
+        self.total_risk += sign * trade.risk_amount
+
+    def _clear(self) -> None:
+        self.trades.clear()
+        for index in (self._pair_trades, self._pair_units, self._pair_risk, self._currency_risk, self._currency_units):
+            index.clear()
+        self.total_risk = 0.0
+
+    def _estimate_risk(self, trade: BookTrade) -> None:
+        """Set risk from the stop-loss distance, or the default when it cannot be priced."""
+        if trade.risk_source == "sizing":
+            return
+        default = self.account_balance * POSITION_BOOK_SETTINGS["default_risk_percent"] / 100
+        risk = None
+        if trade.stop_loss is not None:
+            risk = self.to_account_currency(
+                abs(trade.price - trade.stop_loss) * abs(trade.units), trade.pair, trade.price
+            )
+        trade.risk_amount, trade.risk_source = (risk, "stop_loss") if risk is not None else (default, "default")
+
+    def to_account_currency(
+        self, amount: float, pair: str, price: float, price_source: Optional[Callable[[str], Optional[float]]] = None
+    ) -> Optional[float]:
+        """Convert an amount in the pair's quote currency to the account currency."""
+        base, quote = pair.split("_")
+        account = self.account_currency
+        if quote == account:
+            return amount
+        if base == account:
+            return amount / price
+        price_source = price_source or self.price_source
+        direct = price_source(f"{quote}_{account}")
+        if direct:
+            return amount * direct
+        inverse = price_source(f"{account}_{quote}")
+        if inverse:
+            return amount / inverse
+        return None
+
+    # Updates ------------------------------------------------------------
+
+    def add_trade(self, trade: BookTrade) -> None:
+        """Add or replace an open trade."""
+        existing = self.trades.pop(trade.trade_id, None)
+        if existing is not None:
+            self._index(existing, -1)
+        self._estimate_risk(trade)
+        self.trades[trade.trade_id] = trade
+        self._index(trade, 1)
+        BOOK_UPDATES.inc("open")
+
+    def remove_trade(self, trade_id: str) -> Optional[BookTrade]:
+        trade = self.trades.pop(trade_id, None)
+        if trade is not None:
+            self._index(trade, -1)
+            BOOK_UPDATES.inc("close")
+        return trade
+
+    def update_trade(self, trade_id: str, **changes: Any) -> Optional[BookTrade]:
+        """Change fields of an open trade (units, stop_loss, take_profit, risk_amount)."""
+        trade = self.trades.get(trade_id)
+        if trade is None:
+            return None
+        self._index(trade, -1)
+        for name, value in changes.items():
+            setattr(trade, name, value)
+        if "risk_amount" in changes:
+            trade.risk_source = "sizing"
+        elif {"units", "stop_loss"} & set(changes):
+            if trade.risk_source == "sizing" and "units" in changes:
+                trade.risk_source = "stop_loss"  # Sized risk no longer matches a reduced trade
+            self._estimate_risk(trade)
+        self._index(trade, 1)
+        BOOK_UPDATES.inc("update")
+        return trade
+
+    def annotate(
+        self,
+        trade_id: Optional[str],
+        stop_loss: Optional[float] = None,
+        take_profit: Optional[float] = None,
+        risk_amount: Optional[float] = None,
+    ) -> bool:
+        """Record what the caller already knows about a fresh fill (levels, sized risk)."""
+        changes = {
+            name: value
+            for name, value in (("stop_loss", stop_loss), ("take_profit", take_profit), ("risk_amount", risk_amount))
+            if value is not None
+        }
+        return trade_id is not None and bool(changes) and self.update_trade(trade_id, **changes) is not None
+
+    def apply_transaction(self, transaction: Dict[str, Any]) -> None:
+        """Apply one OANDA transaction; repeats of the same transaction ID are ignored."""
+        transaction_id = transaction.get("id")
+        if transaction_id is not None:
+            transaction_id = str(transaction_id)
+            if transaction_id in self._seen_ids:
+                self.book_stats["duplicate_transactions"] += 1
+                return
+            self._seen.append(transaction_id)
+            self._seen_ids.add(transaction_id)
+            if len(self._seen) > POSITION_BOOK_SETTINGS["transaction_memory"]:
+                self._seen_ids.discard(self._seen.popleft())
+            if self.last_transaction_id is None or int(transaction_id) > int(self.last_transaction_id):
+                self.last_transaction_id = transaction_id
+
+        if "accountBalance" in transaction:
+            self.account_balance = float(transaction["accountBalance"])
+
+        kind = transaction.get("type")
+        if kind == "ORDER_FILL":
+            for closed in transaction.get("tradesClosed") or []:
+                trade = self.trades.get(str(closed["tradeID"]))
+                self.remove_trade(str(closed["tradeID"]))
+                if trade is not None:
+                    for listener in self.close_listeners:
+                        listener(trade, float(closed.get("realizedPL") or 0.0))
+            reduced = transaction.get("tradeReduced")
+            if reduced and str(reduced["tradeID"]) in self.trades:
+                trade = self.trades[str(reduced["tradeID"])]
+                remaining = abs(trade.units) - abs(float(reduced["units"]))
+                self.update_trade(trade.trade_id, units=remaining if trade.units > 0 else -remaining)
+            opened = transaction.get("tradeOpened")
+            if opened:
+                self.add_trade(
+                    BookTrade(
+                        trade_id=str(opened["tradeID"]),
+                        pair=transaction["instrument"],
+                        units=float(opened["units"]),
+                        price=float(opened.get("price") or transaction["price"]),
+                        client_id=(opened.get("clientExtensions") or {}).get("id"),
+                        open_time=transaction.get("time"),
+                    )
+                )
+        elif kind in ("STOP_LOSS_ORDER", "TAKE_PROFIT_ORDER") and transaction.get("tradeID"):
+            field = "stop_loss" if kind == "STOP_LOSS_ORDER" else "take_profit"
+            self.update_trade(str(transaction["tradeID"]), **{field: float(transaction["price"])})
+        if transaction_id is not None:
+            self.book_stats["transactions_applied"] += 1
+
+    # Sync ---------------------------------------------------------------
+
+    async def sync(self) -> int:
+        """Rebuild the book from OANDA's open trades; returns the number of trades."""
+        account = await self.execution.get_account_state()
+        self.account_balance = account.balance
+        self.account_currency = account.currency
+        trades, last_transaction_id = await self.execution.get_open_trades()
+
+        sized = {t.trade_id: t.risk_amount for t in self.trades.values() if t.risk_source == "sizing"}
+        self._clear()
+        for data in trades:
+            stop_loss = data.get("stopLossOrder") or {}
+            take_profit = data.get("takeProfitOrder") or {}
+            trade = BookTrade(
+                trade_id=str(data["id"]),
+                pair=data["instrument"],
+                units=float(data["currentUnits"]),
+                price=float(data["price"]),
+                stop_loss=float(stop_loss["price"]) if stop_loss.get("price") else None,
+                take_profit=float(take_profit["price"]) if take_profit.get("price") else None,
+                client_id=(data.get("clientExtensions") or {}).get("id"),
+                open_time=data.get("openTime"),
+            )
+            if trade.trade_id in sized:
+                trade.risk_amount, trade.risk_source = sized[trade.trade_id], "sizing"
+            self.add_trade(trade)
+
+        self.last_transaction_id = last_transaction_id or self.last_transaction_id
+        self.book_stats["syncs"] += 1
+        self.book_stats["last_sync"] = datetime.utcnow().isoformat()
+        self.logger.info(f"📒 Position book synced: {len(self.trades)} open trades")
+        return len(self.trades)
+
+    async def catch_up(self) -> int:
+        """Apply transactions missed since the last one seen (full sync if none seen yet)."""
+        if self.last_transaction_id is None:
+            return await self.sync()
+        transactions = await self.execution.get_transactions_since(self.last_transaction_id)
+        for transaction in transactions:
+            self.apply_transaction(transaction)
+        self.book_stats["catch_ups"] += 1
+        return len(transactions)
+
+    def request_sync(self) -> None:
+        """Catch up in the background (used when the transaction stream reconnects)."""
+        if self._sync_task is not None and not self._sync_task.done():
+            return
+        self._sync_task = asyncio.get_running_loop().create_task(self.catch_up())
+        self._sync_task.add_done_callback(self._log_sync_failure)
+
+    def _log_sync_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.book_stats["last_error"] = str(task.exception())
+            self.logger.warning(f"⚠️ Position book catch-up failed: {task.exception()}")
+
+    # Queries ------------------------------------------------------------
+
+    def get_pair_trades(self, pair: str) -> List[BookTrade]:
+        return [self.trades[trade_id] for trade_id in self._pair_trades.get(pair, ())]
+
+    def get_pair_units(self, pair: str) -> float:
+        """Net signed units open on a pair."""
+        return self._pair_units.get(pair, 0.0)
+
+    def get_currency_exposure(self, currency: str) -> float:
+        """Open risk in trades involving `currency`, as a percent of the balance."""
+        if self.account_balance <= 0:
+            return 0.0
+        return self._currency_risk.get(currency, 0.0) / self.account_balance * 100
+
+    def get_currency_exposures(self) -> Dict[str, float]:
+        return {
+            currency: self.get_currency_exposure(currency)
+            for currency, risk in self._currency_risk.items()
+            if abs(risk) > 1e-9
+        }
+
+    def get_total_risk_percent(self) -> float:
+        if self.account_balance <= 0:
+            return 0.0
+        return self.total_risk / self.account_balance * 100
+
+    def get_positions(self) -> Dict[str, Dict[str, Any]]:
+        """Per-pair positions in the `current_positions` shape the sizing code uses."""
+        return {
+            pair: {
+                "units": self._pair_units[pair],
+                "risk_amount": self._pair_risk[pair],
+                "risk_percent": (
+                    self._pair_risk[pair] / self.account_balance * 100 if self.account_balance > 0 else 0.0
+                ),
+                "trade_ids": sorted(trade_ids),
+            }
+            for pair, trade_ids in self._pair_trades.items()
+        }
+
+    def get_book_stats(self) -> Dict[str, Any]:
+        """Get open trades, exposures and sync counters."""
+        return {
+            **self.book_stats,
+            "open_trades": len(self.trades),
+            "last_transaction_id": self.last_transaction_id,
+            "account_balance": self.account_balance,
+            "total_risk_percent": round(self.get_total_risk_percent(), 3),
+            "currency_exposure_percent": {
+                currency: round(value, 3) for currency, value in self.get_currency_exposures().items()
+            },
+            "net_currency_units": {
+                currency: round(units, 2)
+                for currency, units in self._currency_units.items()
+                if abs(units) > 1e-9
+            },
+            "positions": self.get_positions(),
+            "trades": [asdict(trade) for trade in self.trades.values()],
+        }
+
+
+# Global position book instance
+position_book = PositionBook()
+
+
+def get_position_book() -> PositionBook:
+    """Get the global position book."""
+    return position_book
@@ -0,0 +1,365 @@
+"""
+Pricing Stream Service
+Long-lived OANDA pricing stream feeding an in-process tick bus and latest-price table.
+
+Features:
+- One streaming connection for every monitored pair (/v3/accounts/{id}/pricing/stream)
+- Heartbeat watchdog: a silent connection is dropped and reopened
+- Reconnects with exponential backoff and jitter
+- Latest-price table read without locks (ticks are immutable and swapped in whole)
+- Tick bus: per-subscriber bounded drop-oldest queues plus synchronous listeners
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Set
+
+import aiohttp
+
+from config.settings import PRICING_STREAM_SETTINGS
+from services.json_codec import loads
+from services.metrics_service import get_metrics_registry
+
+metrics = get_metrics_registry()
+STREAM_MESSAGES = metrics.counter(
+    "pricing_stream_messages_total", "Pricing stream messages by type", ["type"]
+)
+STREAM_CONNECTED = metrics.gauge(
+    "pricing_stream_connected", "1 while the OANDA pricing stream is connected"
+)
+STREAM_RECONNECTS = metrics.counter(
+    "pricing_stream_reconnects_total", "Pricing stream reconnect attempts"
+)
+
+
+class Tick(NamedTuple):
+    """One price update; immutable so readers never see a half-written price."""
+
+    instrument: str
+    time: str  # OANDA RFC3339 timestamp, parsed only on demand
+    bid: float
+    ask: float
+    received: float  # time.monotonic() when the tick arrived
+
+    @property
+    def mid(self) -> float:
+        return (self.bid + self.ask) / 2
+
+    @property
+    def spread(self) -> float:
+        return self.ask - self.bid
+
+    @property
+    def timestamp(self) -> datetime:
+        return datetime.fromisoformat(self.time.replace("Z", "+00:00"))
+
+    def age(self) -> float:
+        """Seconds since the tick was received."""
+        return time.monotonic() - self.received
+
+
+class TickSubscription:
+    """One consumer's bounded drop-oldest tick queue."""
+
+    def __init__(self, subscriber_id: int, max_queue_size: int, instruments: Optional[Set[str]]):
+        self.subscriber_id = subscriber_id
+        self.instruments = instruments
+        self._queue: Deque[Tick] = deque(maxlen=max_queue_size)
+        self._ready = asyncio.Event()
+        self.closed = False
+
+        self.stats = {"delivered": 0, "dropped": 0}
+
+    def put(self, tick: Tick) -> None:
+        if len(self._queue) == self._queue.maxlen:
+            self.stats["dropped"] += 1
+        self._queue.append(tick)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Tick]:
+        """
+        Wait for the next tick.
+
+        Returns:
+            The tick, or None on timeout or once the subscription is closed
+        """
+        while not self._queue:
+            if self.closed:
+                return None
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        self.stats["delivered"] += 1
+        return self._queue.popleft()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+
+class TickBus:
+    """Fans ticks out to queue subscribers and synchronous listeners."""
+
+    def __init__(self, max_queue_size: int = PRICING_STREAM_SETTINGS["subscriber_queue_size"]):
+        self.logger = logging.getLogger(__name__)
+        self.max_queue_size = max_queue_size
+        self._subscriptions: Dict[int, TickSubscription] = {}
+        self._listeners: List[Callable[[Tick], None]] = []
+        self._next_subscriber_id = 1
+        self.listener_errors = 0
+
+    def subscribe(self, instruments: Optional[Iterable[str]] = None) -> TickSubscription:
+        """Subscribe to ticks for some instruments (None for all)."""
+        subscription = TickSubscription(
+            self._next_subscriber_id,
+            self.max_queue_size,
+            set(instruments) if instruments else None,
+        )
+        self._subscriptions[subscription.subscriber_id] = subscription
+        self._next_subscriber_id += 1
+        return subscription
+
+    def unsubscribe(self, subscription: TickSubscription) -> None:
+        subscription.close()
+        self._subscriptions.pop(subscription.subscriber_id, None)
+
+    def add_listener(self, listener: Callable[[Tick], None]) -> None:
+        """Call `listener(tick)` inline for every tick; it must not block."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Tick], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def publish(self, tick: Tick) -> None:
+        for subscription in self._subscriptions.values():
+            if subscription.instruments is None or tick.instrument in subscription.instruments:
+                subscription.put(tick)
+        for listener in self._listeners:
+            try:
+                listener(tick)
+            except Exception as e:
+                self.listener_errors += 1
+                self.logger.error(f"❌ Tick listener failed: {str(e)}")
+
+    def get_bus_stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscriptions),
+            "listeners": len(self._listeners),
+            "listener_errors": self.listener_errors,
+            "queue_depth": sum(s.queue_depth for s in self._subscriptions.values()),
+            "dropped": sum(s.stats["dropped"] for s in self._subscriptions.values()),
+        }
+
+
+class PricingStreamService:
+    """Keeps an OANDA pricing stream open and publishes its ticks."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.data_service = None
+        self.bus = TickBus()
+        self.prices: Dict[str, Tick] = {}
+        self.connected = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_message = 0.0  # time.monotonic() of the last tick or heartbeat
+
+        self.stream_stats = {
+            "connects": 0,
+            "reconnects": 0,
+            "ticks": 0,
+            "heartbeats": 0,
+            "parse_errors": 0,
+            "last_error": None,
+            "last_heartbeat": None,
+            "connected_since": None,
+        }
+
+    def set_data_service(self, data_service) -> None:
+        """Set the DataService providing credentials, stream URL and pairs."""
+        self.data_service = data_service
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, instruments: Optional[Iterable[str]] = None) -> bool:
+        """
+        Start streaming in the background.
+
+        Returns:
+            True if the stream was started (or is already running)
+        """
+        if self.running:
+            return True
+        if not PRICING_STREAM_SETTINGS["enabled"]:
+            self.logger.info("📴 Pricing stream disabled")
+            return False
+        if self.data_service is None or not self.data_service.api_key:
+            self.logger.warning("⚠️ No OANDA API key configured - pricing stream not started")
+            return False
+
+        instruments = list(instruments or self.data_service.pair_mapping.values())
+        self._task = asyncio.get_running_loop().create_task(self._run(instruments))
+        return True
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._set_connected(False)
+
+    def get_price(self, pair: str) -> Optional[Tick]:
+        """
+        Latest tick for a pair, or None if it cannot be trusted as current.
+
+        OANDA only sends a price when it changes, so an old tick is still current
+        while the stream is connected; otherwise it expires after max_price_age_seconds.
+        """
+        tick = self.prices.get(pair)
+        if tick is None:
+            return None
+        if self.connected or tick.age() <= PRICING_STREAM_SETTINGS["max_price_age_seconds"]:
+            return tick
+        return None
+
+    def get_mid(self, pair: str) -> Optional[float]:
+        tick = self.get_price(pair)
+        return tick.mid if tick is not None else None
+
+    async def _run(self, instruments: List[str]) -> None:
+        delay = PRICING_STREAM_SETTINGS["reconnect_initial_seconds"]
+        while True:
+            received_before = self.stream_stats["ticks"] + self.stream_stats["heartbeats"]
+            try:
+                await self._stream(instruments)
+                self.stream_stats["last_error"] = "stream closed by server"
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                self.stream_stats["last_error"] = "heartbeat timeout"
+            except Exception as e:
+                self.stream_stats["last_error"] = str(e) or type(e).__name__
+            finally:
+                self._set_connected(False)
+
+            # A connection that delivered anything resets the backoff
+            if self.stream_stats["ticks"] + self.stream_stats["heartbeats"] > received_before:
+                delay = PRICING_STREAM_SETTINGS["reconnect_initial_seconds"]
+
+            wait = random.uniform(delay / 2, delay)
+            self.stream_stats["reconnects"] += 1
+            STREAM_RECONNECTS.inc()
+            self.logger.warning(
+                f"⚠️ Pricing stream disconnected ({self.stream_stats['last_error']}) - "
+                f"reconnecting in {wait:.1f}s"
+            )
+            await asyncio.sleep(wait)
+            delay = min(delay * 2, PRICING_STREAM_SETTINGS["reconnect_max_seconds"])
+
+    async def _stream(self, instruments: List[str]) -> None:
+        data_service = self.data_service
+        url = f"{data_service.stream_url}/v3/accounts/{data_service.account_id}/pricing/stream"
+        # sock_read turns a silent connection (no ticks, no heartbeats) into a TimeoutError
+        timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=PRICING_STREAM_SETTINGS["heartbeat_timeout_seconds"],
+            sock_read=PRICING_STREAM_SETTINGS["heartbeat_timeout_seconds"],
+        )
+        connector = aiohttp.TCPConnector(ssl=data_service.ssl_context)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            async with session.get(
+                url,
+                headers={"Authorization": data_service.headers["Authorization"]},
+                params={"instruments": ",".join(instruments)},
+            ) as response:
+                if response.status != 200:
+                    body = await response.text()
+                    raise RuntimeError(f"HTTP {response.status}: {body[:200]}")
+
+                self._set_connected(True)
+                self.stream_stats["connects"] += 1
+                self.logger.info(f"📈 Pricing stream connected ({len(instruments)} instruments)")
+
+                async for line in response.content:
+                    if line.strip():
+                        self._handle_message(line)
+
+    def _handle_message(self, line: bytes) -> None:
+        self._last_message = time.monotonic()
+        try:
+            message = loads(line)
+            message_type = message.get("type")
+            if message_type == "PRICE":
+                tick = Tick(
+                    message["instrument"],
+                    message["time"],
+                    float(message["bids"][0]["price"]),
+                    float(message["asks"][0]["price"]),
+                    self._last_message,
+                )
+            elif message_type == "HEARTBEAT":
+                self.stream_stats["heartbeats"] += 1
+                self.stream_stats["last_heartbeat"] = message.get("time")
+                STREAM_MESSAGES.inc("heartbeat")
+                return
+            else:
+                STREAM_MESSAGES.inc("other")
+                return
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            self.stream_stats["parse_errors"] += 1
+            STREAM_MESSAGES.inc("invalid")
+            self.logger.debug(f"Unparseable pricing stream message: {str(e)}")
+            return
+
+        self.prices[tick.instrument] = tick
+        self.stream_stats["ticks"] += 1
+        STREAM_MESSAGES.inc("price")
+        self.bus.publish(tick)
+
+    def _set_connected(self, connected: bool) -> None:
+        self.connected = connected
+        self.stream_stats["connected_since"] = (
+            datetime.utcnow().isoformat() if connected else None
+        )
+
+    def get_stream_stats(self) -> Dict[str, Any]:
+        """Get connection state, message counts and the latest prices."""
+        return {
+            "running": self.running,
+            "connected": self.connected,
+            "seconds_since_last_message": (
+                round(time.monotonic() - self._last_message, 1) if self._last_message else None
+            ),
+            **self.stream_stats,
+            "bus": self.bus.get_bus_stats(),
+            "prices": {
+                pair: {"bid": tick.bid, "ask": tick.ask, "time": tick.time}
+                for pair, tick in self.prices.items()
+            },
+        }
+
+
+# Global pricing stream instance
+pricing_stream_service = PricingStreamService()
+STREAM_CONNECTED.set_function(lambda: {(): float(pricing_stream_service.connected)})
+
+
+def get_pricing_stream_service() -> PricingStreamService:
+    """Get the global pricing stream service."""
+    return pricing_stream_service
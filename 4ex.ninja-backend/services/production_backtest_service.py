@@ -6,7 +6,6 @@ This service will be deployed to DigitalOcean for live monitoring and results di
 """
 
 import asyncio
-import json
 import logging
 import numpy as np
 from datetime import datetime, timedelta
@@ -18,6 +17,12 @@ from services.multi_timeframe_strategy_service import MultiTimeframeStrategyServ
 from services.data_service import DataService
 from models.signal_models import TradingSignal, PriceData, PerformanceMetrics
 from config.settings import MULTI_TIMEFRAME_STRATEGY_CONFIG
+from services.json_codec import dump_to_file, dumps
+from services.synthetic_market import (
+    DEFAULT_MARKET_PARAMS,
+    PAIR_MARKET_PARAMS,
+    generate_series,
+)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -555,64 +560,14 @@ class MultiTimeframeBacktestService:
         """Generate synthetic data for backtesting when real data unavailable."""
         logger.info(f"Generating synthetic backtest data for {pair}")
 
-        # Calculate number of 4H periods
-        total_hours = int((end_date - start_date).total_seconds() / 3600)
-        periods = total_hours // 4
-
-        # Starting prices
-        price_map = {
-            "EUR_USD": 1.0850,
-            "GBP_USD": 1.2650,
-            "USD_JPY": 148.50,
-            "AUD_USD": 0.6650,
-            "EUR_GBP": 0.8580,
-            "GBP_JPY": 187.50,
-            "USD_CAD": 1.3650,
-        }
-
-        start_price = price_map.get(pair, 1.0000)
-        current_price = start_price
-        current_time = start_date
-
-        data = []
-
-        # Generate trending price movement with realistic patterns
-        trend_strength = np.random.uniform(0.0002, 0.0008)  # Daily trend
-        trend_direction = np.random.choice([-1, 1])
-
-        for i in range(periods):
-            # Add trend and noise
-            trend_component = trend_direction * trend_strength * (i / periods)
-            cycle_component = np.sin(i / 50) * 0.0003  # Market cycles
-            noise = np.random.normal(0, 0.0015)  # Random volatility
-
-            price_change = trend_component + cycle_component + noise
-            current_price *= 1 + price_change
-
-            # Generate OHLC with realistic spread
-            volatility = 0.0012
-            high = current_price * (1 + np.random.uniform(0, volatility))
-            low = current_price * (1 - np.random.uniform(0, volatility))
-            open_price = current_price * (
-                1 + np.random.uniform(-volatility / 3, volatility / 3)
-            )
-
-            data.append(
-                PriceData(
-                    pair=pair,
-                    timeframe="4H",
-                    timestamp=current_time,
-                    open=round(open_price, 5),
-                    high=round(high, 5),
-                    low=round(low, 5),
-                    close=round(current_price, 5),
-                    volume=np.random.randint(800, 1200),
-                )
-            )
-
-            current_time += timedelta(hours=4)
-
-        return data
+        series = generate_series(
+            pair,
+            "H4",
+            start=start_date,
+            end=end_date,
+            params=PAIR_MARKET_PARAMS.get(pair, DEFAULT_MARKET_PARAMS),
+        )
+        return series.to_price_data(timeframe="4H")
 
     async def compile_comprehensive_results(
         self,
@@ -765,21 +720,21 @@ class MultiTimeframeBacktestService:
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
+        # Serialize once; the same bytes go to the timestamped and latest files
+        payload = dumps(results, indent=True)
+
         # Save main results
-        with open(results_dir / f"backtest_results_{timestamp}.json", "w") as f:
-            json.dump(results, f, indent=2, default=str)
+        (results_dir / f"backtest_results_{timestamp}.json").write_bytes(payload)
 
         # Save latest results (for frontend to always fetch)
-        with open(results_dir / "latest_backtest_results.json", "w") as f:
-            json.dump(results, f, indent=2, default=str)
+        (results_dir / "latest_backtest_results.json").write_bytes(payload)
 
         # Save individual pair results for detailed analysis
         pair_results_dir = results_dir / "pair_details"
         pair_results_dir.mkdir(exist_ok=True)
 
         for pair, result in self.backtest_results.items():
-            with open(pair_results_dir / f"{pair}_detailed_{timestamp}.json", "w") as f:
-                json.dump(asdict(result), f, indent=2, default=str)
+            dump_to_file(result, pair_results_dir / f"{pair}_detailed_{timestamp}.json")
 
         logger.info(f"📁 Backtest results saved to {results_dir}")
 
@@ -791,17 +746,15 @@ class MultiTimeframeBacktestService:
         results_dir = Path("backtest_results/live_monitoring")
         results_dir.mkdir(parents=True, exist_ok=True)
 
-        # Convert to JSON-serializable format
-        json_results = {pair: asdict(result) for pair, result in live_results.items()}
+        # Dataclasses serialize natively; encode once for both files
+        payload = dumps(live_results, indent=True)
 
         # Save current live results
-        with open(results_dir / "current_live_signals.json", "w") as f:
-            json.dump(json_results, f, indent=2, default=str)
+        (results_dir / "current_live_signals.json").write_bytes(payload)
 
         # Also save timestamped version
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        with open(results_dir / f"live_signals_{timestamp}.json", "w") as f:
-            json.dump(json_results, f, indent=2, default=str)
+        (results_dir / f"live_signals_{timestamp}.json").write_bytes(payload)
 
         logger.info(f"📡 Live results saved to {results_dir}")
 
@@ -0,0 +1,320 @@
+"""
+Profiling Service
+On-demand profiling of production scans without a restart.
+
+Features:
+- Arm the next N scheduled scans, or profile a single /scan request
+- Sampling profiler: every thread's stack on a timer (covers the analysis
+  executor), written as collapsed stacks for flamegraph.pl / speedscope
+- Deterministic profiler: cProfile of the event-loop thread, written as .pstats
+- Top-functions summary next to every profile
+- One attribute check per scan when nothing is armed
+"""
+
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from config.settings import PROFILING_SETTINGS
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Parked threads (idle pool workers, timers) would otherwise dominate the samples
+_IDLE_LEAF_FILES = ("threading.py", "queue.py")
+
+Stack = Tuple[str, ...]
+
+
+class SamplingProfiler:
+    """Samples every thread's Python stack from a background thread."""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: Dict[Any, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            path = code.co_filename
+            if path.startswith(BACKEND_DIR):
+                path = os.path.relpath(path, BACKEND_DIR)
+            else:
+                path = "/".join(Path(path).parts[-2:])
+            # Semicolons separate frames in the collapsed format
+            label = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(";", ":")
+            self._labels[code] = label
+        return label
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_seconds):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if frame.f_code.co_filename.endswith(_IDLE_LEAF_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, f"thread-{thread_id}"))
+                stack.reverse()
+                self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+
+class ProfileSession:
+    """One profiled scan and the files written for it."""
+
+    def __init__(self, label: str, mode: str):
+        self.label = label
+        self.mode = mode
+        self.started_at = datetime.now(timezone.utc)
+        self.started = time.perf_counter()
+        self.duration_seconds = 0.0
+        stamp = self.started_at.strftime("%Y%m%dT%H%M%S.%f")[:-3]
+        self.profile_id = f"{stamp}_{label}_{mode}".replace(" ", "_")
+        self.files: Dict[str, str] = {}
+        self.top_functions: List[Dict[str, Any]] = []
+        self._sampler: Optional[SamplingProfiler] = None
+        self._cprofile: Optional[cProfile.Profile] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "profile_id": self.profile_id,
+            "label": self.label,
+            "mode": self.mode,
+            "started_at": self.started_at.isoformat(),
+            "duration_seconds": round(self.duration_seconds, 3),
+            "files": self.files,
+            "top_functions": self.top_functions[:10],
+        }
+
+
+class ProfilingService:
+    """Arms and runs profilers around scans and writes their reports."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self.output_dir = Path(PROFILING_SETTINGS["output_dir"])
+        self._armed_scans = PROFILING_SETTINGS["profile_next_scans"]
+        self._armed_mode = PROFILING_SETTINGS["default_mode"]
+        self._active: Optional[ProfileSession] = None
+        self._recent: Deque[ProfileSession] = deque(maxlen=PROFILING_SETTINGS["keep_last"])
+
+        self.profiling_stats = {
+            "profiles_written": 0,
+            "profiles_skipped_busy": 0,
+            "profile_failures": 0,
+        }
+
+        if self._armed_scans:
+            self.logger.info(
+                f"🔬 Profiling armed for the next {self._armed_scans} scheduled scans ({self._armed_mode})"
+            )
+
+    def arm(self, scans: int = 1, mode: Optional[str] = None) -> Dict[str, Any]:
+        """Profile the next `scans` scheduled scans (0 disarms)."""
+        mode = mode or PROFILING_SETTINGS["default_mode"]
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode: {mode} (expected one of {PROFILE_MODES})")
+        self._armed_scans = max(0, scans)
+        self._armed_mode = mode
+        self.logger.info(f"🔬 Profiling armed for the next {self._armed_scans} scheduled scans ({mode})")
+        return self.get_profiling_status()
+
+    def start_scheduled(self, label: str) -> Optional[ProfileSession]:
+        """Start profiling a scheduled scan if any are armed; None otherwise."""
+        if not self._armed_scans:
+            return None
+        session = self.start(label, self._armed_mode)
+        if session is not None:
+            self._armed_scans -= 1
+        return session
+
+    def start(self, label: str, mode: Optional[str] = None) -> Optional[ProfileSession]:
+        """
+        Start a profiling session.
+
+        Returns:
+            The session, or None if another session is already running
+        """
+        mode = mode or PROFILING_SETTINGS["default_mode"]
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profiling mode: {mode} (expected one of {PROFILE_MODES})")
+        if self._active is not None:
+            self.profiling_stats["profiles_skipped_busy"] += 1
+            return None
+
+        session = ProfileSession(label, mode)
+        if mode == "sampling":
+            session._sampler = SamplingProfiler(PROFILING_SETTINGS["sample_interval_ms"] / 1000)
+            session._sampler.start()
+        else:
+            # cProfile only sees the thread it was enabled on (the event loop)
+            session._cprofile = cProfile.Profile()
+            session._cprofile.enable()
+
+        self._active = session
+        self.logger.info(f"🔬 Profiling {label} ({mode})")
+        return session
+
+    async def finish(self, session: ProfileSession) -> ProfileSession:
+        """Stop a session and write its reports (file I/O off the event loop)."""
+        session.duration_seconds = time.perf_counter() - session.started
+        if session._cprofile is not None:
+            session._cprofile.disable()
+        try:
+            if session._sampler is not None:
+                await asyncio.to_thread(session._sampler.stop)
+            await asyncio.to_thread(self._write_reports, session)
+            self.profiling_stats["profiles_written"] += 1
+            self._recent.append(session)
+            self.logger.info(
+                f"🔬 Profile {session.profile_id} written ({session.duration_seconds:.2f}s)"
+            )
+        except Exception as e:
+            self.profiling_stats["profile_failures"] += 1
+            self.logger.error(f"❌ Failed to write profile {session.profile_id}: {str(e)}")
+        finally:
+            session._sampler = None
+            session._cprofile = None
+            self._active = None
+        return session
+
+    def _write_reports(self, session: ProfileSession) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        if session._sampler is not None:
+            sampler = session._sampler
+            collapsed = self.output_dir / f"{session.profile_id}.collapsed"
+            collapsed.write_text(
+                "".join(f"{';'.join(stack)} {count}\n" for stack, count in sampler.stacks.most_common())
+            )
+            session.files["collapsed"] = str(collapsed)
+            session.top_functions = self._sampled_top_functions(sampler)
+            header = (
+                f"{sampler.samples} samples every {sampler.interval_seconds * 1000:.1f}ms "
+                f"across all threads"
+            )
+        else:
+            stats_path = self.output_dir / f"{session.profile_id}.pstats"
+            session._cprofile.dump_stats(str(stats_path))
+            session.files["pstats"] = str(stats_path)
+            session.top_functions = self._cprofile_top_functions(session._cprofile)
+            header = "cProfile of the event-loop thread"
+
+        summary = self.output_dir / f"{session.profile_id}.txt"
+        summary.write_text(self._format_summary(session, header))
+        session.files["summary"] = str(summary)
+
+    @staticmethod
+    def _sampled_top_functions(sampler: SamplingProfiler) -> List[Dict[str, Any]]:
+        """Self (leaf) and total (anywhere on the stack) samples per function."""
+        self_counts: Counter = Counter()
+        total_counts: Counter = Counter()
+        for stack, count in sampler.stacks.items():
+            frames = stack[1:]  # First element is the thread name
+            if not frames:
+                continue
+            self_counts[frames[-1]] += count
+            for frame in set(frames):
+                total_counts[frame] += count
+
+        all_samples = sum(sampler.stacks.values()) or 1
+        return [
+            {
+                "function": function,
+                "self_percent": round(self_counts[function] / all_samples * 100, 1),
+                "total_percent": round(total_counts[function] / all_samples * 100, 1),
+                "self_samples": self_counts[function],
+            }
+            for function, _ in self_counts.most_common(PROFILING_SETTINGS["top_functions"])
+        ]
+
+    @staticmethod
+    def _cprofile_top_functions(profile: cProfile.Profile) -> List[Dict[str, Any]]:
+        """Functions by own time, with cumulative time and call counts."""
+        stats = pstats.Stats(profile, stream=io.StringIO())
+        rows = []
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.stats.items():
+            rows.append(
+                {
+                    "function": f"{name} ({'/'.join(Path(filename).parts[-2:])}:{line})",
+                    "own_seconds": round(own, 6),
+                    "cumulative_seconds": round(cumulative, 6),
+                    "calls": calls,
+                }
+            )
+        rows.sort(key=lambda row: row["own_seconds"], reverse=True)
+        return rows[: PROFILING_SETTINGS["top_functions"]]
+
+    @staticmethod
+    def _format_summary(session: ProfileSession, header: str) -> str:
+        lines = [
+            f"Profile {session.profile_id}",
+            f"Started {session.started_at.isoformat()}, ran {session.duration_seconds:.3f}s",
+            header,
+            "",
+        ]
+        if session.mode == "sampling":
+            lines.append(f"{'self%':>7} {'total%':>7} {'samples':>8}  function")
+            for row in session.top_functions:
+                lines.append(
+                    f"{row['self_percent']:7.1f} {row['total_percent']:7.1f} "
+                    f"{row['self_samples']:8d}  {row['function']}"
+                )
+        else:
+            lines.append(f"{'own s':>10} {'cum s':>10} {'calls':>8}  function")
+            for row in session.top_functions:
+                lines.append(
+                    f"{row['own_seconds']:10.4f} {row['cumulative_seconds']:10.4f} "
+                    f"{row['calls']:8d}  {row['function']}"
+                )
+        return "\n".join(lines) + "\n"
+
+    def get_profiling_status(self) -> Dict[str, Any]:
+        """Get armed scans, the running session and recent profiles."""
+        return {
+            "armed_scans": self._armed_scans,
+            "armed_mode": self._armed_mode,
+            "active": self._active.profile_id if self._active else None,
+            "output_dir": str(self.output_dir),
+            "recent": [session.to_dict() for session in reversed(self._recent)],
+            **self.profiling_stats,
+        }
+
+
+# Global profiling service instance
+profiling_service = ProfilingService()
+
+
+def get_profiling_service() -> ProfilingService:
+    """Get the global profiling service."""
+    return profiling_service
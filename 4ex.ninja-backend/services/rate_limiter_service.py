@@ -0,0 +1,166 @@
+"""
+Rate Limiter Service
+Token-bucket rate limiting for outbound API calls (Discord, OANDA).
+
+Features:
+- O(1) token buckets with continuous refill (no per-window counters)
+- Non-blocking try_acquire() and waiting acquire() with optional timeout
+- FIFO fairness for waiters via reservation (a bucket may go into debt)
+- Named bucket registry bounded by LRU eviction
+- Per-bucket allow/reject/wait statistics
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+from config.settings import RATE_LIMIT_SETTINGS
+
+
+class TokenBucket:
+    """
+    Token bucket with continuous refill.
+
+    State is two floats (tokens, last refill time), so every check is O(1)
+    and memory does not grow with traffic. Waiting callers reserve their
+    tokens up front, which lets the balance go negative; later callers see
+    the debt and queue behind them instead of jumping ahead.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        if capacity <= 0 or refill_per_second <= 0:
+            raise ValueError("capacity and refill_per_second must be positive")
+
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+
+        self.stats = {"allowed": 0, "rejected": 0, "waited": 0, "cancelled": 0, "total_wait_seconds": 0.0}
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.refill_per_second)
+            self._last_refill = now
+
+    @property
+    def available_tokens(self) -> float:
+        """Tokens available right now (negative while waiters hold reservations)."""
+        self._refill(time.monotonic())
+        return self._tokens
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available right now; never waits."""
+        self._refill(time.monotonic())
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            self.stats["allowed"] += 1
+            return True
+
+        self.stats["rejected"] += 1
+        return False
+
+    async def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until tokens are available.
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits as long as needed)
+
+        Returns:
+            True once the tokens are granted, False if the wait would exceed timeout
+
+        A caller cancelled while waiting gets its reserved tokens refunded.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from bucket of capacity {self.capacity}")
+
+        self._refill(time.monotonic())
+        wait_seconds = max(0.0, (tokens - self._tokens) / self.refill_per_second)
+
+        if timeout is not None and wait_seconds > timeout:
+            self.stats["rejected"] += 1
+            return False
+
+        # Reserve now so later callers queue behind this one
+        self._tokens -= tokens
+        self.stats["allowed"] += 1
+
+        if wait_seconds > 0:
+            self.stats["waited"] += 1
+            self.stats["total_wait_seconds"] += wait_seconds
+            try:
+                await asyncio.sleep(wait_seconds)
+            except asyncio.CancelledError:
+                # The tokens were never used; give them back to later callers
+                self._tokens += tokens
+                self.stats["allowed"] -= 1
+                self.stats["cancelled"] += 1
+                raise
+
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bucket configuration and counters."""
+        return {
+            "capacity": self.capacity,
+            "refill_per_second": self.refill_per_second,
+            "available_tokens": round(self.available_tokens, 3),
+            **self.stats,
+        }
+
+
+class RateLimiterService:
+    """Registry of named token buckets shared across services."""
+
+    def __init__(self, max_buckets: int = RATE_LIMIT_SETTINGS.get("max_buckets", 256)):
+        self.logger = logging.getLogger(__name__)
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+
+    def get_bucket(self, name: str, capacity: float, refill_per_second: float) -> TokenBucket:
+        """
+        Get or create a named bucket.
+
+        The first caller's capacity/refill settings win; the least recently
+        used bucket is evicted once max_buckets is reached. Evicting only
+        drops the registry's reference, so long-lived clients should resolve
+        their bucket once and keep it.
+        """
+        bucket = self._buckets.get(name)
+        if bucket is not None:
+            self._buckets.move_to_end(name)
+            return bucket
+
+        bucket = TokenBucket(capacity, refill_per_second)
+        self._buckets[name] = bucket
+        if len(self._buckets) > self.max_buckets:
+            evicted, _ = self._buckets.popitem(last=False)
+            self.logger.debug(f"🪣 Evicted rate limit bucket: {evicted}")
+        return bucket
+
+    def get_configured_bucket(self, config_key: str, name: Optional[str] = None) -> TokenBucket:
+        """Get a bucket using limits from RATE_LIMIT_SETTINGS[config_key]."""
+        config = RATE_LIMIT_SETTINGS[config_key]
+        return self.get_bucket(name or config_key, config["capacity"], config["refill_per_second"])
+
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Get statistics for every tracked bucket."""
+        return {
+            "bucket_count": len(self._buckets),
+            "max_buckets": self.max_buckets,
+            "buckets": {name: bucket.get_stats() for name, bucket in self._buckets.items()},
+        }
+
+
+# Global rate limiter instance
+rate_limiter_service = RateLimiterService()
+
+
+def get_rate_limiter_service() -> RateLimiterService:
+    """Get the global rate limiter service instance."""
+    return rate_limiter_service
@@ -0,0 +1,217 @@
+"""
+Risk Journal Service
+Append-only, crash-safe journal for risk-manager state shared across processes.
+
+Features:
+- One JSON line per event (trade results, emergencies, period resets), flushed on write
+- Periodic snapshots written to a temp file and atomically renamed into place
+- Recovery loads the snapshot and replays only the events after it
+- Every event carries a sequence number, so a crash between snapshot and journal
+  truncation never applies an event twice
+- An exclusive file lock around catch-up and append lets the API and the live
+  loops write to the same journal and see each other's events
+"""
+
+import fcntl
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config.settings import RISK_JOURNAL_SETTINGS
+from services import json_codec
+from services.metrics_service import get_metrics_registry
+
+metrics = get_metrics_registry()
+JOURNAL_EVENTS = metrics.counter(
+    "risk_journal_events_total", "Risk events written to the journal", ["type"]
+)
+
+StateGetter = Callable[[], Dict[str, Any]]
+StateSetter = Callable[[Dict[str, Any]], None]
+EventApplier = Callable[[Dict[str, Any]], None]
+
+
+class RiskJournal:
+    """Event journal plus snapshot for one piece of risk state."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        snapshot_every: Optional[int] = None,
+        fsync: Optional[bool] = None,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.directory = Path(directory or RISK_JOURNAL_SETTINGS["directory"])
+        self.snapshot_every = snapshot_every or RISK_JOURNAL_SETTINGS["snapshot_every"]
+        self.fsync = RISK_JOURNAL_SETTINGS["fsync"] if fsync is None else fsync
+        self.journal_path = self.directory / "journal.jsonl"
+        self.snapshot_path = self.directory / "snapshot.json"
+        self.lock_path = self.directory / "journal.lock"
+
+        self.seq = 0  # Sequence number of the last event applied here
+        self._snapshot_seq = 0
+        self._offset = 0  # Bytes of the journal already read
+        self._snapshot_id = None  # (inode, mtime) of the snapshot loaded; each snapshot is a new file
+        self._get_state: Optional[StateGetter] = None
+        self._set_state: Optional[StateSetter] = None
+        self._apply: Optional[EventApplier] = None
+
+        self.journal_stats = {"events_written": 0, "events_replayed": 0, "snapshots": 0, "recoveries": 0}
+
+    def attach(self, get_state: StateGetter, set_state: StateSetter, apply_event: EventApplier) -> None:
+        """Connect the owner's state accessors and event reducer."""
+        self._get_state = get_state
+        self._set_state = set_state
+        self._apply = apply_event
+
+    def recover(self) -> int:
+        """Restore the snapshot and replay the events after it; returns events replayed."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            replayed = self._reload()
+        self.journal_stats["recoveries"] += 1
+        if self.seq:
+            self.logger.info(f"📒 Risk state recovered at event {self.seq} ({replayed} replayed)")
+        return replayed
+
+    def catch_up(self) -> int:
+        """Apply events other writers appended since the last read."""
+        if not self.journal_path.exists():
+            return 0
+        with self._locked():
+            return self._catch_up()
+
+    def record(self, event_type: str, **data: Any) -> Dict[str, Any]:
+        """
+        Append an event and apply it to the owner's state.
+
+        Events from other writers are applied first, so the new event lands on
+        current state and gets the next sequence number.
+        """
+        with self._locked():
+            self._catch_up()
+            if self.journal_path.exists() and self.journal_path.stat().st_size > self._offset:
+                # Drop a torn line left by a writer that crashed mid-append
+                os.truncate(self.journal_path, self._offset)
+            event = {
+                "seq": self.seq + 1,
+                "type": event_type,
+                "time": datetime.now(timezone.utc).isoformat(),
+                **data,
+            }
+            with self.journal_path.open("ab") as f:
+                f.write(json_codec.dumps(event) + b"\n")
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+                self._offset = f.tell()
+            self._apply(event)
+            self.seq = event["seq"]
+            self.journal_stats["events_written"] += 1
+            JOURNAL_EVENTS.inc(event_type)
+
+            if self.seq - self._snapshot_seq >= self.snapshot_every:
+                self._write_snapshot()
+        return event
+
+    def snapshot(self) -> None:
+        """Write a snapshot of the current state and truncate the journal."""
+        with self._locked():
+            self._catch_up()
+            self._write_snapshot()
+
+    def _locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return _FileLock(self.lock_path)
+
+    def _reload(self) -> int:
+        self.seq = self._snapshot_seq = self._offset = 0
+        self._snapshot_id = self._current_snapshot_id()
+        if self._snapshot_id is not None:
+            snapshot = json_codec.loads(self.snapshot_path.read_bytes())
+            self._set_state(snapshot["state"])
+            self.seq = self._snapshot_seq = snapshot["seq"]
+        return self._catch_up()
+
+    def _current_snapshot_id(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.snapshot_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _catch_up(self) -> int:
+        if self._current_snapshot_id() != self._snapshot_id:
+            # Another writer snapshotted and truncated the journal
+            return self._reload()
+        if not self.journal_path.exists():
+            return 0
+        size = self.journal_path.stat().st_size
+        if size < self._offset:
+            return self._reload()
+        if size == self._offset:
+            return 0
+
+        applied = 0
+        with self.journal_path.open("rb") as f:
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Torn write from a crash; it was never acknowledged
+                self._offset += len(line)
+                event = json_codec.loads(line)
+                if event["seq"] <= self.seq:
+                    continue
+                self._apply(event)
+                self.seq = event["seq"]
+                applied += 1
+        self.journal_stats["events_replayed"] += applied
+        return applied
+
+    def _write_snapshot(self) -> None:
+        snapshot = {
+            "seq": self.seq,
+            "time": datetime.now(timezone.utc).isoformat(),
+            "state": self._get_state(),
+        }
+        temp_path = self.snapshot_path.with_suffix(".tmp")
+        with temp_path.open("wb") as f:
+            f.write(json_codec.dumps(snapshot))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self._snapshot_id = self._current_snapshot_id()
+        # Events up to seq are in the snapshot; replay skips them even if truncation is lost
+        self.journal_path.write_bytes(b"")
+        self._offset = 0
+        self._snapshot_seq = self.seq
+        self.journal_stats["snapshots"] += 1
+
+    def get_journal_stats(self) -> Dict[str, Any]:
+        """Get write/replay counts and the current sequence number."""
+        return {
+            **self.journal_stats,
+            "directory": str(self.directory),
+            "seq": self.seq,
+            "snapshot_seq": self._snapshot_seq,
+        }
+
+
+class _FileLock:
+    """Exclusive flock held for the duration of a with-block."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        self._file = self.path.open("a")
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
@@ -0,0 +1,235 @@
+"""
+Scan Snapshot Service
+Serves the latest market scan as an immutable, versioned snapshot.
+
+Features:
+- Snapshots published by the scheduler after each scan run
+- Content-hash ETags for If-None-Match / 304 handling
+- Precomputed per-pair signal index so handlers do no scanning work
+- Single-flight refresh: concurrent forced refreshes share one scan
+- Response bodies serialized (and compressed) once per snapshot and served as bytes
+- Each published snapshot is pushed to stream subscribers on the "scan" topic
+"""
+
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config.settings import JSON_RESPONSE_SETTINGS
+from services.json_codec import SUPPORTED_ENCODINGS, compress, dumps
+from services.signal_bus_service import get_signal_bus_service
+
+# Builds a response body from a snapshot
+ViewBuilder = Callable[["ScanSnapshot"], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class ScanSnapshot:
+    """One published scan. Its data is never mutated after publish; only rendered bodies are added."""
+
+    version: int
+    etag: str
+    created_at: str
+    source: str
+    data: Dict[str, Any]
+    signals_by_pair: Dict[str, List[Dict[str, Any]]]
+    # (view, content-encoding) -> serialized body; filled on first use, never invalidated
+    rendered: Dict[Tuple[str, Optional[str]], bytes] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Check an If-None-Match header value against this snapshot's ETag (any encoding)."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            for encoding in SUPPORTED_ENCODINGS:
+                tag = tag.replace(f"-{encoding}\"", '"')
+            if tag == self.etag:
+                return True
+        return False
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """ETag for one representation; compressed bodies get their own tag."""
+        return f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+
+    def render(self, view: str, build: ViewBuilder, encoding: Optional[str] = None) -> bytes:
+        """
+        Get a view's serialized body, building it only on first request.
+
+        Args:
+            view: Cache key for the body (e.g. "scan", "pair:EUR_USD")
+            build: Builds the body dict from this snapshot
+            encoding: Content-Encoding ("gzip", "br") or None for plain JSON
+        """
+        key = (view, encoding)
+        body = self.rendered.get(key)
+        if body is None:
+            if encoding is None:
+                body = dumps(build(self))
+            else:
+                body = compress(self.render(view, build), encoding)
+            self.rendered[key] = body
+        return body
+
+
+class ScanSnapshotService:
+    """Holds the current scan snapshot and coalesces refreshes."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._snapshot: Optional[ScanSnapshot] = None
+        self._version = 0
+        self._producer: Optional[Callable[[], Awaitable[Dict[str, Any]]]] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._views: Dict[str, ViewBuilder] = {}
+        self.signal_bus = get_signal_bus_service()
+
+        self.snapshot_stats = {
+            "published": 0,
+            "refreshes_started": 0,
+            "refreshes_coalesced": 0,
+            "refresh_failures": 0,
+            "last_published": None,
+        }
+
+    def set_producer(self, producer: Callable[[], Awaitable[Dict[str, Any]]]) -> None:
+        """Set the coroutine function that runs a full scan for forced refreshes."""
+        self._producer = producer
+
+    def register_view(self, view: str, build: ViewBuilder) -> None:
+        """Register a response body rendered (and compressed) as soon as a snapshot is published."""
+        self._views[view] = build
+
+    def get_snapshot(self) -> Optional[ScanSnapshot]:
+        """Get the current snapshot (O(1), no I/O)."""
+        return self._snapshot
+
+    def publish(self, data: Dict[str, Any], source: str = "scheduler") -> ScanSnapshot:
+        """
+        Publish a new snapshot from a market analysis payload.
+
+        Args:
+            data: Market analysis (as built by EnhancedDailyProductionService)
+            source: What produced the scan, for diagnostics
+
+        Returns:
+            The published snapshot
+        """
+        digest = hashlib.sha256(dumps(data, sort_keys=True)).hexdigest()[:32]
+
+        signals_by_pair: Dict[str, List[Dict[str, Any]]] = {}
+        for signal in data.get("signals", []):
+            signals_by_pair.setdefault(signal.get("pair"), []).append(signal)
+
+        self._version += 1
+        snapshot = ScanSnapshot(
+            version=self._version,
+            etag=f'"{digest}"',
+            created_at=datetime.now(timezone.utc).isoformat(),
+            source=source,
+            data=data,
+            signals_by_pair=signals_by_pair,
+        )
+        self._prerender(snapshot)
+        self._snapshot = snapshot
+
+        self.signal_bus.publish(
+            "scan",
+            {
+                "version": snapshot.version,
+                "etag": snapshot.etag,
+                "created_at": snapshot.created_at,
+                "signal_count": data.get("signal_count", 0),
+                "signals": data.get("signals", []),
+            },
+            pairs=list(signals_by_pair.keys()),
+        )
+
+        self.snapshot_stats["published"] += 1
+        self.snapshot_stats["last_published"] = snapshot.created_at
+        self.logger.info(
+            f"📸 Scan snapshot v{snapshot.version} published ({source}, "
+            f"{data.get('signal_count', 0)} signals)"
+        )
+        return snapshot
+
+    def _prerender(self, snapshot: ScanSnapshot) -> None:
+        """Serialize registered views up front so requests only copy bytes."""
+        for view, build in self._views.items():
+            try:
+                body = snapshot.render(view, build)
+                if len(body) >= JSON_RESPONSE_SETTINGS["compression_min_bytes"]:
+                    for encoding in SUPPORTED_ENCODINGS:
+                        snapshot.render(view, build, encoding)
+            except Exception as e:
+                # The view is rendered on first request instead
+                self.logger.warning(f"⚠️ Failed to pre-render snapshot view {view}: {str(e)}")
+
+    async def refresh(self) -> ScanSnapshot:
+        """
+        Run a scan and publish it, sharing one in-flight scan among all callers.
+
+        Callers that arrive while a scan is running wait for that scan instead
+        of starting another. A cancelled caller does not cancel the shared scan.
+        """
+        if self._producer is None:
+            raise RuntimeError("No scan producer configured")
+
+        task = self._refresh_task
+        if task is not None and not task.done():
+            self.snapshot_stats["refreshes_coalesced"] += 1
+        else:
+            self.snapshot_stats["refreshes_started"] += 1
+            task = asyncio.get_running_loop().create_task(self._run_refresh())
+            self._refresh_task = task
+
+        return await asyncio.shield(task)
+
+    async def get_or_refresh(self) -> ScanSnapshot:
+        """Get the current snapshot, running a (single-flight) scan if none exists yet."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        return await self.refresh()
+
+    async def _run_refresh(self) -> ScanSnapshot:
+        try:
+            data = await self._producer()
+        except Exception:
+            self.snapshot_stats["refresh_failures"] += 1
+            raise
+        if "error" in data:
+            self.snapshot_stats["refresh_failures"] += 1
+            raise RuntimeError(data["error"])
+        return self.publish(data, source="refresh")
+
+    def get_snapshot_stats(self) -> Dict[str, Any]:
+        """Get snapshot version and refresh statistics."""
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version if snapshot else None,
+            "etag": snapshot.etag if snapshot else None,
+            "created_at": snapshot.created_at if snapshot else None,
+            "source": snapshot.source if snapshot else None,
+            "rendered_bytes": sum(len(b) for b in snapshot.rendered.values()) if snapshot else 0,
+            "refresh_in_flight": self._refresh_task is not None and not self._refresh_task.done(),
+            **self.snapshot_stats,
+        }
+
+
+# Global snapshot service instance
+scan_snapshot_service = ScanSnapshotService()
+
+
+def get_scan_snapshot_service() -> ScanSnapshotService:
+    """Get the global scan snapshot service instance."""
+    return scan_snapshot_service
@@ -1,20 +1,49 @@
 """
 Forex Market Scheduler Service
 Manages background tasks aligned with 24/5 forex market sessions.
+Signal scans run just after each strategy candle closes.
 """
 
 import asyncio
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.events import EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 
+from config.settings import (
+    CANDLE_SCHEDULE_SETTINGS,
+    ENHANCED_DAILY_STRATEGY_CONFIG,
+    SCHEDULER_PIPELINE_SETTINGS,
+)
+from deployed_strategies.enhanced_daily_strategy import EnhancedDailyStrategy
+from models.signal_models import PriceData, TradingSignal
+from .candle_calendar import CandleCloseTrigger, get_granularity_duration, last_candle_close
 from .data_service import DataService
+from .enhanced_daily_production_service import EnhancedDailyProductionService
+from .enhanced_discord_service import SignalPriority, determine_target_tiers, get_enhanced_discord_service
+from .scan_snapshot_service import get_scan_snapshot_service
+from .metrics_service import get_metrics_registry
+from .profiling_service import get_profiling_service
+from .tracing_service import get_tracer
 from .signal_service import SignalService
 
+metrics = get_metrics_registry()
+PIPELINE_STAGE_SECONDS = metrics.histogram(
+    "pipeline_stage_seconds", "Signal pipeline stage latency", ["stage"]
+)
+PIPELINE_IN_FLIGHT = metrics.gauge(
+    "pipeline_in_flight", "Pipeline work items currently in each stage", ["stage"]
+)
+tracer = get_tracer()
+
 
 class ForexSchedulerService:
     """
@@ -29,15 +58,44 @@ class ForexSchedulerService:
     Continuous operation: Sunday 5 PM EST → Friday 5 PM EST
     """
 
-    def __init__(self, data_service: DataService, signal_service: SignalService):
+    def __init__(
+        self,
+        data_service: DataService,
+        signal_service: SignalService,
+        enhanced_daily_service: Optional[EnhancedDailyProductionService] = None,
+    ):
         self.data_service = data_service
         self.signal_service = signal_service
+        self.enhanced_daily_service = enhanced_daily_service  # Builds scan snapshots
+        self.snapshot_service = get_scan_snapshot_service()
         self.scheduler = AsyncIOScheduler(timezone=timezone.utc)
         self.is_running = False
 
         # Track last signal generation for each pair
         self.last_signals: Dict[str, datetime] = {}
 
+        # Candle granularity each pair's strategy trades on
+        self.pair_granularities: Dict[str, str] = {
+            pair: ENHANCED_DAILY_STRATEGY_CONFIG.get(pair, {}).get("timeframe", "D")
+            for pair in self.data_service.pair_mapping
+        }
+
+        # Signal pipeline: fetch → analyze (thread pool) → persist, bounded per stage
+        self.strategy = EnhancedDailyStrategy()  # Sizing and summaries, on the event loop
+        self._thread_strategies = threading.local()  # One strategy per analysis thread
+        self._fetch_semaphore = asyncio.Semaphore(SCHEDULER_PIPELINE_SETTINGS["fetch_concurrency"])
+        self._persist_semaphore = asyncio.Semaphore(SCHEDULER_PIPELINE_SETTINGS["persist_concurrency"])
+        self._analysis_executor: Optional[ThreadPoolExecutor] = None
+        self.pipeline_metrics = {
+            "runs": 0,
+            "last_run": None,
+            "last_duration_ms": None,
+            "stages": {
+                stage: {"count": 0, "failed": 0, "in_flight": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": None}
+                for stage in ("fetch", "analyze", "persist", "notify")
+            },
+        }
+
         # Market session times (in UTC for consistency)
         self.market_sessions = {
             "sydney": {"start": 22, "end": 21},  # 22:00 UTC Sunday → 21:00 UTC Monday
@@ -46,6 +104,14 @@ class ForexSchedulerService:
             "new_york": {"start": 13, "end": 22},  # 13:00 UTC → 22:00 UTC
         }
 
+        PIPELINE_STAGE_SECONDS.preallocate((stage,) for stage in self.pipeline_metrics["stages"])
+        PIPELINE_IN_FLIGHT.set_function(
+            lambda: {
+                (stage,): stats["in_flight"]
+                for stage, stats in self.pipeline_metrics["stages"].items()
+            }
+        )
+
         self._setup_event_listeners()
 
     def _setup_event_listeners(self):
@@ -85,43 +151,36 @@ class ForexSchedulerService:
 
         logging.info("⏹️ Stopping Forex Market Scheduler...")
         self.scheduler.shutdown(wait=True)
+        if self._analysis_executor is not None:
+            self._analysis_executor.shutdown(wait=False)
+            self._analysis_executor = None
         self.is_running = False
         logging.info("✅ Scheduler stopped")
 
     async def _schedule_market_jobs(self):
         """Schedule jobs based on forex market sessions."""
 
-        # 1. High-frequency during major overlaps (London-NY: 8AM-12PM EST / 13:00-17:00 UTC)
-        self.scheduler.add_job(
-            func=self._generate_all_signals_high_freq,
-            trigger=IntervalTrigger(minutes=5),
-            id="high_freq_signals",
-            name="High Frequency Signals (London-NY Overlap)",
-            max_instances=1,
-            replace_existing=True,
-        )
-
-        # 2. Standard frequency during active sessions
-        self.scheduler.add_job(
-            func=self._generate_all_signals_standard,
-            trigger=IntervalTrigger(minutes=15),
-            id="standard_freq_signals",
-            name="Standard Frequency Signals (Active Sessions)",
-            max_instances=1,
-            replace_existing=True,
-        )
-
-        # 3. Low frequency during quiet periods
-        self.scheduler.add_job(
-            func=self._generate_all_signals_low_freq,
-            trigger=IntervalTrigger(hours=1),
-            id="low_freq_signals",
-            name="Low Frequency Signals (Quiet Periods)",
-            max_instances=1,
-            replace_existing=True,
-        )
+        # 1. Signal generation just after each candle close, one job per granularity.
+        # Strategies only change when a candle completes, so polling between closes
+        # cannot produce a new signal.
+        for granularity in sorted(set(self.pair_granularities.values())):
+            self.scheduler.add_job(
+                func=self._on_candle_close,
+                trigger=CandleCloseTrigger(
+                    granularity,
+                    delay_seconds=CANDLE_SCHEDULE_SETTINGS["delay_seconds"],
+                    jitter=CANDLE_SCHEDULE_SETTINGS["jitter_seconds"],
+                ),
+                args=[granularity],
+                id=f"candle_close_{granularity}",
+                name=f"{granularity} Candle Close Signals",
+                max_instances=1,
+                coalesce=True,
+                misfire_grace_time=300,
+                replace_existing=True,
+            )
 
-        # 4. Market open signals (Sunday 5 PM EST / 22:00 UTC)
+        # 2. Market open signals (Sunday 5 PM EST / 22:00 UTC)
         self.scheduler.add_job(
             func=self._market_open_signals,
             trigger=CronTrigger(day_of_week=0, hour=22, minute=0),  # Sunday 22:00 UTC
@@ -131,7 +190,7 @@ class ForexSchedulerService:
             replace_existing=True,
         )
 
-        # 5. Market close signals (Friday 5 PM EST / 22:00 UTC)
+        # 3. Market close signals (Friday 5 PM EST / 22:00 UTC)
         self.scheduler.add_job(
             func=self._market_close_signals,
             trigger=CronTrigger(day_of_week=4, hour=22, minute=0),  # Friday 22:00 UTC
@@ -141,7 +200,7 @@ class ForexSchedulerService:
             replace_existing=True,
         )
 
-        # 6. Health check every hour
+        # 4. Health check every hour
         self.scheduler.add_job(
             func=self._health_check,
             trigger=IntervalTrigger(hours=1),
@@ -177,29 +236,19 @@ class ForexSchedulerService:
         # Market is active 24/5: Sunday 22:00 UTC → Friday 22:00 UTC
         return True
 
-    async def _generate_all_signals_high_freq(self):
-        """Generate signals during high-frequency periods (major overlaps)."""
-        if not self._is_major_overlap():
-            return
-
-        logging.info("🔥 High-frequency signal generation (London-NY overlap)")
-        await self._execute_signal_generation("HIGH_FREQ")
-
-    async def _generate_all_signals_standard(self):
-        """Generate signals during standard market hours."""
-        if not self._is_market_active() or self._is_major_overlap():
-            return
-
-        logging.info("📊 Standard frequency signal generation")
-        await self._execute_signal_generation("STANDARD")
-
-    async def _generate_all_signals_low_freq(self):
-        """Generate signals during quiet periods."""
-        if self._is_market_active():
-            return
-
-        logging.info("😴 Low frequency signal generation (quiet period)")
-        await self._execute_signal_generation("LOW_FREQ")
+    async def _on_candle_close(self, granularity: str):
+        """Scan the pairs that trade on a granularity after its candle closes."""
+        close_time = last_candle_close(granularity)
+        pairs = [
+            pair for pair, pair_granularity in self.pair_granularities.items()
+            if pair_granularity == granularity
+        ]
+
+        logging.info(
+            f"🕯️ {granularity} candle closed at {close_time.strftime('%Y-%m-%d %H:%M UTC')} "
+            f"- scanning {len(pairs)} pairs"
+        )
+        await self._execute_signal_generation(f"{granularity}_CLOSE", pairs, close_time)
 
     async def _market_open_signals(self):
         """Generate signals at market open (Sunday 5 PM EST)."""
@@ -211,28 +260,268 @@ class ForexSchedulerService:
         logging.info("🌅 Market Close - Generating final signals for the week")
         await self._execute_signal_generation("MARKET_CLOSE")
 
-    async def _execute_signal_generation(self, frequency_type: str):
-        """Execute signal generation with error handling."""
+    @tracer.traced("scheduler_signal_generation")
+    async def _execute_signal_generation(
+        self,
+        frequency_type: str,
+        pairs: Optional[List[str]] = None,
+        close_time: Optional[datetime] = None,
+    ):
+        """
+        Run the signal pipeline for each pair concurrently.
+
+        Each pair moves through fetch → analyze → persist on its own, so a slow
+        fetch only delays that pair. Every stage has its own concurrency bound.
+        Actionable signals from the whole scan are then sent to Discord together.
+        """
+        started = time.perf_counter()
+        tracer.current_span().set_attribute("frequency", frequency_type)
+        profile = get_profiling_service().start_scheduled(frequency_type)
         try:
-            # Get fresh market data
-            all_price_data = await self.data_service.get_historical_data_for_all_pairs()
+            pairs = pairs or list(self.pair_granularities.keys())
 
-            # Generate signals for all pairs
-            signals = await self.signal_service.generate_signals_for_all_pairs(
-                all_price_data
+            results = await asyncio.gather(
+                *(self._run_pair_pipeline(pair, close_time) for pair in pairs),
+                return_exceptions=True,
             )
 
+            analyses: Dict[str, Dict[str, Any]] = {}
+            signals = []
+            for pair, result in zip(pairs, results):
+                if isinstance(result, Exception):
+                    logging.error(f"❌ [{frequency_type}] Pipeline failed for {pair}: {result}")
+                elif result is not None:
+                    signal, analyses[pair] = result
+                    if signal is not None:
+                        signals.append((signal, analyses[pair]))
+
+            # One vectorized sizing pass over every pair's signal
+            self.strategy.size_positions(analyses)
+
             # Track generation time
             generation_time = datetime.now(timezone.utc)
-            for signal in signals:
+            for signal, _ in signals:
                 self.last_signals[signal.pair] = generation_time
 
+            await self._timed_stage("notify", self._notify_signals(signals))
+            await self._publish_snapshot(analyses)
+
             logging.info(
-                f"✅ [{frequency_type}] Generated {len(signals)} signals at {generation_time.strftime('%Y-%m-%d %H:%M:%S UTC')}"
+                f"✅ [{frequency_type}] Generated {len(signals)} signals at {generation_time.strftime('%Y-%m-%d %H:%M:%S UTC')} "
+                f"in {time.perf_counter() - started:.2f}s"
             )
 
         except Exception as e:
             logging.error(f"❌ [{frequency_type}] Signal generation failed: {e}")
+        finally:
+            if profile is not None:
+                await get_profiling_service().finish(profile)
+            self.pipeline_metrics["runs"] += 1
+            self.pipeline_metrics["last_run"] = datetime.now(timezone.utc).isoformat()
+            self.pipeline_metrics["last_duration_ms"] = round(
+                (time.perf_counter() - started) * 1000, 1
+            )
+
+    @tracer.traced("pair_pipeline")
+    async def _run_pair_pipeline(
+        self, pair: str, close_time: Optional[datetime]
+    ) -> Optional[Tuple[Optional[TradingSignal], Dict[str, Any]]]:
+        """
+        Fetch, analyze and persist one pair.
+
+        Returns:
+            (stored signal, analysis); the signal is None when the analysis has
+            no BUY/SELL or the same signal was already stored
+        """
+        tracer.current_span().set_attribute("pair", pair)
+        async with self._fetch_semaphore:
+            candles = await self._timed_stage(
+                "fetch", self._fetch_closed_candles(pair, close_time)
+            )
+        if not candles:
+            return None
+
+        analysis = await self._timed_stage("analyze", self._run_analysis(pair, candles))
+        if not analysis or "error" in analysis:
+            if analysis:
+                logging.warning(f"⚠️ {pair}: {analysis['error']}")
+            return None
+
+        if analysis.get("technical_signal", {}).get("signal") not in ("BUY", "SELL"):
+            return None, analysis
+
+        async with self._persist_semaphore:
+            signal = await self._timed_stage(
+                "persist", self._persist_signal(pair, candles, analysis)
+            )
+        return signal, analysis
+
+    async def _run_analysis(self, pair: str, candles: List[PriceData]) -> Dict[str, Any]:
+        """Run _analyze_pair on the analysis thread pool, keeping the current trace."""
+        # Strategy analysis is CPU-bound pandas work; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_analysis_executor(), tracer.bind(self._analyze_pair), pair, candles
+        )
+
+    def _analyze_pair(self, pair: str, candles: List[PriceData]) -> Dict[str, Any]:
+        """Run the Enhanced Daily Strategy on a pair's candles (executor thread)."""
+        with tracer.span("dataframe_build", pair=pair):
+            df = pd.DataFrame(
+                {
+                    "open": [c.open for c in candles],
+                    "high": [c.high for c in candles],
+                    "low": [c.low for c in candles],
+                    "close": [c.close for c in candles],
+                    "volume": [float(c.volume or 0) for c in candles],
+                },
+                index=pd.DatetimeIndex([c.timestamp for c in candles]),
+            )
+        # Sized together with the other pairs once the scan's analyses are in
+        return self._get_thread_strategy().analyze_pair(pair, df, size_position=False)
+
+    def _get_thread_strategy(self) -> EnhancedDailyStrategy:
+        """Strategy instance owned by the calling analysis thread."""
+        strategy = getattr(self._thread_strategies, "strategy", None)
+        if strategy is None:
+            strategy = self._thread_strategies.strategy = EnhancedDailyStrategy()
+        return strategy
+
+    async def _persist_signal(
+        self, pair: str, candles: List[PriceData], analysis: Dict[str, Any]
+    ) -> Optional[TradingSignal]:
+        """Store a BUY/SELL analysis as a TradingSignal; None if it was already stored."""
+        technical = analysis["technical_signal"]
+        indicators = technical.get("indicators", {})
+
+        signal = TradingSignal(
+            pair=pair,
+            timeframe=self.pair_granularities.get(pair, "D"),
+            signal_type=technical["signal"],
+            price=analysis.get("current_price", candles[-1].close),
+            fast_ma=indicators.get("ema_20", 0.0),
+            slow_ma=indicators.get("ema_50", 0.0),
+            timestamp=candles[-1].timestamp.replace(tzinfo=None),
+            strategy_type="enhanced_daily_strategy",
+            confidence=analysis.get("trade_recommendation", {}).get("confidence", 0.0),
+            trace_id=tracer.current_trace_id(),
+        )
+        if not await self.signal_service.store_signal(signal):
+            return None
+        return signal
+
+    async def _notify_signals(
+        self, signals: List[Tuple[TradingSignal, Dict[str, Any]]]
+    ) -> None:
+        """Send actionable signals from one scan to Discord, packed per qualifying tier."""
+        if not SCHEDULER_PIPELINE_SETTINGS["notify_discord"]:
+            return
+
+        actionable = [
+            (
+                {**analysis, "direction": analysis["technical_signal"].get("direction"),
+                 "entry_price": analysis["technical_signal"].get("entry_price")},
+                SignalPriority.HIGH
+                if analysis.get("signal_strength") in ("confluence", "very_strong")
+                else SignalPriority.MEDIUM,
+                determine_target_tiers(analysis),
+            )
+            for signal, analysis in signals
+            if analysis.get("trade_recommendation", {}).get("recommendation") not in ("WAIT", "AVOID")
+        ]
+        if actionable:
+            await get_enhanced_discord_service().send_packed_signals_by_tier(actionable)
+
+    async def _publish_snapshot(self, analyses: Dict[str, Dict[str, Any]]) -> None:
+        """Publish this run's analyses as the scan snapshot served over HTTP."""
+        if self.enhanced_daily_service is None or not analyses:
+            return
+
+        try:
+            scan_results = self.strategy.summarize_scan(analyses)
+            market_analysis = await self.enhanced_daily_service.build_market_analysis(scan_results)
+            self.snapshot_service.publish(market_analysis, source="scheduler")
+        except Exception as e:
+            logging.error(f"❌ Failed to publish scan snapshot: {e}")
+
+    async def _timed_stage(self, stage: str, awaitable):
+        """Await one pipeline stage, recording latency and failures."""
+        stats = self.pipeline_metrics["stages"][stage]
+        stats["in_flight"] += 1
+        started = time.perf_counter()
+        try:
+            with tracer.span(stage):
+                return await awaitable
+        except Exception:
+            stats["failed"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            PIPELINE_STAGE_SECONDS.observe(elapsed, stage)
+            elapsed_ms = elapsed * 1000
+            stats["in_flight"] -= 1
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["last_ms"] = round(elapsed_ms, 1)
+
+    def _get_analysis_executor(self) -> ThreadPoolExecutor:
+        """Get the analysis thread pool, creating it after a scheduler restart."""
+        if self._analysis_executor is None:
+            self._analysis_executor = ThreadPoolExecutor(
+                max_workers=SCHEDULER_PIPELINE_SETTINGS["analysis_workers"],
+                thread_name_prefix="signal-analysis",
+            )
+        return self._analysis_executor
+
+    def get_pipeline_metrics(self) -> Dict[str, Any]:
+        """Get per-stage pipeline metrics."""
+        stages = {}
+        for stage, stats in self.pipeline_metrics["stages"].items():
+            stages[stage] = {
+                **stats,
+                "total_ms": round(stats["total_ms"], 1),
+                "max_ms": round(stats["max_ms"], 1),
+                "avg_ms": round(stats["total_ms"] / stats["count"], 1) if stats["count"] else 0.0,
+            }
+        return {**self.pipeline_metrics, "stages": stages}
+
+    async def _fetch_closed_candles(
+        self, pair: str, close_time: Optional[datetime] = None
+    ) -> List[PriceData]:
+        """
+        Fetch candles for a pair, retrying until the candle ending at close_time is complete.
+
+        OANDA can take a few seconds after a close to mark the candle complete;
+        without a close_time the latest available candles are returned as-is.
+        """
+        granularity = self.pair_granularities.get(pair, "D")
+        count = CANDLE_SCHEDULE_SETTINGS["history_count"]
+        candles = await self.data_service.get_latest_candles(pair, granularity, count)
+        if close_time is None:
+            return candles
+
+        expected_open = close_time - get_granularity_duration(granularity)
+        retry_delay = CANDLE_SCHEDULE_SETTINGS["incomplete_retry_delay_seconds"]
+
+        for attempt in range(CANDLE_SCHEDULE_SETTINGS["incomplete_retry_attempts"]):
+            if candles and candles[-1].timestamp >= expected_open:
+                return candles
+
+            logging.info(
+                f"⏳ {pair} {granularity} candle closing {close_time.strftime('%H:%M UTC')} "
+                f"not complete yet - retry {attempt + 1} in {retry_delay}s"
+            )
+            await asyncio.sleep(retry_delay)
+            retry_delay *= 2
+            candles = await self.data_service.get_latest_candles(pair, granularity, count)
+
+        if not candles or candles[-1].timestamp < expected_open:
+            logging.warning(
+                f"⚠️ {pair} {granularity} candle closing {close_time.strftime('%H:%M UTC')} "
+                "still incomplete - using latest available data"
+            )
+        return candles
 
     async def _health_check(self):
         """Periodic health check of services."""
@@ -297,4 +586,6 @@ class ForexSchedulerService:
                 pair: timestamp.isoformat()
                 for pair, timestamp in self.last_signals.items()
             },
+            "pipeline": self.get_pipeline_metrics(),
+            "scan_snapshot": self.snapshot_service.get_snapshot_stats(),
         }
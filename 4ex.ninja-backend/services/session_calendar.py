@@ -0,0 +1,192 @@
+"""
+Session Calendar
+Precomputed hour-of-week tables of forex market sessions for O(1) lookups.
+
+Features:
+- 168-slot (hour-of-week) bitmask table per session, one bit per MarketSession
+- Fixed-UTC variant reproducing the historical session hours on every day
+- DST-aware variant: sessions open at local hours in Sydney, Tokyo, London and
+  New York, Monday to Friday local time, so they shift with each DST change
+- Overlap sessions are the intersection of their two sessions
+- Per-pair tables (optimal flag and quality multiplier per session bitmask)
+- Vectorized lookups over timestamp arrays, so a backtest can apply the session
+  filter to a whole history at once
+"""
+
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_WEEK = 168
+
+
+class MarketSession(Enum):
+    SYDNEY = "Sydney"
+    TOKYO = "Tokyo"
+    LONDON = "London"
+    NEW_YORK = "New_York"
+    OVERLAP_LONDON_NY = "London_NY_Overlap"
+    OVERLAP_TOKYO_LONDON = "Tokyo_London_Overlap"
+
+
+SESSION_BITS = {session: 1 << i for i, session in enumerate(MarketSession)}
+
+# Local opening hours (start, end) of the four centres
+SESSION_LOCAL_HOURS = {
+    MarketSession.SYDNEY: ("Australia/Sydney", 8, 17),
+    MarketSession.TOKYO: ("Asia/Tokyo", 8, 17),
+    MarketSession.LONDON: ("Europe/London", 8, 16),
+    MarketSession.NEW_YORK: ("America/New_York", 8, 17),
+}
+
+# Overlaps are active when both sessions are
+SESSION_OVERLAPS = {
+    MarketSession.OVERLAP_LONDON_NY: (MarketSession.LONDON, MarketSession.NEW_YORK),
+    MarketSession.OVERLAP_TOKYO_LONDON: (MarketSession.TOKYO, MarketSession.LONDON),
+}
+
+
+def hour_of_week(when: datetime) -> int:
+    """Slot index 0-167 (Monday 00:00 is 0) of a datetime in its own timezone."""
+    return when.weekday() * 24 + when.hour
+
+
+def _in_hours(hours: np.ndarray, start: int, end: int) -> np.ndarray:
+    if start <= end:
+        return (hours >= start) & (hours < end)
+    return (hours >= start) | (hours < end)  # Overnight session (e.g., Tokyo 23-8 UTC)
+
+
+def _to_utc_index(timestamps) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(timestamps)
+    return index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+
+
+class SessionCalendar:
+    """Session and pair lookups from precomputed hour-of-week tables."""
+
+    def __init__(
+        self,
+        session_times: Dict[MarketSession, Tuple[int, int]],
+        pair_optimal_sessions: Dict[str, List[MarketSession]],
+        session_quality: Dict[MarketSession, float],
+        dst_aware: bool = True,
+    ):
+        """
+        Args:
+            session_times: UTC (start, end) hours per session, used by the fixed variant
+            pair_optimal_sessions: Optimal sessions per pair
+            session_quality: Quality multiplier per session
+            dst_aware: Use local opening hours (and weekdays) instead of fixed UTC hours
+        """
+        self.dst_aware = dst_aware
+        slots = np.arange(HOURS_PER_WEEK)
+        # Bitmask of the four centres -> bitmask including the overlaps they imply
+        self._overlap_lut = self._with_overlaps(np.arange(1 << len(MarketSession), dtype=np.uint8))
+
+        # Fixed UTC hours, every day of the week (the historical behaviour)
+        self.utc_table = np.zeros(HOURS_PER_WEEK, dtype=np.uint8)
+        for session, (start, end) in session_times.items():
+            if session not in SESSION_OVERLAPS:
+                in_session = _in_hours(slots % 24, start, end)
+                self.utc_table |= np.where(in_session, SESSION_BITS[session], 0).astype(np.uint8)
+        self.utc_table = self._overlap_lut[self.utc_table]
+
+        # Local opening hours on local weekdays, one table per centre indexed by local slot
+        self.local_tables = {
+            session: np.where(
+                (slots // 24 < 5) & _in_hours(slots % 24, start, end), SESSION_BITS[session], 0
+            ).astype(np.uint8)
+            for session, (_, start, end) in SESSION_LOCAL_HOURS.items()
+        }
+        self.zones = {session: ZoneInfo(zone) for session, (zone, _, _) in SESSION_LOCAL_HOURS.items()}
+        self._hour_bits: Dict[int, int] = {}  # UTC hour number -> bits, for the DST-aware scalar path
+
+        # Per pair: session bitmask -> (optimal, quality)
+        bitmasks = np.arange(1 << len(MarketSession))
+        self.pair_optimal: Dict[str, np.ndarray] = {}
+        self.pair_quality: Dict[str, np.ndarray] = {}
+        for pair, sessions in pair_optimal_sessions.items():
+            quality = np.zeros(len(bitmasks))
+            for session in sessions:
+                active = (bitmasks & SESSION_BITS[session]) != 0
+                quality = np.where(active, np.maximum(quality, session_quality[session]), quality)
+            self.pair_optimal[pair] = quality > 0
+            self.pair_quality[pair] = np.where(quality > 0, quality, 0.7)  # Outside optimal sessions
+
+    @staticmethod
+    def _with_overlaps(bits):
+        for overlap, (first, second) in SESSION_OVERLAPS.items():
+            both = ((bits & SESSION_BITS[first]) != 0) & ((bits & SESSION_BITS[second]) != 0)
+            bits = bits | np.where(both, SESSION_BITS[overlap], 0).astype(np.uint8)
+        return bits
+
+    # Lookups --------------------------------------------------------------
+
+    def session_bits(self, when: datetime) -> int:
+        """Bitmask of the sessions active at `when` (naive datetimes are UTC)."""
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        if not self.dst_aware:
+            return int(self.utc_table[hour_of_week(when.astimezone(timezone.utc))])
+        hour = int(when.timestamp() // 3600)
+        bits = self._hour_bits.get(hour)
+        if bits is None:
+            for session, table in self.local_tables.items():
+                bits = (bits or 0) | int(table[hour_of_week(when.astimezone(self.zones[session]))])
+            bits = int(self._overlap_lut[bits])
+            if len(self._hour_bits) >= HOURS_PER_WEEK:
+                self._hour_bits.clear()
+            self._hour_bits[hour] = bits
+        return bits
+
+    def session_bits_array(self, timestamps) -> np.ndarray:
+        """Session bitmasks for an array of timestamps (naive timestamps are UTC)."""
+        index = _to_utc_index(timestamps)
+        if not self.dst_aware:
+            return self.utc_table[index.dayofweek * 24 + index.hour]
+        bits = np.zeros(len(index), dtype=np.uint8)
+        for session, table in self.local_tables.items():
+            local = index.tz_convert(self.zones[session])
+            bits |= table[local.dayofweek * 24 + local.hour]
+        return self._overlap_lut[bits]
+
+    def sessions(self, when: datetime) -> List[MarketSession]:
+        """Sessions active at `when`."""
+        bits = self.session_bits(when)
+        return [session for session in MarketSession if bits & SESSION_BITS[session]]
+
+    def pair_filter(self, pair: str, when: datetime) -> Tuple[bool, float]:
+        """(is_optimal, quality_multiplier) for a pair at `when`."""
+        if pair not in self.pair_optimal:
+            return False, 0.8  # Default conservative multiplier for unknown pairs
+        bits = self.session_bits(when)
+        return bool(self.pair_optimal[pair][bits]), float(self.pair_quality[pair][bits])
+
+    def pair_filter_array(self, pair: str, timestamps) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized pair_filter: optimal flags and quality multipliers per timestamp."""
+        bits = self.session_bits_array(timestamps)
+        if pair not in self.pair_optimal:
+            return np.zeros(len(bits), dtype=bool), np.full(len(bits), 0.8)
+        return self.pair_optimal[pair][bits], self.pair_quality[pair][bits]
+
+    def next_session_start(
+        self, session: MarketSession, when: datetime
+    ) -> Optional[datetime]:
+        """Start of the next hour in which `session` opens after `when` (within a week)."""
+        bit = SESSION_BITS[session]
+        hour = (when if when.tzinfo else when.replace(tzinfo=timezone.utc)).replace(
+            minute=0, second=0, microsecond=0
+        )
+        was_active = self.session_bits(hour) & bit
+        for _ in range(HOURS_PER_WEEK + 1):
+            hour += timedelta(hours=1)
+            active = self.session_bits(hour) & bit
+            if active and not was_active:
+                return hour.astimezone(timezone.utc)
+            was_active = active
+        return None  # Never opens (e.g., an overlap that does not occur)
@@ -3,28 +3,27 @@ Session Manager Service for 4ex.ninja
 
 Provides session-based trading filters optimized for different currency pairs.
 Implements market session logic to enhance trade quality and timing.
+
+Lookups go through a precomputed SessionCalendar (services/session_calendar.py):
+O(1) per timestamp, DST aware unless SESSION_CALENDAR_SETTINGS says otherwise,
+and vectorized over timestamp arrays for backtests.
 """
 
 from datetime import datetime, timezone
 from typing import Dict, List, Tuple, Optional
-from enum import Enum
 
+import numpy as np
 
-class MarketSession(Enum):
-    SYDNEY = "Sydney"
-    TOKYO = "Tokyo"
-    LONDON = "London"
-    NEW_YORK = "New_York"
-    OVERLAP_LONDON_NY = "London_NY_Overlap"
-    OVERLAP_TOKYO_LONDON = "Tokyo_London_Overlap"
+from config.settings import SESSION_CALENDAR_SETTINGS
+from services.session_calendar import MarketSession, SessionCalendar
 
 
 class SessionManagerService:
     """Manages forex market sessions and optimal trading times."""
 
-    def __init__(self):
+    def __init__(self, dst_aware: Optional[bool] = None):
         self.session_times = {
-            # All times in UTC
+            # All times in UTC (winter hours; the DST-aware calendar shifts them locally)
             MarketSession.SYDNEY: (21, 6),  # 21:00 - 06:00 UTC
             MarketSession.TOKYO: (23, 8),  # 23:00 - 08:00 UTC
             MarketSession.LONDON: (8, 16),  # 08:00 - 16:00 UTC
@@ -60,30 +59,20 @@ class SessionManagerService:
             MarketSession.SYDNEY: 0.8,  # Lower liquidity
         }
 
+        self.calendar = SessionCalendar(
+            self.session_times,
+            self.pair_optimal_sessions,
+            self.session_quality,
+            dst_aware=SESSION_CALENDAR_SETTINGS["dst_aware"] if dst_aware is None else dst_aware,
+        )
+
     def get_current_session(
         self, current_time: Optional[datetime] = None
     ) -> List[MarketSession]:
         """Get currently active market sessions."""
         if current_time is None:
             current_time = datetime.now(timezone.utc)
-
-        current_hour = current_time.hour
-        active_sessions = []
-
-        for session, (start, end) in self.session_times.items():
-            if self._is_time_in_session(current_hour, start, end):
-                active_sessions.append(session)
-
-        return active_sessions
-
-    def _is_time_in_session(self, current_hour: int, start: int, end: int) -> bool:
-        """Check if current hour falls within session times."""
-        if start <= end:
-            # Same day session (e.g., London 8-16)
-            return start <= current_hour < end
-        else:
-            # Overnight session (e.g., Tokyo 23-8)
-            return current_hour >= start or current_hour < end
+        return self.calendar.sessions(current_time)
 
     def is_optimal_session_for_pair(
         self, pair: str, current_time: Optional[datetime] = None
@@ -94,27 +83,30 @@ class SessionManagerService:
         Returns:
             Tuple[bool, float]: (is_optimal, quality_multiplier)
         """
-        if pair not in self.pair_optimal_sessions:
-            return False, 0.8  # Default conservative multiplier for unknown pairs
-
-        current_sessions = self.get_current_session(current_time)
-        optimal_sessions = self.pair_optimal_sessions[pair]
+        if current_time is None:
+            current_time = datetime.now(timezone.utc)
+        # 0.7 outside optimal sessions, best active session's quality inside, 0.8 for unknown pairs
+        return self.calendar.pair_filter(pair, current_time)
 
-        # Check if any current session is optimal for this pair
-        active_optimal_sessions = [s for s in current_sessions if s in optimal_sessions]
+    def session_filter_array(self, pair: str, timestamps) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Session filter for a whole history at once.
 
-        if not active_optimal_sessions:
-            return False, 0.7  # Reduce signal strength outside optimal sessions
+        Args:
+            pair: Currency pair
+            timestamps: Array-like of timestamps (naive ones are UTC), e.g. a DataFrame index
 
-        # Calculate quality multiplier based on best active session
-        max_quality = max(
-            self.session_quality[session] for session in active_optimal_sessions
-        )
-        return True, max_quality
+        Returns:
+            (is_optimal, quality_multiplier) arrays aligned with `timestamps`
+        """
+        return self.calendar.pair_filter_array(pair, timestamps)
 
-    def get_session_filter_for_pair(self, pair: str) -> Dict:
+    def get_session_filter_for_pair(
+        self, pair: str, current_time: Optional[datetime] = None
+    ) -> Dict:
         """Get comprehensive session filter information for a pair."""
-        current_time = datetime.now(timezone.utc)
+        if current_time is None:
+            current_time = datetime.now(timezone.utc)
         is_optimal, quality = self.is_optimal_session_for_pair(pair, current_time)
         current_sessions = self.get_current_session(current_time)
 
@@ -134,32 +126,39 @@ class SessionManagerService:
             ),
         }
 
-    def get_next_optimal_session(self, pair: str) -> Dict:
+    def get_next_optimal_session(
+        self, pair: str, current_time: Optional[datetime] = None
+    ) -> Dict:
         """Get information about the next optimal trading session for a pair."""
         if pair not in self.pair_optimal_sessions:
             return {"error": f"No optimal sessions defined for {pair}"}
 
-        current_time = datetime.now(timezone.utc)
-        current_hour = current_time.hour
+        if current_time is None:
+            current_time = datetime.now(timezone.utc)
+        elif current_time.tzinfo is None:
+            current_time = current_time.replace(tzinfo=timezone.utc)  # Naive times are UTC
+        else:
+            current_time = current_time.astimezone(timezone.utc)
+        current_hour = current_time.replace(minute=0, second=0, microsecond=0)
         optimal_sessions = self.pair_optimal_sessions[pair]
 
-        # Find next optimal session
+        # Find next optimal session (sessions that never open are skipped)
         next_sessions = []
         for session in optimal_sessions:
-            start_hour, _ = self.session_times[session]
-
-            if start_hour > current_hour:
-                hours_until = start_hour - current_hour
-            else:
-                hours_until = (24 - current_hour) + start_hour
+            start = self.calendar.next_session_start(session, current_time)
+            if start is None:
+                continue
 
             next_sessions.append(
                 {
                     "session": session.value,
-                    "hours_until": hours_until,
-                    "start_hour_utc": start_hour,
+                    "hours_until": int((start - current_hour).total_seconds() // 3600),
+                    "start_hour_utc": start.hour,
+                    "start_time_utc": start.isoformat(),
                 }
             )
+        if not next_sessions:
+            return {"error": f"No upcoming optimal session for {pair}"}
 
         # Return the soonest optimal session
         next_session = min(next_sessions, key=lambda x: x["hours_until"])
@@ -0,0 +1,226 @@
+"""
+Signal Bus Service
+In-process pub/sub bus pushing signals and scan updates to streaming clients.
+
+Features:
+- Non-blocking publish: a slow client never slows down signal generation
+- Per-subscriber bounded queue that drops the oldest message when full
+- Topic and pair filtering per subscription
+- Monotonic message IDs (usable as SSE event IDs)
+- Subscriber, delivery and drop statistics
+"""
+
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterable, Optional, Set
+
+from config.settings import SIGNAL_STREAM_SETTINGS
+from services.metrics_service import get_metrics_registry
+
+metrics = get_metrics_registry()
+STREAM_SUBSCRIBERS = metrics.gauge("stream_subscribers", "Active SSE/WebSocket subscribers")
+STREAM_QUEUE_DEPTH = metrics.gauge(
+    "stream_queue_depth", "Messages waiting across all stream subscriber queues"
+)
+STREAM_DROPPED = metrics.counter(
+    "stream_messages_dropped_total", "Stream messages dropped from full subscriber queues"
+)
+
+
+class Subscription:
+    """One client's view of the bus, with its own bounded drop-oldest queue."""
+
+    def __init__(
+        self,
+        subscriber_id: int,
+        max_queue_size: int,
+        topics: Optional[Set[str]] = None,
+        pair: Optional[str] = None,
+    ):
+        self.subscriber_id = subscriber_id
+        self.topics = topics
+        self.pair = pair
+        self._queue: Deque[Dict[str, Any]] = deque(maxlen=max_queue_size)
+        self._ready = asyncio.Event()
+        self.closed = False
+
+        self.stats = {"delivered": 0, "dropped": 0}
+
+    def wants(self, message: Dict[str, Any]) -> bool:
+        """Check the subscription's topic and pair filters."""
+        if self.topics is not None and message["topic"] not in self.topics:
+            return False
+        if self.pair is not None:
+            pairs = message.get("pairs")
+            return pairs is None or self.pair in pairs
+        return True
+
+    def put(self, message: Dict[str, Any]) -> None:
+        """Queue a message; when full, the oldest queued message is discarded."""
+        if len(self._queue) == self._queue.maxlen:
+            self.stats["dropped"] += 1
+            STREAM_DROPPED.inc()
+        self._queue.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Wait for the next message.
+
+        Returns:
+            The message, or None on timeout or once the subscription is closed
+        """
+        while not self._queue:
+            if self.closed:
+                return None
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        self.stats["delivered"] += 1
+        return self._queue.popleft()
+
+    def close(self) -> None:
+        """Wake any waiting reader and stop accepting messages."""
+        self.closed = True
+        self._ready.set()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+
+class SignalBusService:
+    """Fans published messages out to every matching subscription."""
+
+    def __init__(
+        self,
+        client_queue_size: int = SIGNAL_STREAM_SETTINGS["client_queue_size"],
+        max_subscribers: int = SIGNAL_STREAM_SETTINGS["max_subscribers"],
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.client_queue_size = client_queue_size
+        self.max_subscribers = max_subscribers
+        self._subscriptions: Dict[int, Subscription] = {}
+        self._next_subscriber_id = 1
+        self._next_message_id = 1
+
+        self.bus_stats = {
+            "published": 0,
+            "fanned_out": 0,
+            "subscribers_total": 0,
+            "rejected_subscribers": 0,
+            "last_published": None,
+        }
+
+    def subscribe(
+        self, topics: Optional[Iterable[str]] = None, pair: Optional[str] = None
+    ) -> Subscription:
+        """
+        Register a new subscriber.
+
+        Args:
+            topics: Topics to receive (None for all)
+            pair: Only receive messages about this pair (None for all)
+
+        Raises:
+            RuntimeError: If the subscriber limit has been reached
+        """
+        if len(self._subscriptions) >= self.max_subscribers:
+            self.bus_stats["rejected_subscribers"] += 1
+            raise RuntimeError("Too many stream subscribers")
+
+        subscription = Subscription(
+            self._next_subscriber_id,
+            self.client_queue_size,
+            topics=set(topics) if topics else None,
+            pair=pair,
+        )
+        self._subscriptions[subscription.subscriber_id] = subscription
+        self._next_subscriber_id += 1
+        self.bus_stats["subscribers_total"] += 1
+
+        self.logger.info(
+            f"📡 Stream subscriber {subscription.subscriber_id} connected "
+            f"({len(self._subscriptions)} active)"
+        )
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscriber and wake its reader."""
+        subscription.close()
+        if self._subscriptions.pop(subscription.subscriber_id, None) is not None:
+            self.logger.info(
+                f"📡 Stream subscriber {subscription.subscriber_id} disconnected "
+                f"({len(self._subscriptions)} active, {subscription.stats['dropped']} dropped)"
+            )
+
+    def publish(
+        self, topic: str, data: Dict[str, Any], pairs: Optional[Iterable[str]] = None
+    ) -> int:
+        """
+        Publish a message to every matching subscriber without waiting.
+
+        Args:
+            topic: Message topic ("signal", "scan", ...)
+            data: JSON-serializable payload
+            pairs: Pairs the message concerns, for pair-filtered subscribers
+
+        Returns:
+            Number of subscribers the message was queued for
+        """
+        message = {
+            "id": self._next_message_id,
+            "topic": topic,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "pairs": list(pairs) if pairs is not None else None,
+            "data": data,
+        }
+        self._next_message_id += 1
+
+        delivered = 0
+        for subscription in self._subscriptions.values():
+            if subscription.wants(message):
+                subscription.put(message)
+                delivered += 1
+
+        self.bus_stats["published"] += 1
+        self.bus_stats["fanned_out"] += delivered
+        self.bus_stats["last_published"] = message["timestamp"]
+        return delivered
+
+    def get_bus_stats(self) -> Dict[str, Any]:
+        """Get bus and per-subscriber statistics."""
+        return {
+            **self.bus_stats,
+            "active_subscribers": len(self._subscriptions),
+            "client_queue_size": self.client_queue_size,
+            "dropped_total": sum(s.stats["dropped"] for s in self._subscriptions.values()),
+            "subscribers": [
+                {
+                    "id": s.subscriber_id,
+                    "topics": sorted(s.topics) if s.topics else None,
+                    "pair": s.pair,
+                    "queue_depth": s.queue_depth,
+                    **s.stats,
+                }
+                for s in self._subscriptions.values()
+            ],
+        }
+
+
+# Global signal bus instance
+signal_bus_service = SignalBusService()
+STREAM_SUBSCRIBERS.set_function(lambda: {(): len(signal_bus_service._subscriptions)})
+STREAM_QUEUE_DEPTH.set_function(
+    lambda: {(): sum(s.queue_depth for s in signal_bus_service._subscriptions.values())}
+)
+
+
+def get_signal_bus_service() -> SignalBusService:
+    """Get the global signal bus instance."""
+    return signal_bus_service
@@ -19,6 +19,8 @@ from services.enhanced_discord_service import (
     EnhancedDiscordService, 
     UserTier, 
     SignalPriority,
+    TIER_THRESHOLDS,
+    determine_target_tiers,
     get_enhanced_discord_service
 )
 from services.enhanced_daily_production_service import EnhancedDailyProductionService
@@ -43,29 +45,8 @@ class SignalDiscordIntegration:
             "tier_routing": {tier.value: 0 for tier in UserTier}
         }
         
-        # Signal quality thresholds for tier routing
-        self.tier_thresholds = {
-            UserTier.FREE: {
-                "min_confidence": 0.5,
-                "min_confluence": 0.0,
-                "allowed_pairs": ["USD_JPY", "EUR_USD", "GBP_USD"]  # Limited pairs
-            },
-            UserTier.PREMIUM: {
-                "min_confidence": 0.6,
-                "min_confluence": 0.5,
-                "allowed_pairs": None  # All pairs
-            },
-            UserTier.WHALE: {
-                "min_confidence": 0.7,
-                "min_confluence": 0.8,
-                "allowed_pairs": None  # All pairs with priority
-            },
-            UserTier.ALPHA: {
-                "min_confidence": 0.8,
-                "min_confluence": 1.0,
-                "allowed_pairs": None  # All signals first
-            }
-        }
+        # Signal quality thresholds for tier routing (copied so tuning here stays local)
+        self.tier_thresholds = {tier: dict(thresholds) for tier, thresholds in TIER_THRESHOLDS.items()}
 
     async def process_and_send_signals(self) -> Dict[str, Any]:
         """
@@ -91,7 +72,9 @@ class SignalDiscordIntegration:
             
             self.logger.info(f"Generated {len(signals_data)} enhanced signals")
             
-            # Process each signal for Discord delivery
+            # Route each signal, then pack each tier's signals into as few
+            # webhook messages as Discord allows. Tiers are delivered concurrently.
+            routed_signals = []
             delivery_results = []
             signals_sent_count = 0
             
@@ -104,35 +87,7 @@ class SignalDiscordIntegration:
                         # Determine signal priority and tiers to send to
                         priority = self._determine_signal_priority(signal_data)
                         target_tiers = self._determine_target_tiers(signal_data)
-                        
-                        # Send to each appropriate tier
-                        tier_results = {}
-                        for tier in target_tiers:
-                            success = await self.discord_service.send_enhanced_signal(
-                                signal_data, tier, priority
-                            )
-                            tier_results[tier.value] = success
-                            
-                            if success:
-                                self.delivery_tracking["tier_routing"][tier.value] += 1
-                                signals_sent_count += 1
-                        
-                        delivery_results.append({
-                            "pair": signal_data.get("pair"),
-                            "recommendation": signal_data.get("trade_recommendation", {}).get("recommendation"),
-                            "confidence": signal_data.get("trade_recommendation", {}).get("confidence", 0),
-                            "priority": priority.value,
-                            "tiers_sent": list(tier_results.keys()),
-                            "tier_results": tier_results,
-                            "sent_successfully": any(tier_results.values())
-                        })
-                        
-                        # Update signal status if sent to any tier
-                        if any(tier_results.values()):
-                            # Create a signal ID for tracking
-                            signal_id = f"enhanced_{signal_data.get('pair')}_{datetime.now().strftime('%H%M%S')}"
-                            await self.signal_service.mark_signal_sent(signal_id)
-                        
+                        routed_signals.append((signal_data, priority, target_tiers))
                     else:
                         delivery_results.append({
                             "pair": signal_data.get("pair"),
@@ -147,6 +102,52 @@ class SignalDiscordIntegration:
                     self.logger.error(f"Error processing signal for {signal_data.get('pair', 'UNKNOWN')}: {str(e)}")
                     self.delivery_tracking["delivery_failures"] += 1
             
+            # Group by tier, remembering each signal's position in routed_signals
+            tier_batches: Dict[UserTier, List[int]] = {}
+            for index, (_, _, target_tiers) in enumerate(routed_signals):
+                for tier in target_tiers:
+                    tier_batches.setdefault(tier, []).append(index)
+            
+            batch_results = await asyncio.gather(
+                *(
+                    self.discord_service.send_packed_signals(
+                        [(routed_signals[i][0], routed_signals[i][1]) for i in indices], tier
+                    )
+                    for tier, indices in tier_batches.items()
+                ),
+                return_exceptions=True
+            )
+            
+            tier_results_by_signal: List[Dict[str, bool]] = [{} for _ in routed_signals]
+            for (tier, indices), results in zip(tier_batches.items(), batch_results):
+                if isinstance(results, Exception):
+                    self.logger.error(f"Error sending packed signals to {tier.value} tier: {str(results)}")
+                    self.delivery_tracking["delivery_failures"] += 1
+                    results = [False] * len(indices)
+                
+                for index, result in zip(indices, results):
+                    tier_results_by_signal[index][tier.value] = result
+                    if result:
+                        self.delivery_tracking["tier_routing"][tier.value] += 1
+                        signals_sent_count += 1
+            
+            for (signal_data, priority, target_tiers), tier_results in zip(routed_signals, tier_results_by_signal):
+                delivery_results.append({
+                    "pair": signal_data.get("pair"),
+                    "recommendation": signal_data.get("trade_recommendation", {}).get("recommendation"),
+                    "confidence": signal_data.get("trade_recommendation", {}).get("confidence", 0),
+                    "priority": priority.value,
+                    "tiers_sent": list(tier_results.keys()),
+                    "tier_results": tier_results,
+                    "sent_successfully": any(tier_results.values())
+                })
+                
+                # Update signal status if sent to any tier
+                if any(tier_results.values()):
+                    # Create a signal ID for tracking
+                    signal_id = f"enhanced_{signal_data.get('pair')}_{datetime.now().strftime('%H%M%S')}"
+                    await self.signal_service.mark_signal_sent(signal_id)
+            
             # Update tracking
             self.delivery_tracking["signals_sent"] += signals_sent_count
             self.delivery_tracking["last_delivery"] = datetime.now(timezone.utc).isoformat()
@@ -232,35 +233,7 @@ class SignalDiscordIntegration:
 
     def _determine_target_tiers(self, signal_data: Dict[str, Any]) -> List[UserTier]:
         """Determine which user tiers should receive this signal."""
-        
-        target_tiers = []
-        
-        pair = signal_data.get("pair", "")
-        confidence = signal_data.get("trade_recommendation", {}).get("confidence", 0.0)
-        confluence_score = signal_data.get("confluence_score", 0.0)
-        
-        # Check each tier's requirements
-        for tier, thresholds in self.tier_thresholds.items():
-            # Check confidence threshold
-            if confidence < thresholds["min_confidence"]:
-                continue
-            
-            # Check confluence threshold
-            if confluence_score < thresholds["min_confluence"]:
-                continue
-            
-            # Check allowed pairs (if restricted)
-            if thresholds["allowed_pairs"] and pair not in thresholds["allowed_pairs"]:
-                continue
-            
-            # Tier qualifies for this signal
-            target_tiers.append(tier)
-        
-        # Ensure at least FREE tier gets decent signals
-        if not target_tiers and confidence >= 0.6:
-            target_tiers.append(UserTier.FREE)
-        
-        return target_tiers
+        return determine_target_tiers(signal_data, self.tier_thresholds)
 
     async def send_signal_batch_update(self) -> bool:
         """Send a batch update of all current signals to all tiers."""
@@ -281,8 +254,8 @@ class SignalDiscordIntegration:
             if not quality_signals:
                 return False
             
-            # Send batch updates to each tier
-            batch_results = {}
+            # Send batch updates to each tier concurrently
+            tier_batches = {}
             for tier in UserTier:
                 # Filter signals appropriate for this tier
                 tier_signals = []
@@ -292,16 +265,24 @@ class SignalDiscordIntegration:
                         tier_signals.append(signal_data)
                 
                 if tier_signals:
-                    success = await self.discord_service.send_batch_enhanced_signals(
-                        tier_signals, tier
-                    )
-                    batch_results[tier.value] = {
-                        "signals_sent": len(tier_signals),
-                        "success": success
-                    }
-                    
-                    if success:
-                        self.delivery_tracking["tier_routing"][tier.value] += len(tier_signals)
+                    tier_batches[tier] = tier_signals
+            
+            batch_successes = await asyncio.gather(
+                *(
+                    self.discord_service.send_batch_enhanced_signals(tier_signals, tier)
+                    for tier, tier_signals in tier_batches.items()
+                )
+            )
+            
+            batch_results = {}
+            for (tier, tier_signals), success in zip(tier_batches.items(), batch_successes):
+                batch_results[tier.value] = {
+                    "signals_sent": len(tier_signals),
+                    "success": success
+                }
+                
+                if success:
+                    self.delivery_tracking["tier_routing"][tier.value] += len(tier_signals)
             
             self.logger.info(f"Batch signal update sent: {batch_results}")
             return True
@@ -325,13 +306,15 @@ class SignalDiscordIntegration:
                 "strategy": "Enhanced Daily Strategy Phase 1"
             }
             
-            # Send to all tiers
-            results = {}
-            for tier in UserTier:
-                success = await self.discord_service.send_performance_update(
-                    performance_metrics, tier
+            # Send to all tiers concurrently
+            tiers = list(UserTier)
+            successes = await asyncio.gather(
+                *(
+                    self.discord_service.send_performance_update(performance_metrics, tier)
+                    for tier in tiers
                 )
-                results[tier.value] = success
+            )
+            results = {tier.value: success for tier, success in zip(tiers, successes)}
             
             self.logger.info(f"Performance updates sent: {results}")
             return any(results.values())
@@ -10,6 +10,12 @@ import logging
 import motor.motor_asyncio
 import os
 from models.signal_models import TradingSignal, SignalStatus, SignalType, PriceData
+from services.signal_bus_service import get_signal_bus_service
+from services.metrics_service import get_metrics_registry
+
+MONGO_WRITE_SECONDS = get_metrics_registry().histogram(
+    "mongo_write_seconds", "MongoDB write latency", ["collection"]
+)
 
 
 class SignalService:
@@ -21,6 +27,7 @@ class SignalService:
         self.mongo_client = None
         self.signals_collection = None
         self.db = None
+        self.signal_bus = get_signal_bus_service()
 
     async def generate_signal_for_pair(
         self, pair: str, price_data: List[PriceData], force_recalculate: bool = False
@@ -166,7 +173,16 @@ class SignalService:
 
         return None
 
-    async def _store_signal(self, signal: TradingSignal) -> None:
+    async def store_signal(self, signal: TradingSignal) -> bool:
+        """
+        Store an externally generated signal in cache and MongoDB.
+
+        Returns:
+            False if a signal with the same ID (pair, timeframe, candle) was already stored
+        """
+        return await self._store_signal(signal)
+
+    async def _store_signal(self, signal: TradingSignal) -> bool:
         """Store signal in cache and MongoDB."""
         # Generate ID if not present
         if not signal.id:
@@ -180,14 +196,25 @@ class SignalService:
         if pair_key not in self.signals_cache:
             self.signals_cache[pair_key] = []
 
+        # Scans of the same candle (e.g. market open and a candle close) yield the same ID
+        if any(cached.id == signal.id for cached in self.signals_cache[pair_key]):
+            self.logger.debug(f"Signal {signal.id} already stored")
+            return False
+
         self.signals_cache[pair_key].append(signal)
 
         # Keep only recent signals (last 100 per pair)
         if len(self.signals_cache[pair_key]) > 100:
             self.signals_cache[pair_key] = self.signals_cache[pair_key][-100:]
 
+        # Push to stream subscribers before the (slower) database write
+        self.signal_bus.publish(
+            "signal", signal.model_dump(mode="json"), pairs=[signal.pair]
+        )
+
         # Store in MongoDB
         await self._store_signal_to_mongodb(signal)
+        return True
 
     async def _init_mongodb(self) -> None:
         """Initialize MongoDB connection."""
@@ -240,9 +267,10 @@ class SignalService:
                 }
 
                 # Upsert to avoid duplicates
-                await self.signals_collection.replace_one(
-                    {"id": signal.id}, signal_dict, upsert=True
-                )
+                with MONGO_WRITE_SECONDS.time("signals"):
+                    await self.signals_collection.replace_one(
+                        {"id": signal.id}, signal_dict, upsert=True
+                    )
 
                 self.logger.info(f"Stored signal {signal.id} to MongoDB")
         except Exception as e:
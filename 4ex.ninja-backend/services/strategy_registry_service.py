@@ -0,0 +1,251 @@
+"""
+Strategy Registry Service
+Application-scoped strategy and risk-manager instances shared by API handlers.
+
+Features:
+- One lazily built instance per registered component (no per-request construction)
+- Warm-up at startup so the first request does not pay for initialization
+- Cached V2 signals computed from the shared DataService candle cache
+- Cache valid until the next candle close; single-flight recomputation
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from config.settings import STRATEGY_REGISTRY_SETTINGS
+from services.metrics_service import get_metrics_registry
+
+CACHE_REQUESTS = get_metrics_registry().counter(
+    "cache_requests_total", "Cache lookups by cache and result", ["cache", "result"]
+)
+
+
+def _build_enhanced_daily_v2():
+    from enhanced_daily_strategy_v2 import EnhancedDailyStrategyV2
+
+    return EnhancedDailyStrategyV2()
+
+
+def _build_confidence_risk_v2():
+    from confidence_risk_manager_v2 import ConfidenceAnalysisRiskManager
+
+    return ConfidenceAnalysisRiskManager()
+
+
+# Built-in components: name -> zero-argument factory
+DEFAULT_FACTORIES: Dict[str, Callable[[], Any]] = {
+    "enhanced_daily_v2": _build_enhanced_daily_v2,
+    "confidence_risk_v2": _build_confidence_risk_v2,
+}
+
+
+class StrategyRegistryService:
+    """Holds shared strategy/risk-manager instances and the V2 signal cache."""
+
+    def __init__(self):
+        self.logger = logging.getLogger(__name__)
+        self._factories: Dict[str, Callable[[], Any]] = dict(DEFAULT_FACTORIES)
+        self._instances: Dict[str, Any] = {}
+        self.data_service = None
+
+        # V2 signal cache
+        self._v2_signals: Dict[str, Dict[str, Any]] = {}
+        self._v2_candle_times: Dict[str, datetime] = {}
+        self._v2_computed_at: Optional[datetime] = None
+        self._v2_expires_at: Optional[datetime] = None
+        self._v2_refresh_task: Optional[asyncio.Task] = None
+
+        self.registry_stats = {
+            "instances_built": 0,
+            "v2_cache_hits": 0,
+            "v2_refreshes": 0,
+            "v2_refreshes_coalesced": 0,
+            "v2_pairs_reanalyzed": 0,
+            "v2_pairs_reused": 0,
+            "v2_refresh_failures": 0,
+        }
+
+    def set_data_service(self, data_service) -> None:
+        """Set the DataService whose candle cache feeds V2 signal computation."""
+        self.data_service = data_service
+
+    def register(self, name: str, factory: Callable[[], Any]) -> None:
+        """Register (or replace) a component factory; drops any built instance."""
+        self._factories[name] = factory
+        self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Get the shared instance of a component, building it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        try:
+            factory = self._factories[name]
+        except KeyError:
+            raise KeyError(f"Unknown strategy component: {name}")
+
+        instance = factory()
+        self._instances[name] = instance
+        self.registry_stats["instances_built"] += 1
+        self.logger.info(f"🧩 Strategy component ready: {name}")
+        return instance
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Build components ahead of the first request.
+
+        Returns:
+            Names of the components that were warmed up
+        """
+        names = list(names or STRATEGY_REGISTRY_SETTINGS["warm_up"])
+        for name in names:
+            self.get(name)
+        return names
+
+    @property
+    def strategy_v2(self):
+        return self.get("enhanced_daily_v2")
+
+    @property
+    def risk_manager_v2(self):
+        return self.get("confidence_risk_v2")
+
+    async def get_v2_signals(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get cached V2 signals, recomputing them once the cache has expired.
+
+        Args:
+            force_refresh: Recompute even if the cache is still valid
+
+        Returns:
+            Dict with per-pair signals and cache metadata
+        """
+        now = datetime.now(timezone.utc)
+        if (
+            not force_refresh
+            and self._v2_expires_at is not None
+            and now < self._v2_expires_at
+        ):
+            self.registry_stats["v2_cache_hits"] += 1
+            CACHE_REQUESTS.inc("v2_signals", "hit")
+        else:
+            CACHE_REQUESTS.inc("v2_signals", "miss")
+            await self.refresh_v2_signals()
+
+        return {
+            "signals": [self._v2_signals[pair] for pair in sorted(self._v2_signals)],
+            "computed_at": self._v2_computed_at.isoformat() if self._v2_computed_at else None,
+            "expires_at": self._v2_expires_at.isoformat() if self._v2_expires_at else None,
+        }
+
+    async def refresh_v2_signals(self) -> None:
+        """Recompute V2 signals, sharing one in-flight computation among callers."""
+        task = self._v2_refresh_task
+        if task is not None and not task.done():
+            self.registry_stats["v2_refreshes_coalesced"] += 1
+        else:
+            self.registry_stats["v2_refreshes"] += 1
+            task = asyncio.get_running_loop().create_task(self._run_v2_refresh())
+            self._v2_refresh_task = task
+
+        await asyncio.shield(task)
+
+    async def _run_v2_refresh(self) -> None:
+        # candle_calendar pulls in apscheduler; keep it out of `import app`
+        from services.candle_calendar import next_candle_close
+
+        if self.data_service is None:
+            raise RuntimeError("No data service configured for V2 signals")
+
+        strategy = self.strategy_v2
+        granularity = STRATEGY_REGISTRY_SETTINGS["v2_granularity"]
+        pairs = list(strategy.validated_config.keys())
+
+        results = await asyncio.gather(
+            *(self._analyze_v2_pair(strategy, pair, granularity) for pair in pairs),
+            return_exceptions=True,
+        )
+
+        failures = 0
+        for pair, result in zip(pairs, results):
+            if isinstance(result, Exception):
+                failures += 1
+                self.registry_stats["v2_refresh_failures"] += 1
+                self.logger.error(f"❌ V2 signal refresh failed for {pair}: {str(result)}")
+                self._v2_candle_times.pop(pair, None)
+                self._v2_signals[pair] = {
+                    "pair": pair,
+                    "error": str(result),
+                    "strategy_version": strategy.version,
+                }
+            else:
+                self._v2_signals[pair] = result
+
+        self._v2_computed_at = datetime.now(timezone.utc)
+        self._v2_expires_at = next_candle_close(granularity, self._v2_computed_at) + timedelta(
+            seconds=STRATEGY_REGISTRY_SETTINGS["v2_refresh_delay_seconds"]
+        )
+        if failures:
+            # Don't serve errors until the next close; successful pairs are reused on retry
+            self._v2_expires_at = min(
+                self._v2_expires_at,
+                self._v2_computed_at + timedelta(seconds=STRATEGY_REGISTRY_SETTINGS["v2_retry_seconds"]),
+            )
+        self.logger.info(
+            f"🧮 V2 signals refreshed for {len(pairs)} pairs "
+            f"(valid until {self._v2_expires_at.strftime('%Y-%m-%d %H:%M UTC')})"
+        )
+
+    async def _analyze_v2_pair(self, strategy, pair: str, granularity: str) -> Dict[str, Any]:
+        """Analyze one pair, reusing the cached result if no new candle has closed."""
+        candles = await self.data_service.get_latest_candles(
+            pair, granularity, STRATEGY_REGISTRY_SETTINGS["v2_candle_count"]
+        )
+        if not candles:
+            raise RuntimeError("No candle data available")
+
+        last_candle_time = candles[-1].timestamp
+        if pair in self._v2_signals and self._v2_candle_times.get(pair) == last_candle_time:
+            self.registry_stats["v2_pairs_reused"] += 1
+            return self._v2_signals[pair]
+
+        import pandas as pd
+
+        df = pd.DataFrame(
+            {
+                "open": [c.open for c in candles],
+                "high": [c.high for c in candles],
+                "low": [c.low for c in candles],
+                "close": [c.close for c in candles],
+            },
+            index=pd.DatetimeIndex([c.timestamp for c in candles]),
+        )
+        analysis = strategy.analyze_pair(pair, df)
+        analysis["candle_time"] = last_candle_time.isoformat()
+
+        self._v2_candle_times[pair] = last_candle_time
+        self.registry_stats["v2_pairs_reanalyzed"] += 1
+        return analysis
+
+    def get_registry_stats(self) -> Dict[str, Any]:
+        """Get registered components, built instances and V2 cache statistics."""
+        return {
+            "registered": sorted(self._factories),
+            "built": sorted(self._instances),
+            "v2_cached_pairs": len(self._v2_signals),
+            "v2_computed_at": self._v2_computed_at.isoformat() if self._v2_computed_at else None,
+            "v2_expires_at": self._v2_expires_at.isoformat() if self._v2_expires_at else None,
+            **self.registry_stats,
+        }
+
+
+# Global strategy registry instance
+strategy_registry_service = StrategyRegistryService()
+
+
+def get_strategy_registry() -> StrategyRegistryService:
+    """Get the global strategy registry (also used as a FastAPI dependency)."""
+    return strategy_registry_service
@@ -253,44 +253,23 @@ class SupportResistanceService:
         if len(data) < window * 2:
             return levels
 
-        # Find swing highs
-        for i in range(window, len(data) - window):
-            current_high = data["high"].iloc[i]
-            is_swing_high = True
-
-            # Check if current high is higher than surrounding highs
-            for j in range(i - window, i + window + 1):
-                if j != i and data["high"].iloc[j] >= current_high:
-                    is_swing_high = False
-                    break
-
-            if is_swing_high:
-                levels.append(
-                    {
-                        "price": float(current_high),
-                        "type": "swing_high",
-                        "date": str(data.index[i])[:10],
-                        "strength": 0.8,
-                        "source": "swing",
-                    }
-                )
-
-        # Find swing lows
-        for i in range(window, len(data) - window):
-            current_low = data["low"].iloc[i]
-            is_swing_low = True
-
-            # Check if current low is lower than surrounding lows
-            for j in range(i - window, i + window + 1):
-                if j != i and data["low"].iloc[j] <= current_low:
-                    is_swing_low = False
-                    break
+        # A swing high beats every high within `window` bars on either side (lows mirror it)
+        for column, level_type, beaten in (
+            ("high", "swing_high", np.greater_equal),
+            ("low", "swing_low", np.less_equal),
+        ):
+            values = data[column].to_numpy(dtype=float)
+            if len(values) < window * 2 + 1:
+                continue
+            windows = np.lib.stride_tricks.sliding_window_view(values, window * 2 + 1)
+            neighbours = np.delete(windows, window, axis=1)
+            is_swing = ~beaten(neighbours, windows[:, window : window + 1]).any(axis=1)
 
-            if is_swing_low:
+            for i in np.flatnonzero(is_swing) + window:
                 levels.append(
                     {
-                        "price": float(current_low),
-                        "type": "swing_low",
+                        "price": float(values[i]),
+                        "type": level_type,
                         "date": str(data.index[i])[:10],
                         "strength": 0.8,
                         "source": "swing",
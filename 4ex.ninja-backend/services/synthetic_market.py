@@ -0,0 +1,310 @@
+"""
+Synthetic Market
+Seeded, vectorized OHLCV generator used when real OANDA data is unavailable.
+
+Features:
+- Regime-switching geometric Brownian motion: calm and volatile regimes with
+  per-pair drift and volatility (plain GBM when switching is disabled)
+- Intra-bar high/low drawn from the Brownian-bridge extremes between open and
+  close, so every candle is internally consistent
+- Columnar numpy arrays for a whole series in one call; PriceData and
+  DataFrame conversion only when a caller needs them
+- Deterministic: the same seed, pair, granularity and end time give the same candles
+- Weekend gap (Friday 17:00 → Sunday 17:00 New York) like OANDA
+"""
+
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from config.settings import SYNTHETIC_MARKET_SETTINGS
+from models.signal_models import PriceData
+from services.candle_calendar import get_granularity_duration
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Starting price, annual drift and annual volatility per pair
+PAIR_MARKET_PARAMS: Dict[str, Dict[str, float]] = {
+    "EUR_USD": {"price": 1.0850, "drift": 0.00, "volatility": 0.07},
+    "GBP_USD": {"price": 1.2650, "drift": 0.00, "volatility": 0.08},
+    "USD_JPY": {"price": 150.25, "drift": 0.02, "volatility": 0.09},
+    "AUD_USD": {"price": 0.6580, "drift": -0.01, "volatility": 0.10},
+    "EUR_GBP": {"price": 0.8580, "drift": 0.00, "volatility": 0.05},
+    "GBP_JPY": {"price": 190.15, "drift": 0.02, "volatility": 0.11},
+    "EUR_JPY": {"price": 162.50, "drift": 0.02, "volatility": 0.09},
+    "AUD_JPY": {"price": 98.75, "drift": 0.01, "volatility": 0.12},
+    "NZD_USD": {"price": 0.6125, "drift": -0.01, "volatility": 0.10},
+    "USD_CAD": {"price": 1.3685, "drift": 0.00, "volatility": 0.06},
+    "USD_CHF": {"price": 0.8850, "drift": -0.01, "volatility": 0.07},
+}
+
+# Used for pairs outside the table when a caller opts in
+DEFAULT_MARKET_PARAMS: Dict[str, float] = {"price": 1.0, "drift": 0.0, "volatility": 0.08}
+
+# Candle grid anchor: Sunday 1970-01-04 22:00 UTC (17:00 New York standard time)
+_GRID_ANCHOR = np.datetime64("1970-01-04T22:00:00", "ns")
+_NS_PER_SECOND = 1_000_000_000
+# Trading days per year used to scale annual drift/volatility to one bar
+_TRADING_DAYS_PER_YEAR = 260.0
+
+
+@dataclass
+class SyntheticSeries:
+    """Columnar OHLCV candles for one pair (timestamps are UTC candle open times)."""
+
+    pair: str
+    granularity: str
+    timestamps: np.ndarray  # datetime64[ns]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray  # int64
+    regime: np.ndarray  # int8: 0 = calm, 1 = volatile
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """OHLCV DataFrame with a UTC DatetimeIndex."""
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "open": self.open,
+                "high": self.high,
+                "low": self.low,
+                "close": self.close,
+                "volume": self.volume,
+            },
+            index=pd.DatetimeIndex(self.timestamps, tz="UTC"),
+        )
+
+    def to_price_data(self, timeframe: Optional[str] = None, decimals: int = 5) -> List[PriceData]:
+        """PriceData candles for services that take lists (values rounded like OANDA quotes)."""
+        timeframe = timeframe or self.granularity
+        epoch = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        micros = self.timestamps.astype("datetime64[us]").astype(np.int64).tolist()
+        columns = zip(
+            micros,
+            np.round(self.open, decimals).tolist(),
+            np.round(self.high, decimals).tolist(),
+            np.round(self.low, decimals).tolist(),
+            np.round(self.close, decimals).tolist(),
+            self.volume.tolist(),
+        )
+        # Values are already typed and consistent; skip per-candle validation
+        return [
+            PriceData.model_construct(
+                pair=self.pair,
+                timeframe=timeframe,
+                timestamp=epoch + timedelta(microseconds=ts),
+                open=o,
+                high=h,
+                low=l,
+                close=c,
+                volume=v,
+            )
+            for ts, o, h, l, c, v in columns
+        ]
+
+
+def grid_candle_start(granularity: str, moment: Optional[datetime] = None) -> datetime:
+    """Start of the synthetic candle open at moment (candles of one grid share this key)."""
+    moment = moment or datetime.now(timezone.utc)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    step = int(get_granularity_duration(granularity).total_seconds())
+    anchor = int(_GRID_ANCHOR.astype(np.int64)) // _NS_PER_SECOND
+    seconds = (int(moment.timestamp()) - anchor) // step * step + anchor
+    return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+def get_pair_params(pair: str) -> Dict[str, float]:
+    """Get synthetic market parameters for a pair."""
+    try:
+        return PAIR_MARKET_PARAMS[pair]
+    except KeyError:
+        raise ValueError(f"Unsupported pair: {pair}")
+
+
+def _seed_sequence(seed: int, pair: str, granularity: str, last_start_ns: int) -> np.random.SeedSequence:
+    # crc32 rather than hash(): str hashes are randomized per process
+    return np.random.SeedSequence(
+        [seed, zlib.crc32(pair.encode()), zlib.crc32(granularity.encode()), last_start_ns // _NS_PER_SECOND]
+    )
+
+
+def _market_open_mask(timestamps: np.ndarray) -> np.ndarray:
+    """True for candles that start while the market is open (New York weekend rule)."""
+    ts_ns = timestamps.astype(np.int64)
+    years = timestamps.astype("datetime64[Y]").astype(np.int64) + 1970
+
+    # US DST: second Sunday of March 07:00 UTC → first Sunday of November 06:00 UTC
+    dst = np.zeros(len(ts_ns), dtype=bool)
+    for year in np.unique(years).tolist():
+        march = datetime(year, 3, 8, 7, tzinfo=timezone.utc)
+        dst_start = march + timedelta(days=(6 - march.weekday()) % 7)
+        november = datetime(year, 11, 1, 6, tzinfo=timezone.utc)
+        dst_end = november + timedelta(days=(6 - november.weekday()) % 7)
+        in_year = years == year
+        dst[in_year] = (ts_ns[in_year] >= int(dst_start.timestamp()) * _NS_PER_SECOND) & (
+            ts_ns[in_year] < int(dst_end.timestamp()) * _NS_PER_SECOND
+        )
+
+    local_seconds = ts_ns // _NS_PER_SECOND - np.where(dst, 4 * 3600, 5 * 3600)
+    weekday = (local_seconds // 86400 + 3) % 7  # 1970-01-01 was a Thursday (Monday = 0)
+    hour = (local_seconds % 86400) // 3600
+
+    closed = (weekday == 5) | ((weekday == 4) & (hour >= 17)) | ((weekday == 6) & (hour < 17))
+    return ~closed
+
+
+def _regime_path(rng: np.random.Generator, n: int, bar_days: float) -> np.ndarray:
+    """Alternating calm/volatile regimes with geometric durations (in bars)."""
+    if not SYNTHETIC_MARKET_SETTINGS["regime_switching"]:
+        return np.zeros(n, dtype=np.int8)
+
+    exit_calm = min(1.0, bar_days / SYNTHETIC_MARKET_SETTINGS["calm_mean_days"])
+    exit_volatile = min(1.0, bar_days / SYNTHETIC_MARKET_SETTINGS["volatile_mean_days"])
+    start_volatile = int(rng.random() < exit_calm / (exit_calm + exit_volatile))
+
+    segments = max(4, int(n * min(exit_calm, exit_volatile)) * 2 + 4)
+    while True:
+        durations = np.empty(2 * segments, dtype=np.int64)
+        durations[0::2] = rng.geometric(exit_calm, segments)
+        durations[1::2] = rng.geometric(exit_volatile, segments)
+        if start_volatile:
+            durations = durations[1:]
+        if durations.sum() >= n:
+            break
+        segments *= 2
+
+    states = (np.arange(len(durations)) + start_volatile) % 2
+    return np.repeat(states.astype(np.int8), durations)[:n]
+
+
+def generate_series(
+    pair: str,
+    granularity: str = "H1",
+    count: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    seed: Optional[int] = None,
+    params: Optional[Dict[str, float]] = None,
+) -> SyntheticSeries:
+    """
+    Generate synthetic candles for one pair.
+
+    Args:
+        pair: Currency pair (e.g. "EUR_USD")
+        granularity: OANDA granularity ("D", "H4", "H1", "M15", ...)
+        count: Number of candles ending at `end` (or give `start` instead)
+        start: First candle time when count is not given
+        end: Last candle is the one open at this time (default: now); naive is UTC
+        seed: Base seed (default from SYNTHETIC_MARKET_SETTINGS)
+        params: Price/drift/volatility override (default: PAIR_MARKET_PARAMS)
+
+    Returns:
+        SyntheticSeries whose first open is the pair's starting price
+    """
+    if count is None and start is None:
+        raise ValueError("Either count or start is required")
+    params = params or get_pair_params(pair)
+    seed = SYNTHETIC_MARKET_SETTINGS["seed"] if seed is None else seed
+
+    duration = get_granularity_duration(granularity)
+    step_ns = int(duration.total_seconds()) * _NS_PER_SECOND
+    end = end or datetime.now(timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+
+    # Candle grid aligned to the anchor; the last candle is the one open at `end`
+    end_ns = np.datetime64(end.replace(tzinfo=None), "ns")
+    last_start_ns = int((end_ns - _GRID_ANCHOR).astype(np.int64) // step_ns * step_ns) + int(
+        _GRID_ANCHOR.astype(np.int64)
+    )
+
+    if count is None:
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        start_ns = int(np.datetime64(start.replace(tzinfo=None), "ns").astype(np.int64))
+        grid_size = max(0, (last_start_ns - start_ns) // step_ns) + 1
+    else:
+        # Weekends remove 2 of 7 days; over-generate, then keep the last `count` open candles
+        grid_size = int(count * 7 / 5) + int(timedelta(days=3) / duration) + 2
+
+    skip_weekends = SYNTHETIC_MARKET_SETTINGS["skip_weekends"]
+    while True:
+        grid = last_start_ns - np.arange(grid_size - 1, -1, -1, dtype=np.int64) * step_ns
+        timestamps = grid.astype("datetime64[ns]")
+        if skip_weekends:
+            timestamps = timestamps[_market_open_mask(timestamps)]
+        if count is None or len(timestamps) >= count:
+            break
+        grid_size *= 2
+    if count is not None:
+        timestamps = timestamps[len(timestamps) - count:]
+
+    n = len(timestamps)
+    rng = np.random.Generator(np.random.PCG64(_seed_sequence(seed, pair, granularity, last_start_ns)))
+
+    bar_days = duration.total_seconds() / 86400
+    dt = bar_days / _TRADING_DAYS_PER_YEAR
+    regime = _regime_path(rng, n, bar_days)
+    multipliers = np.array(
+        [
+            SYNTHETIC_MARKET_SETTINGS["calm_volatility_multiplier"],
+            SYNTHETIC_MARKET_SETTINGS["volatile_volatility_multiplier"],
+        ]
+    )
+    sigma = params["volatility"] * np.sqrt(dt) * multipliers[regime]
+
+    # Log-price random walk (GBM with regime-dependent volatility)
+    log_returns = (params["drift"] * dt - 0.5 * sigma**2) + sigma * rng.standard_normal(n)
+    log_close = np.log(params["price"]) + np.cumsum(log_returns)
+    log_open = np.empty(n)
+    log_open[0] = np.log(params["price"])
+    log_open[1:] = log_close[:-1]
+
+    # Extremes of a Brownian bridge from open to close with the bar's variance
+    u = 1.0 - rng.random((2, n))  # (0, 1]
+    spread = np.square(log_close - log_open)
+    mid = log_open + log_close
+    log_high = 0.5 * (mid + np.sqrt(spread - 2.0 * sigma**2 * np.log(u[0])))
+    log_low = 0.5 * (mid - np.sqrt(spread - 2.0 * sigma**2 * np.log(u[1])))
+
+    base_volume = 1000.0 * np.sqrt(bar_days * 24)
+    volume = (rng.lognormal(np.log(base_volume), 0.35, n) * multipliers[regime]).astype(np.int64)
+
+    return SyntheticSeries(
+        pair=pair,
+        granularity=granularity,
+        timestamps=timestamps,
+        open=np.exp(log_open),
+        high=np.exp(log_high),
+        low=np.exp(log_low),
+        close=np.exp(log_close),
+        volume=volume,
+        regime=regime,
+    )
+
+
+def generate_market(
+    pairs: Iterable[str],
+    granularity: str = "H1",
+    count: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    seed: Optional[int] = None,
+) -> Dict[str, SyntheticSeries]:
+    """Generate synthetic candles for several pairs on the same candle grid."""
+    end = end or datetime.now(timezone.utc)
+    return {
+        pair: generate_series(pair, granularity, count=count, start=start, end=end, seed=seed)
+        for pair in pairs
+    }
@@ -0,0 +1,491 @@
+"""
+Tracing Service
+Lightweight spans for following one scan from candle fetch to Discord webhook.
+
+Features:
+- span() context manager and @traced decorator (sync and async functions)
+- Parent/child tracking through contextvars; bind() carries the current span
+  into executor threads
+- Trace IDs shared by every span of one scan (attached to generated signals)
+- Finished traces exported off the hot path (opt-in) to a size-rotated JSONL
+  file or an OTLP/HTTP JSON collector
+- Critical path of each trace (and its time per stage), served at /debug/last-trace
+"""
+
+import contextvars
+import functools
+import inspect
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.request
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from config.settings import TRACING_SETTINGS
+from services import json_codec
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def _new_id(num_bytes: int) -> str:
+    return os.urandom(num_bytes).hex()
+
+
+class Span:
+    """One timed operation; spans of the same trace share a trace_id."""
+
+    __slots__ = (
+        "trace",
+        "span_id",
+        "parent_id",
+        "name",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+    )
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    @property
+    def trace_id(self) -> str:
+        return self.trace.trace_id
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        """Close the span; the trace is exported once its last open span ends."""
+        if self.end_ns is not None:
+            return
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        self.end_ns = time.time_ns()
+        self.trace.span_ended()
+
+    def to_dict(self, trace_start_ns: int) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_offset_ms": round((self.start_ns - trace_start_ns) / 1e6, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """All spans started under one root span."""
+
+    __slots__ = ("tracer", "trace_id", "root", "spans", "_open", "_finished", "_lock")
+
+    def __init__(self, tracer: "Tracer"):
+        self.tracer = tracer
+        self.trace_id = _new_id(16)
+        self.root: Optional[Span] = None
+        self.spans: List[Span] = []
+        self._open = 0
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+            self._open += 1
+
+    def span_ended(self) -> None:
+        with self._lock:
+            self._open -= 1
+            # A span started after the trace finished must not export it a second time
+            finished = self._open == 0 and not self._finished
+            self._finished = self._finished or finished
+        if finished:
+            self.tracer._finish(self)
+
+
+def critical_path(spans: List[Span]) -> List[Dict[str, Any]]:
+    """
+    Chain of work that determined the trace's end time.
+
+    Walking back from the end, each span hands over to the child that finished
+    last before the current point; time not covered by a child is the span's own.
+    Children that outlive their parent (background delivery) extend it.
+
+    Returns:
+        Chronological segments: name, span_id, attributes, start offset and duration (ms)
+    """
+    if not spans:
+        return []
+
+    children: Dict[Optional[str], List[Span]] = defaultdict(list)
+    for span in spans:
+        children[span.parent_id].append(span)
+
+    effective_end: Dict[str, int] = {}
+
+    def end_of(span: Span) -> int:
+        cached = effective_end.get(span.span_id)
+        if cached is None:
+            cached = max(
+                [span.end_ns or span.start_ns]
+                + [end_of(child) for child in children.get(span.span_id, [])]
+            )
+            effective_end[span.span_id] = cached
+        return cached
+
+    segments: List[Tuple[Span, int, int]] = []
+
+    def walk(span: Span, until_ns: int) -> None:
+        cursor = until_ns
+        for child in sorted(children.get(span.span_id, []), key=end_of, reverse=True):
+            if child.start_ns >= cursor:
+                continue
+            child_end = min(end_of(child), cursor)
+            if cursor > child_end:
+                segments.append((span, child_end, cursor))
+            walk(child, child_end)
+            cursor = child.start_ns
+            if cursor <= span.start_ns:
+                break
+        if cursor > span.start_ns:
+            segments.append((span, span.start_ns, cursor))
+
+    root = spans[0]
+    walk(root, end_of(root))
+    segments.sort(key=lambda segment: segment[1])
+
+    # Merge adjacent segments of the same span
+    merged: List[List[Any]] = []
+    for span, start_ns, end_ns in segments:
+        if merged and merged[-1][0] is span and merged[-1][2] == start_ns:
+            merged[-1][2] = end_ns
+        else:
+            merged.append([span, start_ns, end_ns])
+
+    return [
+        {
+            "name": span.name,
+            "span_id": span.span_id,
+            "attributes": span.attributes,
+            "start_offset_ms": round((start_ns - root.start_ns) / 1e6, 3),
+            "duration_ms": round((end_ns - start_ns) / 1e6, 3),
+        }
+        for span, start_ns, end_ns in merged
+    ]
+
+
+class JsonlTraceExporter:
+    """Append one JSON line per finished trace, rotating the file by size."""
+
+    def __init__(self, path: str, max_bytes: int = 0, backups: int = 0):
+        self.path = Path(path)
+        self.max_bytes = max_bytes  # 0: never rotate
+        self.backups = backups
+
+    def export(self, record: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.max_bytes and self.path.exists() and self.path.stat().st_size >= self.max_bytes:
+            self._rotate()
+        with self.path.open("ab") as f:
+            f.write(json_codec.dumps(record) + b"\n")
+
+    def _rotate(self) -> None:
+        """traces.jsonl -> traces.jsonl.1 -> ... -> traces.jsonl.<backups> (dropped beyond)."""
+        if self.backups <= 0:
+            self.path.unlink()
+            return
+        for i in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{i}")
+            if older.exists():
+                os.replace(older, self.path.with_name(f"{self.path.name}.{i + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+
+
+class OtlpHttpTraceExporter:
+    """POST finished traces to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str, timeout: float = 5.0):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def to_otlp(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert a trace record to an ExportTraceServiceRequest body."""
+        trace_start_ns = record["start_ns"]
+        spans = []
+        for span in record["spans"]:
+            start_ns = trace_start_ns + int(span["start_offset_ms"] * 1e6)
+            otlp_span = {
+                "traceId": record["trace_id"],
+                "spanId": span["span_id"],
+                "name": span["name"],
+                "kind": 1,  # SPAN_KIND_INTERNAL
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(span["duration_ms"] * 1e6)),
+                "attributes": [self._attribute(k, v) for k, v in span["attributes"].items()],
+                "status": {"code": 2, "message": span["error"]} if span["error"] else {"code": 1},
+            }
+            if span["parent_id"]:
+                otlp_span["parentSpanId"] = span["parent_id"]
+            spans.append(otlp_span)
+
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                    "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+                }
+            ]
+        }
+
+    def export(self, record: Dict[str, Any]) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json_codec.dumps(self.to_otlp(record)),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+def _build_exporter() -> Optional[Any]:
+    exporter = TRACING_SETTINGS["exporter"]
+    if exporter == "jsonl":
+        return JsonlTraceExporter(
+            TRACING_SETTINGS["jsonl_path"],
+            TRACING_SETTINGS["jsonl_max_bytes"],
+            TRACING_SETTINGS["jsonl_backups"],
+        )
+    if exporter == "otlp":
+        return OtlpHttpTraceExporter(
+            TRACING_SETTINGS["otlp_endpoint"], TRACING_SETTINGS["service_name"]
+        )
+    return None
+
+
+class Tracer:
+    """
+    Creates spans, keeps recent traces in memory and exports finished ones.
+
+    The exporter is any object with export(record); by default it is built from
+    TRACING_SETTINGS (JSONL file, OTLP collector, or none).
+    """
+
+    def __init__(self, exporter: Optional[Any] = None):
+        self.logger = logging.getLogger(__name__)
+        self.exporter = exporter if exporter is not None else _build_exporter()
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=TRACING_SETTINGS["keep_last"])
+        self._export_queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(
+            maxsize=TRACING_SETTINGS["export_queue_size"]
+        )
+        self._export_thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+        self.tracing_stats = {
+            "traces_finished": 0,
+            "spans_recorded": 0,
+            "traces_exported": 0,
+            "export_failures": 0,
+            "export_dropped": 0,
+        }
+
+    # Span creation ------------------------------------------------------
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        """
+        Start a span without making it current.
+
+        Use for work that ends elsewhere (e.g. a background task); pair with
+        use_span() inside that task. Without a parent or current span this
+        starts a new trace.
+        """
+        parent = parent if parent is not None else _current_span.get()
+        if parent is None:
+            trace = Trace(self)
+            span = Span(trace, name, None, attributes)
+            trace.root = span
+        else:
+            trace = parent.trace
+            span = Span(trace, name, parent.span_id, attributes)
+        trace.add(span)
+        return span
+
+    @contextmanager
+    def use_span(self, span: Span, end_on_exit: bool = True) -> Iterator[Span]:
+        """Make span current for the block (ending it on exit by default)."""
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            if end_on_exit:
+                span.end()
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time a block as a child of the current span (or as a new trace)."""
+        with self.use_span(self.start_span(name, **attributes)) as span:
+            yield span
+
+    def traced(self, name: Optional[str] = None) -> Callable:
+        """Decorator wrapping each call of a sync or async function in a span."""
+
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def bind(func: Callable) -> Callable:
+        """Carry the current span into another thread (for run_in_executor)."""
+        return functools.partial(contextvars.copy_context().run, func)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    @staticmethod
+    def current_trace_id() -> Optional[str]:
+        span = _current_span.get()
+        return span.trace_id if span is not None else None
+
+    # Finished traces ----------------------------------------------------
+
+    def _finish(self, trace: Trace) -> None:
+        spans = sorted(trace.spans, key=lambda span: span.start_ns)
+        if trace.root is not None and spans[0] is not trace.root:
+            spans.remove(trace.root)
+            spans.insert(0, trace.root)
+        root = spans[0]
+        end_ns = max(span.end_ns or span.start_ns for span in spans)
+
+        record = {
+            "trace_id": trace.trace_id,
+            "name": root.name,
+            "started_at": datetime.fromtimestamp(root.start_ns / 1e9, tz=timezone.utc).isoformat(),
+            "start_ns": root.start_ns,
+            "duration_ms": round((end_ns - root.start_ns) / 1e6, 3),
+            "span_count": len(spans),
+            "error": root.error,
+            "attributes": root.attributes,
+            "spans": [span.to_dict(root.start_ns) for span in spans],
+        }
+        path = critical_path(spans)
+        by_stage: Dict[str, float] = defaultdict(float)
+        for segment in path:
+            by_stage[segment["name"]] += segment["duration_ms"]
+        record["critical_path"] = path
+        record["critical_path_by_stage"] = {
+            name: round(ms, 3) for name, ms in sorted(by_stage.items(), key=lambda item: -item[1])
+        }
+
+        self._recent.append(record)
+        self.tracing_stats["traces_finished"] += 1
+        self.tracing_stats["spans_recorded"] += len(spans)
+
+        if self.exporter is not None:
+            self._enqueue_export(record)
+
+    def _enqueue_export(self, record: Dict[str, Any]) -> None:
+        try:
+            self._export_queue.put_nowait(record)
+        except queue.Full:
+            self.tracing_stats["export_dropped"] += 1
+            return
+
+        if self._export_thread is None:
+            with self._thread_lock:
+                if self._export_thread is None:
+                    self._export_thread = threading.Thread(
+                        target=self._export_loop, name="trace-export", daemon=True
+                    )
+                    self._export_thread.start()
+
+    def _export_loop(self) -> None:
+        while True:
+            record = self._export_queue.get()
+            try:
+                self.exporter.export(record)
+                self.tracing_stats["traces_exported"] += 1
+            except Exception as e:
+                self.tracing_stats["export_failures"] += 1
+                self.logger.warning(f"⚠️ Trace export failed: {e}")
+            finally:
+                self._export_queue.task_done()
+
+    def get_last_trace(self, name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Most recently finished trace, optionally with a given root span name."""
+        for record in reversed(self._recent):
+            if name is None or record["name"] == name:
+                return record
+        return None
+
+    def get_tracing_stats(self) -> Dict[str, Any]:
+        """Get exporter configuration and trace counters."""
+        return {
+            "exporter": type(self.exporter).__name__ if self.exporter is not None else None,
+            "recent_traces": len(self._recent),
+            "export_queue_depth": self._export_queue.qsize(),
+            **self.tracing_stats,
+        }
+
+
+# Global tracer instance
+tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer."""
+    return tracer
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Startup Profile
+Import-time breakdown of the API's cold start (python -X importtime).
+
+Usage:
+    python startup_profile.py                  # import app only
+    python startup_profile.py --with-services  # also build every service, as the startup hook does
+    python startup_profile.py --top 40
+
+Each phase runs in a fresh interpreter so nothing is already imported.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+IMPORT_APP = "import app"
+BUILD_SERVICES = (
+    "import app\n"
+    "for getter in (app.get_data_service, app.get_signal_service, app.get_notification_service,\n"
+    "               app.get_enhanced_daily_service, app.get_scheduler_service):\n"
+    "    getter()\n"
+    "app.strategy_registry.warm_up()\n"
+)
+
+
+def run_importtime(code: str) -> Tuple[List[Tuple[str, int, int]], float]:
+    """
+    Run code in a fresh interpreter with -X importtime.
+
+    Returns:
+        ([(module, self_us, cumulative_us)], wall-clock seconds)
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": BACKEND_DIR},
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.strip().splitlines()[-10:])
+        raise RuntimeError(f"Profiled code failed:\n{tail}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append((name.rstrip(), int(self_us), int(cumulative_us)))
+    return modules, elapsed
+
+
+def summarize_packages(modules: List[Tuple[str, int, int]]) -> Dict[str, int]:
+    """Sum self time per top-level package (microseconds)."""
+    totals: Dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        totals[name.strip().split(".")[0]] += self_us
+    return dict(totals)
+
+
+def print_report(title: str, modules: List[Tuple[str, int, int]], elapsed: float, top: int):
+    total_us = sum(self_us for _, self_us, _ in modules)
+    print(f"\n{title}")
+    print("=" * 72)
+    print(f"Interpreter wall time: {elapsed * 1000:8.1f} ms")
+    print(f"Total import time:     {total_us / 1000:8.1f} ms ({len(modules)} modules)")
+
+    print(f"\nTop {top} packages by self time")
+    print("-" * 72)
+    packages = sorted(summarize_packages(modules).items(), key=lambda item: item[1], reverse=True)
+    for package, self_us in packages[:top]:
+        share = self_us / total_us * 100 if total_us else 0.0
+        print(f"{self_us / 1000:8.1f} ms  {share:5.1f}%  {package}")
+
+    print(f"\nTop {top} modules by cumulative time")
+    print("-" * 72)
+    for name, _, cumulative_us in sorted(modules, key=lambda m: m[2], reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time breakdown of the API cold start")
+    parser.add_argument("--with-services", action="store_true", help="Also build all services")
+    parser.add_argument("--top", type=int, default=25, help="Rows per table")
+    args = parser.parse_args()
+
+    modules, elapsed = run_importtime(IMPORT_APP)
+    print_report("📦 import app", modules, elapsed, args.top)
+
+    if args.with_services:
+        modules, elapsed = run_importtime(BUILD_SERVICES)
+        print_report("🏗️ import app + build services", modules, elapsed, args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+App Import Tests
+Importing the app must stay cheap: heavy modules load when services are built at startup.
+"""
+
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFERRED_MODULES = ["aiohttp", "apscheduler", "pandas", "motor"]
+
+
+def test_import_app_defers_heavy_modules():
+    probe = (
+        "import sys, json, app; "
+        f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", probe],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
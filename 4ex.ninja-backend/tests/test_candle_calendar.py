@@ -0,0 +1,90 @@
+"""
+Candle Calendar Tests
+17:00 New York alignment across DST and the Friday-to-Sunday weekend gap.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from services.candle_calendar import (
+    CandleCloseTrigger,
+    is_weekend_closed,
+    last_candle_close,
+    next_candle_close,
+)
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "after, close",
+    [
+        (utc(2026, 7, 15, 12), utc(2026, 7, 15, 21)),  # EDT: 17:00 New York is 21:00 UTC
+        (utc(2026, 1, 14, 12), utc(2026, 1, 14, 22)),  # EST: 22:00 UTC
+    ],
+)
+def test_daily_close_follows_new_york_dst(after, close):
+    assert next_candle_close("D", after) == close
+
+
+def test_daily_close_moves_an_hour_across_the_march_change():
+    # US clocks go forward on Sunday 2026-03-08, inside the weekend gap
+    friday = next_candle_close("D", utc(2026, 3, 6, 12))
+    monday = next_candle_close("D", friday)
+
+    assert friday == utc(2026, 3, 6, 22)
+    assert monday == utc(2026, 3, 9, 21)
+    assert last_candle_close("D", utc(2026, 3, 8, 12)) == friday
+
+
+def test_h4_closes_are_anchored_at_17_new_york():
+    closes = [next_candle_close("H4", utc(2026, 7, 15, 0))]
+    for _ in range(5):
+        closes.append(next_candle_close("H4", closes[-1]))
+
+    assert [c.hour for c in closes] == [1, 5, 9, 13, 17, 21]
+
+
+def test_weekend_window():
+    assert not is_weekend_closed(utc(2026, 7, 17, 20, 59))  # Friday 16:59 New York
+    assert is_weekend_closed(utc(2026, 7, 17, 21))  # Friday 17:00
+    assert is_weekend_closed(utc(2026, 7, 18, 12))  # Saturday
+    assert is_weekend_closed(utc(2026, 7, 19, 20, 59))  # Sunday 16:59
+    assert not is_weekend_closed(utc(2026, 7, 19, 21))  # Sunday 17:00
+
+
+@pytest.mark.parametrize(
+    "granularity, friday_close, sunday_close",
+    [
+        ("D", utc(2026, 7, 17, 21), utc(2026, 7, 20, 21)),
+        ("H4", utc(2026, 7, 17, 21), utc(2026, 7, 20, 1)),
+        ("H1", utc(2026, 7, 17, 21), utc(2026, 7, 19, 22)),
+        ("M15", utc(2026, 7, 17, 21), utc(2026, 7, 19, 21, 15)),
+    ],
+)
+def test_no_candles_close_over_the_weekend(granularity, friday_close, sunday_close):
+    assert next_candle_close(granularity, utc(2026, 7, 17, 20, 50)) == friday_close
+    assert next_candle_close(granularity, friday_close) == sunday_close
+    assert next_candle_close(granularity, utc(2026, 7, 18, 12)) == sunday_close
+    assert last_candle_close(granularity, sunday_close - timedelta(seconds=1)) == friday_close
+    assert last_candle_close(granularity, sunday_close) == sunday_close
+
+
+def test_naive_datetimes_are_utc():
+    assert next_candle_close("D", datetime(2026, 7, 15, 12)) == utc(2026, 7, 15, 21)
+
+
+def test_trigger_fires_after_the_close_delay():
+    trigger = CandleCloseTrigger("H4", delay_seconds=5.0)
+    now = utc(2026, 7, 15, 1, 0, 2)  # Inside the delay window of the 01:00 close
+
+    first = trigger.get_next_fire_time(None, now)
+    assert first == utc(2026, 7, 15, 1, 0, 5)
+    assert trigger.get_next_fire_time(first, first) == utc(2026, 7, 15, 5, 0, 5)
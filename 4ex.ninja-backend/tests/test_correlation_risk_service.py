@@ -0,0 +1,108 @@
+"""
+Correlation Risk Service Tests
+Rolling covariance and parametric VaR checked against a direct numpy computation.
+"""
+
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from statistics import NormalDist
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from services.correlation_risk_service import CorrelationRiskEngine
+
+PAIRS = ["EUR_USD", "GBP_USD", "USD_JPY"]
+START = datetime(2026, 1, 5, 22, tzinfo=timezone.utc)
+
+
+def price_paths(bars: int, seed: int = 7) -> np.ndarray:
+    """Correlated random-walk closes, one column per pair."""
+    rng = np.random.default_rng(seed)
+    mixing = np.array([[1.0, 0.0, 0.0], [0.7, 0.5, 0.0], [-0.4, 0.2, 0.8]]) * 0.006
+    returns = rng.standard_normal((bars, 3)) @ mixing.T
+    return np.array([1.10, 1.27, 150.0]) * np.exp(np.cumsum(returns, axis=0))
+
+
+def fed_engine(closes: np.ndarray, window: int) -> CorrelationRiskEngine:
+    engine = CorrelationRiskEngine(pairs=PAIRS, timeframe="D", window=window)
+    for bar, row in enumerate(closes):
+        for pair, close in zip(PAIRS, row):
+            engine.add_close(pair, START + timedelta(days=bar), float(close))
+    return engine
+
+
+def test_covariance_matches_numpy_over_the_window():
+    closes = price_paths(200)
+    # 199 returns through a 30-row window: the running sums are rolled and rebuilt several times
+    engine = fed_engine(closes, window=30)
+
+    reference = np.cov(np.diff(np.log(closes), axis=0)[-30:], rowvar=False)
+    assert engine.count == 30
+    np.testing.assert_allclose(engine.covariance(), reference, rtol=1e-9, atol=1e-15)
+    np.testing.assert_allclose(
+        engine.correlation(), np.corrcoef(np.diff(np.log(closes), axis=0)[-30:], rowvar=False), rtol=1e-9
+    )
+
+
+def test_no_covariance_before_min_observations():
+    engine = fed_engine(price_paths(10), window=30)
+    assert engine.covariance() is None
+    assert engine.portfolio_risk(np.ones(3)) == {"ready": False, "observations": 9}
+
+
+def test_portfolio_var_matches_numpy():
+    closes = price_paths(120)
+    engine = fed_engine(closes, window=60)
+    covariance = np.cov(np.diff(np.log(closes), axis=0)[-60:], rowvar=False)
+    w = np.array([100_000.0, -50_000.0, 0.0])
+
+    risk = engine.portfolio_risk(w)
+
+    z = NormalDist().inv_cdf(0.95)
+    expected_var = z * np.sqrt(w @ covariance @ w)
+    standalone = z * np.abs(w) * np.sqrt(np.diag(covariance))
+    assert risk["var"] == pytest.approx(expected_var, abs=0.01)
+    assert risk["undiversified_var"] == pytest.approx(standalone.sum(), abs=0.01)
+    assert set(risk["pairs"]) == {"EUR_USD", "GBP_USD"}
+    # Component VaR adds up to the portfolio VaR
+    components = sum(p["component_var"] for p in risk["pairs"].values())
+    assert components == pytest.approx(expected_var, abs=0.02)
+    marginal = z * (covariance @ w) / np.sqrt(w @ covariance @ w)
+    assert risk["pairs"]["GBP_USD"]["marginal_var"] == pytest.approx(marginal[1], abs=1e-6)
+
+
+def test_missing_close_is_carried_forward():
+    closes = price_paths(40)
+    engine = CorrelationRiskEngine(pairs=PAIRS, timeframe="D", window=60)
+    for bar, row in enumerate(closes):
+        for pair, close in zip(PAIRS, row):
+            if pair == "USD_JPY" and bar == 20:
+                continue  # No USD_JPY close for this bar
+            engine.add_close(pair, START + timedelta(days=bar), float(close))
+
+    carried = closes.copy()
+    carried[20, 2] = carried[19, 2]
+    reference = np.cov(np.diff(np.log(carried), axis=0), rowvar=False)
+    assert engine.engine_stats["carried_forward"] == 1
+    np.testing.assert_allclose(engine.covariance(), reference, rtol=1e-9, atol=1e-15)
+
+
+def test_late_close_is_ignored():
+    engine = fed_engine(price_paths(5), window=30)
+    engine.add_close("EUR_USD", START, 2.0)
+    assert engine.engine_stats["late_closes"] == 1
+    assert engine.count == 4
+
+
+def test_correlated_trade_is_sized_down():
+    engine = fed_engine(price_paths(120), window=60)
+    long_eur = np.array([100_000.0, 0.0, 0.0])
+
+    # GBP_USD moves with EUR_USD, so adding to it concentrates risk; the opposite side hedges
+    assert engine.correlation_multipliers(np.array([0, 1, 0]), long_eur)[1] < 0.8
+    assert engine.correlation_multipliers(np.array([0, -1, 0]), long_eur)[1] == 1.0
+    assert engine.correlation_multipliers(np.array([1, 1, 1]), np.zeros(3)).tolist() == [1.0, 1.0, 1.0]
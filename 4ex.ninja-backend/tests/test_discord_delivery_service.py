@@ -0,0 +1,117 @@
+"""
+Discord Delivery Service Tests
+Per-webhook ordering and 429 handling against a local webhook stand-in.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+from services.discord_delivery_service import DiscordDeliveryService
+
+
+async def start_webhook_server(handler):
+    """Serve POST /api/webhooks/{id}/{token} with `handler`; returns (runner, base URL)."""
+    app = web.Application()
+    app.add_routes([web.post("/api/webhooks/{id}/{token}", handler)])
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/api/webhooks"
+
+
+def test_posts_to_one_webhook_keep_order_while_others_proceed():
+    async def main():
+        received = defaultdict(list)
+
+        async def webhook(request):
+            payload = await request.json()
+            if payload["seq"] == 0:
+                await asyncio.sleep(0.2)  # A slow first post must not let later ones overtake it
+            received[request.match_info["id"]].append((payload["seq"], time.monotonic()))
+            return web.Response(status=204)
+
+        runner, url = await start_webhook_server(webhook)
+        service = DiscordDeliveryService()
+        try:
+            started = time.monotonic()
+            ordered = [service.deliver(f"{url}/1101/token", {"seq": seq}) for seq in range(4)]
+            other = service.deliver(f"{url}/1102/token", {"seq": 1})
+            results = await asyncio.gather(*ordered, other)
+        finally:
+            await service.close()
+            await runner.cleanup()
+        return started, results, received, service
+
+    started, results, received, service = asyncio.run(main())
+
+    assert results == [True] * 5
+    assert [seq for seq, _ in received["1101"]] == [0, 1, 2, 3]
+    # The second webhook was not held up by the first one's slow post
+    assert received["1102"][0][1] - started < 0.15
+    assert service.delivery_metrics["delivered"] == 5
+
+
+def test_rate_limited_post_waits_for_retry_after():
+    async def main():
+        attempts = defaultdict(list)
+
+        async def webhook(request):
+            webhook_id = request.match_info["id"]
+            attempts[webhook_id].append(time.monotonic())
+            if len(attempts[webhook_id]) > 1:
+                return web.Response(status=204)
+            if webhook_id == "1201":
+                return web.json_response({"message": "rate limited", "retry_after": 0.3}, status=429)
+            return web.Response(status=429, headers={"Retry-After": "0.2"})
+
+        runner, url = await start_webhook_server(webhook)
+        service = DiscordDeliveryService()
+        try:
+            results = await asyncio.gather(
+                service.deliver(f"{url}/1201/token", {"content": "body retry_after"}),
+                service.deliver(f"{url}/1202/token", {"content": "header Retry-After"}),
+            )
+        finally:
+            await service.close()
+            await runner.cleanup()
+        return results, attempts, service
+
+    results, attempts, service = asyncio.run(main())
+
+    assert results == [True, True]
+    assert len(attempts["1201"]) == len(attempts["1202"]) == 2
+    assert attempts["1201"][1] - attempts["1201"][0] >= 0.29  # Timer slack
+    assert attempts["1202"][1] - attempts["1202"][0] >= 0.19
+    assert service.delivery_metrics["rate_limited"] == 2
+    assert service.delivery_metrics["retries"] == 2
+
+
+def test_non_retryable_status_fails_without_retry():
+    async def main():
+        calls = []
+
+        async def webhook(request):
+            calls.append(request.match_info["id"])
+            return web.json_response({"message": "Unknown Webhook"}, status=404)
+
+        runner, url = await start_webhook_server(webhook)
+        service = DiscordDeliveryService()
+        try:
+            result = await service.deliver(f"{url}/1301/token", {"content": "x"})
+        finally:
+            await service.close()
+            await runner.cleanup()
+        return result, calls
+
+    result, calls = asyncio.run(main())
+
+    assert result is False
+    assert calls == ["1301"]
@@ -0,0 +1,81 @@
+"""
+Discord Embed Packer Tests
+Per-message embed count and character limits, truncation and ordering.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.discord_embed_packer import (
+    MAX_EMBED_CHARS_PER_MESSAGE,
+    MAX_EMBEDS_PER_MESSAGE,
+    MAX_FIELD_VALUE_LENGTH,
+    MAX_FIELDS,
+    MAX_TITLE_LENGTH,
+    clamp_embed,
+    embed_size,
+    pack_embeds,
+)
+
+
+def embed(chars: int, title: str = "EUR_USD") -> dict:
+    """Embed of exactly `chars` counted characters."""
+    return {"title": title, "description": "x" * (chars - len(title)), "color": 0x3498DB}
+
+
+def test_at_most_ten_embeds_per_message():
+    messages = pack_embeds([embed(100) for _ in range(23)])
+
+    assert [len(batch) for _, batch in messages] == [10, 10, 3]
+    assert [i for indices, _ in messages for i in indices] == list(range(23))
+    assert all(len(batch) <= MAX_EMBEDS_PER_MESSAGE for _, batch in messages)
+
+
+def test_character_total_stays_within_6000():
+    embeds = [embed(1500) for _ in range(9)]
+    messages = pack_embeds(embeds)
+
+    # Four 1500-character embeds fill a message exactly; a fifth would exceed it
+    assert [indices for indices, _ in messages] == [[0, 1, 2, 3], [4, 5, 6, 7], [8]]
+    for _, batch in messages:
+        assert sum(embed_size(e) for e in batch) <= MAX_EMBED_CHARS_PER_MESSAGE
+
+
+def test_counted_characters_include_fields_footer_and_author():
+    sized = {
+        "title": "abc",
+        "description": "de",
+        "fields": [{"name": "f", "value": "gh"}, {"name": "ij", "value": "k"}],
+        "footer": {"text": "lmn"},
+        "author": {"name": "op"},
+        "url": "https://not-counted.example",
+    }
+    assert embed_size(sized) == 3 + 2 + 3 + 3 + 3 + 2
+
+
+def test_oversized_elements_are_truncated():
+    clamped = clamp_embed(
+        {
+            "title": "t" * 300,
+            "fields": [{"name": "n", "value": "v" * 2000, "inline": True}] * 30,
+        }
+    )
+
+    assert len(clamped["title"]) == MAX_TITLE_LENGTH and clamped["title"].endswith("…")
+    assert len(clamped["fields"]) == MAX_FIELDS
+    assert len(clamped["fields"][0]["value"]) == MAX_FIELD_VALUE_LENGTH
+    assert clamped["fields"][0]["inline"] is True
+
+
+def test_embed_over_the_limit_by_itself_goes_alone():
+    # 30 full fields clamp to 25 x (1 + 1024) characters, more than one message allows
+    huge = {"title": "big", "fields": [{"name": "n", "value": "v" * 1024}] * 30}
+    messages = pack_embeds([embed(100), huge, embed(100)])
+
+    assert [indices for indices, _ in messages] == [[0], [1], [2]]
+
+
+def test_no_embeds_no_messages():
+    assert pack_embeds([]) == []
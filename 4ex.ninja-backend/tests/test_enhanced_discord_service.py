@@ -0,0 +1,92 @@
+"""
+Enhanced Discord Service Tests
+Tier routing and per-tier packing, delivered to a local webhook stand-in.
+"""
+
+import asyncio
+import os
+import sys
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+from services.discord_delivery_service import get_discord_delivery_service
+from services.enhanced_discord_service import (
+    EnhancedDiscordService,
+    SignalPriority,
+    UserTier,
+    determine_target_tiers,
+)
+
+
+def analysis(pair, confidence, confluence):
+    return {
+        "pair": pair,
+        "signal": "BUY",
+        "direction": "LONG",
+        "entry_price": 1.1,
+        "stop_loss": 1.09,
+        "take_profit": 1.12,
+        "confluence_score": confluence,
+        "signal_strength": "strong",
+        "trade_recommendation": {"recommendation": "BUY", "confidence": confidence},
+    }
+
+
+ALL_TIERS = analysis("EUR_USD", 0.85, 1.2)
+PREMIUM_ONLY = analysis("AUD_USD", 0.65, 0.6)
+NO_TIER = analysis("GBP_JPY", 0.55, 0.2)
+
+
+def test_determine_target_tiers():
+    assert determine_target_tiers(ALL_TIERS) == [UserTier.FREE, UserTier.PREMIUM, UserTier.WHALE, UserTier.ALPHA]
+    assert determine_target_tiers(PREMIUM_ONLY) == [UserTier.PREMIUM]
+    assert determine_target_tiers(NO_TIER) == []
+    # Nothing qualifies but confidence is decent: FREE still gets it
+    assert determine_target_tiers(analysis("AUD_USD", 0.62, 0.1)) == [UserTier.FREE]
+
+
+def test_send_packed_signals_by_tier_packs_each_tier_once():
+    async def main():
+        received = defaultdict(list)
+
+        async def webhook(request):
+            received[request.match_info["tier"]].append(await request.json())
+            return web.Response(status=204)
+
+        app = web.Application()
+        app.add_routes([web.post("/api/webhooks/{tier}/token", webhook)])
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+        service = EnhancedDiscordService()
+        for tier, config in service.webhook_configs.items():
+            config["url"] = f"{url}/api/webhooks/{tier.value}/token"
+        try:
+            signals = [ALL_TIERS, PREMIUM_ONLY, NO_TIER]
+            results = await service.send_packed_signals_by_tier(
+                [(signal, SignalPriority.MEDIUM, determine_target_tiers(signal)) for signal in signals]
+            )
+        finally:
+            await get_discord_delivery_service().close()
+            await runner.cleanup()
+        return results, received
+
+    results, received = asyncio.run(main())
+
+    assert results == [
+        {"free": True, "premium": True, "whale": True, "alpha": True},
+        {"premium": True},
+        {},
+    ]
+    # One message per tier; PREMIUM gets both of its signals in that message
+    assert {tier: len(messages) for tier, messages in received.items()} == {
+        "free": 1, "premium": 1, "whale": 1, "alpha": 1,
+    }
+    assert len(received["premium"][0]["embeds"]) == 2
+    assert len(received["alpha"][0]["embeds"]) == 1
@@ -0,0 +1,179 @@
+"""
+Execution Service Tests
+Runs OandaExecutionService against the local OANDA stand-in (load_testing/mock_oanda_server.py).
+"""
+
+import asyncio
+import os
+import sys
+from collections import Counter
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+
+from load_testing.mock_oanda_server import DEFAULT_ACCOUNT_ID, MockOandaConfig, MockOandaServer
+from services.data_service import DataService
+from services.execution_service import EXECUTION_SETTINGS, OandaExecutionService, make_client_order_id
+
+
+def run_with_mock(test, transaction_stream=False, patch_server=None):
+    """Start a mock server and an execution service pointed at it, then run `test(service, server)`."""
+
+    async def main():
+        server = MockOandaServer(MockOandaConfig(latency_ms=0))
+        if patch_server is not None:
+            patch_server(server)
+        url = await server.start()
+
+        data_service = DataService()
+        data_service.base_url = data_service.stream_url = url
+        data_service.api_key = "mock"
+        data_service.account_id = DEFAULT_ACCOUNT_ID
+        data_service.headers = {"Authorization": "Bearer mock", "Content-Type": "application/json"}
+
+        service = OandaExecutionService()
+        service.set_data_service(data_service)
+        previous = EXECUTION_SETTINGS["transaction_stream"], EXECUTION_SETTINGS["retry_backoff_seconds"]
+        EXECUTION_SETTINGS["transaction_stream"] = transaction_stream
+        EXECUTION_SETTINGS["retry_backoff_seconds"] = 0.01
+        try:
+            await service.start()
+            await test(service, server)
+        finally:
+            EXECUTION_SETTINGS["transaction_stream"], EXECUTION_SETTINGS["retry_backoff_seconds"] = previous
+            await service.close()
+            await server.stop()
+
+    asyncio.run(main())
+
+
+async def wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_resubmit_with_same_client_id_recovers_existing_order():
+    async def test(service, server):
+        first = await service.place_market_order("EUR_USD", 1000, client_order_id="4xn-test-1")
+        second = await service.place_market_order("EUR_USD", 1000, client_order_id="4xn-test-1")
+
+        assert first.status == "FILLED" and not first.recovered
+        # Rejected with CLIENT_ORDER_ID_ALREADY_EXISTS, then found by client ID
+        assert second.status == "FILLED" and second.recovered
+        assert second.order_id == first.order_id and second.trade_id == first.trade_id
+        assert second.attempts == 1
+        assert len(server.account.trades) == 1
+
+    run_with_mock(test)
+
+
+def test_server_error_after_order_reached_oanda_recovers_by_client_id():
+    def fail_after_handling(server):
+        create_order = server.create_order
+
+        async def lost_response(request):
+            await create_order(request)
+            return web.json_response({"errorMessage": "Internal server error"}, status=500)
+
+        server.create_order = lost_response
+
+    async def test(service, server):
+        result = await service.place_market_order("EUR_USD", -2000, client_order_id="4xn-test-2")
+
+        assert result.status == "FILLED" and result.recovered
+        assert result.attempts == 1
+        assert result.price is not None
+        assert len(server.account.trades) == 1
+        assert service.execution_stats["orders_recovered"] == 1
+
+    run_with_mock(test, patch_server=fail_after_handling)
+
+
+def test_undecodable_body_is_retried():
+    def proxy_error_once(server):
+        create_order = server.create_order
+        calls = Counter()
+
+        async def flaky(request):
+            calls["create"] += 1
+            if calls["create"] == 1:
+                return web.Response(text="<html>502 Bad Gateway</html>", status=502, content_type="text/html")
+            return await create_order(request)
+
+        server.create_order = flaky
+
+    async def test(service, server):
+        result = await service.place_market_order("EUR_USD", 1000, client_order_id="4xn-test-3")
+
+        assert result.status == "FILLED"
+        assert result.attempts == 2
+        assert len(server.account.trades) == 1
+
+    run_with_mock(test, patch_server=proxy_error_once)
+
+
+def test_rate_limited_order_waits_for_retry_after():
+    def throttle_once(server):
+        create_order = server.create_order
+        calls = Counter()
+
+        async def throttled(request):
+            calls["create"] += 1
+            if calls["create"] == 1:
+                return server._throttled()  # Retry-After: 1
+            return await create_order(request)
+
+        server.create_order = throttled
+
+    async def test(service, server):
+        result = await service.place_market_order("USD_JPY", 1000, client_order_id="4xn-test-4")
+
+        assert result.status == "FILLED" and not result.recovered
+        assert result.attempts == 2
+        # Waited the server's Retry-After, not the (much shorter) backoff
+        assert result.latency_ms >= 1000
+        assert service.execution_stats["retries"] == 1
+
+    run_with_mock(test, patch_server=throttle_once)
+
+
+def test_transaction_stream_updates_account_cache_and_notifies_once():
+    async def test(service, server):
+        await wait_for(lambda: service.stream_connected)
+        seen = Counter()
+        service.transaction_listeners.append(lambda transaction: seen.update([transaction["id"]]))
+        assert service._account.balance == 100000.0
+
+        server.account.balance = 100500.0
+        transfer_id = server.account.next_id()
+        server._publish_transactions(
+            {"id": transfer_id, "type": "TRANSFER_FUNDS", "amount": "500.0000", "accountBalance": "100500.0000"}
+        )
+        await wait_for(lambda: seen[transfer_id] == 1)
+        state = await service.get_account_state()
+        assert state.balance == 100500.0
+        assert state.last_transaction_id == transfer_id
+
+        # The fill arrives in the order response and on the stream; listeners see it once
+        received = service.execution_stats["transactions"]
+        result = await service.place_market_order("EUR_USD", 1000, client_order_id="4xn-test-5")
+        fill_id = result.trade_id
+        await wait_for(lambda: service.execution_stats["transactions"] >= received + 2)  # Create + fill
+        assert seen[fill_id] == 1
+
+        await service.close_trade(fill_id)
+        assert sum(seen.values()) == len(seen)
+
+    run_with_mock(test, transaction_stream=True)
+
+
+def test_client_order_id_ignores_timestamp_timezone_form():
+    signal = {"pair": "EUR_USD", "signal": "BUY", "entry_price": 1.1}
+    naive = make_client_order_id({**signal, "candle_time": datetime(2025, 1, 6, 8)})
+    aware = make_client_order_id({**signal, "candle_time": datetime(2025, 1, 6, 8, tzinfo=timezone.utc)})
+    iso = make_client_order_id({**signal, "candle_time": "2025-01-06T08:00:00Z"})
+    assert naive == aware == iso
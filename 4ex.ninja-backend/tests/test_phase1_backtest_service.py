@@ -0,0 +1,56 @@
+"""
+Phase 1 Backtest Service Tests
+Checks the vectorized signal frame against bar-by-bar analyze_pair() on saved history.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from services.phase1_backtest_service import Phase1Backtester
+
+PAIR = "EUR_USD"
+DIRECTIONS = {"BUY": 1, "SELL": -1, "NONE": 0}
+
+
+def test_signal_frame_matches_analyze_pair():
+    backtester = Phase1Backtester()
+    if PAIR not in backtester.available_pairs():
+        pytest.skip(f"No saved H4 history for {PAIR}")
+    data = backtester.load_history(PAIR)
+    frame = backtester.signal_frame(PAIR, data)
+    strategy = backtester.strategy
+
+    # Every signal bar plus a spread of bars without one
+    signal_bars = np.flatnonzero(frame["direction"].to_numpy() != 0)
+    assert len(signal_bars) > 0
+    bars = sorted(set(signal_bars.tolist()) | set(range(500, len(data), 211)))
+
+    for i in bars:
+        row = frame.iloc[i]
+        analysis = strategy.analyze_pair(
+            PAIR, data.iloc[: i + 1], size_position=False, current_time=row["close_time"].to_pydatetime()
+        )
+        signal = analysis["technical_signal"]
+        where = f"bar {i} ({data.index[i]})"
+
+        assert DIRECTIONS[signal["signal"]] == row["direction"], where
+        assert signal["entry_price"] == pytest.approx(row["entry_price"]), where
+        for name, column in (("ema_20", "ema_20"), ("ema_50", "ema_50"), ("rsi", "rsi"), ("atr", "daily_atr")):
+            assert signal["indicators"][name] == pytest.approx(row[column], rel=1e-6), f"{where} {name}"
+        if row["direction"]:
+            assert signal["stop_loss"] == pytest.approx(row["stop_loss"], rel=1e-9), where
+            assert signal["take_profit"] == pytest.approx(row["take_profit"], rel=1e-9), where
+
+        session = analysis["session_analysis"]
+        assert session["is_optimal_session"] == bool(row["is_optimal_session"]), where
+        assert session["session_quality_multiplier"] == pytest.approx(row["session_quality"]), where
+        assert analysis["atr"] == pytest.approx(row["atr"]), where
+
+
+def test_zero_initial_balance_is_kept():
+    assert Phase1Backtester(initial_balance=0.0).initial_balance == 0.0
@@ -0,0 +1,102 @@
+"""
+Rate Limiter Service Tests
+Token-bucket reservation, refund on cancellation and the LRU bucket registry.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from services.discord_delivery_service import DiscordDeliveryService
+from services.rate_limiter_service import RateLimiterService, TokenBucket
+
+
+def test_try_acquire_rejects_when_empty():
+    bucket = TokenBucket(capacity=2, refill_per_second=0.001)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.stats["allowed"] == 2 and bucket.stats["rejected"] == 1
+
+
+def test_cancelled_waiter_refunds_its_reservation():
+    async def main():
+        bucket = TokenBucket(capacity=1, refill_per_second=1.0)
+        assert await bucket.acquire()  # Empties the bucket
+
+        waiter = asyncio.create_task(bucket.acquire())
+        await asyncio.sleep(0.01)
+        assert bucket.available_tokens < 0  # Reserved ahead of later callers
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return bucket
+
+    bucket = asyncio.run(main())
+
+    # The debt is gone: only refill since the first acquire is left
+    assert 0 <= bucket.available_tokens < 0.5
+    assert bucket.stats["allowed"] == 1
+    assert bucket.stats["cancelled"] == 1
+
+
+def test_waiters_are_served_in_order():
+    async def main():
+        bucket = TokenBucket(capacity=1, refill_per_second=50.0)
+        order = []
+
+        async def take(name):
+            await bucket.acquire()
+            order.append(name)
+
+        await asyncio.gather(*(take(name) for name in "abcd"))
+        return order
+
+    assert asyncio.run(main()) == list("abcd")
+
+
+def test_acquire_timeout_does_not_reserve():
+    async def main():
+        bucket = TokenBucket(capacity=1, refill_per_second=0.1)
+        await bucket.acquire()
+        return bucket, await bucket.acquire(timeout=0.01)
+
+    bucket, granted = asyncio.run(main())
+    assert granted is False
+    assert bucket.available_tokens >= 0
+    assert bucket.stats["rejected"] == 1
+
+
+def test_registry_evicts_least_recently_used_bucket():
+    registry = RateLimiterService(max_buckets=2)
+    a = registry.get_bucket("a", 5, 1)
+    b = registry.get_bucket("b", 5, 1)
+    assert registry.get_bucket("a", 99, 99) is a  # First caller's limits win; "a" is now most recent
+
+    registry.get_bucket("c", 5, 1)
+
+    stats = registry.get_rate_limit_stats()
+    assert set(stats["buckets"]) == {"a", "c"}
+    assert stats["bucket_count"] == 2
+    # An evicted bucket is rebuilt fresh on next use
+    assert registry.get_bucket("b", 5, 1) is not b
+    assert set(registry.get_rate_limit_stats()["buckets"]) == {"c", "b"}
+
+
+def test_delivery_service_keeps_its_webhook_buckets_after_eviction():
+    async def main():
+        service = DiscordDeliveryService()
+        service.rate_limiter = RateLimiterService(max_buckets=1)
+        await service._wait_for_rate_limit("https://discord.test/api/webhooks/1/a")
+        first = service._buckets["https://discord.test/api/webhooks/1/a"]
+        await service._wait_for_rate_limit("https://discord.test/api/webhooks/2/b")  # Evicts webhook 1's bucket
+        await service._wait_for_rate_limit("https://discord.test/api/webhooks/1/a")
+        return first, service
+
+    first, service = asyncio.run(main())
+    assert service._buckets["https://discord.test/api/webhooks/1/a"] is first
+    assert first.stats["allowed"] == 2
@@ -0,0 +1,105 @@
+"""
+Risk Journal Service Tests
+Snapshot recovery, sequence-number replay, torn writes and two writers on one journal.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.risk_journal_service import RiskJournal
+
+
+class Ledger:
+    """Minimal journal owner: a running balance and the sequence numbers applied."""
+
+    def __init__(self, directory, snapshot_every=100):
+        self.state = {"balance": 0.0, "applied": []}
+        self.journal = RiskJournal(str(directory), snapshot_every=snapshot_every, fsync=False)
+        self.journal.attach(self.get_state, self.set_state, self.apply)
+
+    def get_state(self):
+        return {"balance": self.state["balance"], "applied": list(self.state["applied"])}
+
+    def set_state(self, state):
+        self.state = {"balance": state["balance"], "applied": list(state["applied"])}
+
+    def apply(self, event):
+        self.state["balance"] += event["pnl"]
+        self.state["applied"].append(event["seq"])
+
+
+def test_recover_from_snapshot_and_later_events(tmp_path):
+    writer = Ledger(tmp_path, snapshot_every=3)
+    writer.journal.recover()
+    for pnl in (10, -4, 6, 2, 1):
+        writer.journal.record("trade_result", pnl=pnl)
+    assert writer.journal.get_journal_stats()["snapshot_seq"] == 3
+
+    restarted = Ledger(tmp_path, snapshot_every=3)
+    assert restarted.journal.recover() == 2  # Only the events after the snapshot
+    assert restarted.state == {"balance": 15, "applied": [1, 2, 3, 4, 5]}
+    assert restarted.journal.seq == 5
+
+
+def test_replay_skips_events_already_in_the_snapshot(tmp_path):
+    writer = Ledger(tmp_path)
+    writer.journal.recover()
+    for pnl in (1, 2, 3):
+        writer.journal.record("trade_result", pnl=pnl)
+    journal_path = writer.journal.journal_path
+    before_snapshot = journal_path.read_bytes()
+    writer.journal.snapshot()
+    writer.journal.record("trade_result", pnl=4)
+    # A crash between snapshot and truncation leaves events 1-3 in the journal
+    journal_path.write_bytes(before_snapshot + journal_path.read_bytes())
+
+    restarted = Ledger(tmp_path)
+    assert restarted.journal.recover() == 1
+    assert restarted.state == {"balance": 10, "applied": [1, 2, 3, 4]}
+
+
+def test_torn_line_is_ignored_and_truncated(tmp_path):
+    writer = Ledger(tmp_path)
+    writer.journal.recover()
+    writer.journal.record("trade_result", pnl=5)
+    with writer.journal.journal_path.open("ab") as f:
+        f.write(b'{"seq": 2, "type": "trade_res')  # Crash mid-append
+
+    restarted = Ledger(tmp_path)
+    assert restarted.journal.recover() == 1
+    assert restarted.state["balance"] == 5
+
+    event = restarted.journal.record("trade_result", pnl=7)
+    assert event["seq"] == 2
+    lines = restarted.journal.journal_path.read_bytes().splitlines()
+    assert len(lines) == 2 and lines[-1].startswith(b'{"seq":2')
+
+    again = Ledger(tmp_path)
+    again.journal.recover()
+    assert again.state == {"balance": 12, "applied": [1, 2]}
+
+
+def test_second_writer_catches_up(tmp_path):
+    api = Ledger(tmp_path)
+    loop = Ledger(tmp_path)
+    api.journal.recover()
+    loop.journal.recover()
+
+    api.journal.record("trade_result", pnl=3)
+    assert loop.journal.catch_up() == 1
+    assert loop.state["balance"] == 3
+
+    # Recording applies the other writer's events first and takes the next sequence number
+    api.journal.record("trade_result", pnl=4)
+    event = loop.journal.record("trade_result", pnl=5)
+    assert event["seq"] == 3
+    assert loop.state == {"balance": 12, "applied": [1, 2, 3]}
+
+    # A snapshot by one writer truncates the journal; the other reloads from it
+    loop.journal.snapshot()
+    loop.journal.record("trade_result", pnl=1)
+    api.journal.catch_up()
+    assert api.state == {"balance": 13, "applied": [1, 2, 3, 4]}
+    assert api.journal.seq == loop.journal.seq == 4
@@ -0,0 +1,111 @@
+"""
+Scan Snapshot Service Tests
+If-None-Match matching across weak and per-encoding ETags, and single-flight refresh.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from services.scan_snapshot_service import ScanSnapshotService
+
+SCAN = {"signal_count": 1, "signals": [{"pair": "EUR_USD", "signal": "BUY"}]}
+
+
+def test_etag_for_each_encoding():
+    snapshot = ScanSnapshotService().publish(SCAN)
+    digest = snapshot.etag.strip('"')
+
+    assert snapshot.etag_for(None) == snapshot.etag
+    assert snapshot.etag_for("gzip") == f'"{digest}-gzip"'
+
+
+def test_matches_strong_weak_and_encoded_tags():
+    snapshot = ScanSnapshotService().publish(SCAN)
+    gzip_tag = snapshot.etag_for("gzip")
+
+    assert snapshot.matches(snapshot.etag)
+    assert snapshot.matches(gzip_tag)
+    assert snapshot.matches(f"W/{snapshot.etag}")
+    assert snapshot.matches(f"W/{gzip_tag}")  # Proxies weaken tags when they re-encode
+    assert snapshot.matches(f'"stale", {gzip_tag}')
+    assert snapshot.matches("*")
+
+    assert not snapshot.matches(None)
+    assert not snapshot.matches("")
+    assert not snapshot.matches('"stale", W/"stale-gzip"')
+    assert not snapshot.matches(snapshot.etag.strip('"'))  # Unquoted tag is not the same tag
+
+
+def test_new_content_gets_a_new_etag():
+    service = ScanSnapshotService()
+    first = service.publish(SCAN)
+    same = service.publish(dict(SCAN))
+    changed = service.publish({"signal_count": 0, "signals": []})
+
+    assert same.etag == first.etag and same.version == first.version + 1
+    assert not changed.matches(first.etag)
+    assert service.get_snapshot() is changed
+    assert changed.signals_by_pair == {}
+    assert first.signals_by_pair == {"EUR_USD": SCAN["signals"]}
+
+
+def test_concurrent_refreshes_share_one_scan():
+    async def main():
+        service = ScanSnapshotService()
+        calls = 0
+        release = asyncio.Event()
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return SCAN
+
+        service.set_producer(producer)
+        waiters = [asyncio.create_task(service.refresh()) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        waiters[0].cancel()  # A cancelled caller must not cancel the shared scan
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        after = await service.refresh()  # The previous scan finished, so this starts a new one
+        return service, calls, results, after
+
+    service, calls, results, after = asyncio.run(main())
+
+    assert isinstance(results[0], asyncio.CancelledError)
+    snapshots = results[1:]
+    assert all(s is snapshots[0] for s in snapshots)
+    assert calls == 2
+    assert after.version == snapshots[0].version + 1
+    stats = service.get_snapshot_stats()
+    assert stats["refreshes_started"] == 2
+    assert stats["refreshes_coalesced"] == 4
+    assert stats["refresh_in_flight"] is False
+
+
+def test_failed_refresh_reaches_every_waiter():
+    async def main():
+        service = ScanSnapshotService()
+
+        async def producer():
+            await asyncio.sleep(0.01)
+            return {"error": "OANDA unavailable"}
+
+        service.set_producer(producer)
+        return service, await asyncio.gather(*(service.refresh() for _ in range(3)), return_exceptions=True)
+
+    service, results = asyncio.run(main())
+
+    assert all(isinstance(r, RuntimeError) and str(r) == "OANDA unavailable" for r in results)
+    assert service.snapshot_stats["refresh_failures"] == 1
+    assert service.get_snapshot() is None
+
+
+def test_refresh_without_producer():
+    with pytest.raises(RuntimeError):
+        asyncio.run(ScanSnapshotService().refresh())
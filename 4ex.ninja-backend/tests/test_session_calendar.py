@@ -0,0 +1,86 @@
+"""
+Session Calendar Tests
+DST shifts of the London and New York sessions, and scalar vs vectorized pair lookups.
+"""
+
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.session_calendar import MarketSession
+from services.session_manager_service import SessionManagerService
+
+LONDON = MarketSession.LONDON
+NEW_YORK = MarketSession.NEW_YORK
+OVERLAP = MarketSession.OVERLAP_LONDON_NY
+
+
+def utc(*args) -> datetime:
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def open_hours(calendar, session, day) -> list:
+    """UTC hours of `day` in which `session` is active."""
+    return [hour for hour in range(24) if session in calendar.sessions(utc(*day, hour))]
+
+
+@pytest.fixture(scope="module")
+def calendar():
+    return SessionManagerService(dst_aware=True).calendar
+
+
+# 2026 clock changes: US forward 8 Mar, UK forward 29 Mar, UK back 25 Oct, US back 1 Nov
+@pytest.mark.parametrize(
+    "day, london, new_york",
+    [
+        ((2026, 3, 3), range(8, 16), range(13, 22)),  # Both on winter time
+        ((2026, 3, 10), range(8, 16), range(12, 21)),  # New York has moved, London not yet
+        ((2026, 3, 31), range(7, 15), range(12, 21)),  # Both on summer time
+        ((2026, 10, 27), range(8, 16), range(12, 21)),  # London back, New York not yet
+        ((2026, 11, 3), range(8, 16), range(13, 22)),
+    ],
+)
+def test_sessions_follow_local_clock_changes(calendar, day, london, new_york):
+    assert open_hours(calendar, LONDON, day) == list(london)
+    assert open_hours(calendar, NEW_YORK, day) == list(new_york)
+    assert open_hours(calendar, OVERLAP, day) == sorted(set(london) & set(new_york))
+
+
+def test_next_session_start_moves_with_dst(calendar):
+    assert calendar.next_session_start(LONDON, utc(2026, 3, 27, 20)) == utc(2026, 3, 30, 7)
+    assert calendar.next_session_start(NEW_YORK, utc(2026, 10, 30, 23)) == utc(2026, 11, 2, 13)
+
+
+def test_no_sessions_on_the_local_weekend(calendar):
+    assert open_hours(calendar, LONDON, (2026, 3, 28)) == []
+    assert open_hours(calendar, NEW_YORK, (2026, 3, 29)) == []
+
+
+def test_fixed_variant_keeps_utc_hours():
+    fixed = SessionManagerService(dst_aware=False).calendar
+    for day in ((2026, 3, 3), (2026, 7, 14), (2026, 7, 18)):
+        assert open_hours(fixed, LONDON, day) == list(range(8, 16))
+        assert open_hours(fixed, NEW_YORK, day) == list(range(13, 22))
+
+
+@pytest.mark.parametrize("dst_aware", [True, False])
+@pytest.mark.parametrize("pair", ["EUR_USD", "USD_JPY", "EUR_GBP", "AUD_JPY", "XAU_USD"])
+def test_pair_filter_array_matches_scalar_over_a_week(dst_aware, pair):
+    calendar = SessionManagerService(dst_aware=dst_aware).calendar
+    # The week of the US clock change
+    timestamps = pd.date_range("2026-03-05", periods=7 * 24, freq="h", tz="UTC")
+
+    optimal, quality = calendar.pair_filter_array(pair, timestamps)
+    scalar = [calendar.pair_filter(pair, ts.to_pydatetime()) for ts in timestamps]
+
+    assert optimal.tolist() == [flag for flag, _ in scalar]
+    np.testing.assert_array_equal(quality, [multiplier for _, multiplier in scalar])
+    # Naive timestamps are read as UTC
+    naive_optimal, _ = calendar.pair_filter_array(pair, timestamps.tz_localize(None))
+    assert naive_optimal.tolist() == optimal.tolist()